@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+DURALUX CRM - Benchmark do Sistema de Backup v7.0
+Gera uma árvore sintética reproduzível (semente fixa) e mede a vazão do
+backup de arquivos para cada combinação de codec, nível de compressão e workers
+
+Uso:
+    python benchmark-backup.py --files 2000 --size-mb 200 --mix text=70,binary=30
+    python benchmark-backup.py --levels 1,6,9 --workers 1,2,4 --json resultado.json
+    python benchmark-backup.py --codecs deflate,zstd,lz4,xz --levels 3
+"""
+
+import os
+import sys
+import json
+import random
+import shutil
+import logging
+import argparse
+import tempfile
+import importlib.util
+from pathlib import Path
+from typing import Dict, List
+
+# Carrega o sistema de backup diretamente (nome do arquivo não é importável)
+spec = importlib.util.spec_from_file_location(
+    "duralux_backup_system", Path(__file__).parent / "duralux-backup-system-v7.py"
+)
+backup_module = importlib.util.module_from_spec(spec)
+# Registrado para que os workers da compressão paralela encontrem as funções
+sys.modules[spec.name] = backup_module
+spec.loader.exec_module(backup_module)
+
+DuraluxBackupSystem = backup_module.DuraluxBackupSystem
+
+TREE_NAME = 'bench-tree'
+
+# Vocabulário do conteúdo "text" (HTML/JS/PHP comprimem bem, como o projeto real)
+TEXT_WORDS = [
+    '<div class="card">', '</div>', '<span>', '</span>', 'function', 'return',
+    'const', 'cliente', 'pedido', 'relatório', 'Duralux', 'CRM', '$this->',
+    'SELECT', 'FROM', 'WHERE', 'id', 'nome', 'email', 'valor', '{', '}', ';'
+]
+
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    """Converte 'text=70,binary=30' em proporções que somam 1"""
+    weights = {}
+    for part in mix.split(','):
+        kind, _, weight = part.partition('=')
+        kind = kind.strip()
+        if kind not in ('text', 'binary'):
+            raise ValueError(f"Tipo de arquivo desconhecido no --mix: {kind}")
+        weights[kind] = float(weight or 1)
+    total = sum(weights.values())
+    return {kind: weight / total for kind, weight in weights.items()}
+
+
+def text_content(rng: random.Random, size: int) -> bytes:
+    """Texto compressível do tamanho pedido"""
+    words = []
+    length = 0
+    while length < size:
+        word = rng.choice(TEXT_WORDS)
+        words.append(word)
+        length += len(word.encode('utf-8')) + 1
+    return ' '.join(words).encode('utf-8')[:size]
+
+
+def binary_content(rng: random.Random, size: int) -> bytes:
+    """Bytes aleatórios (incompressíveis, como imagens e arquivos já comprimidos)"""
+    return rng.getrandbits(size * 8).to_bytes(size, 'little') if size else b''
+
+
+def build_tree(root: Path, files: int, size_mb: float, mix: Dict[str, float], seed: int) -> Dict:
+    """
+    Gera a árvore sintética: tamanhos com distribuição exponencial (muitos
+    arquivos pequenos e poucos grandes) normalizados para o total pedido
+
+    Returns:
+        Dict: Resumo da árvore (arquivos e bytes por tipo)
+    """
+    rng = random.Random(seed)
+    tree = root / TREE_NAME
+    if tree.exists():
+        shutil.rmtree(tree)
+
+    weights = [rng.expovariate(1.0) for _ in range(files)]
+    scale = size_mb * 1024 * 1024 / sum(weights)
+    kinds = list(mix)
+
+    summary = {kind: {'files': 0, 'bytes': 0} for kind in kinds}
+    for index, weight in enumerate(weights):
+        kind = rng.choices(kinds, weights=[mix[k] for k in kinds])[0]
+        size = int(weight * scale)
+
+        directory = tree / f"dir_{index % 20:02d}" / f"sub_{index % 7}"
+        directory.mkdir(parents=True, exist_ok=True)
+        extension = '.html' if kind == 'text' else '.png'
+        data = text_content(rng, size) if kind == 'text' else binary_content(rng, size)
+        (directory / f"file_{index:06d}{extension}").write_bytes(data)
+
+        summary[kind]['files'] += 1
+        summary[kind]['bytes'] += len(data)
+
+    return summary
+
+
+def warm_tree(root: Path):
+    """Lê a árvore inteira uma vez para que todas as rodadas partam do mesmo cache do SO"""
+    for path in (root / TREE_NAME).rglob('*'):
+        if path.is_file():
+            path.read_bytes()
+
+
+def run_case(root: Path, codec: str, level: int, workers: int, run: int) -> Dict:
+    """Executa um backup de arquivos com a configuração informada"""
+    case_dir = root / f"backups_{codec}_l{level}_w{workers}_r{run}"
+    config_file = root / f"config_{codec}_l{level}_w{workers}_r{run}.json"
+    config = {
+        'backup_directory': str(case_dir),
+        'compression_level': level,
+        'compression_codec': codec,
+        'include_directories': [TREE_NAME],
+        'exclude_patterns': [],
+        'store_patterns': [],
+        'storage_backend': 'zip',
+        'advanced_options': {
+            'verify_backups': False,
+            'create_checksums': True,
+            'checksum_algorithm': 'blake2b',
+            'parallel_compression': workers > 1,
+            'compression_workers': workers,
+            'restore_workers': 0,
+            'max_backup_size_mb': 0,
+            'split_large_backups': False
+        }
+    }
+    with open(config_file, 'w', encoding='utf-8') as f:
+        json.dump(config, f, indent=4)
+
+    system = DuraluxBackupSystem(str(config_file))
+    system.project_root = root
+    result = system.perform_files_backup()
+    if not result['success']:
+        raise RuntimeError(result['error'])
+
+    shutil.rmtree(case_dir, ignore_errors=True)
+    config_file.unlink()
+
+    return {
+        'codec': codec,
+        'level': level,
+        'workers': workers,
+        'duration': result['duration'],
+        'files': result['stats']['files_count'],
+        'total_size': result['stats']['total_size'],
+        'compressed_size': result['stats']['compressed_size'],
+        'compression_ratio': result['stats']['compression_ratio'],
+        **result['metrics']
+    }
+
+
+def print_report(results: List[Dict]):
+    """Tabela com a melhor rodada de cada combinação"""
+    print("\n" + "=" * 108)
+    print(f"{'Codec':>7} {'Nível':>5} {'Workers':>7} {'Duração':>9} {'MB/s':>8} {'Arq/s':>9} {'Compr.':>7} "
+          f"{'scan':>7} {'leitura':>8} {'compr.':>8} {'hash':>7} {'escrita':>8}")
+    print("-" * 108)
+    for r in results:
+        print(f"{r['codec']:>7} {r['level']:>5} {r['workers']:>7} {r['duration']:>8.2f}s "
+              f"{r['bytes_per_second'] / 1024 / 1024:>8.1f} {r['files_per_second']:>9.1f} "
+              f"{r['compression_ratio']:>6.1f}% {r['scan_seconds']:>7.2f} {r['read_seconds']:>8.2f} "
+              f"{r['compress_seconds']:>8.2f} {r['hash_seconds']:>7.2f} {r['write_seconds']:>8.2f}")
+    print("=" * 108)
+    print("ℹ️ Com workers > 1, leitura/compressão/hash somam o tempo de todos os processos")
+
+
+def main():
+    """Função principal - interface de linha de comando"""
+    parser = argparse.ArgumentParser(description="Benchmark do Duralux Backup System v7.0")
+    parser.add_argument('--files', type=int, default=2000, help='Quantidade de arquivos da árvore')
+    parser.add_argument('--size-mb', type=float, default=200, help='Tamanho total da árvore em MB')
+    parser.add_argument('--mix', default='text=70,binary=30',
+                        help='Proporção de arquivos por tipo (text, binary)')
+    parser.add_argument('--codecs', default='deflate', help='Codecs a medir (deflate, zstd, lz4, xz, store)')
+    parser.add_argument('--levels', default='1,6,9', help='Níveis de compressão a medir')
+    parser.add_argument('--workers', default=f"1,{os.cpu_count() or 1}",
+                        help='Quantidades de workers a medir')
+    parser.add_argument('--repeat', type=int, default=3, help='Rodadas por combinação (vale a melhor)')
+    parser.add_argument('--seed', type=int, default=42, help='Semente da árvore sintética')
+    parser.add_argument('--work-dir', help='Diretório de trabalho (padrão: temporário)')
+    parser.add_argument('--json', help='Grava os resultados neste arquivo JSON')
+
+    args = parser.parse_args()
+
+    codecs = [codec.strip() for codec in args.codecs.split(',')]
+    for codec in codecs:
+        if not backup_module.codec_available(codec):
+            parser.error(f"codec indisponível: {codec}")
+    levels = [int(level) for level in args.levels.split(',')]
+    workers_list = sorted({int(workers) for workers in args.workers.split(',')})
+    mix = parse_mix(args.mix)
+
+    # Só avisos do sistema de backup; o relatório sai no final
+    logging.basicConfig(level=logging.WARNING, format='%(levelname)s - %(message)s')
+
+    root = Path(args.work_dir) if args.work_dir else Path(tempfile.mkdtemp(prefix='duralux-bench-'))
+    root.mkdir(parents=True, exist_ok=True)
+
+    try:
+        print(f"🏗️ Gerando árvore sintética em {root} (semente {args.seed})...")
+        tree = build_tree(root, args.files, args.size_mb, mix, args.seed)
+        for kind, info in tree.items():
+            print(f"   {kind}: {info['files']} arquivos, {info['bytes'] / 1024 / 1024:.1f} MB")
+        warm_tree(root)
+
+        results = []
+        for codec in codecs:
+            for level in levels:
+                for workers in workers_list:
+                    runs = [run_case(root, codec, level, workers, run) for run in range(args.repeat)]
+                    best = min(runs, key=lambda r: r['duration'])
+                    results.append(best)
+                    print(f"⏱️ {codec}, nível {level}, {workers} worker(s): {best['duration']:.2f}s "
+                          f"({best['bytes_per_second'] / 1024 / 1024:.1f} MB/s)")
+
+        print_report(results)
+
+        if args.json:
+            with open(args.json, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'parameters': {
+                        'files': args.files, 'size_mb': args.size_mb, 'mix': mix,
+                        'seed': args.seed, 'repeat': args.repeat, 'cpu_count': os.cpu_count()
+                    },
+                    'tree': tree,
+                    'results': results
+                }, f, indent=4, ensure_ascii=False)
+            print(f"💾 Resultados gravados em {args.json}")
+    finally:
+        if not args.work_dir:
+            shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    except KeyboardInterrupt:
+        print("\n🛑 Benchmark interrompido pelo usuário")
+        sys.exit(1)
@@ -10,21 +10,2967 @@ Python: 3.8+
 """
 
 import os
+import re
 import sys
 import json
+import fnmatch
+import mmap
 import shutil
 import zipfile
 import sqlite3
 import pymysql
-import schedule
 import logging
 import datetime
 import subprocess
+import queue
+import tempfile
+import gzip
+import io
+import base64
+import posixpath
+import smtplib
+import ssl
+from email.message import EmailMessage
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 import hashlib
 import threading
 import time
+import zlib
+import lzma
+import struct
+import bisect
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+try:
+    import zstandard
+except ImportError:  # opcional: dumps .sql.zst e codec zstd
+    zstandard = None
+
+try:
+    import lz4.frame
+except ImportError:  # opcional: codec lz4
+    lz4 = None
+
+try:
+    import numpy
+except ImportError:  # opcional: gear hash vetorizado do chunk store
+    numpy = None
+
+try:
+    from cryptography.exceptions import InvalidTag
+    from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+except ImportError:  # opcional: backups criptografados
+    AESGCM = None
+
+try:
+    from dotenv import dotenv_values
+except ImportError:  # opcional: chave de criptografia em arquivo .env
+    dotenv_values = None
+
+try:
+    import boto3
+except ImportError:  # opcional: destino S3 / compatível (MinIO)
+    boto3 = None
+
+try:
+    import paramiko
+except ImportError:  # opcional: destino SFTP
+    paramiko = None
+
+# Manifesto gravado dentro de cada arquivo de backup (e copiado para backups/manifests)
+MANIFEST_MEMBER = '.duralux/manifest.json'
+MANIFEST_VERSION = 1
+HASH_BUFFER_SIZE = 1024 * 1024
+
+# Compressão paralela: lotes enviados aos workers e limite para leitura em memória
+PARALLEL_BATCH_BYTES = 8 * 1024 * 1024
+PARALLEL_BATCH_FILES = 64
+PARALLEL_MAX_FILE_SIZE = 64 * 1024 * 1024
+
+# Volumes gravados pelo ZipStreamWriter (formato documentado no APPNOTE do
+# PKWARE, sem APIs internas do zipfile): ZIP64 acima do mesmo limite do zipfile
+# e membros LZMA com o preset padrão (como o zipfile grava)
+ZIP64_LIMIT = (1 << 31) - 1
+ZIP_FILECOUNT_LIMIT = 0xFFFF
+ZIP_LZMA_PRESET = 6
+ZIP_LZMA_DICT_SIZE = 8 * 1024 * 1024
+
+# Codecs dos membros do zip: métodos nativos do formato (deflate, xz) ou frames
+# zstd/lz4 gravados sem compressão adicional, com sufixo no nome do membro
+ZIP_CODECS = {'deflate': zipfile.ZIP_DEFLATED, 'xz': zipfile.ZIP_LZMA, 'store': zipfile.ZIP_STORED}
+FRAME_CODEC_SUFFIXES = {'zstd': '.zst', 'lz4': '.lz4'}
+CODEC_LEVEL_RANGES = {'zstd': (1, 22), 'lz4': (0, 16)}
+
+# Buffer do pipe mysqldump -> arquivo comprimido (memória limitada, passada única)
+DUMP_BUFFER_SIZE = 1024 * 1024
+DUMP_TIMEOUT_SECONDS = 3600
+DUMP_SUFFIXES = ('.sql.gz', '.sql.zst', '.sql.gz.enc', '.sql.zst.enc')
+
+# Exportação nativa do banco: faixas de chave primária e linhas por lote
+EXPORT_MANIFEST = 'export.json'
+EXPORT_ROWS_PER_RANGE = 50000
+EXPORT_BATCH_ROWS = 1000
+
+# Snapshot online do SQLite: páginas copiadas por passo, pausa entre passos
+# (libera o lock para o PHP gravar) e páginas por segmento armazenado
+SQLITE_PAGES_PER_STEP = 256
+SQLITE_STEP_SLEEP_MS = 20
+SQLITE_SEGMENT_PAGES = 256
+SQLITE_PAGES_SUFFIX = '.pages'
+SQLITE_SNAPSHOT_META = 'snapshot.json'
+SQLITE_SIDECAR_SUFFIXES = ('-wal', '-shm', '-journal')
+
+# Criptografia: AES-256-GCM em blocos de tamanho fixo (acesso aleatório para o
+# zipfile); cabeçalho = magic + id da chave + prefixo do nonce + tamanho do bloco
+ENCRYPTION_MAGIC = b'DLXENC01'
+ENCRYPTION_CHUNK_SIZE = 64 * 1024
+ENCRYPTION_TAG_SIZE = 16
+ENCRYPTION_HEADER_SIZE = len(ENCRYPTION_MAGIC) + 8 + 8 + 4
+ENCRYPTED_SUFFIX = '.enc'
+
+# Destinos remotos: bloco de cópia (unidade do limite de banda), partes do
+# multipart S3 (mínimo de 5 MiB exigido pelo protocolo) e tentativas por arquivo
+UPLOAD_BLOCK_SIZE = 1024 * 1024
+UPLOAD_PART_SIZE = 16 * 1024 * 1024
+UPLOAD_MIN_PART_SIZE = 5 * 1024 * 1024
+UPLOAD_RETRIES = 3
+UPLOAD_PARTIAL_SUFFIX = '.part'
+
+# Verificação: buffer de leitura dos membros descomprimidos
+VERIFY_BUFFER_SIZE = 4 * 1024 * 1024
+
+# Métricas: fases cronometradas em cada backup (colunas <fase>_seconds no histórico)
+BACKUP_PHASES = ('scan', 'hash', 'read', 'compress', 'write', 'dump', 'verify')
+
+# Reconciliação do uso em disco: pausa a cada N entradas varridas (baixa prioridade)
+RECONCILE_PAUSE_EVERY = 500
+RECONCILE_PAUSE_SECONDS = 0.01
+
+# Plano (--action plan): tipo do backup -> tipo no histórico, amostras e arquivos listados
+PLAN_BACKUP_TYPES = {'full': 'full', 'files': 'files_only', 'incremental': 'incremental',
+                     'database': 'database_only'}
+PLAN_SAMPLE_SIZE = 10
+PLAN_LISTED_FILES = 20
+
+# Notificações: espera exponencial entre tentativas de entrega do outbox
+OUTBOX_BACKOFF_SECONDS = 60
+OUTBOX_MAX_BACKOFF_SECONDS = 3600
+OUTBOX_POLL_SECONDS = 30
+
+# Agendador: dias aceitos e espera máxima entre reavaliações da agenda
+WEEKDAYS = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
+SCHEDULER_MAX_SLEEP_SECONDS = 300
+
+# Retenção GFS: janela em dias e quantidade de backups diários, semanais e mensais
+RETENTION_DAYS = 30
+RETENTION_TIERS = {'daily': 7, 'weekly': 4, 'monthly': 6}
+
+# Chunk store: limites do content-defined chunking (média ~8 KiB)
+CDC_MIN_SIZE = 2 * 1024
+CDC_MAX_SIZE = 64 * 1024
+CDC_MASK_BITS = 13
+CDC_MASK = ((1 << CDC_MASK_BITS) - 1) << (64 - CDC_MASK_BITS)
+GEAR_TABLE = [int.from_bytes(hashlib.sha256(bytes([i])).digest()[:8], 'little') for i in range(256)]
+GEAR_ARRAY = numpy.array(GEAR_TABLE, dtype=numpy.uint64) if numpy is not None else None
+# O ChunkWriter fatia o buffer só quando acumula este tanto (menos chamadas ao gear hash)
+CDC_SCAN_SIZE = 1024 * 1024
+CDC_GEAR_BLOCK = 64 * 1024
+# Objetos sem registro em chunks.db mais novos que isto podem ser de um backup em andamento
+CHUNK_ORPHAN_GRACE_SECONDS = 24 * 3600
+
+
+def codec_available(codec: str) -> bool:
+    """Codec conhecido e com o módulo instalado"""
+    if codec == 'zstd':
+        return zstandard is not None
+    if codec == 'lz4':
+        return lz4 is not None
+    return codec in ZIP_CODECS
+
+
+def codec_level(codec: str, compression_level: int) -> int:
+    """Ajusta compression_level (escala zlib) à faixa aceita pelo codec"""
+    low, high = CODEC_LEVEL_RANGES.get(codec, (0, 9))
+    return max(low, min(high, compression_level))
+
+
+class Lz4FrameCompressor:
+    """Compressor lz4 com a mesma interface de zlib.compressobj (compress/flush)"""
+    
+    def __init__(self, level: int):
+        self.context = lz4.frame.LZ4FrameCompressor(compression_level=level)
+        self.header = self.context.begin()
+    
+    def compress(self, data: bytes) -> bytes:
+        output, self.header = self.header + self.context.compress(data), b''
+        return output
+    
+    def flush(self) -> bytes:
+        output, self.header = self.header + self.context.flush(), b''
+        return output
+
+
+def frame_compressor(codec: str, compression_level: int):
+    """Compressor incremental (compress/flush) de um codec de frame"""
+    level = codec_level(codec, compression_level)
+    if codec == 'zstd':
+        return zstandard.ZstdCompressor(level=level).compressobj()
+    return Lz4FrameCompressor(level)
+
+
+def open_frame_reader(codec: str, src):
+    """Leitor que descomprime um membro gravado com codec de frame"""
+    if codec == 'zstd':
+        return zstandard.ZstdDecompressor().stream_reader(src, closefd=False)
+    return lz4.frame.LZ4FrameFile(src, 'rb')
+
+
+@contextmanager
+def open_archive_member(zipf: zipfile.ZipFile, member: str, codec: Optional[str] = None):
+    """Abre um membro do zip já descomprimido, inclusive frames zstd/lz4"""
+    with zipf.open(member) as src:
+        if codec in FRAME_CODEC_SUFFIXES:
+            with open_frame_reader(codec, src) as reader:
+                yield reader
+        else:
+            yield src
+
+
+class FrameWriter:
+    """Escrita em fluxo comprimida com codec de frame (ex.: dump do banco em membro .zst)"""
+    
+    def __init__(self, dest, codec: str, compression_level: int):
+        self.dest = dest
+        self.compressor = frame_compressor(codec, compression_level)
+    
+    def write(self, data) -> int:
+        self.dest.write(self.compressor.compress(data))
+        return len(data)
+    
+    def close(self):
+        self.dest.write(self.compressor.flush())
+
+
+def compress_file_batch(batch: List[Tuple[str, str, str]], compression_level: int) -> List[Dict]:
+    """
+    Worker da compressão paralela: comprime um lote de arquivos, cada um com
+    seu codec, em membros prontos para serem gravados no zip
+    
+    Deflate e xz geram o fluxo bruto do método nativo do zip; zstd e lz4 geram
+    um frame que vai para o zip sem compressão adicional (membro com sufixo).
+    
+    Args:
+        batch: Lista de (caminho absoluto, caminho relativo, codec)
+        compression_level: Nível de compressão (escala zlib)
+    
+    Returns:
+        List[Dict]: Um resultado por arquivo (ou 'error' se a leitura falhar),
+        com o tempo gasto em leitura, compressão e hash
+    """
+    results = []
+    for file_path, arcname, codec in batch:
+        try:
+            started = time.perf_counter()
+            stat = os.stat(file_path)
+            with open(file_path, 'rb') as f:
+                data = f.read()
+            read_done = time.perf_counter()
+            
+            member = arcname
+            compress_type = ZIP_CODECS.get(codec, zipfile.ZIP_STORED)
+            if codec in FRAME_CODEC_SUFFIXES:
+                compressor = frame_compressor(codec, compression_level)
+                payload = compressor.compress(data) + compressor.flush()
+                member += FRAME_CODEC_SUFFIXES[codec]
+                stored = payload
+            elif compress_type == zipfile.ZIP_STORED:
+                payload = stored = data
+            else:
+                compressor = zip_member_compressor(compress_type, compression_level)
+                payload = compressor.compress(data) + compressor.flush()
+                stored = data
+            compress_done = time.perf_counter()
+            
+            digest = hashlib.sha256(data).hexdigest()
+            crc = zlib.crc32(stored)
+            
+            results.append({
+                'path': file_path,
+                'arcname': arcname,
+                'member': member,
+                'codec': codec,
+                'compress_type': compress_type,
+                'file_size': len(stored),
+                'size': len(data),
+                'crc': crc,
+                'sha256': digest,
+                'mtime': stat.st_mtime,
+                'mtime_ns': stat.st_mtime_ns,
+                'mode': stat.st_mode,
+                'data': payload,
+                'timings': {
+                    'read': read_done - started,
+                    'compress': compress_done - read_done,
+                    'hash': time.perf_counter() - compress_done
+                }
+            })
+        except OSError as e:
+            results.append({'path': file_path, 'arcname': arcname, 'error': str(e)})
+    return results
+
+
+def decode_encryption_key(value: str) -> bytes:
+    """Chave AES-256 em base64 ou hexadecimal (32 bytes)"""
+    value = value.strip()
+    try:
+        key = bytes.fromhex(value) if len(value) == 64 else base64.urlsafe_b64decode(value)
+    except ValueError:
+        raise ValueError("Chave de criptografia inválida (use base64 ou hex de 32 bytes)")
+    if len(key) != 32:
+        raise ValueError(f"Chave de criptografia deve ter 32 bytes (recebidos {len(key)})")
+    return key
+
+
+def encryption_key_id(key: bytes) -> bytes:
+    """Identificador da chave gravado no cabeçalho (não revela a chave)"""
+    return hashlib.sha256(b'duralux-backup-key:' + key).digest()[:8]
+
+
+def is_encrypted_file(path: Path) -> bool:
+    with open(path, 'rb') as f:
+        return f.read(len(ENCRYPTION_MAGIC)) == ENCRYPTION_MAGIC
+
+
+class EncryptingWriter:
+    """
+    Camada somente-escrita que cifra em blocos AES-GCM de tamanho fixo
+    
+    Cada bloco de ENCRYPTION_CHUNK_SIZE bytes vira bloco + tag de 16 bytes, com
+    nonce = prefixo aleatório || contador. O cabeçalho e a marca de último
+    bloco entram como dados associados, então troca, remoção ou truncamento
+    de blocos falham na autenticação. A memória usada é de um bloco.
+    """
+    
+    def __init__(self, raw, key: bytes, chunk_size: int = ENCRYPTION_CHUNK_SIZE):
+        self.raw = raw
+        self.aead = AESGCM(key)
+        self.chunk_size = chunk_size
+        self.nonce_prefix = os.urandom(8)
+        self.header = (ENCRYPTION_MAGIC + encryption_key_id(key) + self.nonce_prefix
+                       + chunk_size.to_bytes(4, 'big'))
+        self.counter = 0
+        self.buffer = bytearray()
+        self.raw.write(self.header)
+    
+    def _emit(self, chunk, final: bool):
+        nonce = self.nonce_prefix + self.counter.to_bytes(4, 'big')
+        self.raw.write(self.aead.encrypt(nonce, bytes(chunk), self.header + (b'\x01' if final else b'\x00')))
+        self.counter += 1
+    
+    def write(self, data) -> int:
+        view = memoryview(data).cast('B')
+        written = len(view)
+        # Um bloco só é cifrado quando se sabe que não é o último
+        while view:
+            if len(self.buffer) == self.chunk_size:
+                self._emit(self.buffer, False)
+                self.buffer = bytearray()
+            if not self.buffer and len(view) > self.chunk_size:
+                self._emit(view[:self.chunk_size], False)
+                view = view[self.chunk_size:]
+                continue
+            take = min(self.chunk_size - len(self.buffer), len(view))
+            self.buffer += view[:take]
+            view = view[take:]
+        return written
+    
+    def flush(self):
+        self.raw.flush()
+    
+    def close(self):
+        """Cifra o último bloco (não fecha o arquivo de destino)"""
+        if self.buffer is not None:
+            self._emit(self.buffer, True)
+            self.buffer = None
+
+
+class DecryptingReader(io.RawIOBase):
+    """
+    Leitura com seek de um arquivo gravado pelo EncryptingWriter
+    
+    Só o bloco que contém a posição atual é decifrado (e mantido em cache),
+    portanto o zipfile lê o diretório central e membros isolados sem decifrar
+    o volume inteiro. `raw` pode ser um arquivo aberto ou um mmap.
+    """
+    
+    def __init__(self, raw, key: Optional[bytes], close_raw: bool = True):
+        super().__init__()
+        self.raw = raw
+        self.close_raw = close_raw
+        self.raw.seek(0)
+        self.header = self.raw.read(ENCRYPTION_HEADER_SIZE)
+        if len(self.header) != ENCRYPTION_HEADER_SIZE or not self.header.startswith(ENCRYPTION_MAGIC):
+            raise ValueError("Arquivo não está no formato criptografado do Duralux")
+        if key is None:
+            raise ValueError("Backup criptografado: configure a chave (encryption.key_variable)")
+        if self.header[8:16] != encryption_key_id(key):
+            raise ValueError("Chave de criptografia diferente da usada neste backup")
+        
+        self.aead = AESGCM(key)
+        self.nonce_prefix = self.header[16:24]
+        self.chunk_size = int.from_bytes(self.header[24:28], 'big')
+        self.stored_chunk = self.chunk_size + ENCRYPTION_TAG_SIZE
+        
+        self.raw.seek(0, io.SEEK_END)
+        body = self.raw.tell() - ENCRYPTION_HEADER_SIZE
+        self.chunks = max(1, -(-body // self.stored_chunk))
+        self.body = body
+        self.size = body - self.chunks * ENCRYPTION_TAG_SIZE
+        if self.size < 0:
+            raise ValueError("Arquivo criptografado truncado")
+        self.position = 0
+        self.cached_index = None
+        self.cached = b''
+    
+    def _chunk(self, index: int) -> bytes:
+        if index != self.cached_index:
+            offset = index * self.stored_chunk
+            self.raw.seek(ENCRYPTION_HEADER_SIZE + offset)
+            ciphertext = self.raw.read(min(self.stored_chunk, self.body - offset))
+            final = index == self.chunks - 1
+            nonce = self.nonce_prefix + index.to_bytes(4, 'big')
+            try:
+                self.cached = self.aead.decrypt(nonce, ciphertext, self.header + (b'\x01' if final else b'\x00'))
+            except InvalidTag:
+                raise ValueError(f"Bloco {index} não autenticado (arquivo corrompido ou adulterado)")
+            self.cached_index = index
+        return self.cached
+    
+    def readable(self) -> bool:
+        return True
+    
+    def seekable(self) -> bool:
+        return True
+    
+    def tell(self) -> int:
+        return self.position
+    
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self.position
+        elif whence == io.SEEK_END:
+            offset += self.size
+        if offset < 0:
+            raise ValueError("Posição negativa")
+        self.position = offset
+        return self.position
+    
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            size = self.size - self.position
+        size = min(size, max(0, self.size - self.position))
+        parts = []
+        while size > 0:
+            index, start = divmod(self.position, self.chunk_size)
+            piece = self._chunk(index)[start:start + size]
+            parts.append(piece)
+            self.position += len(piece)
+            size -= len(piece)
+        return b''.join(parts)
+    
+    def readinto(self, buffer) -> int:
+        data = self.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+    
+    def close(self):
+        if not self.closed and self.close_raw:
+            self.raw.close()
+        super().close()
+
+
+@contextmanager
+def open_archive_volume(path: Path, key: Optional[bytes] = None):
+    """Abre um volume zip para leitura, decifrando-o se estiver criptografado"""
+    if not is_encrypted_file(path):
+        with zipfile.ZipFile(path, 'r') as zipf:
+            yield zipf
+        return
+    with DecryptingReader(open(path, 'rb'), key) as reader, zipfile.ZipFile(reader, 'r') as zipf:
+        yield zipf
+
+
+class MappedFile(mmap.mmap):
+    """mmap somente-leitura utilizável como arquivo pelo zipfile"""
+    
+    def seekable(self) -> bool:
+        return True
+
+
+def verify_archive_volume(path: str, expected_members: Dict[str, Tuple[str, Optional[str]]],
+                          expected_checksum: Optional[str], key: Optional[bytes] = None) -> Dict:
+    """
+    Worker da verificação: confere um volume zip mapeado em memória (mmap)
+    
+    Confere o checksum do arquivo inteiro (se conhecido), o SHA-256 de cada
+    membro listado no manifesto (membro -> (sha256, codec)), descomprimindo
+    os frames zstd/lz4, e o CRC de todos os membros. Volumes criptografados
+    têm o checksum conferido sobre o arquivo cifrado e são lidos via
+    DecryptingReader, o que autentica cada bloco.
+    
+    Returns:
+        Dict: {'path', 'ok', 'members', 'errors', 'seconds'}
+    """
+    started = time.perf_counter()
+    errors = []
+    checked = 0
+    try:
+        with open(path, 'rb') as f, MappedFile(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            if expected_checksum:
+                algorithm, _, expected_hex = expected_checksum.partition(':')
+                if hashlib.new(algorithm, mapped).hexdigest() != expected_hex:
+                    errors.append("checksum do arquivo não confere")
+            
+            source = mapped
+            if mapped[:len(ENCRYPTION_MAGIC)] == ENCRYPTION_MAGIC:
+                source = DecryptingReader(mapped, key, close_raw=False)
+            
+            with zipfile.ZipFile(source) as zipf:
+                for info in zipf.infolist():
+                    expected, codec = expected_members.get(info.filename, (None, None))
+                    digest = hashlib.sha256()
+                    try:
+                        with zipf.open(info) as src:
+                            reader = open_frame_reader(codec, src) if codec in FRAME_CODEC_SUFFIXES else src
+                            for chunk in iter(lambda: reader.read(VERIFY_BUFFER_SIZE), b""):
+                                digest.update(chunk)
+                            # A leitura do membro até o fim também valida o CRC
+                            while src.read(VERIFY_BUFFER_SIZE):
+                                pass
+                    except Exception as e:
+                        errors.append(f"{info.filename}: {e}")
+                        continue
+                    if expected and digest.hexdigest() != expected:
+                        errors.append(f"{info.filename}: SHA-256 não confere")
+                    checked += 1
+                
+                missing = set(expected_members) - set(zipf.namelist())
+                errors.extend(f"{member}: membro ausente" for member in sorted(missing))
+    except (OSError, ValueError, zipfile.BadZipFile) as e:
+        errors.append(str(e))
+    
+    return {'path': path, 'ok': not errors, 'members': checked, 'errors': errors,
+            'seconds': time.perf_counter() - started}
+
+
+class HashingFile:
+    """
+    Arquivo de saída somente-escrita que calcula o checksum do que é gravado
+    
+    Não expõe tell/seek: o ZipStreamWriter grava em fluxo (data descriptors),
+    sem voltar para reescrever cabeçalhos, então o hash sai junto com a escrita.
+    """
+    
+    def __init__(self, path: Path, algorithm: Optional[str]):
+        self.raw = open(path, 'wb')
+        self.algorithm = algorithm
+        self.hash = hashlib.new(algorithm) if algorithm else None
+    
+    def write(self, data) -> int:
+        if self.hash is not None:
+            self.hash.update(data)
+        return self.raw.write(data)
+    
+    def flush(self):
+        self.raw.flush()
+    
+    def close(self):
+        self.raw.close()
+    
+    @property
+    def checksum(self) -> str:
+        return f"{self.algorithm}:{self.hash.hexdigest()}" if self.hash is not None else ""
+
+
+def zip_member_compressor(compress_type: int, compression_level: int):
+    """
+    Compressor do fluxo de um membro do zip (None para ZIP_STORED)
+    
+    Deflate bruto (wbits -15) ou LZMA1 com o cabeçalho do método 14 do zip
+    (versão 9.4, tamanho e propriedades do filtro) e marcador de fim (EOS).
+    """
+    if compress_type == zipfile.ZIP_STORED:
+        return None
+    if compress_type == zipfile.ZIP_DEFLATED:
+        return zlib.compressobj(compression_level, zlib.DEFLATED, -15)
+    if compress_type == zipfile.ZIP_LZMA:
+        return ZipLZMACompressor()
+    raise ValueError(f"Método de compressão do zip não suportado: {compress_type}")
+
+
+class ZipLZMACompressor:
+    """LZMA1 no formato do zip: cabeçalho com as propriedades antes do fluxo bruto"""
+    
+    # Propriedades do preset padrão: lc=3, lp=0, pb=2
+    LC, LP, PB = 3, 0, 2
+    
+    def __init__(self):
+        properties = bytes([(self.PB * 5 + self.LP) * 9 + self.LC]) + struct.pack('<I', ZIP_LZMA_DICT_SIZE)
+        self.header = struct.pack('<BBH', 9, 4, len(properties)) + properties
+        self.compressor = lzma.LZMACompressor(lzma.FORMAT_RAW, filters=[{
+            'id': lzma.FILTER_LZMA1, 'preset': ZIP_LZMA_PRESET, 'dict_size': ZIP_LZMA_DICT_SIZE,
+            'lc': self.LC, 'lp': self.LP, 'pb': self.PB
+        }])
+    
+    def compress(self, data) -> bytes:
+        header, self.header = self.header, b''
+        return header + self.compressor.compress(data)
+    
+    def flush(self) -> bytes:
+        header, self.header = self.header, b''
+        return header + self.compressor.flush()
+
+
+class ZipMemberWriter:
+    """Membro em gravação no ZipStreamWriter (tamanho e CRC calculados no fluxo)"""
+    
+    def __init__(self, archive: 'ZipStreamWriter', entry: Dict, zip64: bool):
+        self.archive = archive
+        self.entry = entry
+        self.zip64 = zip64
+        self.compressor = zip_member_compressor(entry['compress_type'], archive.compression_level)
+        self.closed = False
+    
+    def write(self, data) -> int:
+        size = len(memoryview(data).cast('B'))
+        self.entry['crc'] = zlib.crc32(data, self.entry['crc'])
+        self.entry['file_size'] += size
+        if self.compressor is not None:
+            data = self.compressor.compress(data)
+        self.archive.write_raw(data)
+        self.entry['compress_size'] += len(data)
+        return size
+    
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        if self.compressor is not None:
+            tail = self.compressor.flush()
+            self.archive.write_raw(tail)
+            self.entry['compress_size'] += len(tail)
+        entry = self.entry
+        if not self.zip64 and max(entry['file_size'], entry['compress_size']) > ZIP64_LIMIT:
+            raise RuntimeError(f"Membro {entry['name']} passou de {ZIP64_LIMIT} bytes sem ZIP64")
+        # Data descriptor: CRC e tamanhos só são conhecidos no fim do fluxo
+        self.archive.write_raw(struct.pack('<4sLQQ' if self.zip64 else '<4sLLL', b'PK\x07\x08',
+                                           entry['crc'], entry['compress_size'], entry['file_size']))
+        self.archive.entries.append(entry)
+        self.archive.writing = False
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.closed = True
+            self.archive.writing = False
+
+
+class ZipStreamWriter:
+    """
+    Gravação de um zip em fluxo, só com write() no destino (sem tell/seek)
+    
+    Cabeçalhos locais, data descriptors, diretório central e registros ZIP64
+    seguem o formato documentado (APPNOTE do PKWARE), sem as APIs internas do
+    zipfile; a leitura continua com o zipfile. Além de membros em fluxo
+    (open), aceita membros já comprimidos por um worker (write_compressed),
+    então a compressão paralela funciona em qualquer versão do Python.
+    """
+    
+    def __init__(self, fileobj, compression_level: int = 6):
+        self.fp = fileobj
+        self.compression_level = compression_level
+        self.offset = 0
+        self.entries = []
+        self.writing = False
+        self.closed = False
+    
+    def write_raw(self, data):
+        self.fp.write(data)
+        self.offset += len(data)
+    
+    def _new_entry(self, name: str, date_time, mode: int, compress_type: int) -> Dict:
+        if self.closed:
+            raise ValueError("Zip já fechado")
+        if self.writing:
+            raise ValueError(f"Outro membro ainda está aberto (ao gravar {name})")
+        if date_time[0] < 1980:
+            date_time = (1980, 1, 1, 0, 0, 0)
+        elif date_time[0] > 2107:
+            date_time = (2107, 12, 31, 23, 59, 58)
+        year, month, day, hour, minute, second = date_time
+        try:
+            encoded, flags = name.encode('ascii'), 0
+        except UnicodeEncodeError:
+            encoded, flags = name.encode('utf-8'), 0x800
+        if compress_type == zipfile.ZIP_LZMA:
+            flags |= 0x02
+        return {
+            'name': name,
+            'encoded': encoded,
+            'flags': flags,
+            'compress_type': compress_type,
+            'dos_time': hour << 11 | minute << 5 | second // 2,
+            'dos_date': (year - 1980) << 9 | month << 5 | day,
+            'external_attr': (mode & 0xFFFF) << 16,
+            'header_offset': self.offset,
+            'crc': 0,
+            'compress_size': 0,
+            'file_size': 0
+        }
+    
+    @staticmethod
+    def _version(entry: Dict, zip64: bool) -> int:
+        if entry['compress_type'] == zipfile.ZIP_LZMA:
+            return 63
+        return 45 if zip64 else 20
+    
+    def _write_local_header(self, entry: Dict, zip64: bool):
+        crc, compress_size, file_size = entry['crc'], entry['compress_size'], entry['file_size']
+        extra = b''
+        if zip64:
+            extra = struct.pack('<HHQQ', 1, 16, file_size, compress_size)
+            compress_size = file_size = 0xFFFFFFFF
+        self.write_raw(struct.pack('<4sHHHHHLLLHH', b'PK\x03\x04', self._version(entry, zip64),
+                                   entry['flags'], entry['compress_type'], entry['dos_time'],
+                                   entry['dos_date'], crc, compress_size, file_size,
+                                   len(entry['encoded']), len(extra)))
+        self.write_raw(entry['encoded'])
+        self.write_raw(extra)
+    
+    def open(self, name: str, date_time, mode: int, compress_type: int,
+             file_size: Optional[int] = None, force_zip64: bool = False) -> ZipMemberWriter:
+        """
+        Membro gravado em fluxo (CRC e tamanhos no data descriptor)
+        
+        Sem file_size conhecido e com chance de passar de 2 GiB, use
+        force_zip64 (como no zipfile.ZipFile.open).
+        """
+        entry = self._new_entry(name, date_time, mode, compress_type)
+        entry['flags'] |= 0x08
+        zip64 = force_zip64 or (file_size or 0) * 1.05 > ZIP64_LIMIT
+        entry['zip64'] = zip64
+        self._write_local_header(entry, zip64)
+        self.writing = True
+        return ZipMemberWriter(self, entry, zip64)
+    
+    def write_compressed(self, name: str, date_time, mode: int, compress_type: int,
+                         payload: bytes, file_size: int, crc: int):
+        """Membro já comprimido (fluxo bruto do método) com CRC e tamanho original"""
+        entry = self._new_entry(name, date_time, mode, compress_type)
+        entry.update({'crc': crc, 'compress_size': len(payload), 'file_size': file_size})
+        zip64 = max(file_size, len(payload)) > ZIP64_LIMIT
+        entry['zip64'] = zip64
+        self._write_local_header(entry, zip64)
+        self.write_raw(payload)
+        self.entries.append(entry)
+    
+    def writestr(self, name: str, data, compress_type: int = zipfile.ZIP_DEFLATED, mode: int = 0o644):
+        """Membro a partir de bytes (ou texto, em UTF-8) já em memória"""
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        compressor = zip_member_compressor(compress_type, self.compression_level)
+        payload = data if compressor is None else compressor.compress(data) + compressor.flush()
+        self.write_compressed(name, time.localtime()[0:6], mode, compress_type,
+                              payload, len(data), zlib.crc32(data))
+    
+    def namelist(self) -> List[str]:
+        return [entry['name'] for entry in self.entries]
+    
+    def close(self):
+        """Grava o diretório central (com registros ZIP64 quando necessário)"""
+        if self.closed:
+            return
+        if self.writing:
+            raise ValueError("Membro ainda aberto ao fechar o zip")
+        self.closed = True
+        
+        start = self.offset
+        for entry in self.entries:
+            file_size, compress_size, header_offset = (entry['file_size'], entry['compress_size'],
+                                                       entry['header_offset'])
+            fields = []
+            if file_size > ZIP64_LIMIT or compress_size > ZIP64_LIMIT:
+                fields += [file_size, compress_size]
+                file_size = compress_size = 0xFFFFFFFF
+            if header_offset > ZIP64_LIMIT:
+                fields.append(header_offset)
+                header_offset = 0xFFFFFFFF
+            extra = struct.pack(f'<HH{len(fields)}Q', 1, 8 * len(fields), *fields) if fields else b''
+            version = self._version(entry, entry['zip64'] or bool(fields))
+            self.write_raw(struct.pack('<4sBBHHHHHLLLHHHHHLL', b'PK\x01\x02', version, 3, version,
+                                       entry['flags'], entry['compress_type'], entry['dos_time'],
+                                       entry['dos_date'], entry['crc'], compress_size, file_size,
+                                       len(entry['encoded']), len(extra), 0, 0, 0,
+                                       entry['external_attr'], header_offset))
+            self.write_raw(entry['encoded'])
+            self.write_raw(extra)
+        
+        count, size = len(self.entries), self.offset - start
+        if count > ZIP_FILECOUNT_LIMIT or start > ZIP64_LIMIT or size > ZIP64_LIMIT:
+            zip64_end = self.offset
+            self.write_raw(struct.pack('<4sQHHLLQQQQ', b'PK\x06\x06', 44, 45, 45, 0, 0,
+                                       count, count, size, start))
+            self.write_raw(struct.pack('<4sLQL', b'PK\x06\x07', 0, zip64_end, 1))
+            count, size, start = min(count, 0xFFFF), min(size, 0xFFFFFFFF), min(start, 0xFFFFFFFF)
+        self.write_raw(struct.pack('<4sHHHHLLH', b'PK\x05\x06', 0, 0, count, count, size, start, 0))
+
+
+class ArchiveVolumes:
+    """
+    Conjunto de volumes zip de um backup
+    
+    Cada volume é um zip completo, com seu próprio diretório central (índice),
+    portanto um membro pode ser restaurado lendo apenas o volume onde está.
+    Quando o volume atual atinge `max_bytes`, o próximo membro vai para um
+    novo volume: backup.zip, backup.vol002.zip, backup.vol003.zip...
+    
+    Com `encryption_key`, o zip passa pelo EncryptingWriter antes do disco
+    (o checksum é do arquivo cifrado, como gravado). `on_volume_closed`
+    recebe cada volume assim que fica completo (ex.: envio ao destino remoto
+    enquanto o próximo volume ainda é comprimido).
+    """
+    
+    def __init__(self, first_path: Path, compression_level: int, max_bytes: Optional[int] = None,
+                 checksum_algorithm: Optional[str] = None, encryption_key: Optional[bytes] = None,
+                 on_volume_closed=None):
+        self.first_path = first_path
+        self.compression_level = compression_level
+        self.max_bytes = max_bytes
+        self.checksum_algorithm = checksum_algorithm
+        self.encryption_key = encryption_key
+        self.on_volume_closed = on_volume_closed
+        self.encryptor = None
+        self.paths = []
+        self.member_sources = {}
+        self.checksums = {}
+        self.zipf = None
+        self.output = None
+        self._open_next()
+    
+    @staticmethod
+    def volume_paths(first_path: Path) -> List[Path]:
+        """Volumes existentes em disco de um backup, em ordem"""
+        return [first_path] + sorted(first_path.parent.glob(f"{first_path.stem}.vol*.zip"))
+    
+    @staticmethod
+    def sort_key(name: str) -> Tuple[str, int]:
+        """Ordena nomes de volumes: backup.zip antes de backup.vol002.zip"""
+        stem = Path(name).stem
+        base, _, volume = stem.rpartition('.vol')
+        if base and volume.isdigit():
+            return base, int(volume)
+        return stem, 1
+    
+    def _open_next(self):
+        index = len(self.paths) + 1
+        if index == 1:
+            path = self.first_path
+        else:
+            path = self.first_path.with_name(f"{self.first_path.stem}.vol{index:03d}.zip")
+        self._close_current()
+        self.output = HashingFile(path, self.checksum_algorithm)
+        target = self.output
+        if self.encryption_key is not None:
+            self.encryptor = target = EncryptingWriter(self.output, self.encryption_key)
+        self.zipf = ZipStreamWriter(target, self.compression_level)
+        self.paths.append(path)
+    
+    def _close_current(self):
+        if self.zipf is not None:
+            self.zipf.close()
+            if self.encryptor is not None:
+                self.encryptor.close()
+            self.output.close()
+            self.checksums[self.current_name] = self.output.checksum
+            self.zipf = None
+            if self.on_volume_closed is not None:
+                self.on_volume_closed(self.paths[-1])
+    
+    @property
+    def current_name(self) -> str:
+        return self.paths[-1].name
+    
+    def ensure_room(self, incoming: int = 0) -> ZipStreamWriter:
+        """Retorna o zip onde o próximo membro deve ser gravado, rolando se necessário"""
+        if (self.max_bytes and self.zipf.entries
+                and self.zipf.offset + incoming >= self.max_bytes):
+            self._open_next()
+        return self.zipf
+    
+    def record(self, member: str):
+        """Registra em qual volume um membro foi gravado"""
+        self.member_sources[member] = self.current_name
+    
+    @property
+    def total_size(self) -> int:
+        return sum(path.stat().st_size for path in self.paths)
+    
+    def close(self):
+        self._close_current()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            # Volume incompleto de um backup que falhou não é entregue
+            self.on_volume_closed = None
+        self.close()
+
+
+def cdc_cut_point(data, start: int, end: int) -> int:
+    """
+    Tamanho do próximo chunk em data[start:end] usando gear hash (rolling)
+    
+    Os bits altos do hash dependem dos últimos 64 bytes, então as fronteiras
+    acompanham o conteúdo: inserir bytes no início de um arquivo altera apenas
+    os chunks vizinhos e o resto continua deduplicado.
+    """
+    length = end - start
+    if length <= CDC_MIN_SIZE:
+        return length
+    
+    limit = start + min(length, CDC_MAX_SIZE)
+    gear = GEAR_TABLE
+    h = 0
+    # Aquece o hash com a janela de 64 bytes anterior ao tamanho mínimo
+    for i in range(start + CDC_MIN_SIZE - 64, start + CDC_MIN_SIZE):
+        h = ((h << 1) + gear[data[i]]) & 0xFFFFFFFFFFFFFFFF
+    for i in range(start + CDC_MIN_SIZE, limit):
+        h = ((h << 1) + gear[data[i]]) & 0xFFFFFFFFFFFFFFFF
+        if not h & CDC_MASK:
+            return i + 1 - start
+    return limit - start
+
+
+def gear_cut_candidates(data) -> List[int]:
+    """
+    Posições i de data em que o gear hash da janela terminada em i passa na
+    máscara (com numpy; o resultado vale para qualquer início de chunk)
+    
+    O hash é a soma de gear[data[i - k]] << k para k < 64 (módulo 2^64), a
+    mesma que cdc_cut_point calcula byte a byte; aqui ela é montada por
+    dobramento (janelas de 1, 2, 4... 64 bytes) em 6 operações vetoriais.
+    """
+    values = numpy.frombuffer(data, dtype=numpy.uint8)
+    mask = numpy.uint64(CDC_MASK)
+    candidates = []
+    # Blocos pequenos (cabem no cache), cada um com os 63 bytes anteriores da janela
+    for start in range(0, len(values), CDC_GEAR_BLOCK):
+        first = max(0, start - 63)
+        h = GEAR_ARRAY[values[first:start + CDC_GEAR_BLOCK]]
+        shifted = numpy.empty_like(h)
+        for shift in (1, 2, 4, 8, 16, 32):
+            numpy.left_shift(h[:-shift], numpy.uint64(shift), out=shifted[shift:])
+            h[shift:] += shifted[shift:]
+        hits = numpy.flatnonzero((h[start - first:] & mask) == 0)
+        candidates.extend((hits + start).tolist())
+    return candidates
+
+
+def cdc_chunk_lengths(data, final: bool) -> List[int]:
+    """
+    Tamanhos dos chunks do início de data, os mesmos de chamadas sucessivas a
+    cdc_cut_point
+    
+    Sem final, para quando restam menos de CDC_MAX_SIZE bytes (o próximo
+    corte pode depender de dados que ainda não chegaram).
+    """
+    end = len(data)
+    candidates = gear_cut_candidates(data) if numpy is not None else None
+    lengths = []
+    position = 0
+    while end - position >= CDC_MAX_SIZE or (final and position < end):
+        if candidates is None:
+            cut = cdc_cut_point(data, position, end)
+        elif end - position <= CDC_MIN_SIZE:
+            cut = end - position
+        else:
+            limit = position + min(end - position, CDC_MAX_SIZE)
+            index = bisect.bisect_left(candidates, position + CDC_MIN_SIZE)
+            if index < len(candidates) and candidates[index] < limit:
+                cut = candidates[index] + 1 - position
+            else:
+                cut = limit - position
+        lengths.append(cut)
+        position += cut
+    return lengths
+
+
+class ChunkWriter:
+    """Destino de escrita (write/close) que fatia o fluxo em chunks no ChunkStore"""
+    
+    def __init__(self, store: 'ChunkStore'):
+        self.store = store
+        self.buffer = bytearray()
+        self.chunks = []
+        self.size = 0
+        self.hash = hashlib.sha256()
+    
+    def write(self, data: bytes) -> int:
+        self.hash.update(data)
+        self.size += len(data)
+        self.buffer += data
+        if len(self.buffer) >= CDC_SCAN_SIZE:
+            self.flush_chunks(final=False)
+        return len(data)
+    
+    def close(self):
+        self.flush_chunks(final=True)
+        self.buffer = bytearray()
+    
+    def flush_chunks(self, final: bool):
+        """Grava os chunks completos do buffer (todos com final=True)"""
+        position = 0
+        view = memoryview(self.buffer)
+        try:
+            for cut in cdc_chunk_lengths(view, final):
+                self.chunks.append(self.store.put_chunk(bytes(view[position:position + cut])))
+                position += cut
+        finally:
+            view.release()
+        del self.buffer[:position]
+    
+    @property
+    def sha256(self) -> str:
+        return self.hash.hexdigest()
+
+
+class ChunkStore:
+    """
+    Armazenamento deduplicado de backups por content-defined chunking
+    
+    Cada chunk é gravado uma única vez em objects/<2>/<sha256> (zlib) e indexado
+    em chunks.db. Um snapshot é a lista de arquivos com seus chunks; o refcount
+    de cada chunk conta quantos snapshots o usam, e chunks sem referência são
+    removidos pela coleta de lixo.
+    """
+    
+    def __init__(self, store_dir: Path, compression_level: int = 6):
+        self.store_dir = store_dir
+        self.objects_dir = store_dir / 'objects'
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+        self.compression_level = compression_level
+        self.new_stored_bytes = 0
+        
+        self.conn = sqlite3.connect(store_dir / 'chunks.db')
+        self.conn.executescript('''
+            CREATE TABLE IF NOT EXISTS chunks (
+                hash TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                stored_size INTEGER NOT NULL,
+                refcount INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE TABLE IF NOT EXISTS snapshots (
+                name TEXT PRIMARY KEY,
+                backup_type TEXT NOT NULL,
+                created TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS snapshot_files (
+                snapshot TEXT NOT NULL,
+                path TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER,
+                sha256 TEXT NOT NULL,
+                chunks TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_snapshot_files ON snapshot_files(snapshot);
+            CREATE INDEX IF NOT EXISTS idx_snapshots_created ON snapshots(created);
+        ''')
+        self.init_totals()
+        self.conn.commit()
+    
+    def init_totals(self):
+        """
+        Ledger store_totals (uma linha): contagens e bytes mantidos por triggers
+        a cada chunk/snapshot gravado ou removido, para o status não somar as
+        tabelas inteiras
+        """
+        created = self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'store_totals'").fetchone() is None
+        self.conn.executescript('''
+            CREATE TABLE IF NOT EXISTS store_totals (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                snapshots INTEGER NOT NULL DEFAULT 0,
+                chunks INTEGER NOT NULL DEFAULT 0,
+                logical_bytes INTEGER NOT NULL DEFAULT 0,
+                unique_bytes INTEGER NOT NULL DEFAULT 0,
+                stored_bytes INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE TRIGGER IF NOT EXISTS trg_totals_chunk_insert AFTER INSERT ON chunks
+            BEGIN
+                UPDATE store_totals SET chunks = chunks + 1, unique_bytes = unique_bytes + NEW.size,
+                                        stored_bytes = stored_bytes + NEW.stored_size;
+            END;
+            CREATE TRIGGER IF NOT EXISTS trg_totals_chunk_delete AFTER DELETE ON chunks
+            BEGIN
+                UPDATE store_totals SET chunks = chunks - 1, unique_bytes = unique_bytes - OLD.size,
+                                        stored_bytes = stored_bytes - OLD.stored_size;
+            END;
+            CREATE TRIGGER IF NOT EXISTS trg_totals_snapshot_insert AFTER INSERT ON snapshots
+            BEGIN
+                UPDATE store_totals SET snapshots = snapshots + 1;
+            END;
+            CREATE TRIGGER IF NOT EXISTS trg_totals_snapshot_delete AFTER DELETE ON snapshots
+            BEGIN
+                UPDATE store_totals SET snapshots = snapshots - 1;
+            END;
+            CREATE TRIGGER IF NOT EXISTS trg_totals_file_insert AFTER INSERT ON snapshot_files
+            BEGIN
+                UPDATE store_totals SET logical_bytes = logical_bytes + NEW.size;
+            END;
+            CREATE TRIGGER IF NOT EXISTS trg_totals_file_delete AFTER DELETE ON snapshot_files
+            BEGIN
+                UPDATE store_totals SET logical_bytes = logical_bytes - OLD.size;
+            END;
+        ''')
+        
+        # Stores de versões anteriores: agregação completa uma única vez
+        if created:
+            self.conn.execute('''
+                INSERT INTO store_totals (id, snapshots, chunks, logical_bytes, unique_bytes, stored_bytes)
+                SELECT 1, (SELECT COUNT(*) FROM snapshots), COUNT(*),
+                       (SELECT COALESCE(SUM(size), 0) FROM snapshot_files),
+                       COALESCE(SUM(size), 0), COALESCE(SUM(stored_size), 0)
+                FROM chunks
+            ''')
+    
+    def object_path(self, digest: str) -> Path:
+        return self.objects_dir / digest[:2] / digest
+    
+    def put_chunk(self, chunk: bytes) -> str:
+        """Grava o chunk se ainda não existir e retorna seu SHA-256"""
+        digest = hashlib.sha256(chunk).hexdigest()
+        if self.conn.execute('SELECT 1 FROM chunks WHERE hash = ?', (digest,)).fetchone():
+            return digest
+        
+        payload = zlib.compress(chunk, self.compression_level)
+        target = self.object_path(digest)
+        target.parent.mkdir(exist_ok=True)
+        partial = target.with_suffix('.part')
+        with open(partial, 'wb') as f:
+            f.write(payload)
+        partial.replace(target)
+        
+        self.conn.execute(
+            'INSERT INTO chunks (hash, size, stored_size, refcount) VALUES (?, ?, ?, 0)',
+            (digest, len(chunk), len(payload))
+        )
+        self.new_stored_bytes += len(payload)
+        return digest
+    
+    def read_chunk(self, digest: str) -> bytes:
+        with open(self.object_path(digest), 'rb') as f:
+            chunk = zlib.decompress(f.read())
+        if hashlib.sha256(chunk).hexdigest() != digest:
+            raise ValueError(f"Chunk corrompido: {digest}")
+        return chunk
+    
+    def writer(self) -> ChunkWriter:
+        return ChunkWriter(self)
+    
+    def has_snapshot(self, name: str) -> bool:
+        return self.conn.execute('SELECT 1 FROM snapshots WHERE name = ?', (name,)).fetchone() is not None
+    
+    def latest_files(self) -> Dict[str, Tuple[int, int, str, str]]:
+        """Arquivos do snapshot mais recente: path -> (size, mtime_ns, sha256, chunks)"""
+        row = self.conn.execute('SELECT name FROM snapshots ORDER BY created DESC LIMIT 1').fetchone()
+        if not row:
+            return {}
+        cursor = self.conn.execute(
+            'SELECT path, size, mtime_ns, sha256, chunks FROM snapshot_files WHERE snapshot = ?', (row[0],)
+        )
+        return {path: (size, mtime_ns, digest, chunks) for path, size, mtime_ns, digest, chunks in cursor}
+    
+    def commit_snapshot(self, name: str, backup_type: str, created: str,
+                        files: List[Tuple[str, int, int, str, str]]):
+        """Registra o snapshot e incrementa o refcount dos chunks que ele usa"""
+        with self.conn:
+            self.conn.execute('INSERT INTO snapshots (name, backup_type, created) VALUES (?, ?, ?)',
+                              (name, backup_type, created))
+            self.conn.executemany(
+                'INSERT INTO snapshot_files (snapshot, path, size, mtime_ns, sha256, chunks) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                [(name,) + row for row in files]
+            )
+            used = {digest for row in files for digest in row[4].split()}
+            self.conn.executemany('UPDATE chunks SET refcount = refcount + 1 WHERE hash = ?',
+                                  [(digest,) for digest in used])
+    
+    def delete_snapshot(self, name: str):
+        """Remove o snapshot e decrementa o refcount dos seus chunks"""
+        cursor = self.conn.execute('SELECT chunks FROM snapshot_files WHERE snapshot = ?', (name,))
+        used = {digest for (chunks,) in cursor for digest in chunks.split()}
+        with self.conn:
+            self.conn.executemany('UPDATE chunks SET refcount = refcount - 1 WHERE hash = ?',
+                                  [(digest,) for digest in used])
+            self.conn.execute('DELETE FROM snapshot_files WHERE snapshot = ?', (name,))
+            self.conn.execute('DELETE FROM snapshots WHERE name = ?', (name,))
+    
+    def reclaimable_bytes(self, names: List[str]) -> int:
+        """Bytes que a coleta de lixo liberaria se estes snapshots fossem removidos"""
+        references: Dict[str, int] = {}
+        for name in names:
+            cursor = self.conn.execute('SELECT chunks FROM snapshot_files WHERE snapshot = ?', (name,))
+            for digest in {digest for (chunks,) in cursor for digest in chunks.split()}:
+                references[digest] = references.get(digest, 0) + 1
+        
+        freed = 0
+        for digest, count in references.items():
+            row = self.conn.execute('SELECT stored_size, refcount FROM chunks WHERE hash = ?', (digest,)).fetchone()
+            if row and row[1] <= count:
+                freed += row[0]
+        return freed
+    
+    def garbage_collect(self) -> Tuple[int, int]:
+        """
+        Apaga os chunks sem referência
+        
+        Além dos registros com refcount zero, varre objects/ atrás de objetos
+        sem registro (ou .part) deixados por um backup que caiu antes do
+        commit_snapshot; só os mais antigos que CHUNK_ORPHAN_GRACE_SECONDS,
+        para não apagar os de um backup ainda em andamento.
+        
+        Returns:
+            Tuple[int, int]: (chunks removidos, bytes liberados)
+        """
+        orphans = self.conn.execute('SELECT hash, stored_size FROM chunks WHERE refcount <= 0').fetchall()
+        for digest, _ in orphans:
+            self.object_path(digest).unlink(missing_ok=True)
+        with self.conn:
+            self.conn.executemany('DELETE FROM chunks WHERE hash = ?', [(digest,) for digest, _ in orphans])
+        removed, freed = len(orphans), sum(size for _, size in orphans)
+        
+        known = {digest for (digest,) in self.conn.execute('SELECT hash FROM chunks')}
+        cutoff = time.time() - CHUNK_ORPHAN_GRACE_SECONDS
+        for path in self.objects_dir.glob('*/*'):
+            if path.name in known:
+                continue
+            try:
+                stat = path.stat()
+                if stat.st_mtime > cutoff:
+                    continue
+                path.unlink()
+            except OSError:
+                continue
+            removed += 1
+            freed += stat.st_size
+        return removed, freed
+    
+    def snapshot_paths(self, name: str) -> List[str]:
+        cursor = self.conn.execute('SELECT path FROM snapshot_files WHERE snapshot = ?', (name,))
+        return [row[0] for row in cursor]
+    
+    def iter_file(self, name: str, relative_path: str):
+        """Conteúdo de um arquivo do snapshot, chunk a chunk"""
+        row = self.conn.execute('SELECT chunks FROM snapshot_files WHERE snapshot = ? AND path = ?',
+                                (name, relative_path)).fetchone()
+        if row is None:
+            raise FileNotFoundError(f"Arquivo não encontrado no snapshot: {relative_path}")
+        for digest in row[0].split():
+            yield self.read_chunk(digest)
+    
+    def restore_snapshot(self, name: str, restore_path: Path, selector=None) -> int:
+        """Reconstrói os arquivos do snapshot, validando o SHA-256 de cada um"""
+        root = restore_path.resolve()
+        restored = 0
+        cursor = self.conn.execute('SELECT path, sha256, chunks FROM snapshot_files WHERE snapshot = ?', (name,))
+        for relative_path, expected, chunks in cursor.fetchall():
+            if selector is not None and not selector(relative_path):
+                continue
+            target = (restore_path / relative_path).resolve()
+            if root not in target.parents:
+                continue
+            target.parent.mkdir(parents=True, exist_ok=True)
+            file_hash = hashlib.sha256()
+            with open(target, 'wb') as f:
+                for digest in chunks.split():
+                    chunk = self.read_chunk(digest)
+                    file_hash.update(chunk)
+                    f.write(chunk)
+            if file_hash.hexdigest() != expected:
+                raise ValueError(f"Arquivo restaurado não confere: {relative_path}")
+            restored += 1
+        return restored
+    
+    def storage_report(self) -> Dict:
+        """Tamanho lógico x físico e taxa de deduplicação (lidos do ledger store_totals)"""
+        snapshots, chunk_count, logical_bytes, unique_bytes, stored_bytes = self.conn.execute(
+            'SELECT snapshots, chunks, logical_bytes, unique_bytes, stored_bytes FROM store_totals'
+        ).fetchone()
+        return {
+            'snapshots': snapshots,
+            'chunks': chunk_count,
+            'logical_bytes': logical_bytes,
+            'unique_bytes': unique_bytes,
+            'stored_bytes': stored_bytes,
+            'dedup_ratio': (logical_bytes / unique_bytes) if unique_bytes else 0
+        }
+    
+    def close(self):
+        self.conn.close()
+
+
+class StatCache:
+    """
+    Cache persistente de hashes por (inode, tamanho, mtime_ns)
+    
+    Fica em backup_history.db; é carregado inteiro em memória no início e só
+    as entradas alteradas são gravadas de volta, em lote.
+    """
+    
+    def __init__(self, db_file: Path):
+        self.db_file = db_file
+        self.entries: Dict[str, Tuple[int, int, int, str]] = {}
+        self.dirty: Dict[str, Tuple[int, int, int, str]] = {}
+        
+        conn = sqlite3.connect(db_file)
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS file_stat_cache (
+                path TEXT PRIMARY KEY,
+                inode INTEGER,
+                size INTEGER,
+                mtime_ns INTEGER,
+                sha256 TEXT
+            )
+        ''')
+        for path, inode, size, mtime_ns, digest in conn.execute(
+                'SELECT path, inode, size, mtime_ns, sha256 FROM file_stat_cache'):
+            self.entries[path] = (inode, size, mtime_ns, digest)
+        conn.commit()
+        conn.close()
+    
+    def lookup(self, path: str, stat: os.stat_result) -> Optional[str]:
+        """Hash conhecido se o arquivo não mudou desde a última leitura"""
+        cached = self.entries.get(path)
+        if cached and cached[:3] == (stat.st_ino, stat.st_size, stat.st_mtime_ns):
+            return cached[3]
+        return None
+    
+    def store(self, path: str, stat: os.stat_result, digest: str):
+        entry = (stat.st_ino, stat.st_size, stat.st_mtime_ns, digest)
+        if self.entries.get(path) != entry:
+            self.entries[path] = entry
+            self.dirty[path] = entry
+    
+    def flush(self):
+        """Grava as entradas novas ou alteradas"""
+        if not self.dirty:
+            return
+        conn = sqlite3.connect(self.db_file)
+        with conn:
+            conn.executemany(
+                'INSERT OR REPLACE INTO file_stat_cache (path, inode, size, mtime_ns, sha256) '
+                'VALUES (?, ?, ?, ?, ?)',
+                [(path,) + entry for path, entry in self.dirty.items()]
+            )
+        conn.close()
+        self.dirty = {}
+
+
+class HistoryRepository:
+    """
+    Histórico de backups (backup_history.db) em uma única conexão WAL
+    
+    As consultas são constantes, então o cache de statements do sqlite3 as
+    prepara uma vez por processo. A tabela backup_rollups guarda contagens,
+    tamanhos e durações por tipo, atualizada por trigger a cada INSERT: as
+    estatísticas leem uma linha por tipo, não o histórico inteiro.
+    
+    O uso em disco segue o mesmo modelo: cada backup registra disk_bytes e
+    usage_ledger (tipo x mês) é ajustado por trigger na inserção, na remoção
+    (deleted_at) e na correção feita pela reconciliação. Espaço que não
+    pertence a um backup (chunk store, logs, histórico) fica em usage_extra.
+    """
+    
+    METRIC_COLUMNS = [f"{phase}_seconds" for phase in BACKUP_PHASES] + ['bytes_per_second', 'files_per_second']
+    
+    NEW_COLUMNS = {
+        'parent_backup': 'TEXT',
+        'verified_at': 'TEXT',
+        'verify_status': 'TEXT',
+        'verify_error': 'TEXT',
+        'codec': 'TEXT',
+        'deleted_at': 'TEXT',
+        'disk_bytes': 'INTEGER',
+        **{column: 'REAL' for column in METRIC_COLUMNS}
+    }
+    
+    INSERT_SQL = f'''
+        INSERT INTO backup_history
+        (timestamp, backup_type, filename, file_size, duration_seconds,
+         status, error_message, checksum, files_count, compressed_size,
+         parent_backup, codec, disk_bytes, {', '.join(METRIC_COLUMNS)})
+        VALUES ({', '.join('?' * (13 + len(METRIC_COLUMNS)))})
+    '''
+    
+    def __init__(self, db_file: Path):
+        self.db_file = db_file
+        self.conn = sqlite3.connect(db_file, timeout=30, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.init_schema()
+    
+    def init_schema(self):
+        with self.conn:
+            self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS backup_history (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    timestamp TEXT NOT NULL,
+                    backup_type TEXT NOT NULL,
+                    filename TEXT NOT NULL,
+                    file_size INTEGER,
+                    duration_seconds REAL,
+                    status TEXT NOT NULL,
+                    error_message TEXT,
+                    checksum TEXT,
+                    files_count INTEGER,
+                    compressed_size INTEGER
+                )
+            ''')
+            self.conn.execute('CREATE INDEX IF NOT EXISTS idx_timestamp ON backup_history(timestamp)')
+            self.conn.execute('CREATE INDEX IF NOT EXISTS idx_status ON backup_history(status)')
+            self.migrate()
+            
+            # Planejamento da retenção: backups de um tipo em ordem cronológica
+            self.conn.execute('CREATE INDEX IF NOT EXISTS idx_type_timestamp ON backup_history(backup_type, timestamp)')
+            # Verificação localiza a linha pelo arquivo
+            self.conn.execute('CREATE INDEX IF NOT EXISTS idx_filename ON backup_history(filename)')
+            
+            created = self.conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'backup_rollups'").fetchone() is None
+            self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS backup_rollups (
+                    backup_type TEXT PRIMARY KEY,
+                    total_count INTEGER NOT NULL DEFAULT 0,
+                    success_count INTEGER NOT NULL DEFAULT 0,
+                    total_size INTEGER NOT NULL DEFAULT 0,
+                    success_size INTEGER NOT NULL DEFAULT 0,
+                    total_duration REAL NOT NULL DEFAULT 0,
+                    success_duration REAL NOT NULL DEFAULT 0,
+                    last_timestamp TEXT
+                )
+            ''')
+            self.conn.execute('''
+                CREATE TRIGGER IF NOT EXISTS trg_backup_rollups AFTER INSERT ON backup_history
+                BEGIN
+                    INSERT INTO backup_rollups (backup_type, total_count, success_count, total_size,
+                                                success_size, total_duration, success_duration, last_timestamp)
+                    VALUES (NEW.backup_type, 1, NEW.status = 'success', COALESCE(NEW.file_size, 0),
+                            CASE WHEN NEW.status = 'success' THEN COALESCE(NEW.file_size, 0) ELSE 0 END,
+                            COALESCE(NEW.duration_seconds, 0),
+                            CASE WHEN NEW.status = 'success' THEN COALESCE(NEW.duration_seconds, 0) ELSE 0 END,
+                            NEW.timestamp)
+                    ON CONFLICT(backup_type) DO UPDATE SET
+                        total_count = total_count + 1,
+                        success_count = success_count + excluded.success_count,
+                        total_size = total_size + excluded.total_size,
+                        success_size = success_size + excluded.success_size,
+                        total_duration = total_duration + excluded.total_duration,
+                        success_duration = success_duration + excluded.success_duration,
+                        last_timestamp = MAX(COALESCE(last_timestamp, ''), excluded.last_timestamp);
+                END
+            ''')
+            
+            # Históricos de versões anteriores: agregação completa uma única vez
+            if created:
+                self.conn.execute('''
+                    INSERT INTO backup_rollups
+                    SELECT backup_type, COUNT(*), SUM(status = 'success'), COALESCE(SUM(file_size), 0),
+                           COALESCE(SUM(CASE WHEN status = 'success' THEN file_size END), 0),
+                           COALESCE(SUM(duration_seconds), 0),
+                           COALESCE(SUM(CASE WHEN status = 'success' THEN duration_seconds END), 0),
+                           MAX(timestamp)
+                    FROM backup_history GROUP BY backup_type
+                ''')
+            
+            self.init_usage_ledger()
+            
+            # Notificações aguardando entrega (drenadas pelo NotificationOutbox)
+            self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS notification_outbox (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    created TEXT NOT NULL,
+                    subject TEXT NOT NULL,
+                    body TEXT NOT NULL,
+                    success INTEGER NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    next_attempt TEXT NOT NULL,
+                    last_error TEXT,
+                    sent_at TEXT
+                )
+            ''')
+            self.conn.execute('CREATE INDEX IF NOT EXISTS idx_outbox_status ON notification_outbox(status, next_attempt)')
+    
+    def init_usage_ledger(self):
+        """Tabelas e triggers do uso em disco por tipo e mês"""
+        created = self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'usage_ledger'").fetchone() is None
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS usage_ledger (
+                backup_type TEXT NOT NULL,
+                month TEXT NOT NULL,
+                bytes INTEGER NOT NULL DEFAULT 0,
+                backups INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (backup_type, month)
+            )
+        ''')
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS usage_extra (
+                category TEXT PRIMARY KEY,
+                bytes INTEGER NOT NULL DEFAULT 0,
+                scanned_at TEXT
+            )
+        ''')
+        
+        # Históricos anteriores: estimativa pelo tamanho registrado (a reconciliação corrige)
+        if created:
+            self.conn.execute('''
+                UPDATE backup_history SET disk_bytes = COALESCE(NULLIF(compressed_size, 0), file_size, 0)
+                WHERE disk_bytes IS NULL
+            ''')
+            self.conn.execute('''
+                INSERT INTO usage_ledger (backup_type, month, bytes, backups)
+                SELECT backup_type, substr(timestamp, 1, 7), SUM(disk_bytes), COUNT(*)
+                FROM backup_history WHERE status = 'success' AND deleted_at IS NULL
+                GROUP BY backup_type, substr(timestamp, 1, 7)
+            ''')
+        
+        self.conn.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_usage_insert AFTER INSERT ON backup_history
+            WHEN NEW.status = 'success' AND NEW.deleted_at IS NULL
+            BEGIN
+                INSERT INTO usage_ledger (backup_type, month, bytes, backups)
+                VALUES (NEW.backup_type, substr(NEW.timestamp, 1, 7), COALESCE(NEW.disk_bytes, 0), 1)
+                ON CONFLICT(backup_type, month) DO UPDATE SET
+                    bytes = bytes + excluded.bytes, backups = backups + 1;
+            END
+        ''')
+        self.conn.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_usage_delete AFTER UPDATE OF deleted_at ON backup_history
+            WHEN OLD.deleted_at IS NULL AND NEW.deleted_at IS NOT NULL AND NEW.status = 'success'
+            BEGIN
+                UPDATE usage_ledger SET bytes = bytes - COALESCE(OLD.disk_bytes, 0), backups = backups - 1
+                WHERE backup_type = OLD.backup_type AND month = substr(OLD.timestamp, 1, 7);
+            END
+        ''')
+        self.conn.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_usage_resize AFTER UPDATE OF disk_bytes ON backup_history
+            WHEN NEW.status = 'success' AND NEW.deleted_at IS NULL
+            BEGIN
+                UPDATE usage_ledger SET bytes = bytes + COALESCE(NEW.disk_bytes, 0) - COALESCE(OLD.disk_bytes, 0)
+                WHERE backup_type = NEW.backup_type AND month = substr(NEW.timestamp, 1, 7);
+            END
+        ''')
+    
+    def migrate(self):
+        """Adiciona colunas novas em bancos de histórico criados por versões anteriores"""
+        existing = {row[1] for row in self.conn.execute('PRAGMA table_info(backup_history)')}
+        for column, column_type in self.NEW_COLUMNS.items():
+            if column not in existing:
+                self.conn.execute(f'ALTER TABLE backup_history ADD COLUMN {column} {column_type}')
+    
+    def record(self, values: Tuple):
+        """Insere um backup (valores na ordem de INSERT_SQL); o trigger atualiza os rollups"""
+        with self.conn:
+            self.conn.execute(self.INSERT_SQL, values)
+    
+    def record_verifications(self, rows: List[Tuple]):
+        """rows: (verified_at, verify_status, verify_error, verify_seconds, filename)"""
+        with self.conn:
+            self.conn.executemany('''
+                UPDATE backup_history
+                SET verified_at = ?, verify_status = ?, verify_error = ?, verify_seconds = ?
+                WHERE filename = ?
+            ''', rows)
+    
+    def mark_deleted(self, row_id: int, deleted_at: str):
+        with self.conn:
+            self.conn.execute('UPDATE backup_history SET deleted_at = ? WHERE id = ?', (deleted_at, row_id))
+    
+    def recent(self, limit: int = 50) -> List[Dict]:
+        """Backups mais recentes (limit -1 = todos), pelo índice de timestamp"""
+        cursor = self.conn.execute('SELECT * FROM backup_history ORDER BY timestamp DESC LIMIT ?', (limit,))
+        return [dict(row) for row in cursor]
+    
+    def retention_candidates(self) -> List[Dict]:
+        """Backups com arquivo ainda em disco (qualquer status), por tipo e do mais novo ao mais antigo"""
+        cursor = self.conn.execute('''
+            SELECT id, timestamp, backup_type, status, filename, file_size, compressed_size, parent_backup
+            FROM backup_history
+            WHERE deleted_at IS NULL AND filename IS NOT NULL AND filename != ''
+            ORDER BY backup_type, timestamp DESC
+        ''')
+        return [dict(row) for row in cursor]
+    
+    def active_backups(self) -> List[Dict]:
+        """Backups bem-sucedidos ainda em disco, com o uso registrado"""
+        cursor = self.conn.execute('''
+            SELECT id, filename, disk_bytes FROM backup_history
+            WHERE status = 'success' AND deleted_at IS NULL AND filename IS NOT NULL AND filename != ''
+        ''')
+        return [dict(row) for row in cursor]
+    
+    def update_disk_bytes(self, rows: List[Tuple[int, int]]):
+        """rows: (disk_bytes, id); os triggers ajustam usage_ledger pela diferença"""
+        with self.conn:
+            self.conn.executemany('UPDATE backup_history SET disk_bytes = ? WHERE id = ?', rows)
+    
+    def add_extra_usage(self, category: str, delta: int):
+        with self.conn:
+            self.conn.execute('''
+                INSERT INTO usage_extra (category, bytes) VALUES (?, MAX(?, 0))
+                ON CONFLICT(category) DO UPDATE SET bytes = MAX(bytes + ?, 0)
+            ''', (category, delta, delta))
+    
+    def set_extra_usage(self, usage: Dict[str, int], scanned_at: str):
+        """Substitui o uso fora dos backups pelo resultado de uma varredura"""
+        with self.conn:
+            self.conn.execute('DELETE FROM usage_extra')
+            self.conn.executemany('INSERT INTO usage_extra (category, bytes, scanned_at) VALUES (?, ?, ?)',
+                                  [(category, size, scanned_at) for category, size in usage.items()])
+    
+    def usage(self) -> Dict:
+        """Uso em disco por tipo, por mês e fora dos backups (lê só as tabelas do ledger)"""
+        ledger = [dict(row) for row in self.conn.execute(
+            'SELECT * FROM usage_ledger WHERE backups > 0 ORDER BY month DESC, backup_type')]
+        extra = [dict(row) for row in self.conn.execute('SELECT * FROM usage_extra ORDER BY category')]
+        by_type: Dict[str, Dict] = {}
+        by_month: Dict[str, Dict] = {}
+        for row in ledger:
+            for key, bucket in ((row['backup_type'], by_type), (row['month'], by_month)):
+                totals = bucket.setdefault(key, {'bytes': 0, 'backups': 0})
+                totals['bytes'] += row['bytes']
+                totals['backups'] += row['backups']
+        return {
+            'backups_bytes': sum(row['bytes'] for row in ledger),
+            'extra_bytes': sum(row['bytes'] for row in extra),
+            'by_type': by_type,
+            'by_month': by_month,
+            'extra': {row['category']: row['bytes'] for row in extra},
+            'scanned_at': max((row['scanned_at'] for row in extra if row['scanned_at']), default=None)
+        }
+    
+    def rollups(self) -> List[Dict]:
+        """Uma linha por tipo de backup (custo independe do tamanho do histórico)"""
+        return [dict(row) for row in self.conn.execute('SELECT * FROM backup_rollups ORDER BY backup_type')]
+    
+    def recent_successes(self, backup_type: str, limit: int = 10) -> List[Dict]:
+        """Últimos backups bem-sucedidos de um tipo (base das previsões do plano)"""
+        cursor = self.conn.execute('''
+            SELECT timestamp, file_size, compressed_size, duration_seconds, codec, bytes_per_second
+            FROM backup_history
+            WHERE backup_type = ? AND status = 'success' AND file_size > 0
+            ORDER BY timestamp DESC LIMIT ?
+        ''', (backup_type, limit))
+        return [dict(row) for row in cursor]
+    
+    def enqueue_notification(self, created: str, subject: str, body: str, success: bool):
+        with self.conn:
+            self.conn.execute('''
+                INSERT INTO notification_outbox (created, subject, body, success, next_attempt)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (created, subject, body, int(success), created))
+    
+    def pending_notifications(self, now: str) -> List[Dict]:
+        """Notificações pendentes cuja próxima tentativa já venceu, na ordem de chegada"""
+        cursor = self.conn.execute('''
+            SELECT * FROM notification_outbox
+            WHERE status = 'pending' AND next_attempt <= ? ORDER BY id
+        ''', (now,))
+        return [dict(row) for row in cursor]
+    
+    def mark_notifications_sent(self, ids: List[int], sent_at: str):
+        with self.conn:
+            self.conn.executemany('''
+                UPDATE notification_outbox SET status = 'sent', sent_at = ?, attempts = attempts + 1
+                WHERE id = ?
+            ''', [(sent_at, row_id) for row_id in ids])
+    
+    def retry_notifications(self, ids: List[int], error: str, next_attempt: str, max_attempts: int):
+        """Devolve as notificações à fila (ou marca 'failed' ao esgotar as tentativas)"""
+        with self.conn:
+            self.conn.executemany('''
+                UPDATE notification_outbox
+                SET attempts = attempts + 1, last_error = ?, next_attempt = ?,
+                    status = CASE WHEN attempts + 1 >= ? THEN 'failed' ELSE 'pending' END
+                WHERE id = ?
+            ''', [(error, next_attempt, max_attempts, row_id) for row_id in ids])
+    
+    def outbox_counts(self) -> Dict[str, int]:
+        return dict(self.conn.execute('SELECT status, COUNT(*) FROM notification_outbox GROUP BY status').fetchall())
+    
+    def close(self):
+        self.conn.close()
+
+
+class PhaseTimer:
+    """
+    Cronômetro por fase de um backup (scan, hash, leitura, compressão...)
+    
+    Fases executadas pelos workers da compressão paralela somam o tempo de
+    cada processo, portanto podem ultrapassar a duração total do backup.
+    """
+    
+    def __init__(self):
+        self.seconds: Dict[str, float] = dict.fromkeys(BACKUP_PHASES, 0.0)
+    
+    def add(self, phase: str, seconds: float):
+        self.seconds[phase] = self.seconds.get(phase, 0.0) + seconds
+    
+    @contextmanager
+    def phase(self, phase: str):
+        """Cronometra o bloco `with` na fase informada"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(phase, time.perf_counter() - started)
+    
+    def summary(self, duration: float, total_bytes: int, files_count: int) -> Dict:
+        """Tempos por fase e vazão (bytes/s e arquivos/s) sobre a duração total"""
+        metrics = {f"{phase}_seconds": round(seconds, 4) for phase, seconds in self.seconds.items()}
+        metrics['bytes_per_second'] = total_bytes / duration if duration > 0 else 0.0
+        metrics['files_per_second'] = files_count / duration if duration > 0 else 0.0
+        return metrics
+
+
+def snapshot_sqlite_database(source: Path, target: Path, pages_per_step: int = SQLITE_PAGES_PER_STEP,
+                             step_sleep_ms: int = SQLITE_STEP_SLEEP_MS) -> Tuple[int, int]:
+    """
+    Copia um banco SQLite em uso pela API de backup online
+    
+    A cópia avança `pages_per_step` páginas por vez; entre os passos o lock de
+    leitura é liberado e a thread dorme, então o PHP continua gravando. Se o
+    banco mudar no meio, o SQLite reinicia a cópia e o resultado é consistente.
+    
+    Returns:
+        Tuple[int, int]: (page_size, page_count) do snapshot
+    """
+    def pause(status, remaining, total):
+        if remaining and step_sleep_ms:
+            time.sleep(step_sleep_ms / 1000)
+    
+    src = sqlite3.connect(f"{source.resolve().as_uri()}?mode=ro", uri=True, timeout=60)
+    try:
+        dest = sqlite3.connect(target)
+        try:
+            src.backup(dest, pages=pages_per_step, progress=pause)
+            page_size = dest.execute('PRAGMA page_size').fetchone()[0]
+            page_count = dest.execute('PRAGMA page_count').fetchone()[0]
+        finally:
+            dest.close()
+    finally:
+        src.close()
+    return page_size, page_count
+
+
+def check_sqlite_integrity(path: Path, mode: str = 'full') -> List[str]:
+    """
+    Executa PRAGMA integrity_check (ou quick_check) no snapshot
+    
+    Returns:
+        List[str]: Problemas encontrados (vazia quando o banco está íntegro)
+    """
+    pragma = 'quick_check' if mode == 'quick' else 'integrity_check'
+    conn = sqlite3.connect(f"{path.resolve().as_uri()}?mode=ro", uri=True)
+    try:
+        problems = [row[0] for row in conn.execute(f'PRAGMA {pragma}')]
+    finally:
+        conn.close()
+    return [] if problems == ['ok'] else problems
+
+
+def open_compressed_writer(path: Path, dump_format: str, compression_level: int):
+    """Abre um arquivo de saída comprimido em fluxo ("gz" ou "zst")"""
+    if dump_format == 'zst':
+        raw = open(path, 'wb')
+        return zstandard.ZstdCompressor(level=compression_level).stream_writer(raw, closefd=True)
+    return gzip.open(path, 'wb', compresslevel=compression_level)
+
+
+def open_compressed_reader(path: Path):
+    """Abre um arquivo .gz/.zst para leitura (vários membros/frames concatenados)"""
+    if path.name.endswith('.zst'):
+        return zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), read_across_frames=True, closefd=True)
+    return gzip.open(path, 'rb')
+
+
+def encode_export_value(value):
+    """Converte valores do banco sem equivalente JSON (Decimal, datas, bytes)"""
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return {'$b': base64.b64encode(bytes(value)).decode('ascii')}
+    return str(value)
+
+
+def decode_export_value(value):
+    if isinstance(value, dict) and '$b' in value:
+        return base64.b64decode(value['$b'])
+    return value
+
+
+class ConnectionPool:
+    """
+    Pool pequeno de conexões reutilizadas pelos workers da exportação nativa
+    
+    As conexões são criadas sob demanda até `size`; depois disso cada worker
+    espera uma conexão livre.
+    """
+    
+    def __init__(self, factory, size: int):
+        self.factory = factory
+        self.size = max(1, size)
+        self.idle = queue.LifoQueue()
+        self.created = 0
+        self.lock = threading.Lock()
+    
+    @contextmanager
+    def connection(self):
+        try:
+            conn = self.idle.get_nowait()
+        except queue.Empty:
+            with self.lock:
+                create = self.created < self.size
+                if create:
+                    self.created += 1
+            if create:
+                try:
+                    conn = self.factory()
+                except BaseException:
+                    with self.lock:
+                        self.created -= 1
+                    raise
+            else:
+                conn = self.idle.get()
+        try:
+            yield conn
+        finally:
+            self.idle.put(conn)
+    
+    def fill(self) -> List:
+        """Cria todas as `size` conexões de uma vez (todas ficam livres no pool)"""
+        with self.lock:
+            missing = self.size - self.created
+            self.created = self.size
+        connections = []
+        try:
+            for _ in range(missing):
+                connections.append(self.factory())
+        except BaseException:
+            for conn in connections:
+                conn.close()
+            with self.lock:
+                self.created -= missing
+            raise
+        for conn in connections:
+            self.idle.put(conn)
+        return list(self.idle.queue)
+    
+    def close(self):
+        while True:
+            try:
+                self.idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+class MySQLDialect:
+    """Consultas da exportação nativa no MySQL (pymysql, cursores no servidor)"""
+    
+    name = 'mysql'
+    placeholder = '%s'
+    integer_types = ('tinyint', 'smallint', 'mediumint', 'int', 'integer', 'bigint')
+    
+    @staticmethod
+    def quote(identifier: str) -> str:
+        return '`' + identifier.replace('`', '``') + '`'
+    
+    def tables(self, conn) -> List[str]:
+        with conn.cursor() as cursor:
+            cursor.execute("SHOW FULL TABLES WHERE Table_type = 'BASE TABLE'")
+            return [row[0] for row in cursor.fetchall()]
+    
+    def columns(self, conn, table: str) -> List[str]:
+        with conn.cursor() as cursor:
+            cursor.execute(f"SHOW COLUMNS FROM {self.quote(table)}")
+            return [row[0] for row in cursor.fetchall()]
+    
+    def integer_primary_key(self, conn, table: str) -> Optional[str]:
+        """Coluna da chave primária se ela for única e inteira (divisível em faixas)"""
+        with conn.cursor() as cursor:
+            cursor.execute(f"SHOW KEYS FROM {self.quote(table)} WHERE Key_name = 'PRIMARY'")
+            keys = cursor.fetchall()
+            if len(keys) != 1:
+                return None
+            column = keys[0][4]
+            cursor.execute(f"SHOW COLUMNS FROM {self.quote(table)} LIKE %s", (column,))
+            row = cursor.fetchone()
+        column_type = row[1].split('(')[0].split()[0].lower() if row else ''
+        return column if column_type in self.integer_types else None
+    
+    def schema(self, conn, table: str) -> List[str]:
+        with conn.cursor() as cursor:
+            cursor.execute(f"SHOW CREATE TABLE {self.quote(table)}")
+            return [cursor.fetchone()[1]]
+    
+    def stream_cursor(self, conn):
+        """Cursor no servidor: as linhas chegam aos poucos, sem carregar a tabela"""
+        return conn.cursor(pymysql.cursors.SSCursor)
+    
+    def begin_snapshot(self, factory, connections: List):
+        """
+        Coloca todas as conexões no mesmo snapshot (como o --single-transaction
+        do mysqldump, mas para vários workers)
+        
+        Uma conexão à parte segura um FLUSH TABLES WITH READ LOCK enquanto cada
+        worker abre START TRANSACTION WITH CONSISTENT SNAPSHOT, então nenhuma
+        escrita acontece entre os snapshots. Sem o privilégio RELOAD o lock
+        falha e a exportação também.
+        """
+        coordinator = factory()
+        try:
+            with coordinator.cursor() as cursor:
+                cursor.execute('FLUSH TABLES WITH READ LOCK')
+            try:
+                for conn in connections:
+                    with conn.cursor() as cursor:
+                        cursor.execute('SET SESSION TRANSACTION ISOLATION LEVEL REPEATABLE READ')
+                        cursor.execute('START TRANSACTION WITH CONSISTENT SNAPSHOT')
+            finally:
+                with coordinator.cursor() as cursor:
+                    cursor.execute('UNLOCK TABLES')
+        finally:
+            coordinator.close()
+    
+    def prepare_import(self, conn):
+        with conn.cursor() as cursor:
+            cursor.execute('SET FOREIGN_KEY_CHECKS = 0')
+            cursor.execute('SET UNIQUE_CHECKS = 0')
+
+
+class SQLiteDialect:
+    """
+    Consultas da exportação nativa no SQLite (backend/database/duralux.db)
+    
+    A exportação lê uma cópia feita pela API de backup online
+    (snapshot_sqlite_database), nunca o banco em uso.
+    """
+    
+    name = 'sqlite'
+    placeholder = '?'
+    # Nomes de tipo inteiros do SQLite (a chave INTEGER é o próprio rowid)
+    integer_types = ('integer', 'int', 'tinyint', 'smallint', 'mediumint', 'bigint',
+                     'unsigned big int', 'int2', 'int8')
+    
+    @staticmethod
+    def quote(identifier: str) -> str:
+        return '"' + identifier.replace('"', '""') + '"'
+    
+    def tables(self, conn) -> List[str]:
+        cursor = conn.execute("SELECT name FROM sqlite_master WHERE type = 'table' "
+                              "AND name NOT LIKE 'sqlite_%' ORDER BY name")
+        return [row[0] for row in cursor]
+    
+    def columns(self, conn, table: str) -> List[str]:
+        return [row[1] for row in conn.execute(f"PRAGMA table_info({self.quote(table)})")]
+    
+    def integer_primary_key(self, conn, table: str) -> Optional[str]:
+        keys = [row for row in conn.execute(f"PRAGMA table_info({self.quote(table)})") if row[5]]
+        if len(keys) != 1:
+            return None
+        column_type = ' '.join((keys[0][2] or '').split('(')[0].lower().split())
+        return keys[0][1] if column_type in self.integer_types else None
+    
+    def schema(self, conn, table: str) -> List[str]:
+        cursor = conn.execute("SELECT sql FROM sqlite_master WHERE tbl_name = ? AND sql IS NOT NULL "
+                              "ORDER BY type = 'table' DESC, name", (table,))
+        return [row[0] for row in cursor]
+    
+    def stream_cursor(self, conn):
+        # Cursores do SQLite já percorrem o resultado passo a passo
+        return conn.cursor()
+    
+    def begin_snapshot(self, factory, connections: List):
+        """Transação de leitura em cada conexão (sobre a cópia, que ninguém altera)"""
+        for conn in connections:
+            conn.execute('BEGIN')
+            conn.execute('SELECT COUNT(*) FROM sqlite_master').fetchone()
+    
+    def prepare_import(self, conn):
+        conn.execute('PRAGMA foreign_keys = OFF')
+
+
+class DatabaseExporter:
+    """
+    Exportação lógica nativa do banco (alternativa ao mysqldump)
+    
+    Tabelas com chave primária inteira são divididas em faixas de
+    `rows_per_range` linhas, exportadas em paralelo por conexões de um pool
+    (todas no mesmo snapshot), com cursores no servidor. Cada faixa vira um fluxo comprimido e as faixas
+    de uma tabela são concatenadas em <tabela>.jsonl.gz|zst (membros gzip e
+    frames zstd concatenados continuam válidos). O export.json guarda colunas,
+    schema e contagem de linhas; a importação recria as tabelas em paralelo.
+    """
+    
+    def __init__(self, dialect, pool: ConnectionPool, logger: logging.Logger, workers: int = 4,
+                 rows_per_range: int = EXPORT_ROWS_PER_RANGE, batch_rows: int = EXPORT_BATCH_ROWS,
+                 dump_format: str = 'gz', compression_level: int = 6):
+        self.dialect = dialect
+        self.pool = pool
+        self.logger = logger
+        self.workers = max(1, workers)
+        self.rows_per_range = max(1, rows_per_range)
+        self.batch_rows = max(1, batch_rows)
+        self.dump_format = dump_format
+        self.compression_level = compression_level
+    
+    def plan_ranges(self, conn, table: str, primary_key: Optional[str]) -> List[Tuple[Optional[int], Optional[int]]]:
+        """
+        Faixas [início, fim) da chave primária com `rows_per_range` linhas; a
+        última fica aberta
+        
+        Os limites vêm dos próprios dados (paginação por chave: o valor
+        `rows_per_range` posições adiante do início da faixa), então chaves
+        esparsas ou bigint geram tantas faixas quanto as linhas pedem, e não
+        uma por intervalo de valores entre MIN e MAX.
+        """
+        if primary_key is None:
+            return [(None, None)]
+        quoted = self.dialect.quote(primary_key)
+        cursor = conn.cursor()
+        try:
+            cursor.execute(f"SELECT MIN({quoted}), MAX({quoted}) FROM {self.dialect.quote(table)}")
+            low, high = cursor.fetchone()
+            if not isinstance(low, int) or not isinstance(high, int):
+                # Tabela vazia ou chave com valores não inteiros (afinidade do SQLite)
+                return [(None, None)]
+            
+            next_boundary = (f"SELECT {quoted} FROM {self.dialect.quote(table)} "
+                             f"WHERE {quoted} >= {self.dialect.placeholder} ORDER BY {quoted} "
+                             f"LIMIT 1 OFFSET {int(self.rows_per_range)}")
+            ranges = []
+            start = low
+            while True:
+                cursor.execute(next_boundary, (start,))
+                row = cursor.fetchone()
+                if row is None:
+                    break
+                ranges.append((start, row[0]))
+                start = row[0]
+        finally:
+            cursor.close()
+        ranges.append((start, None))
+        return ranges
+    
+    def export_range(self, table: str, columns: List[str], primary_key: Optional[str],
+                     bounds: Tuple[Optional[int], Optional[int]], part_path: Path) -> int:
+        """Exporta uma faixa para um arquivo comprimido (uma linha JSON por registro)"""
+        quote = self.dialect.quote
+        sql = f"SELECT {', '.join(quote(c) for c in columns)} FROM {quote(table)}"
+        params = []
+        low, high = bounds
+        if primary_key is not None:
+            conditions = []
+            if low is not None:
+                conditions.append(f"{quote(primary_key)} >= {self.dialect.placeholder}")
+                params.append(low)
+            if high is not None:
+                conditions.append(f"{quote(primary_key)} < {self.dialect.placeholder}")
+                params.append(high)
+            if conditions:
+                sql += " WHERE " + " AND ".join(conditions)
+            sql += f" ORDER BY {quote(primary_key)}"
+        
+        rows = 0
+        with self.pool.connection() as conn:
+            cursor = self.dialect.stream_cursor(conn)
+            try:
+                cursor.execute(sql, params)
+                with open_compressed_writer(part_path, self.dump_format, self.compression_level) as out:
+                    while True:
+                        batch = cursor.fetchmany(self.batch_rows)
+                        if not batch:
+                            break
+                        out.write(''.join(
+                            json.dumps(list(row), default=encode_export_value, ensure_ascii=False) + '\n'
+                            for row in batch
+                        ).encode('utf-8'))
+                        rows += len(batch)
+            finally:
+                cursor.close()
+        return rows
+    
+    def export(self, export_dir: Path) -> Dict:
+        """
+        Exporta todas as tabelas para `export_dir`
+        
+        Antes de qualquer leitura todas as conexões do pool são abertas no
+        mesmo snapshot (dialect.begin_snapshot): faixas lidas por workers
+        diferentes formam um retrato do banco em um único instante.
+        
+        Returns:
+            Dict: Conteúdo do export.json
+        """
+        export_dir.mkdir(parents=True, exist_ok=True)
+        tables = {}
+        tasks = []
+        
+        self.dialect.begin_snapshot(self.pool.factory, self.pool.fill())
+        
+        with self.pool.connection() as conn:
+            for table in self.dialect.tables(conn):
+                columns = self.dialect.columns(conn, table)
+                primary_key = self.dialect.integer_primary_key(conn, table)
+                ranges = self.plan_ranges(conn, table, primary_key)
+                tables[table] = {
+                    'file': f"{table}.jsonl.{self.dump_format}",
+                    'columns': columns,
+                    'primary_key': primary_key,
+                    'schema': self.dialect.schema(conn, table),
+                    'ranges': len(ranges),
+                    'rows': 0
+                }
+                for index, bounds in enumerate(ranges):
+                    part_path = export_dir / f"{table}.{index:05d}.part"
+                    tasks.append((table, columns, primary_key, bounds, part_path))
+        
+        self.logger.info(f"🗄️ Exportação nativa: {len(tables)} tabelas em {len(tasks)} faixas, "
+                         f"{self.workers} conexões")
+        
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = [(task, executor.submit(self.export_range, *task)) for task in tasks]
+            for (table, _, _, _, _), future in futures:
+                tables[table]['rows'] += future.result()
+        
+        # Junta as faixas de cada tabela, na ordem da chave primária
+        for table, info in tables.items():
+            parts = [task[4] for task in tasks if task[0] == table]
+            with open(export_dir / info['file'], 'wb') as out:
+                for part_path in parts:
+                    with open(part_path, 'rb') as part:
+                        shutil.copyfileobj(part, out, HASH_BUFFER_SIZE)
+                    part_path.unlink()
+        
+        manifest = {
+            'version': 1,
+            'engine': self.dialect.name,
+            'created': datetime.datetime.now().isoformat(),
+            'format': 'jsonl',
+            'compression': self.dump_format,
+            'tables': tables
+        }
+        with open(export_dir / EXPORT_MANIFEST, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        return manifest
+    
+    def import_table(self, export_dir: Path, table: str, info: Dict) -> int:
+        """Recria uma tabela e carrega suas linhas em lotes (executemany)"""
+        quote = self.dialect.quote
+        insert = (f"INSERT INTO {quote(table)} ({', '.join(quote(c) for c in info['columns'])}) "
+                  f"VALUES ({', '.join([self.dialect.placeholder] * len(info['columns']))})")
+        rows = 0
+        with self.pool.connection() as conn:
+            self.dialect.prepare_import(conn)
+            cursor = conn.cursor()
+            try:
+                cursor.execute(f"DROP TABLE IF EXISTS {quote(table)}")
+                for statement in info['schema']:
+                    cursor.execute(statement)
+                
+                with open_compressed_reader(export_dir / info['file']) as reader:
+                    batch = []
+                    for line in io.TextIOWrapper(reader, encoding='utf-8'):
+                        batch.append([decode_export_value(value) for value in json.loads(line)])
+                        if len(batch) >= self.batch_rows:
+                            cursor.executemany(insert, batch)
+                            rows += len(batch)
+                            batch = []
+                    if batch:
+                        cursor.executemany(insert, batch)
+                        rows += len(batch)
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+            finally:
+                cursor.close()
+        return rows
+    
+    def import_export(self, export_dir: Path) -> Dict[str, int]:
+        """
+        Importa uma exportação nativa, uma tabela por conexão em paralelo
+        
+        Returns:
+            Dict[str, int]: Linhas carregadas por tabela
+        """
+        with open(export_dir / EXPORT_MANIFEST, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = {
+                table: executor.submit(self.import_table, export_dir, table, info)
+                for table, info in manifest['tables'].items()
+            }
+            loaded = {table: future.result() for table, future in futures.items()}
+        
+        for table, rows in loaded.items():
+            expected = manifest['tables'][table]['rows']
+            if rows != expected:
+                raise ValueError(f"Tabela {table}: {rows} linhas carregadas, {expected} exportadas")
+        return loaded
+
+
+def next_run_time(days: List[str], at: str, after: datetime.datetime) -> Optional[datetime.datetime]:
+    """Próxima ocorrência (dia da semana + HH:MM) estritamente depois de `after`"""
+    weekdays = {WEEKDAYS.index(day.lower()) for day in days if day.lower() in WEEKDAYS}
+    if not weekdays:
+        return None
+    hour, minute = (int(part) for part in at.split(':'))
+    
+    for offset in range(8):
+        candidate = (after + datetime.timedelta(days=offset)).replace(
+            hour=hour, minute=minute, second=0, microsecond=0)
+        if candidate.weekday() in weekdays and candidate > after:
+            return candidate
+    return None
+
+
+class JobRunner:
+    """
+    Executor de jobs agendados com filas, limite de concorrência e timeout
+    
+    Cada fila tem seu próprio número de workers, então a limpeza semanal não
+    espera um backup longo. Cada job roda como subprocesso do próprio script
+    (--action), o que permite encerrá-lo no timeout. Agenda e estado ficam em
+    backup_history.db: após uma parada, execuções perdidas rodam uma vez ao
+    reiniciar (catch-up).
+    """
+    
+    def __init__(self, db_file: Path, logger: logging.Logger, jobs: List[Dict],
+                 queues: Dict[str, int], catch_up: bool = True):
+        self.db_file = db_file
+        self.logger = logger
+        self.jobs = {job['name']: job for job in jobs}
+        self.queue_limits = queues
+        self.catch_up = catch_up
+        self.queues = {name: queue.Queue() for name in queues}
+        self.active = set()
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.init_db()
+    
+    def init_db(self):
+        conn = sqlite3.connect(self.db_file)
+        with conn:
+            conn.executescript('''
+                CREATE TABLE IF NOT EXISTS scheduled_jobs (
+                    name TEXT PRIMARY KEY,
+                    action TEXT NOT NULL,
+                    days TEXT NOT NULL,
+                    at TEXT NOT NULL,
+                    queue TEXT NOT NULL,
+                    timeout_seconds INTEGER,
+                    next_run TEXT,
+                    last_run TEXT,
+                    last_status TEXT,
+                    last_error TEXT
+                );
+                CREATE TABLE IF NOT EXISTS job_runs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    job TEXT NOT NULL,
+                    started TEXT NOT NULL,
+                    finished TEXT,
+                    status TEXT,
+                    error TEXT
+                );
+                CREATE INDEX IF NOT EXISTS idx_job_runs_job ON job_runs(job, started);
+            ''')
+        conn.close()
+    
+    def load_state(self) -> Dict[str, Optional[str]]:
+        """Sincroniza a definição dos jobs e devolve o next_run persistido de cada um"""
+        conn = sqlite3.connect(self.db_file)
+        persisted = dict(conn.execute('SELECT name, next_run FROM scheduled_jobs'))
+        with conn:
+            for job in self.jobs.values():
+                conn.execute('''
+                    INSERT INTO scheduled_jobs (name, action, days, at, queue, timeout_seconds)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(name) DO UPDATE SET
+                        action = excluded.action, days = excluded.days, at = excluded.at,
+                        queue = excluded.queue, timeout_seconds = excluded.timeout_seconds
+                ''', (job['name'], job['action'], ','.join(job['days']), job['at'],
+                      job['queue'], job.get('timeout_seconds')))
+        conn.close()
+        return persisted
+    
+    def save_next_run(self, name: str, next_run: Optional[datetime.datetime]):
+        conn = sqlite3.connect(self.db_file)
+        with conn:
+            conn.execute('UPDATE scheduled_jobs SET next_run = ? WHERE name = ?',
+                         (next_run.isoformat() if next_run else None, name))
+        conn.close()
+    
+    def record_run(self, name: str, started: datetime.datetime, status: str, error: Optional[str]):
+        finished = datetime.datetime.now().isoformat()
+        conn = sqlite3.connect(self.db_file)
+        with conn:
+            conn.execute('INSERT INTO job_runs (job, started, finished, status, error) VALUES (?, ?, ?, ?, ?)',
+                         (name, started.isoformat(), finished, status, error))
+            conn.execute('UPDATE scheduled_jobs SET last_run = ?, last_status = ?, last_error = ? WHERE name = ?',
+                         (started.isoformat(), status, error, name))
+        conn.close()
+    
+    def enqueue(self, name: str, reason: str = 'agendado'):
+        """Coloca o job na fila (ignora se já estiver na fila ou em execução)"""
+        job = self.jobs[name]
+        with self.lock:
+            if name in self.active:
+                self.logger.info(f"⏭️ Job {name} já pendente, execução ignorada")
+                return
+            self.active.add(name)
+        self.logger.info(f"📥 Job {name} enfileirado ({reason}) na fila {job['queue']}")
+        self.queues[job['queue']].put(name)
+    
+    def run_job(self, name: str):
+        job = self.jobs[name]
+        started = datetime.datetime.now()
+        timeout = job.get('timeout_seconds')
+        self.logger.info(f"▶️ Executando job {name}")
+        
+        try:
+            result = subprocess.run(job['command'], timeout=timeout,
+                                    stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+            if result.returncode == 0:
+                status, error = 'success', None
+            else:
+                status = 'error'
+                error = result.stderr.decode('utf-8', errors='replace').strip()[-2000:] or f"código {result.returncode}"
+        except subprocess.TimeoutExpired:
+            status, error = 'timeout', f"Excedeu {timeout}s"
+        except Exception as e:
+            status, error = 'error', str(e)
+        
+        self.record_run(name, started, status, error)
+        duration = (datetime.datetime.now() - started).total_seconds()
+        if status == 'success':
+            self.logger.info(f"✅ Job {name} concluído em {duration:.1f}s")
+        else:
+            self.logger.error(f"❌ Job {name} terminou com {status}: {error}")
+    
+    def worker(self, queue_name: str):
+        jobs = self.queues[queue_name]
+        while True:
+            name = jobs.get()
+            if name is None:
+                break
+            try:
+                self.run_job(name)
+            finally:
+                with self.lock:
+                    self.active.discard(name)
+    
+    def run_forever(self):
+        """Loop principal: dorme até o próximo horário em vez de consultar a cada minuto"""
+        now = datetime.datetime.now()
+        persisted = self.load_state()
+        next_runs = {}
+        
+        for name, job in self.jobs.items():
+            previous = persisted.get(name)
+            if self.catch_up and previous and datetime.datetime.fromisoformat(previous) <= now:
+                self.enqueue(name, reason=f"perdido em {previous}")
+            next_runs[name] = next_run_time(job['days'], job['at'], now)
+            self.save_next_run(name, next_runs[name])
+        
+        threads = []
+        for queue_name, limit in self.queue_limits.items():
+            for _ in range(max(1, limit)):
+                thread = threading.Thread(target=self.worker, args=(queue_name,), daemon=True)
+                thread.start()
+                threads.append(thread)
+        
+        try:
+            while not self.stop_event.is_set():
+                pending = [t for t in next_runs.values() if t is not None]
+                if not pending:
+                    break
+                wait = (min(pending) - datetime.datetime.now()).total_seconds()
+                if self.stop_event.wait(max(0, min(wait, SCHEDULER_MAX_SLEEP_SECONDS))):
+                    break
+                
+                now = datetime.datetime.now()
+                for name, due in next_runs.items():
+                    if due is not None and due <= now:
+                        self.enqueue(name)
+                        next_runs[name] = next_run_time(self.jobs[name]['days'], self.jobs[name]['at'], now)
+                        self.save_next_run(name, next_runs[name])
+        finally:
+            self.stop_event.set()
+            for queue_name, jobs in self.queues.items():
+                for _ in range(max(1, self.queue_limits[queue_name])):
+                    jobs.put(None)
+    
+    def stop(self):
+        self.stop_event.set()
+
+
+class NotificationOutbox:
+    """
+    Entrega das notificações por email a partir de notification_outbox
+    
+    send_notification só insere no outbox, então um SMTP lento ou fora do ar
+    nunca atrasa o job de backup. O worker espera `digest_minutes` desde a
+    notificação mais antiga pendente e envia tudo o que acumulou em um único
+    email (digest). Falhas voltam para a fila com espera exponencial até
+    `max_attempts`, depois ficam como 'failed'.
+    """
+    
+    def __init__(self, db_file: Path, logger: logging.Logger, smtp: Dict, recipients: List[str],
+                 password: Optional[str] = None):
+        self.history = HistoryRepository(db_file)
+        self.logger = logger
+        self.smtp = smtp
+        self.recipients = recipients
+        self.password = password
+        self.digest_window = datetime.timedelta(minutes=smtp.get('digest_minutes', 5))
+        self.max_attempts = smtp.get('max_attempts', 8)
+        self.stop_event = threading.Event()
+        self.thread = None
+    
+    def build_message(self, rows: List[Dict]) -> EmailMessage:
+        message = EmailMessage()
+        if len(rows) == 1:
+            message['Subject'] = rows[0]['subject']
+            message.set_content(rows[0]['body'])
+        else:
+            failures = sum(1 for row in rows if not row['success'])
+            message['Subject'] = f"Duralux Backup - {len(rows)} resultados ({failures} falha(s))"
+            message.set_content(f"\n{'-' * 60}\n".join(row['body'].strip() for row in rows))
+        message['From'] = self.smtp.get('smtp_from') or self.smtp.get('smtp_username') or 'duralux-backup@localhost'
+        message['To'] = ', '.join(self.recipients)
+        return message
+    
+    def deliver(self, message: EmailMessage):
+        timeout = self.smtp.get('timeout_seconds', 30)
+        with smtplib.SMTP(self.smtp.get('smtp_server', 'localhost'), self.smtp.get('smtp_port', 587),
+                          timeout=timeout) as server:
+            if self.smtp.get('use_tls', True):
+                server.starttls(context=ssl.create_default_context())
+            if self.smtp.get('smtp_username'):
+                server.login(self.smtp['smtp_username'], self.password or '')
+            server.send_message(message)
+    
+    def drain(self, force: bool = False) -> int:
+        """
+        Envia o digest das notificações vencidas
+        
+        Args:
+            force: Ignora a janela do digest e a espera entre tentativas (envio imediato)
+        
+        Returns:
+            int: Notificações entregues
+        """
+        now = datetime.datetime.now()
+        rows = self.history.pending_notifications((datetime.datetime.max if force else now).isoformat())
+        if not rows:
+            return 0
+        oldest = min(datetime.datetime.fromisoformat(row['created']) for row in rows)
+        if not force and now - oldest < self.digest_window:
+            return 0
+        
+        ids = [row['id'] for row in rows]
+        try:
+            self.deliver(self.build_message(rows))
+        except Exception as e:
+            attempts = max(row['attempts'] for row in rows) + 1
+            delay = min(OUTBOX_MAX_BACKOFF_SECONDS, OUTBOX_BACKOFF_SECONDS * 2 ** (attempts - 1))
+            self.history.retry_notifications(ids, str(e), (now + datetime.timedelta(seconds=delay)).isoformat(),
+                                             self.max_attempts)
+            self.logger.warning(f"⚠️ Falha ao enviar {len(rows)} notificação(ões) ({e}), "
+                                f"tentativa {attempts}/{self.max_attempts}")
+            return 0
+        
+        self.history.mark_notifications_sent(ids, datetime.datetime.now().isoformat())
+        self.logger.info(f"📧 Email enviado para {len(self.recipients)} destinatário(s) "
+                         f"({len(rows)} notificação(ões))")
+        return len(rows)
+    
+    def run(self):
+        while not self.stop_event.is_set():
+            try:
+                self.drain()
+            except Exception as e:
+                self.logger.error(f"Erro no outbox de notificações: {e}")
+            self.stop_event.wait(OUTBOX_POLL_SECONDS)
+    
+    def start(self):
+        self.thread = threading.Thread(target=self.run, name='notification-outbox', daemon=True)
+        self.thread.start()
+    
+    def stop(self):
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join()
+        self.history.close()
+
+
+class Throttle:
+    """
+    Limite de banda compartilhado entre threads (token bucket em bytes/s)
+    
+    O saldo pode ficar negativo: quem consome além do disponível dorme o
+    tempo necessário, então a média respeita o limite mesmo com blocos
+    grandes (partes do multipart).
+    """
+    
+    def __init__(self, bytes_per_second: float = 0):
+        self.rate = bytes_per_second
+        self.allowance = bytes_per_second
+        self.last = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def consume(self, amount: int):
+        if not self.rate:
+            return
+        with self.lock:
+            now = time.monotonic()
+            self.allowance = min(self.rate, self.allowance + (now - self.last) * self.rate)
+            self.last = now
+            self.allowance -= amount
+            wait = -self.allowance / self.rate if self.allowance < 0 else 0
+        if wait > 0:
+            time.sleep(wait)
+
+
+def copy_throttled(src, dest, throttle: Throttle, block_size: int = UPLOAD_BLOCK_SIZE) -> int:
+    """Copia src para dest em blocos, respeitando o limite de banda"""
+    copied = 0
+    while True:
+        block = src.read(block_size)
+        if not block:
+            return copied
+        throttle.consume(len(block))
+        dest.write(block)
+        copied += len(block)
+
+
+class UploadJournal:
+    """
+    Envios pendentes (um JSON por destino x arquivo em <backup_dir>/uploads)
+    
+    A entrada é criada ao enfileirar e removida só após a confirmação do
+    destino: se o processo cair (timeout do job, reinício), o próximo
+    processo retoma de onde parou (.part parcial ou partes já enviadas do
+    multipart). Tamanho e mtime da origem detectam arquivos alterados.
+    """
+    
+    def __init__(self, journal_dir: Path):
+        self.journal_dir = journal_dir
+        self.journal_dir.mkdir(parents=True, exist_ok=True)
+        self.lock = threading.Lock()
+    
+    def path(self, destination: str, key: str) -> Path:
+        digest = hashlib.sha1(f"{destination}\0{key}".encode('utf-8')).hexdigest()
+        return self.journal_dir / f"{digest}.json"
+    
+    def open(self, destination: str, key: str, source: Path) -> Tuple[Dict, Optional[Dict]]:
+        """
+        Entrada do envio: reaproveita a anterior se a origem não mudou
+        
+        Returns:
+            Tuple[Dict, Optional[Dict]]: (estado, estado anterior obsoleto a descartar)
+        """
+        stat = source.stat()
+        state = self.load(self.path(destination, key))
+        if state is not None and state.get('size') == stat.st_size and state.get('mtime_ns') == stat.st_mtime_ns:
+            return state, None
+        
+        stale = state
+        state = {'destination': destination, 'key': key, 'source': str(source),
+                 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns,
+                 'queued': datetime.datetime.now().isoformat()}
+        self.save(state)
+        return state, stale
+    
+    def load(self, path: Path) -> Optional[Dict]:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+    
+    def save(self, state: Dict):
+        path = self.path(state['destination'], state['key'])
+        with self.lock:
+            temp_path = path.with_suffix('.tmp')
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(state, f, ensure_ascii=False)
+            os.replace(temp_path, path)
+    
+    def remove(self, state: Dict):
+        with self.lock:
+            self.path(state['destination'], state['key']).unlink(missing_ok=True)
+    
+    def pending(self) -> List[Dict]:
+        states = (self.load(path) for path in sorted(self.journal_dir.glob('*.json')))
+        return [state for state in states if state is not None]
+
+
+class LocalDestination:
+    """Diretório local ou montado (NAS, disco externo): cópia via .part + rename"""
+    
+    kind = 'local'
+    
+    def __init__(self, name: str, options: Dict, throttle: Throttle):
+        self.name = name
+        self.root = Path(options['path'])
+        self.throttle = throttle
+    
+    def describe(self) -> str:
+        return str(self.root)
+    
+    def upload(self, source: Path, state: Dict, save_state) -> int:
+        target = self.root / state['key']
+        partial = target.with_name(target.name + UPLOAD_PARTIAL_SUFFIX)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        
+        # Retoma a cópia parcial (o prefixo já gravado é do mesmo arquivo de origem)
+        offset = partial.stat().st_size if partial.exists() else 0
+        if offset > state['size']:
+            offset = 0
+        with open(source, 'rb') as src, open(partial, 'ab' if offset else 'wb') as dest:
+            src.seek(offset)
+            copy_throttled(src, dest, self.throttle)
+            dest.flush()
+            os.fsync(dest.fileno())
+        
+        if partial.stat().st_size != state['size']:
+            raise IOError(f"tamanho divergente em {partial}")
+        os.replace(partial, target)
+        return state['size'] - offset
+    
+    def discard(self, state: Dict):
+        target = self.root / state['key']
+        target.with_name(target.name + UPLOAD_PARTIAL_SUFFIX).unlink(missing_ok=True)
+
+
+class SFTPDestination:
+    """
+    Servidor SSH/SFTP (paramiko): mesmo protocolo do destino local, com o
+    .part remoto retomado por append e trocado pelo nome final com posix_rename
+    """
+    
+    kind = 'sftp'
+    
+    def __init__(self, name: str, options: Dict, throttle: Throttle, password: Optional[str] = None):
+        if paramiko is None:
+            raise RuntimeError("Módulo paramiko não instalado (necessário para destinos sftp)")
+        self.name = name
+        self.host = options['host']
+        self.port = options.get('port', 22)
+        self.username = options.get('username')
+        self.key_file = options.get('key_file')
+        self.password = password
+        self.root = options.get('path', '.')
+        self.throttle = throttle
+    
+    def describe(self) -> str:
+        return f"sftp://{self.host}:{self.port}{posixpath.join('/', self.root)}"
+    
+    @contextmanager
+    def connect(self):
+        client = paramiko.SSHClient()
+        # Só hosts conhecidos (~/.ssh/known_hosts): nunca envia backup a um servidor não confirmado
+        client.load_system_host_keys()
+        client.set_missing_host_key_policy(paramiko.RejectPolicy())
+        client.connect(self.host, port=self.port, username=self.username,
+                       password=self.password, key_filename=self.key_file, timeout=30)
+        try:
+            yield client.open_sftp()
+        finally:
+            client.close()
+    
+    def makedirs(self, sftp, directory: str):
+        parts = []
+        while directory not in ('', '/', '.'):
+            parts.append(directory)
+            directory = posixpath.dirname(directory)
+        for part in reversed(parts):
+            try:
+                sftp.stat(part)
+            except FileNotFoundError:
+                sftp.mkdir(part)
+    
+    def upload(self, source: Path, state: Dict, save_state) -> int:
+        target = posixpath.join(self.root, state['key'])
+        partial = target + UPLOAD_PARTIAL_SUFFIX
+        with self.connect() as sftp:
+            self.makedirs(sftp, posixpath.dirname(target))
+            try:
+                offset = sftp.stat(partial).st_size
+            except FileNotFoundError:
+                offset = 0
+            if offset > state['size']:
+                offset = 0
+            
+            with open(source, 'rb') as src, sftp.open(partial, 'ab' if offset else 'wb') as dest:
+                dest.set_pipelined(True)
+                src.seek(offset)
+                copy_throttled(src, dest, self.throttle)
+            
+            if sftp.stat(partial).st_size != state['size']:
+                raise IOError(f"tamanho divergente em {partial}")
+            sftp.posix_rename(partial, target)
+        return state['size'] - offset
+    
+    def discard(self, state: Dict):
+        with self.connect() as sftp:
+            try:
+                sftp.remove(posixpath.join(self.root, state['key']) + UPLOAD_PARTIAL_SUFFIX)
+            except FileNotFoundError:
+                pass
+
+
+class S3Destination:
+    """
+    Bucket S3 ou compatível (MinIO, Ceph, Wasabi via endpoint_url)
+    
+    Arquivos maiores que uma parte usam multipart upload com várias partes
+    em paralelo. O UploadId fica no journal: ao retomar, list_parts informa o
+    que o servidor já tem e só as partes que faltam são reenviadas. Cada parte
+    leva Content-MD5 (o servidor rejeita parte corrompida no caminho).
+    """
+    
+    kind = 's3'
+    
+    def __init__(self, name: str, options: Dict, throttle: Throttle, credentials: Dict[str, Optional[str]],
+                 part_size: int = UPLOAD_PART_SIZE, part_workers: int = 4):
+        if boto3 is None:
+            raise RuntimeError("Módulo boto3 não instalado (necessário para destinos s3)")
+        self.name = name
+        self.bucket = options['bucket']
+        self.prefix = options.get('prefix', '')
+        self.endpoint_url = options.get('endpoint_url')
+        self.part_size = max(UPLOAD_MIN_PART_SIZE, part_size)
+        self.part_workers = max(1, part_workers)
+        self.throttle = throttle
+        self.client = boto3.client(
+            's3', endpoint_url=self.endpoint_url, region_name=options.get('region'),
+            aws_access_key_id=credentials.get('access_key'),
+            aws_secret_access_key=credentials.get('secret_key')
+        )
+    
+    def describe(self) -> str:
+        location = f"s3://{self.bucket}/{self.prefix}"
+        return f"{location} ({self.endpoint_url})" if self.endpoint_url else location
+    
+    def object_key(self, state: Dict) -> str:
+        return posixpath.join(self.prefix, state['key']) if self.prefix else state['key']
+    
+    def read_part(self, source: Path, number: int) -> bytes:
+        with open(source, 'rb') as f:
+            f.seek((number - 1) * self.part_size)
+            return f.read(self.part_size)
+    
+    def uploaded_parts(self, key: str, upload_id: str) -> Dict[int, Tuple[str, int]]:
+        """Partes já recebidas pelo servidor: número -> (ETag, tamanho)"""
+        parts = {}
+        marker = 0
+        while True:
+            response = self.client.list_parts(Bucket=self.bucket, Key=key, UploadId=upload_id,
+                                              PartNumberMarker=marker)
+            for part in response.get('Parts', []):
+                parts[part['PartNumber']] = (part['ETag'], part['Size'])
+            if not response.get('IsTruncated'):
+                return parts
+            marker = response['NextPartNumberMarker']
+    
+    def upload_part(self, source: Path, key: str, upload_id: str, number: int) -> str:
+        data = self.read_part(source, number)
+        self.throttle.consume(len(data))
+        response = self.client.upload_part(
+            Bucket=self.bucket, Key=key, UploadId=upload_id, PartNumber=number, Body=data,
+            ContentMD5=base64.b64encode(hashlib.md5(data).digest()).decode('ascii')
+        )
+        return response['ETag']
+    
+    def upload(self, source: Path, state: Dict, save_state) -> int:
+        key = self.object_key(state)
+        size = state['size']
+        
+        if size <= self.part_size:
+            data = source.read_bytes()
+            self.throttle.consume(len(data))
+            self.client.put_object(Bucket=self.bucket, Key=key, Body=data,
+                                   ContentMD5=base64.b64encode(hashlib.md5(data).digest()).decode('ascii'))
+            sent = size
+        else:
+            sent = self.upload_multipart(source, key, state, save_state)
+        
+        head = self.client.head_object(Bucket=self.bucket, Key=key)
+        if head['ContentLength'] != size:
+            raise IOError(f"tamanho divergente em s3://{self.bucket}/{key}")
+        return sent
+    
+    def upload_multipart(self, source: Path, key: str, state: Dict, save_state) -> int:
+        count = (state['size'] + self.part_size - 1) // self.part_size
+        expected = {number: min(self.part_size, state['size'] - (number - 1) * self.part_size)
+                    for number in range(1, count + 1)}
+        
+        done = {}
+        if state.get('upload_id') and state.get('part_size') != self.part_size:
+            # Partes de outro tamanho não servem para este envio
+            self.discard(state)
+            state['upload_id'] = None
+        if state.get('upload_id'):
+            try:
+                done = {number: etag for number, (etag, size) in
+                        self.uploaded_parts(key, state['upload_id']).items()
+                        if expected.get(number) == size}
+            except Exception:
+                # Upload expirado ou abortado no servidor: recomeça
+                state['upload_id'] = None
+        if not state.get('upload_id'):
+            response = self.client.create_multipart_upload(Bucket=self.bucket, Key=key)
+            state.update({'upload_id': response['UploadId'], 'part_size': self.part_size})
+            save_state(state)
+        
+        missing = [number for number in expected if number not in done]
+        with ThreadPoolExecutor(max_workers=self.part_workers) as executor:
+            futures = {number: executor.submit(self.upload_part, source, key, state['upload_id'], number)
+                       for number in missing}
+            for number, future in futures.items():
+                done[number] = future.result()
+        
+        self.client.complete_multipart_upload(
+            Bucket=self.bucket, Key=key, UploadId=state['upload_id'],
+            MultipartUpload={'Parts': [{'PartNumber': number, 'ETag': done[number]} for number in sorted(done)]}
+        )
+        return sum(expected[number] for number in missing)
+    
+    def discard(self, state: Dict):
+        if state.get('upload_id'):
+            try:
+                self.client.abort_multipart_upload(Bucket=self.bucket, Key=self.object_key(state),
+                                                   UploadId=state['upload_id'])
+            except Exception:
+                # Já expirado/abortado no servidor
+                pass
+
+
+class BackupUploader:
+    """
+    Envia arquivos de backup aos destinos em segundo plano
+    
+    submit() só enfileira: cada volume segue para os destinos enquanto o
+    próximo ainda é comprimido. Falhas são repetidas com espera crescente;
+    o estado de cada envio fica no UploadJournal até a confirmação.
+    """
+    
+    def __init__(self, destinations: List, journal: UploadJournal, logger: logging.Logger,
+                 workers: int = 2, retries: int = UPLOAD_RETRIES):
+        self.destinations = destinations
+        self.journal = journal
+        self.logger = logger
+        self.retries = retries
+        self.executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix='upload')
+        self.futures = []
+        self.lock = threading.Lock()
+    
+    def submit(self, source: Path, key: str):
+        for destination in self.destinations:
+            self.enqueue(destination, source, key)
+    
+    def enqueue(self, destination, source: Path, key: str):
+        state, stale = self.journal.open(destination.name, key, source)
+        future = self.executor.submit(self.transfer, destination, source, state, stale)
+        with self.lock:
+            self.futures.append(future)
+    
+    def discard(self, destination, state: Dict):
+        try:
+            destination.discard(state)
+        except Exception as e:
+            self.logger.warning(f"⚠️ Não foi possível limpar o envio parcial em {destination.name}: {e}")
+    
+    def transfer(self, destination, source: Path, state: Dict, stale: Optional[Dict] = None) -> Dict:
+        result = {'destination': destination.name, 'key': state['key'], 'ok': False, 'error': None}
+        if stale is not None:
+            # A origem mudou desde o envio interrompido: o parcial não serve mais
+            self.discard(destination, stale)
+        for attempt in range(self.retries + 1):
+            started = time.perf_counter()
+            try:
+                sent = destination.upload(source, state, self.journal.save)
+            except Exception as e:
+                result['error'] = str(e)
+                if attempt < self.retries:
+                    delay = min(60, 2 ** attempt)
+                    self.logger.warning(f"⚠️ Envio de {state['key']} para {destination.name} falhou "
+                                        f"({e}), nova tentativa em {delay}s")
+                    time.sleep(delay)
+                continue
+            
+            seconds = time.perf_counter() - started
+            self.journal.remove(state)
+            result.update({'ok': True, 'error': None, 'bytes': sent, 'seconds': seconds})
+            self.logger.info(f"☁️ {state['key']} → {destination.name}: "
+                             f"{sent / 1024 / 1024:.1f} MB em {seconds:.1f}s "
+                             f"({sent / 1024 / 1024 / max(seconds, 1e-6):.1f} MB/s)")
+            return result
+        
+        self.logger.error(f"❌ Envio de {state['key']} para {destination.name} falhou: {result['error']}")
+        return result
+    
+    def resume_pending(self) -> int:
+        """Reenfileira os envios interrompidos; descarta os de arquivos que já não existem"""
+        by_name = {destination.name: destination for destination in self.destinations}
+        resumed = 0
+        for state in self.journal.pending():
+            destination = by_name.get(state['destination'])
+            source = Path(state['source'])
+            if destination is None:
+                continue
+            if not source.exists():
+                self.logger.warning(f"⚠️ Envio pendente descartado (origem removida): {state['key']}")
+                self.discard(destination, state)
+                self.journal.remove(state)
+                continue
+            self.enqueue(destination, source, state['key'])
+            resumed += 1
+        if resumed:
+            self.logger.info(f"🔁 Retomando {resumed} envio(s) pendente(s)")
+        return resumed
+    
+    def wait(self) -> List[Dict]:
+        """Aguarda os envios enfileirados até agora"""
+        with self.lock:
+            futures, self.futures = self.futures, []
+        return [future.result() for future in futures]
+    
+    def close(self):
+        self.executor.shutdown(wait=True)
+
 
 class DuraluxBackupSystem:
     """Sistema completo de backup para Duralux CRM"""
@@ -48,27 +2994,79 @@ class DuraluxBackupSystem:
         # Banco de dados para histórico
         self.db_file = self.backup_dir / 'backup_history.db'
         
+        # Manifestos por arquivo (base dos backups incrementais)
+        self.manifest_dir = self.backup_dir / 'manifests'
+        self.manifest_dir.mkdir(exist_ok=True)
+        
+        # Chunk store deduplicado (storage_backend: "chunks"), aberto sob demanda
+        self.chunk_store_dir = self.backup_dir / 'chunks'
+        self.chunk_store = None
+        
         self.setup_logging()
         self.init_history_db()
         
+        # Varredura: padrões de exclusão compilados + stat de cada arquivo visto
+        self.exclude_regex, self.exclude_path_patterns = self.compile_exclude_patterns()
+        
+        # Codec dos membros + arquivos já comprimidos gravados sem recompressão
+        self.compression_codec = self.resolve_codec()
+        self.store_regex, self.store_path_patterns = self.compile_name_patterns(
+            self.config.get('store_patterns', []))
+        self.scan_stats: Dict[Path, os.stat_result] = {}
+        self.scan_sqlite: List[Path] = []
+        self.stat_cache = StatCache(self.db_file)
+        
+        # Tempos por fase do backup em andamento (recriado a cada perform_*)
+        self.metrics = PhaseTimer()
+        
+        # Chave AES-256 (arquivo .env); sem encryption.enabled só é usada para ler
+        self.encrypt_backups = self.config.get('encryption', {}).get('enabled', False)
+        self.encryption_key = self.load_encryption_key()
+        
+        # Destinos remotos: envio em segundo plano, iniciado no primeiro arquivo
+        self.upload_journal_dir = self.backup_dir / 'uploads'
+        self.uploader = None
+        self.uploads_resumed = False
+        if self.config.get('destinations') and self.uses_chunk_store():
+            self.logger.warning("⚠️ Snapshots do chunk store não são enviados aos destinos remotos")
+        
         self.logger.info("🚀 Duralux Backup System v7.0 inicializado")
     
     def load_config(self) -> Dict:
         """Carrega configuração do arquivo JSON"""
         default_config = {
             "backup_directory": "backups",
-            "retention_days": 30,
+            "retention_days": RETENTION_DAYS,
+            "retention": dict(RETENTION_TIERS),
             "compression_level": 6,
+            "compression_codec": "deflate",
             "schedule_time": "02:00",
             "schedule_days": ["monday", "wednesday", "friday"],
             "email_notifications": True,
             "email_recipients": [],
+            "notifications": {
+                "smtp_server": "smtp.gmail.com",
+                "smtp_port": 587,
+                "smtp_username": "",
+                "smtp_password": "",
+                "smtp_from": "",
+                "use_tls": True,
+                "timeout_seconds": 30,
+                "digest_minutes": 5,
+                "max_attempts": 8
+            },
             "database": {
                 "host": "localhost",
                 "port": 3306,
                 "name": "duralux_crm",
                 "user": "root",
-                "password": ""
+                "password": "",
+                "dump_format": "gz",
+                "engine": "mysql",
+                "sqlite_path": "backend/database/duralux.db",
+                "export_method": "mysqldump",
+                "export_workers": 4,
+                "rows_per_range": EXPORT_ROWS_PER_RANGE
             },
             "backup_types": {
                 "full": True,
@@ -89,7 +3087,61 @@ class DuraluxBackupSystem:
                 "duralux-admin",
                 "backend",
                 "docs"
-            ]
+            ],
+            "store_patterns": [
+                "*.png",
+                "*.jpg",
+                "*.jpeg",
+                "*.gif",
+                "*.webp",
+                "*.woff2",
+                "*.zip",
+                "*.gz",
+                "*.zst",
+                "*.min.js"
+            ],
+            "storage_backend": "zip",
+            "sqlite_snapshots": {
+                "databases": ["backend/database/duralux.db"],
+                "pages_per_step": SQLITE_PAGES_PER_STEP,
+                "step_sleep_ms": SQLITE_STEP_SLEEP_MS,
+                "segment_pages": SQLITE_SEGMENT_PAGES,
+                "integrity_check": "full"
+            },
+            "encryption": {
+                "enabled": False,
+                "env_file": "backend/.env",
+                "key_variable": "DURALUX_BACKUP_KEY"
+            },
+            "destinations": [],
+            "upload": {
+                "workers": 2,
+                "part_size_mb": 16,
+                "part_workers": 4,
+                "max_mb_per_second": 0,
+                "retries": UPLOAD_RETRIES
+            },
+            "usage_reconcile": {
+                "enabled": False,
+                "days": ["saturday"],
+                "at": "04:00",
+                "niceness": 19
+            },
+            "scheduler": {
+                "queues": {"backup": 1, "maintenance": 1},
+                "job_timeout_minutes": {"scheduled_backup": 240, "cleanup": 60, "reconcile_usage": 60},
+                "catch_up_missed_runs": True
+            },
+            "advanced_options": {
+                "verify_backups": True,
+                "create_checksums": True,
+                "checksum_algorithm": "blake2b",
+                "parallel_compression": False,
+                "compression_workers": 0,
+                "restore_workers": 0,
+                "max_backup_size_mb": 2048,
+                "split_large_backups": True
+            }
         }
         
         if os.path.exists(self.config_file):
@@ -107,6 +3159,129 @@ class DuraluxBackupSystem:
         
         return default_config
     
+    def load_encryption_key(self) -> Optional[bytes]:
+        """
+        Lê a chave de criptografia do arquivo .env (encryption.env_file) ou do
+        ambiente (encryption.key_variable)
+        
+        Com encryption.enabled a chave e o módulo cryptography são obrigatórios:
+        nunca grava em texto puro um backup que deveria sair criptografado.
+        """
+        variable = self.config.get('encryption', {}).get('key_variable', 'DURALUX_BACKUP_KEY')
+        value = self.read_secret(variable, required=self.encrypt_backups)
+        
+        if not value:
+            if self.encrypt_backups:
+                raise RuntimeError(f"Criptografia ativa, mas {variable} não está definida em {self.env_file()}")
+            return None
+        if AESGCM is None:
+            if self.encrypt_backups:
+                raise RuntimeError("Módulo cryptography não instalado (necessário para criptografia)")
+            return None
+        
+        key = decode_encryption_key(value)
+        if self.encrypt_backups and (self.uses_chunk_store() or self.uses_native_export()):
+            self.logger.warning("⚠️ Chunk store e exportação nativa avulsa não são criptografados")
+        return key
+    
+    def env_file(self) -> Path:
+        """Arquivo .env com os segredos (chave de criptografia, credenciais dos destinos)"""
+        return self.project_root / self.config.get('encryption', {}).get('env_file', 'backend/.env')
+    
+    def read_secret(self, variable: str, required: bool = False) -> Optional[str]:
+        """Valor de uma variável do arquivo .env, com o ambiente como alternativa"""
+        env_file = self.env_file()
+        value = None
+        if env_file.exists():
+            if dotenv_values is not None:
+                value = dotenv_values(env_file).get(variable)
+            elif required:
+                raise RuntimeError("python-dotenv não instalado (necessário para ler encryption.env_file)")
+        return value or os.environ.get(variable)
+    
+    def write_key(self) -> Optional[bytes]:
+        """Chave para os arquivos gravados agora (None = texto puro)"""
+        return self.encryption_key if self.encrypt_backups else None
+    
+    def build_destination(self, options: Dict):
+        """Cria o destino descrito em um item de `destinations`"""
+        upload = self.config.get('upload', {})
+        kind = options.get('type', 'local')
+        name = options.get('name', kind)
+        limit = options.get('max_mb_per_second', upload.get('max_mb_per_second', 0))
+        throttle = Throttle(limit * 1024 * 1024)
+        
+        if kind == 'local':
+            return LocalDestination(name, options, throttle)
+        if kind == 'sftp':
+            password = self.read_secret(options['password_variable']) if options.get('password_variable') else None
+            return SFTPDestination(name, options, throttle, password)
+        if kind == 's3':
+            credentials = {
+                'access_key': self.read_secret(options.get('access_key_variable', 'AWS_ACCESS_KEY_ID')),
+                'secret_key': self.read_secret(options.get('secret_key_variable', 'AWS_SECRET_ACCESS_KEY'))
+            }
+            return S3Destination(name, options, throttle, credentials,
+                                 part_size=int(upload.get('part_size_mb', 16) * 1024 * 1024),
+                                 part_workers=upload.get('part_workers', 4))
+        raise ValueError(f"Tipo de destino desconhecido: {kind}")
+    
+    def get_uploader(self) -> Optional[BackupUploader]:
+        """Envio para os destinos configurados (None sem `destinations`)"""
+        if self.uploader is None and self.config.get('destinations'):
+            upload = self.config.get('upload', {})
+            destinations = [self.build_destination(options) for options in self.config['destinations']]
+            self.uploader = BackupUploader(destinations, UploadJournal(self.upload_journal_dir), self.logger,
+                                           workers=upload.get('workers', 2),
+                                           retries=upload.get('retries', UPLOAD_RETRIES))
+        return self.uploader
+    
+    def resume_uploads(self) -> Optional[int]:
+        """
+        Reenfileira os envios interrompidos em execuções anteriores (uma vez por processo)
+        
+        Returns:
+            Optional[int]: envios retomados (None sem destinos configurados)
+        """
+        uploader = self.get_uploader()
+        if uploader is None:
+            return None
+        if self.uploads_resumed:
+            return 0
+        self.uploads_resumed = True
+        return uploader.resume_pending()
+    
+    def queue_upload(self, path: Path):
+        """Enfileira um arquivo (ou diretório) do backup para todos os destinos"""
+        uploader = self.get_uploader()
+        if uploader is None:
+            return
+        # Pendências de execuções anteriores seguem junto com o backup novo
+        self.resume_uploads()
+        files = sorted(p for p in path.rglob('*') if p.is_file()) if path.is_dir() else [path]
+        for file_path in files:
+            uploader.submit(file_path, file_path.relative_to(self.backup_dir).as_posix())
+    
+    def wait_uploads(self) -> bool:
+        """Aguarda os envios em andamento; False se algum falhou após as tentativas"""
+        if self.uploader is None:
+            return True
+        results = self.uploader.wait()
+        failed = [result for result in results if not result['ok']]
+        if results:
+            sent = sum(result.get('bytes', 0) for result in results)
+            self.logger.info(f"☁️ Envios: {len(results) - len(failed)} de {len(results)} concluídos "
+                             f"({self.format_size(sent)})")
+        if failed:
+            self.logger.error(f"❌ {len(failed)} envio(s) pendente(s) para a próxima execução")
+        return not failed
+    
+    @contextmanager
+    def open_volume(self, path: Path):
+        """Volume zip para leitura, decifrado se necessário"""
+        with open_archive_volume(path, self.encryption_key) as zipf:
+            yield zipf
+    
     def setup_logging(self):
         """Configura sistema de logging"""
         log_dir = self.backup_dir / 'logs'
@@ -125,41 +3300,11 @@ class DuraluxBackupSystem:
         self.logger = logging.getLogger(__name__)
     
     def init_history_db(self):
-        """Inicializa banco de dados do histórico"""
+        """Abre o repositório do histórico (cria/migra as tabelas)"""
         try:
-            conn = sqlite3.connect(self.db_file)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS backup_history (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    timestamp TEXT NOT NULL,
-                    backup_type TEXT NOT NULL,
-                    filename TEXT NOT NULL,
-                    file_size INTEGER,
-                    duration_seconds REAL,
-                    status TEXT NOT NULL,
-                    error_message TEXT,
-                    checksum TEXT,
-                    files_count INTEGER,
-                    compressed_size INTEGER
-                )
-            ''')
-            
-            cursor.execute('''
-                CREATE INDEX IF NOT EXISTS idx_timestamp 
-                ON backup_history(timestamp)
-            ''')
-            
-            cursor.execute('''
-                CREATE INDEX IF NOT EXISTS idx_status 
-                ON backup_history(status)
-            ''')
-            
-            conn.commit()
-            conn.close()
-            
+            self.history = HistoryRepository(self.db_file)
         except Exception as e:
+            self.history = None
             self.logger.error(f"Erro ao inicializar BD histórico: {e}")
     
     def calculate_checksum(self, filepath: Path) -> str:
@@ -167,13 +3312,146 @@ class DuraluxBackupSystem:
         hash_md5 = hashlib.md5()
         try:
             with open(filepath, "rb") as f:
-                for chunk in iter(lambda: f.read(4096), b""):
+                for chunk in iter(lambda: f.read(HASH_BUFFER_SIZE), b""):
                     hash_md5.update(chunk)
             return hash_md5.hexdigest()
         except Exception as e:
             self.logger.error(f"Erro ao calcular checksum: {e}")
             return ""
     
+    def hash_file(self, filepath: Path, stat: Optional[os.stat_result] = None) -> str:
+        """
+        Calcula SHA-256 do conteúdo de um arquivo (endereço do blob no manifesto)
+        
+        Com o stat informado, consulta o cache persistente e só relê o arquivo
+        se inode, tamanho ou mtime mudaram.
+        """
+        if stat is not None:
+            cached = self.stat_cache.lookup(str(filepath), stat)
+            if cached:
+                return cached
+        
+        hash_sha = hashlib.sha256()
+        with self.metrics.phase('hash'), open(filepath, 'rb') as f:
+            for chunk in iter(lambda: f.read(HASH_BUFFER_SIZE), b""):
+                hash_sha.update(chunk)
+        digest = hash_sha.hexdigest()
+        
+        if stat is not None:
+            self.stat_cache.store(str(filepath), stat, digest)
+        return digest
+    
+    def stat_file(self, filepath: Path) -> os.stat_result:
+        """Stat obtido na varredura (evita um segundo stat por arquivo)"""
+        stat = self.scan_stats.get(filepath)
+        return stat if stat is not None else filepath.stat()
+    
+    def manifest_path(self, backup_name: str) -> Path:
+        """Caminho do manifesto externo de um backup"""
+        return self.manifest_dir / f"{Path(backup_name).stem}.json"
+    
+    def save_manifest(self, manifest: Dict):
+        """Grava o manifesto externo ao lado do histórico"""
+        with open(self.manifest_path(manifest['backup']), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False)
+    
+    def load_manifest(self, backup_name: str) -> Optional[Dict]:
+        """Carrega o manifesto de um backup (arquivo externo ou membro do zip)"""
+        manifest_file = self.manifest_path(backup_name)
+        if manifest_file.exists():
+            with open(manifest_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        
+        archive = self.backup_dir / Path(backup_name).name
+        if archive.exists():
+            return self.read_archive_manifest(archive)
+        return None
+    
+    def read_archive_manifest(self, archive: Path) -> Optional[Dict]:
+        """Lê o manifesto gravado no último volume de um backup"""
+        for volume in reversed(ArchiveVolumes.volume_paths(archive)):
+            with self.open_volume(volume) as zipf:
+                if MANIFEST_MEMBER in zipf.namelist():
+                    return json.loads(zipf.read(MANIFEST_MEMBER).decode('utf-8'))
+        return None
+    
+    def get_latest_manifest(self) -> Optional[Dict]:
+        """Último manifesto cujos backups de origem ainda estão todos em disco"""
+        manifests = []
+        for manifest_file in self.manifest_dir.glob("duralux_backup_*.json"):
+            try:
+                with open(manifest_file, 'r', encoding='utf-8') as f:
+                    manifests.append(json.load(f))
+            except Exception as e:
+                self.logger.warning(f"⚠️ Manifesto inválido {manifest_file.name}: {e}")
+        
+        for manifest in sorted(manifests, key=lambda m: m.get('created', ''), reverse=True):
+            sources = {entry['source'] for entry in manifest['files'].values()}
+            sources.add(manifest['backup'])
+            if all((self.backup_dir / name).exists() for name in sources):
+                return manifest
+        return None
+    
+    def plan_incremental(self, files: List[Path], parent: Dict) -> Tuple[Dict, List[Path]]:
+        """
+        Compara os arquivos atuais com o manifesto pai
+        
+        Arquivos com mesmo tamanho e mtime reaproveitam a entrada do pai sem leitura.
+        Os demais são lidos para hash; blobs cujo SHA-256 já existe na cadeia (ou no
+        próprio backup) apenas apontam para o membro já armazenado.
+        
+        Returns:
+            Tuple[Dict, List[Path]]: (entradas do manifesto, arquivos a armazenar)
+        """
+        parent_files = parent.get('files', {})
+        known_blobs = {entry['sha256']: entry for entry in parent_files.values()}
+        entries = {}
+        to_store = []
+        
+        for file_path in files:
+            try:
+                stat = self.stat_file(file_path)
+                relative_path = file_path.relative_to(self.project_root).as_posix()
+                previous = parent_files.get(relative_path)
+                
+                if (previous and previous['size'] == stat.st_size
+                        and previous['mtime_ns'] == stat.st_mtime_ns):
+                    entries[relative_path] = previous
+                    continue
+                
+                digest = self.hash_file(file_path, stat)
+                blob = known_blobs.get(digest)
+                if blob:
+                    entries[relative_path] = dict(blob, size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+                    continue
+                
+                entry = {
+                    'size': stat.st_size,
+                    'mtime_ns': stat.st_mtime_ns,
+                    'sha256': digest,
+                    'source': None,  # preenchido com o nome do novo arquivo
+                    'member': relative_path
+                }
+                entries[relative_path] = entry
+                known_blobs[digest] = entry
+                to_store.append(file_path)
+                
+            except Exception as e:
+                self.logger.warning(f"⚠️ Erro ao analisar arquivo {file_path}: {e}")
+        
+        return entries, to_store
+    
+    def get_chunk_store(self, create: bool = False) -> Optional[ChunkStore]:
+        """Abre o chunk store (None se não existir e create=False)"""
+        if self.chunk_store is None:
+            if not create and not (self.chunk_store_dir / 'chunks.db').exists():
+                return None
+            self.chunk_store = ChunkStore(self.chunk_store_dir, self.config.get('compression_level', 6))
+        return self.chunk_store
+    
+    def uses_chunk_store(self) -> bool:
+        return self.config.get('storage_backend', 'zip') == 'chunks'
+    
     def get_database_connection(self) -> Optional[pymysql.Connection]:
         """Estabelece conexão com o banco MySQL"""
         try:
@@ -191,106 +3469,722 @@ class DuraluxBackupSystem:
             self.logger.error(f"Erro na conexão MySQL: {e}")
             return None
     
+    def build_dump_command(self) -> List[str]:
+        """Monta o comando mysqldump a partir da configuração"""
+        db_config = self.config['database']
+        return [
+            self.config.get('mysql_dump_path', 'mysqldump'),
+            '--host', db_config['host'],
+            '--port', str(db_config['port']),
+            '--user', db_config['user'],
+            f'--password={db_config["password"]}',
+            '--single-transaction',
+            '--routines',
+            '--triggers',
+            '--add-drop-table',
+            '--add-locks',
+            '--extended-insert',
+            db_config['name']
+        ]
+    
+    def stream_database_dump(self, dest) -> Tuple[bool, str, int, str]:
+        """
+        Executa o mysqldump enviando o stdout direto para `dest` em blocos,
+        sem arquivo SQL intermediário
+        
+        Args:
+            dest: Objeto com write() (membro do zip, gzip, zstd...)
+        
+        Returns:
+            Tuple[bool, str, int, str]: (sucesso, mensagem de erro, bytes SQL, sha256)
+        """
+        hash_sha = hashlib.sha256()
+        size = 0
+        
+        with tempfile.TemporaryFile() as stderr_file:
+            process = subprocess.Popen(
+                self.build_dump_command(),
+                stdout=subprocess.PIPE,
+                stderr=stderr_file
+            )
+            timed_out = threading.Event()
+            
+            def kill_on_timeout():
+                timed_out.set()
+                process.kill()
+            
+            timer = threading.Timer(DUMP_TIMEOUT_SECONDS, kill_on_timeout)
+            timer.start()
+            try:
+                for chunk in iter(lambda: process.stdout.read(DUMP_BUFFER_SIZE), b""):
+                    hash_sha.update(chunk)
+                    dest.write(chunk)
+                    size += len(chunk)
+                process.wait()
+            except BaseException:
+                process.kill()
+                process.wait()
+                raise
+            finally:
+                timer.cancel()
+                process.stdout.close()
+            
+            if timed_out.is_set():
+                return False, "Timeout no backup do banco de dados", size, ""
+            
+            if process.returncode != 0:
+                stderr_file.seek(0)
+                error_msg = stderr_file.read().decode('utf-8', errors='replace').strip()
+                return False, error_msg or "Erro desconhecido no mysqldump", size, ""
+        
+        return True, "", size, hash_sha.hexdigest()
+    
+    @contextmanager
+    def open_dump_writer(self, dump_file: Path, dump_format: str):
+        """Abre o destino comprimido do dump ("gz" ou "zst"), cifrado em fluxo se ativo"""
+        compression_level = self.config.get('compression_level', 6)
+        key = self.write_key()
+        if key is None:
+            with open_compressed_writer(dump_file, dump_format, compression_level) as writer:
+                yield writer
+            return
+        
+        with open(dump_file, 'wb') as raw:
+            encryptor = EncryptingWriter(raw, key)
+            if dump_format == 'zst':
+                writer = zstandard.ZstdCompressor(level=compression_level).stream_writer(encryptor, closefd=False)
+            else:
+                writer = gzip.GzipFile(fileobj=encryptor, mode='wb', compresslevel=compression_level)
+            with writer:
+                yield writer
+            encryptor.close()
+    
+    def get_dump_format(self) -> str:
+        """Formato de compressão dos dumps, com gzip se o zstandard não estiver instalado"""
+        dump_format = self.config['database'].get('dump_format', 'gz')
+        if dump_format == 'zst' and zstandard is None:
+            self.logger.warning("⚠️ Módulo zstandard indisponível, usando gzip")
+            dump_format = 'gz'
+        return dump_format
+    
+    def uses_native_export(self) -> bool:
+        """Exportação nativa (pool de conexões) em vez do mysqldump"""
+        return self.config['database'].get('export_method', 'mysqldump') == 'native'
+    
+    def uses_sqlite_engine(self) -> bool:
+        return self.config['database'].get('engine', 'mysql') == 'sqlite'
+    
+    def sqlite_database_path(self) -> Path:
+        return self.project_root / self.config['database'].get('sqlite_path', 'backend/database/duralux.db')
+    
+    def connect_database(self, sqlite_snapshot: Optional[Path] = None):
+        """
+        Nova conexão do pool da exportação nativa (MySQL ou SQLite local)
+        
+        Com `sqlite_snapshot` a conexão lê (somente leitura) a cópia do banco
+        SQLite em vez do arquivo em uso.
+        """
+        if sqlite_snapshot is not None:
+            return sqlite3.connect(f"{sqlite_snapshot.resolve().as_uri()}?mode=ro", uri=True,
+                                   timeout=60, check_same_thread=False)
+        if self.uses_sqlite_engine():
+            return sqlite3.connect(self.sqlite_database_path(), timeout=60, check_same_thread=False)
+        
+        connection = self.get_database_connection()
+        if connection is None:
+            raise ConnectionError("Não foi possível conectar ao MySQL")
+        return connection
+    
+    def get_database_exporter(self, sqlite_snapshot: Optional[Path] = None) -> DatabaseExporter:
+        """Exportador nativo com um pool de até export_workers conexões"""
+        db_config = self.config['database']
+        workers = int(db_config.get('export_workers', 4))
+        dialect = SQLiteDialect() if self.uses_sqlite_engine() else MySQLDialect()
+        return DatabaseExporter(
+            dialect,
+            ConnectionPool(lambda: self.connect_database(sqlite_snapshot), workers),
+            self.logger,
+            workers=workers,
+            rows_per_range=int(db_config.get('rows_per_range', EXPORT_ROWS_PER_RANGE)),
+            dump_format=self.get_dump_format(),
+            compression_level=self.config.get('compression_level', 6)
+        )
+    
+    def export_database_native(self, export_dir: Path) -> Tuple[bool, str]:
+        """
+        Exporta o banco com o exportador nativo para `export_dir`
+        
+        No SQLite os workers leem uma única cópia feita pela API de backup
+        online; no MySQL todos abrem o mesmo snapshot. Se não for possível
+        obter esse retrato consistente, a exportação falha.
+        
+        Returns:
+            Tuple[bool, str]: (sucesso, mensagem de erro)
+        """
+        try:
+            with tempfile.TemporaryDirectory(dir=self.backup_dir) as temp_dir:
+                snapshot = None
+                if self.uses_sqlite_engine():
+                    snapshot = Path(temp_dir) / 'snapshot.db'
+                    options = self.get_sqlite_options()
+                    with self.metrics.phase('dump'):
+                        snapshot_sqlite_database(self.sqlite_database_path(), snapshot,
+                                                 options['pages_per_step'], options['step_sleep_ms'])
+                
+                exporter = self.get_database_exporter(snapshot)
+                try:
+                    with self.metrics.phase('dump'):
+                        manifest = exporter.export(export_dir)
+                finally:
+                    exporter.pool.close()
+            rows = sum(info['rows'] for info in manifest['tables'].values())
+            self.logger.info(f"✅ Exportação nativa concluída: {len(manifest['tables'])} tabelas, {rows} linhas")
+            return True, ""
+        except Exception as e:
+            shutil.rmtree(export_dir, ignore_errors=True)
+            return False, f"Erro na exportação nativa: {str(e)}"
+    
+    def import_database_native(self, export_dir: Path) -> bool:
+        """Carrega uma exportação nativa no banco configurado, tabelas em paralelo"""
+        with open(export_dir / EXPORT_MANIFEST, 'r', encoding='utf-8') as f:
+            engine = json.load(f).get('engine')
+        target = self.config['database'].get('engine', 'mysql')
+        if engine != target:
+            self.logger.error(f"❌ Exportação de {engine} não pode ser carregada em {target}")
+            return False
+        
+        exporter = self.get_database_exporter()
+        try:
+            loaded = exporter.import_export(export_dir)
+            self.logger.info(f"✅ Banco restaurado: {len(loaded)} tabelas, {sum(loaded.values())} linhas")
+            return True
+        except Exception as e:
+            self.logger.error(f"❌ Erro ao carregar BD: {e}")
+            return False
+        finally:
+            exporter.pool.close()
+    
     def backup_database(self, backup_path: Path) -> Tuple[bool, str]:
         """
-        Faz backup do banco de dados MySQL
+        Faz backup do banco de dados MySQL em um arquivo comprimido
+        
+        O dump é comprimido em fluxo (database.dump_format: "gz" ou "zst"),
+        então o pico de disco é o tamanho comprimido.
+        
+        Com database.export_method "native" grava um diretório com um arquivo
+        comprimido por tabela (DatabaseExporter) em vez do dump do mysqldump.
         
         Returns:
             Tuple[bool, str]: (sucesso, mensagem)
         """
+        if self.uses_native_export():
+            export_dir = backup_path / f"database_native_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}"
+            success, error_msg = self.export_database_native(export_dir)
+            if not success:
+                self.logger.error(f"❌ {error_msg}")
+                return False, error_msg
+            return True, str(export_dir)
+        
+        dump_format = self.get_dump_format()
+        dump_file = backup_path / f"database_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.sql.{dump_format}"
+        if self.write_key() is not None:
+            dump_file = dump_file.with_name(dump_file.name + ENCRYPTED_SUFFIX)
+        partial_file = dump_file.with_name(dump_file.name + '.part')
+        
         try:
-            db_config = self.config['database']
-            dump_file = backup_path / f"database_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.sql"
-            
-            # Comando mysqldump
-            cmd = [
-                'mysqldump',
-                '--host', db_config['host'],
-                '--port', str(db_config['port']),
-                '--user', db_config['user'],
-                f'--password={db_config["password"]}',
-                '--single-transaction',
-                '--routines',
-                '--triggers',
-                '--add-drop-table',
-                '--add-locks',
-                '--extended-insert',
-                db_config['name']
-            ]
-            
-            with open(dump_file, 'w', encoding='utf-8') as f:
-                result = subprocess.run(
-                    cmd,
-                    stdout=f,
-                    stderr=subprocess.PIPE,
-                    text=True,
-                    timeout=3600  # 1 hora timeout
-                )
+            with self.metrics.phase('dump'), self.open_dump_writer(partial_file, dump_format) as writer:
+                success, error_msg, _, _ = self.stream_database_dump(writer)
             
-            if result.returncode == 0:
+            if success:
+                partial_file.replace(dump_file)
                 size = dump_file.stat().st_size
                 self.logger.info(f"✅ Backup BD concluído: {dump_file} ({self.format_size(size)})")
                 return True, str(dump_file)
             else:
-                error_msg = result.stderr or "Erro desconhecido no mysqldump"
+                partial_file.unlink(missing_ok=True)
                 self.logger.error(f"❌ Erro no backup BD: {error_msg}")
                 return False, error_msg
                 
-        except subprocess.TimeoutExpired:
-            error_msg = "Timeout no backup do banco de dados"
-            self.logger.error(f"❌ {error_msg}")
-            return False, error_msg
         except Exception as e:
+            partial_file.unlink(missing_ok=True)
             error_msg = f"Erro no backup BD: {str(e)}"
             self.logger.error(f"❌ {error_msg}")
             return False, error_msg
     
+    def add_native_export(self, timestamp: datetime.datetime, add_file) -> Optional[str]:
+        """
+        Exporta o banco (exportação nativa) para um diretório temporário e
+        entrega cada arquivo a `add_file(caminho, caminho no backup)`
+        
+        Returns:
+            Optional[str]: Mensagem de erro (None em caso de sucesso)
+        """
+        export_name = f"database_native_{timestamp.strftime('%Y%m%d_%H%M%S')}"
+        with tempfile.TemporaryDirectory(dir=self.backup_dir) as temp_dir:
+            export_dir = Path(temp_dir) / export_name
+            success, error_msg = self.export_database_native(export_dir)
+            if not success:
+                return error_msg
+            for path in sorted(export_dir.iterdir()):
+                add_file(path, f"database/{export_name}/{path.name}")
+        return None
+    
+    def write_export_member(self, volumes: ArchiveVolumes, entries: Dict, path: Path, relative_path: str):
+        """Grava um arquivo da exportação nativa no zip (os .gz/.zst ficam sem recompressão)"""
+        stat = path.stat()
+        size, digest, member = self.write_member(
+            volumes.ensure_room(stat.st_size), path, relative_path, self.member_codec(path))
+        volumes.record(member)
+        entry = {
+            'size': size,
+            'mtime_ns': stat.st_mtime_ns,
+            'sha256': digest,
+            'source': volumes.current_name,
+            'member': member
+        }
+        codec = self.member_codec(path)
+        if codec in FRAME_CODEC_SUFFIXES:
+            entry['codec'] = codec
+        entries[relative_path] = entry
+    
+    def write_database_member(self, zipf: ZipStreamWriter) -> Tuple[bool, str, str, Optional[Dict]]:
+        """
+        Grava o dump do banco como membro do zip, direto do pipe do mysqldump,
+        com o codec configurado (compression_codec)
+        
+        Returns:
+            Tuple[bool, str, str, Optional[Dict]]: (sucesso, erro, caminho no
+            manifesto, entrada do manifesto)
+        """
+        now = datetime.datetime.now()
+        codec = self.compression_codec
+        relative_path = f"database/database_{now.strftime('%Y%m%d_%H%M%S')}.sql"
+        member = relative_path + FRAME_CODEC_SUFFIXES.get(codec, '')
+        compress_type = ZIP_CODECS.get(codec, zipfile.ZIP_STORED)
+        
+        try:
+            # Tamanho desconhecido de antemão: força ZIP64
+            with self.metrics.phase('dump'), zipf.open(member, now.timetuple()[:6], 0o644, compress_type,
+                                                       force_zip64=True) as dest:
+                if codec in FRAME_CODEC_SUFFIXES:
+                    writer = FrameWriter(dest, codec, self.config.get('compression_level', 6))
+                    success, error_msg, size, digest = self.stream_database_dump(writer)
+                    writer.close()
+                else:
+                    success, error_msg, size, digest = self.stream_database_dump(dest)
+        except Exception as e:
+            success, error_msg = False, f"Erro no backup BD: {str(e)}"
+        
+        if not success:
+            self.logger.error(f"❌ Erro no backup BD: {error_msg}")
+            return False, error_msg, relative_path, None
+        
+        self.logger.info(f"✅ Backup BD concluído: {member} ({self.format_size(size)})")
+        entry = {
+            'size': size,
+            'mtime_ns': time.time_ns(),
+            'sha256': digest,
+            'member': member
+        }
+        if codec in FRAME_CODEC_SUFFIXES:
+            entry['codec'] = codec
+        return True, "", relative_path, entry
+    
+    def compile_exclude_patterns(self) -> Tuple[Optional[re.Pattern], List[str]]:
+        """Compila os padrões de exclusão uma única vez"""
+        return self.compile_name_patterns(self.config['exclude_patterns'])
+    
+    def compile_name_patterns(self, patterns: List[str]) -> Tuple[Optional[re.Pattern], List[str]]:
+        """
+        Padrões sem '/' comparam só o nome, como Path.match, e viram uma única
+        regex; padrões com '/' continuam em Path.match
+        """
+        name_patterns, path_patterns = [], []
+        for pattern in patterns:
+            (path_patterns if '/' in pattern else name_patterns).append(pattern)
+        
+        if not name_patterns:
+            return None, path_patterns
+        
+        # Path.match ignora maiúsculas/minúsculas no Windows
+        flags = re.IGNORECASE if os.name == 'nt' else 0
+        regex = re.compile('|'.join(fnmatch.translate(p) for p in name_patterns), flags)
+        return regex, path_patterns
+    
+    def resolve_codec(self) -> str:
+        """Codec configurado (compression_codec), com deflate se indisponível"""
+        codec = self.config.get('compression_codec', 'deflate')
+        if not codec_available(codec):
+            self.logger.warning(f"⚠️ Codec {codec} indisponível, usando deflate")
+            return 'deflate'
+        return codec
+    
+    def member_codec(self, path: Path) -> str:
+        """Codec de um arquivo: 'store' para formatos já comprimidos (store_patterns)"""
+        if self.store_regex is not None and self.store_regex.match(path.name):
+            return 'store'
+        if any(path.match(pattern) for pattern in self.store_path_patterns):
+            return 'store'
+        return self.compression_codec
+    
     def should_exclude(self, path: Path) -> bool:
         """Verifica se um arquivo/diretório deve ser excluído"""
-        for pattern in self.config['exclude_patterns']:
-            if path.match(pattern):
+        if self.exclude_regex is not None and self.exclude_regex.match(path.name):
+            return True
+        return any(path.match(pattern) for pattern in self.exclude_path_patterns)
+    
+    def get_sqlite_options(self) -> Dict:
+        """Configuração do snapshot online dos bancos SQLite (com valores padrão)"""
+        options = self.config.get('sqlite_snapshots', {})
+        return {
+            'databases': options.get('databases', []),
+            'pages_per_step': int(options.get('pages_per_step', SQLITE_PAGES_PER_STEP)),
+            'step_sleep_ms': int(options.get('step_sleep_ms', SQLITE_STEP_SLEEP_MS)),
+            'segment_pages': max(1, int(options.get('segment_pages', SQLITE_SEGMENT_PAGES))),
+            'integrity_check': options.get('integrity_check', 'full')
+        }
+    
+    def get_sqlite_databases(self) -> List[Path]:
+        """Bancos SQLite copiados pelo snapshot online em vez de lidos como arquivo"""
+        return [self.project_root / database for database in self.get_sqlite_options()['databases']]
+    
+    def is_sqlite_sidecar(self, path: Path, databases) -> bool:
+        """Arquivo -wal/-shm/-journal de um banco com snapshot online"""
+        for suffix in SQLITE_SIDECAR_SUFFIXES:
+            if path.name.endswith(suffix) and path.with_name(path.name[:-len(suffix)]) in databases:
                 return True
         return False
     
-    def collect_files(self, directories: List[str]) -> List[Path]:
-        """Coleta arquivos para backup baseado nas regras"""
-        files_to_backup = []
+    def collect_files(self, directories: List[str]) -> List[Path]:
+        """
+        Coleta arquivos para backup baseado nas regras
+        
+        Usa os.scandir, de modo que cada entrada recebe um único stat; o
+        resultado fica em self.scan_stats para as etapas seguintes. Bancos
+        SQLite de sqlite_snapshots vão para self.scan_sqlite (snapshot online)
+        e seus arquivos -wal/-shm/-journal são ignorados.
+        """
+        files_to_backup = []
+        self.scan_stats = {}
+        self.scan_sqlite = []
+        sqlite_databases = set(self.get_sqlite_databases())
+        
+        for dir_name in directories:
+            dir_path = self.project_root / dir_name
+            
+            if not dir_path.exists():
+                self.logger.warning(f"⚠️ Diretório não encontrado: {dir_path}")
+                continue
+            
+            self.logger.info(f"📂 Coletando arquivos de: {dir_path}")
+            
+            stack = [dir_path]
+            while stack:
+                current = stack.pop()
+                subdirs = []
+                try:
+                    with os.scandir(current) as entries:
+                        for entry in entries:
+                            entry_path = current / entry.name
+                            if self.should_exclude(entry_path):
+                                continue
+                            try:
+                                if entry.is_dir():
+                                    # Como os.walk: links para diretórios não são seguidos
+                                    if not entry.is_symlink():
+                                        subdirs.append(entry_path)
+                                elif entry_path in sqlite_databases:
+                                    self.scan_sqlite.append(entry_path)
+                                elif self.is_sqlite_sidecar(entry_path, sqlite_databases):
+                                    continue
+                                elif entry.is_file():
+                                    self.scan_stats[entry_path] = entry.stat()
+                                    files_to_backup.append(entry_path)
+                            except OSError as e:
+                                self.logger.warning(f"⚠️ Erro ao ler {entry_path}: {e}")
+                except OSError as e:
+                    self.logger.warning(f"⚠️ Erro ao listar {current}: {e}")
+                
+                # Ordem de visita igual à do os.walk (top-down)
+                stack.extend(reversed(subdirs))
+        
+        return files_to_backup
+    
+    def write_member(self, zipf: ZipStreamWriter, file_path: Path, arcname: str,
+                     codec: str = 'deflate') -> Tuple[int, str, str]:
+        """
+        Grava um arquivo no zip lendo-o uma única vez e calculando o SHA-256
+        
+        O tempo de compressão inclui a gravação no volume (o ZipStreamWriter
+        comprime e escreve na mesma chamada). Com zstd/lz4 o membro recebe o sufixo do
+        codec e guarda o frame sem compressão adicional.
+        
+        Returns:
+            Tuple[int, str, str]: (tamanho original, sha256, nome do membro)
+        """
+        member = arcname + FRAME_CODEC_SUFFIXES.get(codec, '')
+        stat = file_path.stat()
+        
+        hash_sha = hashlib.sha256()
+        size = 0
+        read_seconds = hash_seconds = compress_seconds = 0.0
+        with open(file_path, 'rb') as src, \
+                zipf.open(member, time.localtime(stat.st_mtime)[0:6], stat.st_mode,
+                          ZIP_CODECS.get(codec, zipfile.ZIP_STORED), file_size=stat.st_size) as zip_dest:
+            dest = zip_dest
+            if codec in FRAME_CODEC_SUFFIXES:
+                dest = FrameWriter(zip_dest, codec, self.config.get('compression_level', 6))
+            while True:
+                started = time.perf_counter()
+                chunk = src.read(HASH_BUFFER_SIZE)
+                read_done = time.perf_counter()
+                read_seconds += read_done - started
+                if not chunk:
+                    break
+                hash_sha.update(chunk)
+                hash_done = time.perf_counter()
+                dest.write(chunk)
+                hash_seconds += hash_done - read_done
+                compress_seconds += time.perf_counter() - hash_done
+                size += len(chunk)
+            if dest is not zip_dest:
+                dest.close()
+        
+        self.metrics.add('read', read_seconds)
+        self.metrics.add('hash', hash_seconds)
+        self.metrics.add('compress', compress_seconds)
+        return size, hash_sha.hexdigest(), member
+    
+    def write_blob_member(self, zipf: ZipStreamWriter, data: bytes, arcname: str,
+                          codec: str = 'deflate') -> str:
+        """Grava bytes já em memória como membro (mesmas regras de codec do write_member)"""
+        member = arcname + FRAME_CODEC_SUFFIXES.get(codec, '')
+        with self.metrics.phase('compress'):
+            if codec in FRAME_CODEC_SUFFIXES:
+                compressor = frame_compressor(codec, self.config.get('compression_level', 6))
+                data = compressor.compress(data) + compressor.flush()
+            zipf.writestr(member, data, ZIP_CODECS.get(codec, zipfile.ZIP_STORED))
+        return member
+    
+    def add_sqlite_snapshots(self, previous_hashes: Dict[str, str], store_blob, reuse_blob) -> Dict:
+        """
+        Snapshot online de cada banco em self.scan_sqlite, verificado e
+        armazenado em segmentos de páginas
+        
+        O snapshot (API de backup do SQLite) passa por integrity_check antes
+        de ser arquivado. Cada segmento de `segment_pages` páginas vira o blob
+        `<banco>.pages/<índice>`; segmentos com o mesmo SHA-256 do backup
+        anterior chamam `reuse_blob(caminho)` em vez de `store_blob(caminho,
+        dados, sha256, mtime_ns)`, então só as páginas alteradas são gravadas.
+        O snapshot.json do diretório descreve o banco para a remontagem.
+        
+        Returns:
+            Dict: Bancos, bytes, segmentos gravados/reaproveitados e erros
+        """
+        options = self.get_sqlite_options()
+        summary = {'databases': 0, 'size': 0, 'segments': 0, 'reused_segments': 0, 'errors': []}
+        if not self.scan_sqlite:
+            return summary
+        
+        with tempfile.TemporaryDirectory(dir=self.backup_dir) as temp_dir:
+            for db_path in self.scan_sqlite:
+                relative_path = db_path.relative_to(self.project_root).as_posix()
+                snapshot = Path(temp_dir) / db_path.name
+                try:
+                    mtime_ns = db_path.stat().st_mtime_ns
+                    with self.metrics.phase('dump'):
+                        page_size, page_count = snapshot_sqlite_database(
+                            db_path, snapshot, options['pages_per_step'], options['step_sleep_ms'])
+                    with self.metrics.phase('verify'):
+                        problems = check_sqlite_integrity(snapshot, options['integrity_check'])
+                    if problems:
+                        raise ValueError(f"{options['integrity_check']} integrity_check falhou: "
+                                         f"{'; '.join(problems[:5])}")
+                    
+                    pages_dir = relative_path + SQLITE_PAGES_SUFFIX
+                    segment_bytes = page_size * options['segment_pages']
+                    file_hash = hashlib.sha256()
+                    segments = reused = 0
+                    with open(snapshot, 'rb') as f:
+                        while True:
+                            with self.metrics.phase('read'):
+                                data = f.read(segment_bytes)
+                            if not data:
+                                break
+                            with self.metrics.phase('hash'):
+                                digest = hashlib.sha256(data).hexdigest()
+                                file_hash.update(data)
+                            segment_path = f"{pages_dir}/{segments:08d}"
+                            if previous_hashes.get(segment_path) == digest:
+                                reuse_blob(segment_path)
+                                reused += 1
+                            else:
+                                store_blob(segment_path, data, digest, mtime_ns)
+                            segments += 1
+                    
+                    meta = json.dumps({
+                        'database': relative_path,
+                        'page_size': page_size,
+                        'page_count': page_count,
+                        'segment_pages': options['segment_pages'],
+                        'segments': segments,
+                        'size': snapshot.stat().st_size,
+                        'sha256': file_hash.hexdigest(),
+                        'integrity_check': options['integrity_check'],
+                        'created': datetime.datetime.now().isoformat()
+                    }).encode('utf-8')
+                    store_blob(f"{pages_dir}/{SQLITE_SNAPSHOT_META}", meta,
+                               hashlib.sha256(meta).hexdigest(), mtime_ns)
+                    
+                    summary['databases'] += 1
+                    summary['size'] += snapshot.stat().st_size
+                    summary['segments'] += segments
+                    summary['reused_segments'] += reused
+                    self.logger.info(f"🗃️ Snapshot SQLite {relative_path}: {page_count} páginas íntegras, "
+                                     f"{segments - reused} de {segments} segmentos gravados")
+                except Exception as e:
+                    self.logger.error(f"❌ Erro no snapshot SQLite {relative_path}: {e}")
+                    summary['errors'].append(f"{relative_path}: {e}")
+                finally:
+                    snapshot.unlink(missing_ok=True)
+        
+        return summary
+    
+    def write_precompressed_member(self, zipf: ZipStreamWriter, result: Dict):
+        """
+        Grava no zip um membro já comprimido por um worker
+        
+        O cabeçalho local sai com CRC e tamanhos definitivos (sem data
+        descriptor), para qualquer codec: deflate/xz no método nativo do zip,
+        store e frames zstd/lz4 sem compressão adicional.
+        """
+        zipf.write_compressed(result['member'], time.localtime(result['mtime'])[0:6], result['mode'],
+                              result['compress_type'], result['data'], result['file_size'], result['crc'])
+    
+    def get_compression_workers(self) -> int:
+        """Quantidade de processos de compressão (0/1 = compressão serial)"""
+        options = self.config.get('advanced_options', {})
+        if not options.get('parallel_compression', False):
+            return 1
+        workers = options.get('compression_workers', 0) or os.cpu_count() or 1
+        return max(1, int(workers))
+    
+    def add_files_to_archive(self, volumes: ArchiveVolumes, files: List[Path]):
+        """
+        Grava os arquivos do projeto nos volumes, em série ou com um pool de processos
         
-        for dir_name in directories:
-            dir_path = self.project_root / dir_name
+        Os workers comprimem lotes de arquivos de forma independente e apenas
+        este processo escreve no zip, na mesma ordem da lista recebida. O codec
+        de cada arquivo vem de member_codec (store_patterns ou compression_codec).
+        
+        Yields:
+            Tuple[str, int, str, int, str, str]: (caminho relativo, tamanho,
+            sha256, mtime_ns, nome do membro, codec)
+        """
+        workers = self.get_compression_workers()
+        pending = []
+        pending_stats = {}
+        for file_path in files:
+            try:
+                stat = self.stat_file(file_path)
+                relative_path = file_path.relative_to(self.project_root).as_posix()
+            except Exception as e:
+                self.logger.warning(f"⚠️ Erro ao adicionar arquivo {file_path}: {e}")
+                continue
             
-            if not dir_path.exists():
-                self.logger.warning(f"⚠️ Diretório não encontrado: {dir_path}")
+            codec = self.member_codec(file_path)
+            if workers > 1 and stat.st_size <= PARALLEL_MAX_FILE_SIZE:
+                pending.append((file_path, relative_path, codec, stat.st_size))
+                pending_stats[str(file_path)] = stat
                 continue
             
-            self.logger.info(f"📂 Coletando arquivos de: {dir_path}")
+            # Série (arquivo grande demais para ir inteiro à memória de um worker)
+            try:
+                size, digest, member = self.write_member(
+                    volumes.ensure_room(stat.st_size), file_path, relative_path, codec)
+                volumes.record(member)
+                self.stat_cache.store(str(file_path), stat, digest)
+                yield relative_path, size, digest, stat.st_mtime_ns, member, codec
+            except Exception as e:
+                self.logger.warning(f"⚠️ Erro ao adicionar arquivo {file_path}: {e}")
+        
+        if not pending:
+            return
+        
+        # Agrupa arquivos pequenos para amortizar a comunicação entre processos
+        batches, batch, batch_bytes = [], [], 0
+        for file_path, relative_path, codec, size in pending:
+            batch.append((str(file_path), relative_path, codec))
+            batch_bytes += size
+            if batch_bytes >= PARALLEL_BATCH_BYTES or len(batch) >= PARALLEL_BATCH_FILES:
+                batches.append(batch)
+                batch, batch_bytes = [], 0
+        if batch:
+            batches.append(batch)
+        
+        self.logger.info(f"⚙️ Compressão paralela: {len(pending)} arquivos em "
+                         f"{len(batches)} lotes, {workers} processos")
+        
+        compression_level = self.config.get('compression_level', 6)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            # Janela limitada de lotes em andamento para não acumular tudo em memória
+            in_flight = deque()
+            batch_iter = iter(batches)
+            for batch in batch_iter:
+                in_flight.append(executor.submit(compress_file_batch, batch, compression_level))
+                if len(in_flight) >= workers * 2:
+                    break
             
-            for root, dirs, files in os.walk(dir_path):
-                root_path = Path(root)
+            while in_flight:
+                results = in_flight.popleft().result()
+                next_batch = next(batch_iter, None)
+                if next_batch is not None:
+                    in_flight.append(executor.submit(compress_file_batch, next_batch, compression_level))
                 
-                # Filtra diretórios
-                dirs[:] = [d for d in dirs if not self.should_exclude(root_path / d)]
-                
-                # Adiciona arquivos
-                for file in files:
-                    file_path = root_path / file
-                    if not self.should_exclude(file_path):
-                        files_to_backup.append(file_path)
-        
-        return files_to_backup
+                for result in results:
+                    if 'error' in result:
+                        self.logger.warning(f"⚠️ Erro ao adicionar arquivo {result['path']}: {result['error']}")
+                        continue
+                    for phase, seconds in result['timings'].items():
+                        self.metrics.add(phase, seconds)
+                    with self.metrics.phase('write'):
+                        self.write_precompressed_member(volumes.ensure_room(len(result['data'])), result)
+                    volumes.record(result['member'])
+                    self.stat_cache.store(result['path'], pending_stats[result['path']], result['sha256'])
+                    yield (result['arcname'], result['size'], result['sha256'], result['mtime_ns'],
+                           result['member'], result['codec'])
     
     def create_backup_archive(self, backup_type: str, files: List[Path], 
-                            db_file: Optional[str] = None) -> Tuple[bool, str, Dict]:
+                            include_database: bool = False,
+                            manifest_entries: Optional[Dict] = None,
+                            parent: Optional[str] = None) -> Tuple[bool, str, Dict]:
         """
         Cria arquivo de backup comprimido
         
+        Args:
+            backup_type: Tipo do backup (full, files_only, incremental)
+            files: Arquivos a armazenar no zip
+            include_database: Grava o dump do banco como membro (via pipe)
+            manifest_entries: Entradas herdadas do backup pai (modo incremental)
+            parent: Nome do backup pai (modo incremental)
+        
         Returns:
             Tuple[bool, str, Dict]: (sucesso, arquivo_backup, estatísticas)
         """
+        if self.uses_chunk_store():
+            return self.create_chunk_snapshot(backup_type, files, include_database)
+        
         timestamp = datetime.datetime.now()
         backup_filename = f"duralux_backup_{backup_type}_{timestamp.strftime('%Y%m%d_%H%M%S')}.zip"
         backup_filepath = self.backup_dir / backup_filename
         
+        # Nunca sobrescreve um backup existente (pode ser base de incrementais)
+        suffix = 1
+        while backup_filepath.exists():
+            backup_filename = f"duralux_backup_{backup_type}_{timestamp.strftime('%Y%m%d_%H%M%S')}_{suffix}.zip"
+            backup_filepath = self.backup_dir / backup_filename
+            suffix += 1
+        
         stats = {
             'files_count': 0,
             'total_size': 0,
@@ -298,270 +4192,1092 @@ class DuraluxBackupSystem:
             'compression_ratio': 0
         }
         
+        entries = dict(manifest_entries or {})
+        stored: Dict[str, Dict] = {}
+        manifest = {
+            'version': MANIFEST_VERSION,
+            'backup': backup_filename,
+            'backup_type': backup_type,
+            'parent': parent,
+            'created': timestamp.isoformat(),
+            'codec': self.compression_codec,
+            'encrypted': self.write_key() is not None,
+            'files': entries
+        }
+        
+        options = self.config.get('advanced_options', {})
+        max_bytes = None
+        if options.get('split_large_backups', False) and options.get('max_backup_size_mb'):
+            max_bytes = int(options['max_backup_size_mb'] * 1024 * 1024)
+        
         try:
             compression_level = self.config.get('compression_level', 6)
             
-            with zipfile.ZipFile(
-                backup_filepath, 
-                'w', 
-                zipfile.ZIP_DEFLATED, 
-                compresslevel=compression_level
-            ) as zipf:
-                
-                # Adiciona arquivos do projeto
-                for file_path in files:
-                    try:
-                        if file_path.exists() and file_path.is_file():
-                            # Calcula path relativo para manter estrutura
-                            relative_path = file_path.relative_to(self.project_root)
-                            
-                            zipf.write(file_path, relative_path)
-                            stats['files_count'] += 1
-                            stats['total_size'] += file_path.stat().st_size
-                            
-                            if stats['files_count'] % 100 == 0:
-                                self.logger.info(f"📦 Arquivos processados: {stats['files_count']}")
-                                
-                    except Exception as e:
-                        self.logger.warning(f"⚠️ Erro ao adicionar arquivo {file_path}: {e}")
+            checksum_algorithm = None
+            if options.get('create_checksums', True):
+                checksum_algorithm = options.get('checksum_algorithm', 'blake2b')
+            
+            with ArchiveVolumes(backup_filepath, compression_level, max_bytes, checksum_algorithm,
+                                self.write_key(), on_volume_closed=self.queue_upload) as volumes:
                 
-                # Adiciona dump do banco se existir
-                if db_file and os.path.exists(db_file):
-                    db_path = Path(db_file)
-                    zipf.write(db_path, f"database/{db_path.name}")
+                # Adiciona arquivos do projeto (path relativo mantém a estrutura)
+                for relative_path, size, digest, mtime_ns, member, codec in self.add_files_to_archive(volumes, files):
+                    entry = entries.get(relative_path) or {}
+                    entry.update({
+                        'size': size,
+                        'mtime_ns': entry.get('mtime_ns', mtime_ns),
+                        'sha256': digest,
+                        'source': volumes.current_name,
+                        'member': member
+                    })
+                    # Só frames zstd/lz4 precisam de decodificação na restauração
+                    entry.pop('codec', None)
+                    if codec in FRAME_CODEC_SUFFIXES:
+                        entry['codec'] = codec
+                    entries[relative_path] = entry
+                    stored[relative_path] = entry
                     stats['files_count'] += 1
-                    stats['total_size'] += db_path.stat().st_size
+                    stats['total_size'] += size
+                    
+                    if stats['files_count'] % 100 == 0:
+                        self.logger.info(f"📦 Arquivos processados: {stats['files_count']}")
+                
+                # Bancos SQLite: snapshot online em segmentos (incremental reaproveita os iguais)
+                if self.scan_sqlite:
+                    previous = (self.load_manifest(parent) or {}).get('files', {}) if parent else {}
+                    
+                    def store_segment(relative_path: str, data: bytes, digest: str, mtime_ns: int):
+                        codec = self.compression_codec
+                        member = self.write_blob_member(volumes.ensure_room(len(data)), data, relative_path, codec)
+                        volumes.record(member)
+                        entries[relative_path] = {
+                            'size': len(data),
+                            'mtime_ns': mtime_ns,
+                            'sha256': digest,
+                            'source': volumes.current_name,
+                            'member': member
+                        }
+                        if codec in FRAME_CODEC_SUFFIXES:
+                            entries[relative_path]['codec'] = codec
                     
-                    # Remove arquivo temporário do BD
-                    db_path.unlink()
+                    def reuse_segment(relative_path: str):
+                        entries[relative_path] = previous[relative_path]
+                    
+                    sqlite_stats = self.add_sqlite_snapshots(
+                        {path: entry['sha256'] for path, entry in previous.items()}, store_segment, reuse_segment)
+                    stats['files_count'] += sqlite_stats['databases']
+                    stats['total_size'] += sqlite_stats['size']
+                    if sqlite_stats['errors']:
+                        stats['sqlite_error'] = '; '.join(sqlite_stats['errors'])
+                
+                # Exportação nativa: arquivos por tabela gravados como membros
+                if include_database and self.uses_native_export():
+                    db_error = self.add_native_export(
+                        timestamp, lambda path, relative: self.write_export_member(volumes, entries, path, relative))
+                    if db_error:
+                        stats['database_error'] = db_error
+                    else:
+                        exported = [entries[key] for key in entries if key.startswith('database/database_native_')]
+                        stats['files_count'] += len(exported)
+                        stats['total_size'] += sum(entry['size'] for entry in exported)
+                
+                # Dump do banco direto no zip, sem arquivo temporário
+                elif include_database:
+                    db_success, db_error, db_path, db_entry = self.write_database_member(volumes.ensure_room())
+                    if not db_success:
+                        # O membro truncado já está no zip: o backup inteiro é descartado
+                        stats['database_error'] = db_error
+                        raise RuntimeError(f"dump do banco interrompido ({db_error})")
+                    volumes.record(db_entry['member'])
+                    db_entry['source'] = volumes.current_name
+                    entries[db_path] = db_entry
+                    stats['files_count'] += 1
+                    stats['total_size'] += db_entry['size']
+                
+                # Duplicatas apontam para o membro gravado; as demais sumiram durante o backup
+                for relative_path, entry in list(entries.items()):
+                    if entry.get('source'):
+                        continue
+                    holder = stored.get(entry['member'])
+                    if holder is not None:
+                        entry.update({key: holder[key] for key in ('source', 'member', 'codec') if key in holder})
+                    else:
+                        del entries[relative_path]
+                
+                # O manifesto completo vai no último volume
+                manifest['volumes'] = [path.name for path in volumes.paths]
+                volumes.zipf.writestr(MANIFEST_MEMBER, json.dumps(manifest, ensure_ascii=False))
+            
+            # Checksums calculados durante a escrita (só no manifesto externo)
+            manifest['volume_checksums'] = volumes.checksums
+            self.save_manifest(manifest)
+            self.stat_cache.flush()
+            stats['checksum'] = volumes.checksums.get(backup_filename, '')
+            stats['codec'] = self.compression_codec
             
             # Calcula estatísticas finais
-            stats['compressed_size'] = backup_filepath.stat().st_size
+            stats['compressed_size'] = volumes.total_size
+            stats['volumes'] = len(volumes.paths)
             if stats['total_size'] > 0:
                 stats['compression_ratio'] = (1 - stats['compressed_size'] / stats['total_size']) * 100
+            stats['tracked_files'] = len(entries)
             
             self.logger.info(f"✅ Backup criado: {backup_filename}")
+            if len(volumes.paths) > 1:
+                self.logger.info(f"💽 Dividido em {len(volumes.paths)} volumes de até "
+                                 f"{self.format_size(max_bytes)}")
             self.logger.info(f"📊 Arquivos: {stats['files_count']} | "
                            f"Original: {self.format_size(stats['total_size'])} | "
                            f"Comprimido: {self.format_size(stats['compressed_size'])} | "
-                           f"Compressão: {stats['compression_ratio']:.1f}%")
+                           f"Compressão: {stats['compression_ratio']:.1f}% ({self.compression_codec})")
             
             return True, str(backup_filepath), stats
             
         except Exception as e:
             error_msg = f"Erro ao criar arquivo de backup: {str(e)}"
             self.logger.error(f"❌ {error_msg}")
+            self.discard_partial_backup(backup_filepath)
+            return False, error_msg, stats
+    
+    def discard_partial_backup(self, backup_filepath: Path):
+        """Remove os volumes (e o manifesto) de um backup que falhou no meio da gravação"""
+        removed = 0
+        for path in ArchiveVolumes.volume_paths(backup_filepath):
+            try:
+                if path.exists():
+                    path.unlink()
+                    removed += 1
+            except OSError as e:
+                self.logger.warning(f"⚠️ Não foi possível remover o volume parcial {path.name}: {e}")
+        self.manifest_path(backup_filepath.name).unlink(missing_ok=True)
+        if removed:
+            self.logger.info(f"🧹 {removed} volume(s) parcial(is) removido(s): {backup_filepath.name}")
+    
+    def create_chunk_snapshot(self, backup_type: str, files: List[Path],
+                              include_database: bool = False) -> Tuple[bool, str, Dict]:
+        """
+        Cria um snapshot no chunk store deduplicado (alternativa ao zip)
+        
+        Arquivos com mesmo tamanho e mtime do snapshot anterior reaproveitam a
+        lista de chunks sem releitura; os demais são fatiados e só os chunks
+        inéditos são gravados.
+        
+        Returns:
+            Tuple[bool, str, Dict]: (sucesso, identificador do snapshot, estatísticas)
+        """
+        timestamp = datetime.datetime.now()
+        snapshot_name = f"duralux_snapshot_{backup_type}_{timestamp.strftime('%Y%m%d_%H%M%S')}"
+        stats = {
+            'files_count': 0,
+            'total_size': 0,
+            'compressed_size': 0,
+            'compression_ratio': 0,
+            'reused_files': 0,
+            'codec': 'zlib'
+        }
+        
+        try:
+            store = self.get_chunk_store(create=True)
+            store.new_stored_bytes = 0
+            suffix = 1
+            while store.has_snapshot(snapshot_name):
+                snapshot_name = f"duralux_snapshot_{backup_type}_{timestamp.strftime('%Y%m%d_%H%M%S')}_{suffix}"
+                suffix += 1
+            
+            previous = store.latest_files()
+            rows = []
+            
+            for file_path in files:
+                try:
+                    stat = self.stat_file(file_path)
+                    relative_path = file_path.relative_to(self.project_root).as_posix()
+                    known = previous.get(relative_path)
+                    
+                    if known and known[0] == stat.st_size and known[1] == stat.st_mtime_ns:
+                        rows.append((relative_path,) + known)
+                        stats['reused_files'] += 1
+                    else:
+                        writer = store.writer()
+                        with open(file_path, 'rb') as f:
+                            while True:
+                                with self.metrics.phase('read'):
+                                    block = f.read(HASH_BUFFER_SIZE)
+                                if not block:
+                                    break
+                                # Fatiamento, hash e compressão dos chunks novos
+                                with self.metrics.phase('compress'):
+                                    writer.write(block)
+                        with self.metrics.phase('compress'):
+                            writer.close()
+                        rows.append((relative_path, writer.size, stat.st_mtime_ns,
+                                     writer.sha256, ' '.join(writer.chunks)))
+                        self.stat_cache.store(str(file_path), stat, writer.sha256)
+                    
+                    stats['files_count'] += 1
+                    stats['total_size'] += stat.st_size
+                    
+                except Exception as e:
+                    self.logger.warning(f"⚠️ Erro ao adicionar arquivo {file_path}: {e}")
+            
+            if self.scan_sqlite:
+                def store_segment(relative_path: str, data: bytes, digest: str, mtime_ns: int):
+                    writer = store.writer()
+                    with self.metrics.phase('compress'):
+                        writer.write(data)
+                        writer.close()
+                    rows.append((relative_path, writer.size, mtime_ns, writer.sha256, ' '.join(writer.chunks)))
+                
+                sqlite_stats = self.add_sqlite_snapshots(
+                    {path: known[2] for path, known in previous.items()},
+                    store_segment, lambda relative_path: rows.append((relative_path,) + previous[relative_path]))
+                stats['files_count'] += sqlite_stats['databases']
+                stats['total_size'] += sqlite_stats['size']
+                if sqlite_stats['errors']:
+                    stats['sqlite_error'] = '; '.join(sqlite_stats['errors'])
+            
+            if include_database and self.uses_native_export():
+                def store_export_file(path: Path, relative: str):
+                    writer = store.writer()
+                    with open(path, 'rb') as f:
+                        for block in iter(lambda: f.read(HASH_BUFFER_SIZE), b""):
+                            writer.write(block)
+                    writer.close()
+                    rows.append((relative, writer.size, time.time_ns(), writer.sha256, ' '.join(writer.chunks)))
+                    stats['files_count'] += 1
+                    stats['total_size'] += writer.size
+                
+                db_error = self.add_native_export(timestamp, store_export_file)
+                if db_error:
+                    self.logger.error(f"❌ Erro no backup BD: {db_error}")
+                    stats['database_error'] = db_error
+            
+            elif include_database:
+                writer = store.writer()
+                with self.metrics.phase('dump'):
+                    db_success, db_error, _, digest = self.stream_database_dump(writer)
+                    writer.close()
+                if db_success:
+                    member = f"database/database_{timestamp.strftime('%Y%m%d_%H%M%S')}.sql"
+                    rows.append((member, writer.size, time.time_ns(), digest, ' '.join(writer.chunks)))
+                    stats['files_count'] += 1
+                    stats['total_size'] += writer.size
+                else:
+                    self.logger.error(f"❌ Erro no backup BD: {db_error}")
+                    stats['database_error'] = db_error
+            
+            store.commit_snapshot(snapshot_name, backup_type, timestamp.isoformat(), rows)
+            # Chunks são compartilhados entre snapshots: o uso fica fora do ledger por tipo
+            self.history.add_extra_usage('chunk_store', store.new_stored_bytes)
+            self.stat_cache.flush()
+            
+            stats['compressed_size'] = store.new_stored_bytes
+            if stats['total_size'] > 0:
+                stats['compression_ratio'] = (1 - stats['compressed_size'] / stats['total_size']) * 100
+            
+            self.logger.info(f"✅ Snapshot criado: {snapshot_name}")
+            self.logger.info(f"📊 Arquivos: {stats['files_count']} "
+                           f"(reaproveitados: {stats['reused_files']}) | "
+                           f"Original: {self.format_size(stats['total_size'])} | "
+                           f"Novos dados: {self.format_size(stats['compressed_size'])}")
+            
+            return True, str(self.chunk_store_dir / snapshot_name), stats
+            
+        except Exception as e:
+            error_msg = f"Erro ao criar snapshot: {str(e)}"
+            self.logger.error(f"❌ {error_msg}")
             return False, error_msg, stats
     
     def perform_full_backup(self) -> Dict:
         """Executa backup completo (arquivos + banco)"""
         start_time = time.time()
         backup_type = "full"
+        self.metrics = PhaseTimer()
         
         self.logger.info("🚀 Iniciando backup completo...")
         
         # Coleta arquivos
-        files = self.collect_files(self.config['include_directories'])
-        
-        # Backup do banco
-        temp_backup_dir = self.backup_dir / 'temp'
-        temp_backup_dir.mkdir(exist_ok=True)
+        with self.metrics.phase('scan'):
+            files = self.collect_files(self.config['include_directories'])
         
-        db_success, db_file_or_error = self.backup_database(temp_backup_dir)
-        
-        # Cria arquivo de backup
+        # Cria arquivo de backup (o dump do banco é gravado em fluxo no zip)
         archive_success, archive_result, stats = self.create_backup_archive(
             backup_type, 
             files, 
-            db_file_or_error if db_success else None
+            include_database=True
         )
-        
-        # Limpa diretório temporário
-        shutil.rmtree(temp_backup_dir, ignore_errors=True)
+        db_error = stats.pop('database_error', None)
+        sqlite_error = stats.pop('sqlite_error', None)
         
         duration = time.time() - start_time
         
         # Resultado final
-        success = db_success and archive_success
+        success = archive_success and db_error is None and sqlite_error is None
+        error = f"DB: {db_error or 'OK'}, Archive: {archive_result if not archive_success else 'OK'}"
+        if sqlite_error:
+            error += f", SQLite: {sqlite_error}"
         result = {
             'success': success,
             'backup_type': backup_type,
             'duration': duration,
             'filename': archive_result if archive_success else None,
-            'error': None if success else f"DB: {db_file_or_error}, Archive: {archive_result}",
-            'stats': stats
+            'error': None if success else error,
+            'checksum': stats.pop('checksum', ''),
+            'stats': stats,
+            'metrics': self.metrics.summary(duration, stats['total_size'], stats['files_count'])
         }
         
         # Registra no histórico
         self.record_backup_history(result)
+        self.verify_new_backup(result)
+        
+        if success:
+            self.logger.info(f"✅ Backup completo finalizado em {duration:.1f}s")
+            self.log_metrics(result['metrics'])
+        else:
+            self.logger.error(f"❌ Falha no backup completo: {result['error']}")
+        
+        return result
+    
+    def perform_database_backup(self) -> Dict:
+        """Executa backup apenas do banco de dados"""
+        start_time = time.time()
+        backup_type = "database_only"
+        self.metrics = PhaseTimer()
+        
+        self.logger.info("🗄️ Iniciando backup do banco de dados...")
+        
+        # Cria diretório específico para backup BD
+        db_backup_dir = self.backup_dir / 'database'
+        db_backup_dir.mkdir(exist_ok=True)
+        
+        success, result_or_error = self.backup_database(db_backup_dir)
+        duration = time.time() - start_time
+        
+        dump_path = Path(result_or_error) if success else None
+        dump_files = []
+        if dump_path is not None and dump_path.is_dir():
+            dump_files = [path for path in dump_path.iterdir() if path.is_file()]
+        elif dump_path is not None and dump_path.exists():
+            dump_files = [dump_path]
+        if dump_files:
+            self.queue_upload(dump_path)
+        
+        stats = {
+            'files_count': len(dump_files),
+            'total_size': sum(path.stat().st_size for path in dump_files),
+            'compressed_size': 0,
+            'compression_ratio': 0,
+            'codec': ('zstd' if self.get_dump_format() == 'zst' else 'gzip') if success else None
+        }
+        result = {
+            'success': success,
+            'backup_type': backup_type,
+            'duration': duration,
+            'filename': result_or_error if success else None,
+            'error': result_or_error if not success else None,
+            'stats': stats,
+            'metrics': self.metrics.summary(duration, stats['total_size'], stats['files_count'])
+        }
+        
+        self.record_backup_history(result)
+        
+        if success:
+            self.logger.info(f"✅ Backup do BD finalizado em {duration:.1f}s")
+            self.log_metrics(result['metrics'])
+        else:
+            self.logger.error(f"❌ Falha no backup do BD: {result['error']}")
+        
+        return result
+    
+    def perform_files_backup(self) -> Dict:
+        """Executa backup apenas dos arquivos (sem BD)"""
+        start_time = time.time()
+        backup_type = "files_only"
+        self.metrics = PhaseTimer()
+        
+        self.logger.info("📁 Iniciando backup dos arquivos...")
+        
+        # Coleta arquivos
+        with self.metrics.phase('scan'):
+            files = self.collect_files(self.config['include_directories'])
+        
+        # Cria arquivo de backup
+        success, result, stats = self.create_backup_archive(backup_type, files)
+        sqlite_error = stats.pop('sqlite_error', None)
+        duration = time.time() - start_time
+        
+        result_dict = {
+            'success': success and sqlite_error is None,
+            'backup_type': backup_type,
+            'duration': duration,
+            'filename': result if success else None,
+            'error': result if not success else (f"SQLite: {sqlite_error}" if sqlite_error else None),
+            'checksum': stats.pop('checksum', ''),
+            'stats': stats,
+            'metrics': self.metrics.summary(duration, stats['total_size'], stats['files_count'])
+        }
+        
+        self.record_backup_history(result_dict)
+        self.verify_new_backup(result_dict)
+        
+        if success:
+            self.logger.info(f"✅ Backup dos arquivos finalizado em {duration:.1f}s")
+            self.log_metrics(result_dict['metrics'])
+        else:
+            self.logger.error(f"❌ Falha no backup dos arquivos: {result_dict['error']}")
+        
+        return result_dict
+    
+    def perform_incremental_backup(self) -> Dict:
+        """Executa backup incremental dos arquivos (somente blobs novos ou alterados)"""
+        start_time = time.time()
+        backup_type = "incremental"
+        self.metrics = PhaseTimer()
+        
+        if self.uses_chunk_store():
+            self.logger.info("ℹ️ Chunk store já deduplica cada snapshot, executando backup de arquivos")
+            return self.perform_files_backup()
+        
+        parent = self.get_latest_manifest()
+        if parent is None:
+            self.logger.info("ℹ️ Nenhum backup base disponível, executando backup de arquivos completo")
+            return self.perform_files_backup()
+        
+        self.logger.info(f"➕ Iniciando backup incremental (base: {parent['backup']})...")
+        
+        # Coleta arquivos e compara com o manifesto pai
+        with self.metrics.phase('scan'):
+            files = self.collect_files(self.config['include_directories'])
+        entries, to_store = self.plan_incremental(files, parent)
+        
+        self.logger.info(f"🔍 {len(to_store)} de {len(files)} arquivos novos ou alterados")
+        
+        success, result, stats = self.create_backup_archive(
+            backup_type, to_store, manifest_entries=entries, parent=parent['backup']
+        )
+        sqlite_error = stats.pop('sqlite_error', None)
+        duration = time.time() - start_time
+        
+        result_dict = {
+            'success': success and sqlite_error is None,
+            'backup_type': backup_type,
+            'duration': duration,
+            'filename': result if success else None,
+            'error': result if not success else (f"SQLite: {sqlite_error}" if sqlite_error else None),
+            'parent': parent['backup'],
+            'checksum': stats.pop('checksum', ''),
+            'stats': stats,
+            'metrics': self.metrics.summary(duration, stats['total_size'], stats['files_count'])
+        }
+        
+        self.record_backup_history(result_dict)
+        self.verify_new_backup(result_dict)
+        
+        if success:
+            self.logger.info(f"✅ Backup incremental finalizado em {duration:.1f}s")
+            self.log_metrics(result_dict['metrics'])
+        else:
+            self.logger.error(f"❌ Falha no backup incremental: {result_dict['error']}")
+        
+        return result_dict
+    
+    def log_metrics(self, metrics: Dict):
+        """Registra no log os tempos por fase e a vazão do backup"""
+        phases = ' | '.join(
+            f"{phase} {metrics[f'{phase}_seconds']:.2f}s"
+            for phase in BACKUP_PHASES if metrics.get(f'{phase}_seconds')
+        )
+        self.logger.info(f"⏱️ Fases: {phases or '-'}")
+        self.logger.info(f"🚄 Vazão: {self.format_size(int(metrics['bytes_per_second']))}/s | "
+                         f"{metrics['files_per_second']:.1f} arquivos/s")
+    
+    def record_backup_history(self, backup_result: Dict):
+        """Registra backup no histórico (com os tempos por fase, se houver)"""
+        metrics = backup_result.get('metrics', {})
+        try:
+            self.history.record((
+                datetime.datetime.now().isoformat(),
+                backup_result['backup_type'],
+                backup_result.get('filename', ''),
+                backup_result['stats'].get('total_size', 0),
+                backup_result['duration'],
+                'success' if backup_result['success'] else 'error',
+                backup_result.get('error', ''),
+                backup_result.get('checksum', ''),
+                backup_result['stats'].get('files_count', 0),
+                backup_result['stats'].get('compressed_size', 0),
+                backup_result.get('parent'),
+                backup_result['stats'].get('codec'),
+                self.backup_disk_bytes(backup_result['filename']) if backup_result['success'] else None,
+                *(metrics.get(column) for column in HistoryRepository.METRIC_COLUMNS)
+            ))
+            
+        except Exception as e:
+            self.logger.error(f"Erro ao registrar histórico: {e}")
+    
+    def backup_disk_bytes(self, filename: str) -> int:
+        """
+        Espaço em disco de um backup: volumes + manifesto, dump ou diretório
+        da exportação nativa (snapshots usam o chunk store compartilhado: 0)
+        """
+        backup_path = Path(filename)
+        if backup_path.parent == self.chunk_store_dir:
+            return 0
+        
+        paths = []
+        if backup_path.suffix == '.zip':
+            paths = ArchiveVolumes.volume_paths(backup_path) + [self.manifest_path(backup_path.name)]
+        elif backup_path.is_dir():
+            paths = [path for path in backup_path.rglob('*') if path.is_file()]
+        else:
+            paths = [backup_path]
+        return sum(path.stat().st_size for path in paths if path.exists())
+    
+    def usage_owner(self, path: Path) -> str:
+        """Backup (ou categoria de uso) dono de um arquivo do diretório de backups"""
+        relative = path.relative_to(self.backup_dir)
+        top = relative.parts[0]
+        if len(relative.parts) == 1:
+            if top.endswith('.zip'):
+                stem = Path(top).stem
+                base, separator, volume = stem.rpartition('.vol')
+                if separator and volume.isdigit():
+                    stem = base
+                return os.path.abspath(self.backup_dir / f"{stem}.zip")
+            if top.startswith('backup_history.db'):
+                return 'history'
+        elif top == 'manifests' and len(relative.parts) == 2:
+            return os.path.abspath(self.backup_dir / f"{Path(relative.parts[1]).stem}.zip")
+        elif top == 'database':
+            return os.path.abspath(self.backup_dir / 'database' / relative.parts[1])
+        elif top == 'chunks':
+            return 'chunk_store'
+        elif top == 'logs':
+            return 'logs'
+        return 'other'
+    
+    def reconcile_usage(self, niceness: int = 19) -> Dict:
+        """
+        Recalcula o uso em disco varrendo o diretório de backups (os.scandir)
+        
+        Roda com prioridade baixa (os.nice) e pausa a cada RECONCILE_PAUSE_EVERY
+        entradas. Corrige disk_bytes de cada backup (os triggers ajustam
+        usage_ledger) e substitui usage_extra; arquivos sem backup no
+        histórico contam como "other".
+        
+        Returns:
+            Dict: Uso por dono (backup ou categoria) e correções aplicadas
+        """
+        if niceness and hasattr(os, 'nice'):
+            os.nice(niceness)
+        
+        owners: Dict[str, int] = {}
+        stack = [str(self.backup_dir)]
+        visited = 0
+        while stack:
+            current = stack.pop()
+            try:
+                with os.scandir(current) as entries:
+                    for entry in entries:
+                        visited += 1
+                        if visited % RECONCILE_PAUSE_EVERY == 0:
+                            time.sleep(RECONCILE_PAUSE_SECONDS)
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                stack.append(entry.path)
+                            elif entry.is_file(follow_symlinks=False):
+                                owner = self.usage_owner(Path(entry.path))
+                                owners[owner] = owners.get(owner, 0) + entry.stat(follow_symlinks=False).st_size
+                        except OSError as e:
+                            self.logger.warning(f"⚠️ Erro ao ler {entry.path}: {e}")
+            except OSError as e:
+                self.logger.warning(f"⚠️ Erro ao listar {current}: {e}")
+        
+        corrections = []
+        for row in self.history.active_backups():
+            if Path(row['filename']).parent == self.chunk_store_dir:
+                actual = 0
+            else:
+                actual = owners.pop(os.path.abspath(row['filename']), 0)
+            if actual != (row['disk_bytes'] or 0):
+                corrections.append((actual, row['id']))
+        self.history.update_disk_bytes(corrections)
+        
+        # O que sobrou não pertence a backup ativo (logs, chunks, órfãos...)
+        extra: Dict[str, int] = {}
+        for owner, size in owners.items():
+            category = owner if owner in ('history', 'chunk_store', 'logs') else 'other'
+            extra[category] = extra.get(category, 0) + size
+        self.history.set_extra_usage(extra, datetime.datetime.now().isoformat())
+        
+        self.logger.info(f"📏 Uso em disco reconciliado: {visited} entradas, "
+                         f"{len(corrections)} backups corrigidos")
+        return {'entries': visited, 'corrections': len(corrections), 'extra': extra}
+    
+    def verify_backups(self, backup_files: Optional[List[str]] = None) -> List[Dict]:
+        """
+        Verifica arquivos de backup em paralelo e registra o resultado no histórico
+        
+        Cada volume é conferido por um processo (leitura via mmap): checksum do
+        arquivo, SHA-256 de cada membro do manifesto e CRC de todos os membros.
+        
+        Args:
+            backup_files: Backups a verificar (padrão: todos os zips do histórico em disco)
+        
+        Returns:
+            List[Dict]: Um resultado por backup
+        """
+        if backup_files is None:
+            backup_files = [row['filename'] for row in self.get_backup_history(limit=-1)
+                            if row['filename'] and row['filename'].endswith('.zip')]
+        
+        tasks = {}
+        for backup_file in dict.fromkeys(backup_files):
+            backup_path = Path(backup_file)
+            if not backup_path.exists():
+                continue
+            manifest = self.load_manifest(backup_path.name) if backup_path.parent == self.backup_dir else None
+            if manifest is None:
+                try:
+                    manifest = self.read_archive_manifest(backup_path) or {}
+                except (OSError, ValueError, zipfile.BadZipFile):
+                    # Volume ilegível: o worker registra o erro como corrupção
+                    manifest = {}
+            checksums = manifest.get('volume_checksums', {})
+            
+            for volume in ArchiveVolumes.volume_paths(backup_path):
+                expected = {
+                    entry['member']: (entry['sha256'], entry.get('codec'))
+                    for entry in manifest.get('files', {}).values()
+                    if entry['source'] == volume.name
+                }
+                tasks[str(volume)] = (str(backup_path), expected, checksums.get(volume.name))
+        
+        if not tasks:
+            self.logger.info("ℹ️ Nenhum arquivo de backup para verificar")
+            return []
+        
+        self.logger.info(f"🔎 Verificando {len(tasks)} volume(s)...")
+        
+        per_backup: Dict[str, Dict] = {}
+        workers = min(len(tasks), os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(verify_archive_volume, volume, expected, checksum, self.encryption_key): backup
+                for volume, (backup, expected, checksum) in tasks.items()
+            }
+            for future, backup in futures.items():
+                volume_result = future.result()
+                summary = per_backup.setdefault(backup, {'filename': backup, 'ok': True, 'members': 0,
+                                                         'errors': [], 'seconds': 0.0})
+                summary['members'] += volume_result['members']
+                summary['seconds'] += volume_result['seconds']
+                summary['ok'] = summary['ok'] and volume_result['ok']
+                summary['errors'].extend(f"{Path(volume_result['path']).name}: {error}"
+                                         for error in volume_result['errors'])
+        
+        results = list(per_backup.values())
+        self.record_verification(results)
+        
+        for result in results:
+            if result['ok']:
+                self.logger.info(f"✅ Backup íntegro: {Path(result['filename']).name} ({result['members']} membros)")
+            else:
+                self.logger.error(f"❌ Backup corrompido: {Path(result['filename']).name}: "
+                                  f"{'; '.join(result['errors'][:5])}")
+        return results
+    
+    def verify_new_backup(self, backup_result: Dict):
+        """Verificação automática após o backup (advanced_options.verify_backups)"""
+        if not backup_result.get('filename'):
+            return
+        if not self.config.get('advanced_options', {}).get('verify_backups', False):
+            return
+        try:
+            results = self.verify_backups([backup_result['filename']])
+            if results:
+                backup_result['verified'] = results[0]['ok']
+                backup_result.setdefault('metrics', {})['verify_seconds'] = round(results[0]['seconds'], 4)
+        except Exception as e:
+            self.logger.error(f"Erro na verificação do backup: {e}")
+    
+    def record_verification(self, results: List[Dict]):
+        """Registra o resultado da verificação na linha do backup"""
+        try:
+            verified_at = datetime.datetime.now().isoformat()
+            self.history.record_verifications([
+                (verified_at, 'ok' if r['ok'] else 'failed', '; '.join(r['errors']) or None,
+                 r['seconds'], r['filename'])
+                for r in results
+            ])
+        except Exception as e:
+            self.logger.error(f"Erro ao registrar verificação: {e}")
+    
+    def plan_backup(self, backup_type: str = 'full') -> Dict:
+        """
+        Prevê tamanho, duração e arquivos alterados de um backup, sem executá-lo
+        
+        Só faz a varredura (stat). O manifesto do último backup e o StatCache
+        dizem quais arquivos mudaram; o histórico recente do mesmo tipo (com o
+        mesmo codec, se houver) fornece a taxa de compressão e a vazão.
+        
+        Args:
+            backup_type: full, files, incremental ou database
+        
+        Returns:
+            Dict: Previsão (tamanhos em bytes, duração em segundos e avisos)
+        """
+        started = time.perf_counter()
+        files = []
+        if backup_type != 'database':
+            files = self.collect_files(self.config['include_directories'])
+        sqlite_bytes = sum(path.stat().st_size for path in self.scan_sqlite if path.exists())
+        scan_seconds = time.perf_counter() - started
+        
+        parent = self.get_latest_manifest()
+        parent_files = parent.get('files', {}) if parent else {}
+        incremental = backup_type == 'incremental' and parent is not None and not self.uses_chunk_store()
+        
+        # Mesmo critério do plan_incremental: tamanho+mtime do manifesto ou hash já conhecido
+        changed = []
+        store_bytes = compress_bytes = 0
+        for file_path in files:
+            stat = self.scan_stats[file_path]
+            relative_path = file_path.relative_to(self.project_root).as_posix()
+            previous = parent_files.get(relative_path)
+            unchanged = previous is not None and (
+                (previous['size'] == stat.st_size and previous['mtime_ns'] == stat.st_mtime_ns)
+                or self.stat_cache.lookup(str(file_path), stat) == previous['sha256'])
+            if not unchanged:
+                changed.append((relative_path, stat.st_size, 'novo' if previous is None else 'alterado'))
+            elif incremental:
+                continue
+            if self.member_codec(file_path) == 'store':
+                store_bytes += stat.st_size
+            else:
+                compress_bytes += stat.st_size
         
-        if success:
-            self.logger.info(f"✅ Backup completo finalizado em {duration:.1f}s")
-            
-            # Calcula checksum
-            if result['filename']:
-                checksum = self.calculate_checksum(Path(result['filename']))
-                result['checksum'] = checksum
-        else:
-            self.logger.error(f"❌ Falha no backup completo: {result['error']}")
+        # Histórico: taxa de compressão e vazão dos últimos backups do tipo
+        samples = self.history.recent_successes(PLAN_BACKUP_TYPES[backup_type], PLAN_SAMPLE_SIZE) if self.history else []
+        samples = [row for row in samples if row['codec'] == self.compression_codec] or samples
+        sized = [row for row in samples if row['compressed_size']]
+        ratio = (sum(row['compressed_size'] for row in sized) / sum(row['file_size'] for row in sized)
+                 if sized else None)
+        rates = sorted(row['bytes_per_second'] for row in samples if row['bytes_per_second'])
+        throughput = rates[len(rates) // 2] if rates else None
         
-        return result
-    
-    def perform_database_backup(self) -> Dict:
-        """Executa backup apenas do banco de dados"""
-        start_time = time.time()
-        backup_type = "database_only"
+        # Dump do banco: tamanho do último backup só do BD
+        database_bytes = 0
+        if backup_type in ('full', 'database') and self.history:
+            dumps = self.history.recent_successes('database_only', 1)
+            database_bytes = dumps[0]['file_size'] if dumps else 0
         
-        self.logger.info("🗄️ Iniciando backup do banco de dados...")
+        processed = store_bytes + compress_bytes + sqlite_bytes + database_bytes
+        predicted_size = int(store_bytes + database_bytes + (compress_bytes + sqlite_bytes) * (ratio or 1.0))
+        predicted_seconds = scan_seconds + processed / throughput if throughput else None
         
-        # Cria diretório específico para backup BD
-        db_backup_dir = self.backup_dir / 'database'
-        db_backup_dir.mkdir(exist_ok=True)
+        warnings = []
+        if not samples:
+            warnings.append("Sem histórico deste tipo: tamanho previsto sem compressão e duração desconhecida")
+        if backup_type in ('full', 'database') and not database_bytes:
+            warnings.append("Tamanho do dump desconhecido (nenhum backup só do BD no histórico)")
         
-        success, result_or_error = self.backup_database(db_backup_dir)
-        duration = time.time() - start_time
+        options = self.config.get('advanced_options', {})
+        limit = int(options.get('max_backup_size_mb', 0) * 1024 * 1024)
+        volumes = 1
+        if limit and predicted_size > limit:
+            if options.get('split_large_backups', False):
+                volumes = -(-predicted_size // limit)
+                warnings.append(f"Tamanho previsto excede max_backup_size_mb ({self.format_size(limit)}): "
+                                f"~{volumes} volumes")
+            else:
+                warnings.append(f"Tamanho previsto excede max_backup_size_mb ({self.format_size(limit)}) "
+                                f"e split_large_backups está desativado")
+        free = shutil.disk_usage(self.backup_dir).free
+        if predicted_size > free:
+            warnings.append(f"Espaço livre insuficiente em {self.backup_dir} ({self.format_size(free)})")
         
-        result = {
-            'success': success,
+        changed.sort(key=lambda item: item[1], reverse=True)
+        return {
             'backup_type': backup_type,
-            'duration': duration,
-            'filename': result_or_error if success else None,
-            'error': result_or_error if not success else None,
-            'stats': {
-                'files_count': 1 if success else 0,
-                'total_size': Path(result_or_error).stat().st_size if success and os.path.exists(result_or_error) else 0,
-                'compressed_size': 0,
-                'compression_ratio': 0
-            }
+            'parent': parent['backup'] if incremental else None,
+            'files_count': len(files),
+            'changed_count': len(changed),
+            'new_count': sum(1 for item in changed if item[2] == 'novo'),
+            'changed_bytes': sum(item[1] for item in changed),
+            'changed': changed[:PLAN_LISTED_FILES],
+            'bytes_to_process': processed,
+            'store_bytes': store_bytes,
+            'database_bytes': database_bytes,
+            'sqlite_bytes': sqlite_bytes,
+            'compression_ratio': ratio,
+            'throughput': throughput,
+            'samples': len(samples),
+            'scan_seconds': scan_seconds,
+            'predicted_size': predicted_size,
+            'predicted_seconds': predicted_seconds,
+            'volumes': volumes,
+            'warnings': warnings
         }
+    
+    def print_plan(self, plan: Dict):
+        """Imprime a previsão de plan_backup"""
+        print("\n" + "="*60)
+        print(f"🧮 PLANO DO BACKUP: {plan['backup_type']}")
+        print("="*60)
+        if plan['parent']:
+            print(f"➕ Base: {plan['parent']}")
+        print(f"📂 Arquivos: {plan['files_count']} (varredura em {plan['scan_seconds']:.2f}s)")
+        print(f"🔍 Novos ou alterados: {plan['changed_count']} ({plan['new_count']} novos, "
+              f"{self.format_size(plan['changed_bytes'])})")
+        for relative_path, size, kind in plan['changed']:
+            print(f"   {kind:>8} {self.format_size(size):>10}  {relative_path}")
+        if plan['changed_count'] > len(plan['changed']):
+            print(f"   ... e mais {plan['changed_count'] - len(plan['changed'])}")
         
-        self.record_backup_history(result)
-        
-        if success:
-            self.logger.info(f"✅ Backup do BD finalizado em {duration:.1f}s")
+        print(f"\n📦 A processar: {self.format_size(plan['bytes_to_process'])}"
+              f" (sem recompressão: {self.format_size(plan['store_bytes'])}"
+              f", BD: {self.format_size(plan['database_bytes'])}"
+              f", SQLite: {self.format_size(plan['sqlite_bytes'])})")
+        ratio = (f"{(1 - plan['compression_ratio']) * 100:.1f}% de compressão"
+                 if plan['compression_ratio'] is not None else "sem histórico de compressão")
+        print(f"💾 Tamanho previsto: {self.format_size(plan['predicted_size'])} ({ratio}, "
+              f"{plan['samples']} backup(s) de referência)")
+        if plan['predicted_seconds'] is not None:
+            print(f"⏱️ Duração prevista: {plan['predicted_seconds']:.1f}s "
+                  f"({self.format_size(int(plan['throughput']))}/s)")
         else:
-            self.logger.error(f"❌ Falha no backup do BD: {result['error']}")
-        
-        return result
+            print("⏱️ Duração prevista: desconhecida")
+        for warning in plan['warnings']:
+            print(f"⚠️ {warning}")
+        print("="*60)
     
-    def perform_files_backup(self) -> Dict:
-        """Executa backup apenas dos arquivos (sem BD)"""
-        start_time = time.time()
-        backup_type = "files_only"
+    def get_retention_policy(self) -> Dict[str, int]:
+        """Política GFS: janela de retenção total + quantidade de diários, semanais e mensais"""
+        retention = self.config.get('retention', {})
+        policy = {'within_days': int(self.config.get('retention_days', RETENTION_DAYS))}
+        for bucket, default in RETENTION_TIERS.items():
+            policy[bucket] = int(retention.get(bucket, default))
+        return policy
+    
+    def plan_retention(self) -> Dict:
+        """
+        Planeja a retenção avô-pai-filho (GFS) a partir do backup_history
         
-        self.logger.info("📁 Iniciando backup dos arquivos...")
+        Cada tipo de backup é uma série independente. Em cada série ficam o
+        mais recente, todos os backups dentro de retention_days e o último
+        backup de cada um dos N dias, M semanas ISO e K meses mais recentes que
+        têm backup; só backups bem-sucedidos ocupam essas vagas. Backups com
+        erro que ainda têm arquivo (ex.: falha só no snapshot SQLite) também
+        são candidatos e ficam apenas dentro de retention_days. Em seguida,
+        todo backup da cadeia (parent_backup) de um backup mantido também é
+        mantido, seja qual for o status, pois os incrementais leem blobs dele.
+        Nada é listado no disco.
         
-        # Coleta arquivos
-        files = self.collect_files(self.config['include_directories'])
+        Returns:
+            Dict: {'keep': [(linha, motivos)], 'delete': [linhas], 'bytes_freed': int}
+        """
+        policy = self.get_retention_policy()
+        cutoff = datetime.datetime.now() - datetime.timedelta(days=policy['within_days'])
         
-        # Cria arquivo de backup
-        success, result, stats = self.create_backup_archive(backup_type, files)
-        duration = time.time() - start_time
+        rows = self.history.retention_candidates()
         
-        result_dict = {
-            'success': success,
-            'backup_type': backup_type,
-            'duration': duration,
-            'filename': result if success else None,
-            'error': result if not success else None,
-            'stats': stats
-        }
+        reasons: Dict[int, List[str]] = {row['id']: [] for row in rows}
+        series: Dict[str, List[Dict]] = {}
+        for row in rows:
+            series.setdefault(row['backup_type'], []).append(row)
         
-        self.record_backup_history(result_dict)
+        for backups in series.values():
+            remaining = {bucket: policy[bucket] for bucket in ('daily', 'weekly', 'monthly')}
+            last_bucket = dict.fromkeys(remaining)
+            latest = True
+            for row in backups:
+                created = datetime.datetime.fromisoformat(row['timestamp'])
+                if created >= cutoff:
+                    reasons[row['id']].append('within')
+                if row['status'] != 'success':
+                    continue
+                if latest:
+                    reasons[row['id']].insert(0, 'latest')
+                    latest = False
+                buckets = {
+                    'daily': created.date(),
+                    'weekly': tuple(created.isocalendar()[:2]),
+                    'monthly': (created.year, created.month)
+                }
+                for bucket, key in buckets.items():
+                    if remaining[bucket] > 0 and key != last_bucket[bucket]:
+                        last_bucket[bucket] = key
+                        remaining[bucket] -= 1
+                        reasons[row['id']].append(bucket)
         
-        if success:
-            self.logger.info(f"✅ Backup dos arquivos finalizado em {duration:.1f}s")
-        else:
-            self.logger.error(f"❌ Falha no backup dos arquivos: {result_dict['error']}")
+        # Bases de incrementais mantidos não podem sair (cadeia completa)
+        by_name = {Path(row['filename']).name: row for row in rows}
+        for row in rows:
+            if not reasons[row['id']] or 'chain' in reasons[row['id']]:
+                continue
+            parent = by_name.get(row['parent_backup']) if row['parent_backup'] else None
+            while parent is not None and 'chain' not in reasons[parent['id']]:
+                reasons[parent['id']].append('chain')
+                parent = by_name.get(parent['parent_backup']) if parent['parent_backup'] else None
         
-        return result_dict
+        keep = [(row, reasons[row['id']]) for row in rows if reasons[row['id']]]
+        delete = [row for row in rows if not reasons[row['id']]]
+        
+        # Bytes liberados segundo o histórico (snapshots: chunks exclusivos)
+        bytes_freed = 0
+        snapshots = []
+        for row in delete:
+            if self.is_snapshot_row(row):
+                snapshots.append(Path(row['filename']).name)
+            elif row['backup_type'] == 'database_only':
+                bytes_freed += row['file_size'] or 0
+            else:
+                bytes_freed += row['compressed_size'] or 0
+        store = self.get_chunk_store() if snapshots else None
+        if store is not None:
+            bytes_freed += store.reclaimable_bytes(snapshots)
+        
+        return {'keep': keep, 'delete': delete, 'bytes_freed': bytes_freed, 'policy': policy}
     
-    def record_backup_history(self, backup_result: Dict):
-        """Registra backup no histórico"""
+    def is_snapshot_row(self, row: Dict) -> bool:
+        """Linha do histórico que aponta para um snapshot do chunk store"""
+        return Path(row['filename']).parent == self.chunk_store_dir
+    
+    def delete_backup_files(self, row: Dict):
+        """Remove do disco um backup do histórico (volumes + manifesto, dump ou snapshot)"""
+        backup_path = Path(row['filename'])
+        if self.is_snapshot_row(row):
+            store = self.get_chunk_store()
+            if store is not None and store.has_snapshot(backup_path.name):
+                store.delete_snapshot(backup_path.name)
+            return
+        
+        if backup_path.suffix == '.zip':
+            manifest = self.load_manifest(backup_path.name)
+            if manifest and manifest.get('volumes'):
+                volumes = [backup_path.parent / name for name in manifest['volumes']]
+            else:
+                volumes = ArchiveVolumes.volume_paths(backup_path)
+            for volume in volumes:
+                volume.unlink(missing_ok=True)
+            self.manifest_path(backup_path.name).unlink(missing_ok=True)
+        elif backup_path.is_dir():
+            shutil.rmtree(backup_path, ignore_errors=True)
+        else:
+            backup_path.unlink(missing_ok=True)
+    
+    def cleanup_old_backups(self, dry_run: bool = False) -> Dict:
+        """
+        Remove backups antigos segundo a política de retenção GFS (plan_retention)
+        
+        Args:
+            dry_run: Só exibe o plano (mantidos, removidos e bytes liberados)
+        
+        Returns:
+            Dict: Plano de retenção executado (ou simulado)
+        """
+        labels = {
+            'latest': 'mais recente', 'within': f"últimos {self.get_retention_policy()['within_days']} dias",
+            'daily': 'diário', 'weekly': 'semanal', 'monthly': 'mensal', 'chain': 'base de incremental'
+        }
+        
         try:
-            conn = sqlite3.connect(self.db_file)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                INSERT INTO backup_history 
-                (timestamp, backup_type, filename, file_size, duration_seconds, 
-                 status, error_message, checksum, files_count, compressed_size)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                datetime.datetime.now().isoformat(),
-                backup_result['backup_type'],
-                backup_result.get('filename', ''),
-                backup_result['stats'].get('total_size', 0),
-                backup_result['duration'],
-                'success' if backup_result['success'] else 'error',
-                backup_result.get('error', ''),
-                backup_result.get('checksum', ''),
-                backup_result['stats'].get('files_count', 0),
-                backup_result['stats'].get('compressed_size', 0)
-            ))
-            
-            conn.commit()
-            conn.close()
-            
+            plan = self.plan_retention()
         except Exception as e:
-            self.logger.error(f"Erro ao registrar histórico: {e}")
-    
-    def cleanup_old_backups(self):
-        """Remove backups antigos baseado na política de retenção"""
-        retention_days = self.config.get('retention_days', 30)
-        cutoff_date = datetime.datetime.now() - datetime.timedelta(days=retention_days)
+            self.logger.error(f"Erro no planejamento da retenção: {e}")
+            return {'keep': [], 'delete': [], 'bytes_freed': 0}
         
-        removed_count = 0
-        freed_space = 0
+        prefix = "🔍 [simulação] " if dry_run else ""
+        for row, reasons in plan['keep']:
+            self.logger.info(f"{prefix}📌 Mantido: {Path(row['filename']).name} "
+                             f"({', '.join(labels[reason] for reason in reasons)})")
+        for row in plan['delete']:
+            self.logger.info(f"{prefix}🗑️ Remover: {Path(row['filename']).name}")
         
+        if dry_run:
+            self.logger.info(f"{prefix}🧹 {len(plan['delete'])} backups seriam removidos, "
+                             f"{self.format_size(plan['bytes_freed'])} liberados")
+            return plan
+        
+        removed_count = 0
         try:
-            # Lista todos os arquivos de backup
-            for backup_file in self.backup_dir.glob("duralux_backup_*.zip"):
-                file_time = datetime.datetime.fromtimestamp(backup_file.stat().st_mtime)
-                
-                if file_time < cutoff_date:
-                    file_size = backup_file.stat().st_size
-                    backup_file.unlink()
-                    removed_count += 1
-                    freed_space += file_size
-                    
-                    self.logger.info(f"🗑️ Backup removido: {backup_file.name}")
+            for row in plan['delete']:
+                try:
+                    self.delete_backup_files(row)
+                except OSError as e:
+                    self.logger.warning(f"⚠️ Erro ao remover {row['filename']}: {e}")
+                    continue
+                self.history.mark_deleted(row['id'], datetime.datetime.now().isoformat())
+                removed_count += 1
+                self.logger.info(f"🗑️ Backup removido: {Path(row['filename']).name}")
             
-            # Remove arquivos de BD antigos
-            db_backup_dir = self.backup_dir / 'database'
-            if db_backup_dir.exists():
-                for db_file in db_backup_dir.glob("database_*.sql"):
-                    file_time = datetime.datetime.fromtimestamp(db_file.stat().st_mtime)
-                    
-                    if file_time < cutoff_date:
-                        file_size = db_file.stat().st_size
-                        db_file.unlink()
-                        removed_count += 1
-                        freed_space += file_size
+            # Coleta dos chunks que ficaram sem referência
+            store = self.get_chunk_store()
+            if store is not None:
+                chunks_removed, chunk_bytes = store.garbage_collect()
+                self.history.add_extra_usage('chunk_store', -chunk_bytes)
+                if chunks_removed:
+                    self.logger.info(f"♻️ Chunks sem referência removidos: {chunks_removed}")
             
             if removed_count > 0:
-                self.logger.info(f"🧹 Limpeza concluída: {removed_count} arquivos removidos, "
-                               f"{self.format_size(freed_space)} liberados")
+                self.logger.info(f"🧹 Limpeza concluída: {removed_count} backups removidos, "
+                               f"{self.format_size(plan['bytes_freed'])} liberados")
             else:
                 self.logger.info("✅ Nenhum backup antigo para remover")
                 
         except Exception as e:
             self.logger.error(f"Erro na limpeza de backups: {e}")
+        
+        return plan
+    
+    def build_path_selector(self, patterns: Optional[List[str]]):
+        """
+        Filtro de restauração: caminho exato, diretório (prefixo) ou glob
+        
+        Um banco SQLite com snapshot online também seleciona os seus segmentos.
+        
+        Returns:
+            Callable[[str], bool] ou None quando não há filtro
+        """
+        if not patterns:
+            return None
+        
+        normalized = [pattern.replace('\\', '/').strip('/') for pattern in patterns]
+        
+        def selector(relative_path: str) -> bool:
+            for pattern in normalized:
+                if (relative_path == pattern or relative_path.startswith(pattern + '/')
+                        or relative_path.startswith(pattern + SQLITE_PAGES_SUFFIX + '/')
+                        or fnmatch.fnmatchcase(relative_path, pattern)):
+                    return True
+            return False
+        
+        return selector
+    
+    def get_restore_workers(self) -> int:
+        """Threads de extração paralela (zlib libera o GIL ao descomprimir)"""
+        workers = self.config.get('advanced_options', {}).get('restore_workers', 0)
+        return max(1, int(workers or os.cpu_count() or 1))
     
-    def restore_backup(self, backup_file: str, restore_path: str = None) -> bool:
+    def restore_backup(self, backup_file: str, restore_path: str = None,
+                       patterns: Optional[List[str]] = None) -> bool:
         """
         Restaura backup do arquivo especificado
         
         Args:
             backup_file: Caminho para o arquivo de backup
             restore_path: Diretório de destino (opcional)
+            patterns: Restaura apenas caminhos/diretórios/globs indicados (opcional)
         
         Returns:
             bool: Sucesso da operação
         """
         backup_path = Path(backup_file)
+        store = self.get_chunk_store()
+        is_snapshot = store is not None and store.has_snapshot(backup_path.name)
         
-        if not backup_path.exists():
+        if not backup_path.exists() and not is_snapshot:
             self.logger.error(f"❌ Arquivo de backup não encontrado: {backup_file}")
             return False
         
@@ -571,13 +5287,31 @@ class DuraluxBackupSystem:
             restore_path = Path(restore_path)
         
         restore_path.mkdir(parents=True, exist_ok=True)
+        selector = self.build_path_selector(patterns)
         
         try:
             self.logger.info(f"🔄 Iniciando restauração de: {backup_path}")
             self.logger.info(f"📁 Destino: {restore_path}")
+            if patterns:
+                self.logger.info(f"🔍 Filtros: {', '.join(patterns)}")
             
-            with zipfile.ZipFile(backup_path, 'r') as zipf:
-                zipf.extractall(restore_path)
+            manifest = None if is_snapshot else self.read_archive_manifest(backup_path)
+            
+            if is_snapshot:
+                restored = store.restore_snapshot(backup_path.name, restore_path, selector)
+                self.logger.info(f"📦 Arquivos restaurados do chunk store: {restored}")
+            elif manifest is None:
+                # Zip avulso (ou volume isolado): cada volume tem seu próprio índice
+                for volume in ArchiveVolumes.volume_paths(backup_path):
+                    with self.open_volume(volume) as zipf:
+                        members = [name for name in zipf.namelist()
+                                   if selector is None or selector(name)]
+                        zipf.extractall(restore_path, members)
+            else:
+                restored = self.restore_from_manifest(manifest, backup_path.parent, restore_path, selector)
+                self.logger.info(f"📦 Arquivos restaurados: {restored}")
+            
+            self.assemble_sqlite_snapshots(restore_path)
             
             self.logger.info(f"✅ Restauração concluída em: {restore_path}")
             
@@ -588,6 +5322,12 @@ class DuraluxBackupSystem:
                 self.logger.info("⚠️ Para restaurar o BD, execute manualmente:")
                 self.logger.info(f"mysql -u {self.config['database']['user']} -p "
                                f"{self.config['database']['name']} < {db_files[0]}")
+                self.logger.info("💡 Ou carregue direto do backup: --action restore --load-database")
+            
+            exports = list(restore_path.glob(f"**/database_native_*/{EXPORT_MANIFEST}"))
+            if exports:
+                self.logger.info(f"🗄️ Encontrada exportação nativa do BD: {exports[0].parent}")
+                self.logger.info(f"💡 Para carregar: --action restore --restore-file {exports[0].parent} --load-database")
             
             return True
             
@@ -595,95 +5335,328 @@ class DuraluxBackupSystem:
             self.logger.error(f"❌ Erro na restauração: {e}")
             return False
     
-    def get_backup_history(self, limit: int = 50) -> List[Dict]:
-        """Retorna histórico de backups"""
-        try:
-            conn = sqlite3.connect(self.db_file)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                SELECT * FROM backup_history 
-                ORDER BY timestamp DESC 
-                LIMIT ?
-            ''', (limit,))
+    def assemble_sqlite_snapshots(self, restore_path: Path):
+        """
+        Remonta cada banco SQLite restaurado a partir dos segmentos de páginas
+        
+        O banco só substitui o diretório <banco>.pages quando todos os
+        segmentos estão presentes e o SHA-256 confere com o snapshot.json.
+        """
+        for meta_file in restore_path.glob(f"**/*{SQLITE_PAGES_SUFFIX}/{SQLITE_SNAPSHOT_META}"):
+            pages_dir = meta_file.parent
+            with open(meta_file, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            segments = [pages_dir / f"{index:08d}" for index in range(meta['segments'])]
+            missing = [segment.name for segment in segments if not segment.exists()]
+            if missing:
+                self.logger.warning(f"⚠️ Snapshot SQLite incompleto em {pages_dir} ({len(missing)} segmentos ausentes)")
+                continue
             
-            columns = [description[0] for description in cursor.description]
-            history = []
+            target = pages_dir.with_name(pages_dir.name[:-len(SQLITE_PAGES_SUFFIX)])
+            partial = target.with_name(target.name + '.partial')
+            file_hash = hashlib.sha256()
+            with open(partial, 'wb') as dest:
+                for segment in segments:
+                    with open(segment, 'rb') as src:
+                        for block in iter(lambda: src.read(HASH_BUFFER_SIZE), b""):
+                            file_hash.update(block)
+                            dest.write(block)
             
-            for row in cursor.fetchall():
-                history.append(dict(zip(columns, row)))
+            if file_hash.hexdigest() != meta['sha256']:
+                partial.unlink()
+                raise ValueError(f"Banco SQLite remontado não confere: {meta['database']}")
+            partial.replace(target)
+            shutil.rmtree(pages_dir)
+            self.logger.info(f"🗃️ Banco SQLite remontado: {target} ({meta['page_count']} páginas)")
+    
+    def restore_from_manifest(self, manifest: Dict, archive_dir: Path, restore_path: Path,
+                              selector=None) -> int:
+        """
+        Reconstrói a árvore a partir do manifesto, lendo cada blob do backup da
+        cadeia em que ele foi armazenado
+        
+        Os membros são independentes entre si, então cada volume é dividido em
+        lotes extraídos em paralelo, cada thread com seu próprio ZipFile.
+        
+        Returns:
+            int: Quantidade de arquivos restaurados
+        """
+        by_source: Dict[str, List[Tuple[str, str, Optional[str]]]] = {}
+        for relative_path, entry in manifest['files'].items():
+            if selector is not None and not selector(relative_path):
+                continue
+            by_source.setdefault(entry['source'], []).append(
+                (relative_path, entry['member'], entry.get('codec')))
+        
+        # Valida a cadeia antes de escrever qualquer arquivo
+        missing = [name for name in by_source if not (archive_dir / name).exists()]
+        if missing:
+            raise FileNotFoundError(f"Backups da cadeia ausentes: {', '.join(missing)}")
+        
+        root = restore_path.resolve()
+        
+        def extract(source: str, members: List[Tuple[str, str, Optional[str]]]) -> int:
+            count = 0
+            with self.open_volume(archive_dir / source) as zipf:
+                for relative_path, member, codec in members:
+                    target = (restore_path / relative_path).resolve()
+                    if root not in target.parents:
+                        self.logger.warning(f"⚠️ Caminho inválido ignorado: {relative_path}")
+                        continue
+                    target.parent.mkdir(parents=True, exist_ok=True)
+                    with open_archive_member(zipf, member, codec) as src, open(target, 'wb') as dest:
+                        shutil.copyfileobj(src, dest, HASH_BUFFER_SIZE)
+                    count += 1
+            return count
+        
+        workers = self.get_restore_workers()
+        tasks = []
+        for source in sorted(by_source, key=ArchiveVolumes.sort_key):
+            members = by_source[source]
+            step = max(1, -(-len(members) // workers))
+            tasks.extend((source, members[i:i + step]) for i in range(0, len(members), step))
+        
+        if workers == 1:
+            return sum(extract(source, members) for source, members in tasks)
+        
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return sum(executor.map(lambda task: extract(*task), tasks))
+    
+    def stream_member(self, backup_file: str, relative_path: str, dest) -> int:
+        """
+        Escreve um único arquivo do backup em `dest` (stdout, pipe...) sem
+        extrair nada em disco
+        
+        Um banco SQLite com snapshot online é remontado em fluxo a partir dos
+        seus segmentos de páginas.
+        
+        Returns:
+            int: Bytes escritos
+        """
+        relative_path = relative_path.replace('\\', '/').strip('/')
+        pages_dir = relative_path + SQLITE_PAGES_SUFFIX
+        meta_path = f"{pages_dir}/{SQLITE_SNAPSHOT_META}"
+        if meta_path not in self.list_backup_paths(backup_file):
+            return self.stream_stored_member(backup_file, relative_path, dest)
+        
+        meta_buffer = io.BytesIO()
+        self.stream_stored_member(backup_file, meta_path, meta_buffer)
+        meta = json.loads(meta_buffer.getvalue().decode('utf-8'))
+        written = 0
+        for index in range(meta['segments']):
+            written += self.stream_stored_member(backup_file, f"{pages_dir}/{index:08d}", dest)
+        return written
+    
+    def stream_stored_member(self, backup_file: str, relative_path: str, dest) -> int:
+        """Escreve em `dest` um blob exatamente como foi gravado no backup"""
+        backup_path = Path(backup_file)
+        written = 0
+        
+        store = self.get_chunk_store()
+        if store is not None and store.has_snapshot(backup_path.name):
+            for chunk in store.iter_file(backup_path.name, relative_path):
+                dest.write(chunk)
+                written += len(chunk)
+            return written
+        
+        manifest = self.read_archive_manifest(backup_path)
+        if manifest is not None:
+            entry = manifest['files'].get(relative_path)
+            if entry is None:
+                raise FileNotFoundError(f"Arquivo não encontrado no backup: {relative_path}")
+            archives = [backup_path.parent / entry['source']]
+            member, codec = entry['member'], entry.get('codec')
+        else:
+            archives = ArchiveVolumes.volume_paths(backup_path)
+            member, codec = relative_path, None
+        
+        for archive in archives:
+            with self.open_volume(archive) as zipf:
+                try:
+                    zipf.getinfo(member)
+                except KeyError:
+                    continue
+                with open_archive_member(zipf, member, codec) as src:
+                    for chunk in iter(lambda: src.read(HASH_BUFFER_SIZE), b""):
+                        dest.write(chunk)
+                        written += len(chunk)
+                return written
+        
+        raise FileNotFoundError(f"Arquivo não encontrado no backup: {relative_path}")
+    
+    def list_backup_paths(self, backup_file: str) -> List[str]:
+        """Caminhos gravados no backup (snapshot, manifesto ou nomes dos volumes)"""
+        backup_path = Path(backup_file)
+        store = self.get_chunk_store()
+        if store is not None and store.has_snapshot(backup_path.name):
+            return store.snapshot_paths(backup_path.name)
+        
+        manifest = self.read_archive_manifest(backup_path)
+        if manifest is not None:
+            return list(manifest['files'])
+        
+        paths = []
+        for volume in ArchiveVolumes.volume_paths(backup_path):
+            with self.open_volume(volume) as zipf:
+                paths.extend(zipf.namelist())
+        return paths
+    
+    def find_database_member(self, backup_file: str) -> Optional[str]:
+        """Caminho do dump database_*.sql mais recente dentro do backup"""
+        paths = self.list_backup_paths(backup_file)
+        dumps = sorted(p for p in paths if fnmatch.fnmatchcase(Path(p).name, 'database_*.sql'))
+        return dumps[-1] if dumps else None
+    
+    def find_native_export(self, backup_file: str) -> Optional[str]:
+        """Diretório da exportação nativa mais recente dentro do backup"""
+        paths = self.list_backup_paths(backup_file)
+        exports = sorted(str(Path(p).parent.as_posix()) for p in paths
+                         if Path(p).name == EXPORT_MANIFEST
+                         and Path(p).parent.name.startswith('database_native_'))
+        return exports[-1] if exports else None
+    
+    def restore_native_export(self, backup_file: str) -> Optional[bool]:
+        """
+        Carrega a exportação nativa de um diretório, zip ou snapshot
+        
+        Returns:
+            Optional[bool]: None quando o backup não contém exportação nativa
+        """
+        backup_path = Path(backup_file)
+        if backup_path.is_dir():
+            if not (backup_path / EXPORT_MANIFEST).exists():
+                return None
+            self.logger.info(f"🗄️ Carregando exportação nativa: {backup_path.name}")
+            return self.import_database_native(backup_path)
+        
+        if backup_path.name.endswith(DUMP_SUFFIXES):
+            return None
+        export_path = self.find_native_export(backup_file)
+        if export_path is None:
+            return None
+        
+        self.logger.info(f"🗄️ Carregando exportação nativa: {export_path}")
+        with tempfile.TemporaryDirectory(dir=self.backup_dir) as temp_dir:
+            if not self.restore_backup(backup_file, temp_dir, [export_path]):
+                return False
+            return self.import_database_native(Path(temp_dir) / export_path)
+    
+    def restore_database(self, backup_file: str) -> bool:
+        """
+        Carrega o dump do backup direto no MySQL (mysql_path) via pipe, sem
+        gravar o SQL em disco
+        
+        Aceita zips/snapshots com database_*.sql e dumps avulsos .sql.gz/.sql.zst
+        (com sufixo .enc quando criptografados).
+        Exportações nativas (diretório database_native_* ou dentro do backup)
+        são carregadas pelo DatabaseExporter.
+        """
+        native = self.restore_native_export(backup_file)
+        if native is not None:
+            return native
+        
+        backup_path = Path(backup_file)
+        db_config = self.config['database']
+        cmd = [
+            self.config.get('mysql_path', 'mysql'),
+            '--host', db_config['host'],
+            '--port', str(db_config['port']),
+            '--user', db_config['user'],
+            f'--password={db_config["password"]}',
+            db_config['name']
+        ]
+        
+        try:
+            with tempfile.TemporaryFile() as stderr_file:
+                process = subprocess.Popen(cmd, stdin=subprocess.PIPE, stderr=stderr_file)
+                try:
+                    if backup_path.name.endswith(DUMP_SUFFIXES):
+                        self.logger.info(f"🗄️ Carregando dump: {backup_path.name}")
+                        raw = open(backup_path, 'rb')
+                        if backup_path.name.endswith(ENCRYPTED_SUFFIX):
+                            raw = DecryptingReader(raw, self.encryption_key)
+                        if backup_path.name.endswith(('.zst', '.zst' + ENCRYPTED_SUFFIX)):
+                            reader = zstandard.ZstdDecompressor().stream_reader(raw, read_across_frames=True, closefd=True)
+                        else:
+                            reader = gzip.GzipFile(fileobj=raw, mode='rb')
+                        with raw, reader:
+                            shutil.copyfileobj(reader, process.stdin, HASH_BUFFER_SIZE)
+                    else:
+                        member = self.find_database_member(backup_file)
+                        if member is None:
+                            process.kill()
+                            process.wait()
+                            self.logger.error("❌ Nenhum dump database_*.sql no backup")
+                            return False
+                        self.logger.info(f"🗄️ Carregando dump: {member}")
+                        self.stream_member(backup_file, member, process.stdin)
+                    process.stdin.close()
+                    process.wait(timeout=DUMP_TIMEOUT_SECONDS)
+                except BaseException:
+                    process.kill()
+                    process.wait()
+                    raise
+                
+                if process.returncode != 0:
+                    stderr_file.seek(0)
+                    error_msg = stderr_file.read().decode('utf-8', errors='replace').strip()
+                    self.logger.error(f"❌ Erro ao carregar BD: {error_msg or process.returncode}")
+                    return False
             
-            conn.close()
-            return history
+            self.logger.info(f"✅ Banco {db_config['name']} restaurado")
+            return True
             
+        except Exception as e:
+            self.logger.error(f"❌ Erro ao carregar BD: {e}")
+            return False
+    
+    def get_backup_history(self, limit: int = 50) -> List[Dict]:
+        """Retorna histórico de backups"""
+        try:
+            return self.history.recent(limit)
         except Exception as e:
             self.logger.error(f"Erro ao buscar histórico: {e}")
             return []
     
     def get_backup_statistics(self) -> Dict:
-        """Retorna estatísticas dos backups"""
+        """
+        Retorna estatísticas dos backups
+        
+        Totais e médias vêm dos rollups por tipo (backup_rollups) e os últimos
+        backups do índice de timestamp, sem varrer o histórico.
+        """
         try:
-            conn = sqlite3.connect(self.db_file)
-            cursor = conn.cursor()
-            
-            # Estatísticas gerais
-            cursor.execute('''
-                SELECT 
-                    COUNT(*) as total_backups,
-                    SUM(CASE WHEN status = 'success' THEN 1 ELSE 0 END) as successful_backups,
-                    SUM(file_size) as total_size,
-                    AVG(duration_seconds) as avg_duration
-                FROM backup_history
-            ''')
-            
-            general_stats = cursor.fetchone()
-            
-            # Estatísticas por tipo
-            cursor.execute('''
-                SELECT 
-                    backup_type,
-                    COUNT(*) as count,
-                    AVG(duration_seconds) as avg_duration,
-                    SUM(file_size) as total_size
-                FROM backup_history
-                WHERE status = 'success'
-                GROUP BY backup_type
-            ''')
-            
-            type_stats = cursor.fetchall()
+            rollups = self.history.rollups()
+            recent_backups = self.history.recent(10)
             
-            # Últimos backups
-            cursor.execute('''
-                SELECT timestamp, backup_type, status, filename
-                FROM backup_history
-                ORDER BY timestamp DESC
-                LIMIT 10
-            ''')
-            
-            recent_backups = cursor.fetchall()
+            total_backups = sum(row['total_count'] for row in rollups)
+            successful_backups = sum(row['success_count'] for row in rollups)
+            total_duration = sum(row['total_duration'] for row in rollups)
             
-            conn.close()
+            store = self.get_chunk_store()
+            storage = store.storage_report() if store is not None else None
             
             return {
-                'total_backups': general_stats[0] or 0,
-                'successful_backups': general_stats[1] or 0,
-                'success_rate': (general_stats[1] / general_stats[0] * 100) if general_stats[0] > 0 else 0,
-                'total_size': general_stats[2] or 0,
-                'avg_duration': general_stats[3] or 0,
+                'storage': storage,
+                'total_backups': total_backups,
+                'successful_backups': successful_backups,
+                'success_rate': (successful_backups / total_backups * 100) if total_backups > 0 else 0,
+                'total_size': sum(row['total_size'] for row in rollups),
+                'avg_duration': total_duration / total_backups if total_backups > 0 else 0,
                 'by_type': [
                     {
-                        'type': row[0],
-                        'count': row[1],
-                        'avg_duration': row[2],
-                        'total_size': row[3]
-                    } for row in type_stats
+                        'type': row['backup_type'],
+                        'count': row['success_count'],
+                        'avg_duration': row['success_duration'] / row['success_count'],
+                        'total_size': row['success_size']
+                    } for row in rollups if row['success_count']
                 ],
                 'recent_backups': [
                     {
-                        'timestamp': row[0],
-                        'type': row[1],
-                        'status': row[2],
-                        'filename': row[3]
+                        'timestamp': row['timestamp'],
+                        'type': row['backup_type'],
+                        'status': row['status'],
+                        'filename': row['filename']
                     } for row in recent_backups
                 ]
             }
@@ -692,24 +5665,71 @@ class DuraluxBackupSystem:
             self.logger.error(f"Erro ao calcular estatísticas: {e}")
             return {}
     
-    def setup_scheduled_backups(self):
-        """Configura backups agendados"""
+    def setup_scheduled_backups(self) -> List[Dict]:
+        """
+        Define os jobs agendados
+        
+        Returns:
+            List[Dict]: Definições dos jobs para o JobRunner
+        """
         schedule_time = self.config.get('schedule_time', '02:00')
         schedule_days = self.config.get('schedule_days', ['monday', 'wednesday', 'friday'])
+        scheduler = self.config.get('scheduler', {})
+        timeouts = scheduler.get('job_timeout_minutes', {})
+        
+        script = str(Path(__file__).resolve())
+        config_file = os.path.abspath(self.config_file)
         
-        # Limpa agendamentos anteriores
-        schedule.clear()
+        def command(action: str) -> List[str]:
+            return [sys.executable, script, '--config', config_file, '--action', action]
         
-        for day in schedule_days:
-            if hasattr(schedule.every(), day.lower()):
-                getattr(schedule.every(), day.lower()).at(schedule_time).do(self.scheduled_backup_job)
-                self.logger.info(f"📅 Backup agendado: {day}s às {schedule_time}")
+        days = [day for day in schedule_days if day.lower() in WEEKDAYS]
+        for day in days:
+            self.logger.info(f"📅 Backup agendado: {day}s às {schedule_time}")
         
-        # Limpeza automática semanal
-        schedule.every().sunday.at("03:00").do(self.cleanup_old_backups)
+        # Limpeza automática semanal (fila própria: não espera o backup)
         self.logger.info("🧹 Limpeza automática agendada: Domingos às 03:00")
+        
+        jobs = [
+            {
+                'name': 'scheduled_backup',
+                'action': 'scheduled-job',
+                'command': command('scheduled-job'),
+                'days': days,
+                'at': schedule_time,
+                'queue': 'backup',
+                'timeout_seconds': int(timeouts.get('scheduled_backup', 240) * 60)
+            },
+            {
+                'name': 'cleanup',
+                'action': 'cleanup',
+                'command': command('cleanup'),
+                'days': ['sunday'],
+                'at': '03:00',
+                'queue': 'maintenance',
+                'timeout_seconds': int(timeouts.get('cleanup', 60) * 60)
+            }
+        ]
+        
+        # Reconciliação do uso em disco (opcional, mesma fila da limpeza)
+        reconcile = self.config.get('usage_reconcile', {})
+        if reconcile.get('enabled', False):
+            reconcile_days = [day for day in reconcile.get('days', ['saturday']) if day.lower() in WEEKDAYS]
+            reconcile_at = reconcile.get('at', '04:00')
+            self.logger.info(f"📏 Reconciliação do uso em disco: {', '.join(reconcile_days)} às {reconcile_at}")
+            jobs.append({
+                'name': 'reconcile_usage',
+                'action': 'reconcile-usage',
+                'command': command('reconcile-usage'),
+                'days': reconcile_days,
+                'at': reconcile_at,
+                'queue': 'maintenance',
+                'timeout_seconds': int(timeouts.get('reconcile_usage', 60) * 60)
+            })
+        
+        return jobs
     
-    def scheduled_backup_job(self):
+    def scheduled_backup_job(self) -> Dict:
         """Job executado pelo agendador"""
         self.logger.info("⏰ Executando backup agendado...")
         
@@ -725,18 +5745,27 @@ class DuraluxBackupSystem:
                 result = self.perform_database_backup()
             else:
                 result = self.perform_files_backup()
-        else:
+        elif self.config['backup_types'].get('incremental', False):
             # Backup incremental em outros dias
+            result = self.perform_incremental_backup()
+        else:
             result = self.perform_files_backup()
         
         # Envia notificação se configurado
         if self.config.get('email_notifications', False):
             self.send_notification(result)
+        
+        return result
     
     def send_notification(self, backup_result: Dict):
-        """Envia notificação por email do resultado do backup"""
+        """
+        Enfileira a notificação por email do resultado do backup
+        
+        Só grava no outbox do histórico; a entrega (SMTP, digest, novas
+        tentativas) fica com o NotificationOutbox do agendador ou com
+        --action send-notifications.
+        """
         try:
-            # Implementação básica - pode ser expandida
             recipients = self.config.get('email_recipients', [])
             if not recipients:
                 return
@@ -762,28 +5791,66 @@ Estatísticas:
 Timestamp: {datetime.datetime.now()}
 """
             
-            self.logger.info(f"📧 Notificação preparada: {subject}")
-            # Aqui seria implementado o envio real do email
+            self.history.enqueue_notification(datetime.datetime.now().isoformat(), subject, message,
+                                              backup_result['success'])
+            self.logger.info(f"📧 Notificação enfileirada: {subject}")
             
         except Exception as e:
-            self.logger.error(f"Erro ao enviar notificação: {e}")
+            self.logger.error(f"Erro ao enfileirar notificação: {e}")
+    
+    def get_notification_outbox(self) -> NotificationOutbox:
+        """Worker de entrega das notificações (config notifications.*)"""
+        options = self.config.get('notifications', {})
+        password = options.get('smtp_password') or self.read_secret(
+            options.get('smtp_password_variable', 'DURALUX_SMTP_PASSWORD'))
+        return NotificationOutbox(self.db_file, self.logger, options,
+                                  self.config.get('email_recipients', []), password)
     
     def start_scheduler(self):
         """Inicia o agendador de backups"""
-        self.setup_scheduled_backups()
+        scheduler = self.config.get('scheduler', {})
+        runner = JobRunner(
+            self.db_file,
+            self.logger,
+            self.setup_scheduled_backups(),
+            scheduler.get('queues', {'backup': 1, 'maintenance': 1}),
+            catch_up=scheduler.get('catch_up_missed_runs', True)
+        )
+        
+        # Entrega das notificações em segundo plano (os jobs só enfileiram)
+        outbox = None
+        if self.config.get('email_notifications', False):
+            outbox = self.get_notification_outbox()
+            outbox.start()
         
         self.logger.info("🔄 Agendador de backups iniciado")
         
-        while True:
-            try:
-                schedule.run_pending()
-                time.sleep(60)  # Verifica a cada minuto
-            except KeyboardInterrupt:
-                self.logger.info("🛑 Agendador interrompido pelo usuário")
-                break
-            except Exception as e:
-                self.logger.error(f"Erro no agendador: {e}")
-                time.sleep(300)  # Aguarda 5 minutos em caso de erro
+        try:
+            runner.run_forever()
+        except KeyboardInterrupt:
+            runner.stop()
+            self.logger.info("🛑 Agendador interrompido pelo usuário")
+        finally:
+            if outbox is not None:
+                outbox.stop()
+    
+    def get_scheduled_jobs(self) -> List[Dict]:
+        """Próximas execuções persistidas pelo agendador"""
+        try:
+            conn = sqlite3.connect(self.db_file)
+            cursor = conn.execute('''
+                SELECT name, next_run, last_run, last_status FROM scheduled_jobs
+                WHERE next_run IS NOT NULL ORDER BY next_run
+            ''')
+            jobs = [
+                {'name': name, 'next_run': next_run, 'last_run': last_run, 'last_status': last_status}
+                for name, next_run, last_run, last_status in cursor
+            ]
+            conn.close()
+            return jobs
+        except sqlite3.Error:
+            # Agendador ainda não foi iniciado
+            return []
     
     def format_size(self, bytes_size: int) -> str:
         """Formata tamanho em bytes para formato legível"""
@@ -801,8 +5868,24 @@ Timestamp: {datetime.datetime.now()}
         
         # Configuração atual
         print(f"📁 Diretório de Backup: {self.backup_dir}")
-        print(f"⏱️ Retenção: {self.config['retention_days']} dias")
+        policy = self.get_retention_policy()
+        print(f"⏱️ Retenção: todos dos últimos {policy['within_days']} dias + "
+              f"{policy['daily']} diários, {policy['weekly']} semanais, {policy['monthly']} mensais")
         print(f"📅 Agendamento: {self.config['schedule_days']} às {self.config['schedule_time']}")
+        if self.encrypt_backups:
+            print(f"🔐 Criptografia: AES-256-GCM (chave {encryption_key_id(self.encryption_key).hex()})")
+        else:
+            print("🔓 Criptografia: desativada")
+        destinations = self.config.get('destinations', [])
+        if destinations:
+            names = ', '.join(f"{d.get('name', d.get('type', 'local'))} ({d.get('type', 'local')})"
+                              for d in destinations)
+            pending = len(UploadJournal(self.upload_journal_dir).pending())
+            print(f"☁️ Destinos: {names} | envios pendentes: {pending}")
+        if self.config.get('email_notifications', False):
+            outbox = self.history.outbox_counts()
+            print(f"📧 Notificações: {outbox.get('pending', 0)} pendente(s), "
+                  f"{outbox.get('sent', 0)} enviada(s), {outbox.get('failed', 0)} com falha")
         
         # Estatísticas
         stats = self.get_backup_statistics()
@@ -812,15 +5895,33 @@ Timestamp: {datetime.datetime.now()}
             print(f"   Taxa de Sucesso: {stats['success_rate']:.1f}%")
             print(f"   Espaço Total: {self.format_size(stats['total_size'])}")
             print(f"   Duração Média: {stats['avg_duration']:.1f}s")
+            
+            storage = stats.get('storage')
+            if storage:
+                print(f"\n♻️ Chunk Store:")
+                print(f"   Snapshots: {storage['snapshots']} | Chunks: {storage['chunks']}")
+                print(f"   Lógico: {self.format_size(storage['logical_bytes'])} | "
+                      f"Único: {self.format_size(storage['unique_bytes'])} | "
+                      f"Em disco: {self.format_size(storage['stored_bytes'])}")
+                print(f"   Taxa de Deduplicação: {storage['dedup_ratio']:.2f}x")
         
-        # Espaço em disco
-        backup_size = sum(f.stat().st_size for f in self.backup_dir.rglob('*') if f.is_file())
-        print(f"\n💾 Espaço Utilizado: {self.format_size(backup_size)}")
+        # Espaço em disco (ledger mantido a cada backup gravado/removido)
+        usage = self.history.usage()
+        print(f"\n💾 Espaço Utilizado: {self.format_size(usage['backups_bytes'] + usage['extra_bytes'])} "
+              f"(backups: {self.format_size(usage['backups_bytes'])})")
+        for backup_type, totals in sorted(usage['by_type'].items()):
+            print(f"   {backup_type}: {totals['backups']} backups, {self.format_size(totals['bytes'])}")
+        for month, totals in list(usage['by_month'].items())[:6]:
+            print(f"   {month}: {totals['backups']} backups, {self.format_size(totals['bytes'])}")
+        for category, size in usage['extra'].items():
+            print(f"   {category}: {self.format_size(size)}")
+        print(f"   Última reconciliação: {usage['scanned_at'] or 'nunca (--action reconcile-usage)'}")
         
         # Próximos agendamentos
         print(f"\n⏰ Próximos Backups:")
-        for job in schedule.jobs[:3]:
-            print(f"   {job.next_run}")
+        for job in self.get_scheduled_jobs()[:3]:
+            last = f" (último: {job['last_status']})" if job['last_status'] else ""
+            print(f"   {job['next_run']} - {job['name']}{last}")
         
         print("="*60)
 
@@ -830,14 +5931,36 @@ def main():
     import argparse
     
     parser = argparse.ArgumentParser(description="Duralux CRM Backup System v7.0")
-    parser.add_argument('--action', choices=['full', 'database', 'files', 'schedule', 'status', 'cleanup', 'restore'], 
+    parser.add_argument('--action', choices=['full', 'database', 'files', 'incremental', 'schedule', 'scheduled-job', 'status', 'cleanup', 'restore', 'verify', 'reconcile-usage', 'generate-key', 'upload', 'send-notifications', 'plan'], 
                        default='status', help='Ação a executar')
     parser.add_argument('--config', default='backup_config.json', help='Arquivo de configuração')
     parser.add_argument('--restore-file', help='Arquivo de backup para restaurar')
     parser.add_argument('--restore-path', help='Diretório de destino para restauração')
+    parser.add_argument('--verify-file', help='Arquivo de backup a verificar (padrão: todos)')
+    parser.add_argument('--include', action='append', metavar='CAMINHO',
+                        help='Restaura só este caminho, diretório ou glob (pode repetir)')
+    parser.add_argument('--member', help='Envia um único arquivo do backup para stdout')
+    parser.add_argument('--load-database', action='store_true',
+                        help='Carrega o dump do backup direto no MySQL, sem gravar em disco')
+    parser.add_argument('--backup-type', choices=list(PLAN_BACKUP_TYPES), default='full',
+                        help='Plan: tipo do backup a prever')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='Cleanup: só mostra o que seria removido e o espaço liberado')
     
     args = parser.parse_args()
     
+    # Com --member o stdout carrega o conteúdo do arquivo; mensagens vão para stderr
+    member_output = None
+    if args.action == 'restore' and args.member:
+        member_output = sys.stdout.buffer
+        sys.stdout = sys.stderr
+    
+    # Nova chave para o .env (não depende da configuração atual)
+    if args.action == 'generate-key':
+        key = base64.urlsafe_b64encode(os.urandom(32)).decode('ascii')
+        print(f"DURALUX_BACKUP_KEY={key}")
+        return
+    
     # Inicializa sistema
     backup_system = DuraluxBackupSystem(args.config)
     
@@ -869,17 +5992,61 @@ def main():
                 print(f"❌ Falha no backup dos arquivos: {result['error']}")
                 sys.exit(1)
                 
+        elif args.action == 'incremental':
+            print("➕ Iniciando backup incremental...")
+            result = backup_system.perform_incremental_backup()
+            if result['success']:
+                print(f"✅ Backup incremental concluído: {result['filename']}")
+            else:
+                print(f"❌ Falha no backup incremental: {result['error']}")
+                sys.exit(1)
+                
         elif args.action == 'cleanup':
             print("🧹 Iniciando limpeza de backups antigos...")
-            backup_system.cleanup_old_backups()
+            backup_system.cleanup_old_backups(dry_run=args.dry_run)
+        
+        elif args.action == 'reconcile-usage':
+            niceness = backup_system.config.get('usage_reconcile', {}).get('niceness', 19)
+            backup_system.reconcile_usage(niceness)
+        
+        elif args.action == 'plan':
+            backup_system.print_plan(backup_system.plan_backup(args.backup_type))
+        
+        elif args.action == 'send-notifications':
+            # Entrega imediata do outbox (sem esperar a janela do digest)
+            outbox = backup_system.get_notification_outbox()
+            try:
+                outbox.drain(force=True)
+            finally:
+                outbox.stop()
+            
+        elif args.action == 'upload':
+            # Retoma os envios interrompidos; a espera fica com wait_uploads() abaixo
+            resumed = backup_system.resume_uploads()
+            if resumed is None:
+                print("ℹ️ Nenhum destino configurado (destinations)")
+            elif not resumed:
+                print("ℹ️ Nenhum envio pendente")
             
         elif args.action == 'restore':
             if not args.restore_file:
                 print("❌ Especifique o arquivo de backup com --restore-file")
                 sys.exit(1)
             
-            success = backup_system.restore_backup(args.restore_file, args.restore_path)
-            if not success:
+            if args.member:
+                backup_system.stream_member(args.restore_file, args.member, member_output)
+                member_output.flush()
+            elif args.load_database:
+                if not backup_system.restore_database(args.restore_file):
+                    sys.exit(1)
+            else:
+                success = backup_system.restore_backup(args.restore_file, args.restore_path, args.include)
+                if not success:
+                    sys.exit(1)
+                
+        elif args.action == 'verify':
+            results = backup_system.verify_backups([args.verify_file] if args.verify_file else None)
+            if any(not r['ok'] for r in results):
                 sys.exit(1)
                 
         elif args.action == 'schedule':
@@ -887,8 +6054,18 @@ def main():
             print("Pressione Ctrl+C para parar")
             backup_system.start_scheduler()
             
+        elif args.action == 'scheduled-job':
+            # Executado pelo agendador em um subprocesso
+            result = backup_system.scheduled_backup_job()
+            if not result['success']:
+                sys.exit(1)
+            
         elif args.action == 'status':
             backup_system.print_status()
+        
+        # Envios que ainda estão em andamento (o último volume sai após a compressão)
+        if not backup_system.wait_uploads():
+            sys.exit(1)
             
     except KeyboardInterrupt:
         print("\n🛑 Operação interrompida pelo usuário")
@@ -13,64 +13,17 @@ import re
 import glob
 from datetime import datetime
 
+import glossaries
+
 class MixedLanguageFixer:
     def __init__(self, base_dir="duralux-admin"):
         self.base_dir = base_dir
         self.fixed_files = 0
         self.total_fixes = 0
         
-        # Correções de traduções mistas e incompletas
-        self.mixed_corrections = {
-            # Problemas específicos identificados
-            'Total of Leads': 'Total de Leads',
-            'TOTAL OF LEADS': 'TOTAL DE LEADS',
-            'Taxa of Conversão': 'Taxa de Conversão',
-            'TAXA OF CONVERSÃO': 'TAXA DE CONVERSÃO',
-            'Funil of Conversão': 'Funil de Conversão',
-            'FUNIL OF CONVERSÃO': 'FUNIL DE CONVERSÃO',
-            'Evolução of Leads': 'Evolução de Leads',
-            'EVOLUÇÃO OF LEADS': 'EVOLUÇÃO DE LEADS',
-            'Período of Análise': 'Período de Análise',
-            'PERÍODO OF ANÁLISE': 'PERÍODO DE ANÁLISE',
-            'Métricas of Performance': 'Métricas de Performance',
-            'MÉTRICAS OF PERFORMANCE': 'MÉTRICAS DE PERFORMANCE',
-            'Gráfico of ': 'Gráfico de ',
-            'GRÁFICO OF ': 'GRÁFICO DE ',
-            'barras of progresso': 'barras de progresso',
-            'BARRAS OF PROGRESSO': 'BARRAS DE PROGRESSO',
-            'Funcionalidaof of exportação': 'Funcionalidade de exportação',
-            'FUNCIONALIDAOF OF EXPORTAÇÃO': 'FUNCIONALIDADE DE EXPORTAÇÃO',
-            ' of exportação in': ' de exportação em',
-            ' OF EXPORTAÇÃO IN': ' DE EXPORTAÇÃO EM',
-            
-            # Outros padrões comuns
-            ' of ': ' de ',
-            ' OF ': ' DE ',
-            'of desenvolvimento': 'em desenvolvimento',
-            'OF DESENVOLVIMENTO': 'EM DESENVOLVIMENTO',
-            'in desenvolvimento': 'em desenvolvimento',
-            'IN DESENVOLVIMENTO': 'EM DESENVOLVIMENTO',
-            
-            # Correções de títulos
-            'Analytics Avançado': 'Analytics Avançados',
-            'ANALYTICS AVANÇADO': 'ANALYTICS AVANÇADOS',
-            'Analíticos Avançado': 'Analytics Avançados',
-            'ANALÍTICOS AVANÇADO': 'ANALYTICS AVANÇADOS',
-            
-            # Correções de CSS classes problemáticas
-            '--duralux-Sucesso': '--duralux-success',
-            '--duralux-Aviso': '--duralux-warning',
-            '.Analíticos-': '.analytics-',
-            '.ANALÍTICOS-': '.analytics-',
-            
-            # Outras correções
-            'Status dos Projetos': 'Status dos Projetos',
-            'STATUS DOS PROJETOS': 'STATUS DOS PROJETOS',
-            'CLIENTES ATIVOS': 'CLIENTES ATIVOS',
-            'PROJETOS ATIVOS': 'PROJETOS ATIVOS',
-            'RECEITA MENSAL': 'RECEITA MENSAL',
-            'TICKET MÉDIO': 'TICKET MÉDIO',
-        }
+        # Correções de traduções mistas e incompletas, aplicadas na ordem
+        # (glossaries/fix-mixed-language.json)
+        self.mixed_corrections = glossaries.load('fix-mixed-language').entries
 
     def fix_file(self, file_path):
         """Corrige traduções mistas em um arquivo específico"""
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+DURALUX CRM - Glossários de Tradução Compartilhados
+Os dicionários dos scripts de tradução ficam em arquivos JSON neste pacote,
+carregados uma única vez por processo, com índice em minúsculas para busca
+O(1) e matchers compilados uma única vez. Conflitos (mesmo termo com traduções
+diferentes) são detectados dentro de cada glossário e, com merge, entre os
+glossários dos diferentes scripts
+
+Uso:
+    import glossaries
+    glossary = glossaries.load('translate-batch')
+    glossary.lookup('save task')           # 'Salvar Tarefa'
+    matcher = glossary.matcher()           # regex única (trie) de todos os termos
+    merged = glossaries.merge()            # união de todos, conflitos em merged.conflicts
+
+    python glossaries                      # resumo e conflitos entre glossários
+    python glossaries --strict             # código 1 se houver conflitos
+"""
+
+import re
+import json
+import hashlib
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+GLOSSARY_DIR = Path(__file__).parent
+
+
+class GlossaryConflict(ValueError):
+    """Mesmo termo com traduções diferentes em um merge estrito"""
+
+
+class Glossary:
+    """
+    Glossário ordenado (inglês → português) montado a partir de categorias
+
+    Categorias posteriores sobrescrevem termos repetidos, como o dict.update
+    que os scripts usavam; cada sobrescrita com tradução diferente fica
+    registrada em conflicts.
+    """
+
+    def __init__(self, name: str, categories: Dict[str, Dict[str, str]], description: str = ''):
+        self.name = name
+        self.description = description
+        self.categories = categories
+        self.entries = {}
+        self.sources = {}
+        self.conflicts = []
+
+        for category, terms in categories.items():
+            for english, portuguese in terms.items():
+                if english in self.entries and self.entries[english] != portuguese:
+                    self.conflicts.append({
+                        'term': english,
+                        'previous': self.entries[english],
+                        'previous_source': self.sources[english],
+                        'translation': portuguese,
+                        'source': category
+                    })
+                self.entries[english] = portuguese
+                self.sources[english] = category
+
+        # Índice em minúsculas: o primeiro termo na ordem do glossário vence
+        self.index = {}
+        for english, portuguese in self.entries.items():
+            self.index.setdefault(english.lower(), portuguese)
+
+        self.digest = glossary_digest(self.entries)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, english):
+        return english in self.entries
+
+    def items(self):
+        return self.entries.items()
+
+    def lookup(self, text: str, default: Optional[str] = None) -> Optional[str]:
+        """Tradução exata ou, na falta dela, sem diferenciar maiúsculas"""
+        translation = self.entries.get(text)
+        if translation is not None:
+            return translation
+        return self.index.get(text.lower(), default)
+
+    def matcher(self, flags: int = re.IGNORECASE) -> re.Pattern:
+        """Regex única com todos os termos do glossário (ver compile_matcher)"""
+        return compile_matcher(self.entries, flags)
+
+
+def glossary_digest(entries: Dict[str, str]) -> str:
+    """Hash do conteúdo do glossário (termos, traduções e ordem)"""
+    payload = json.dumps(list(entries.items()), ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def trie_pattern(phrases: Iterable[str]) -> str:
+    """
+    Regex com as frases em forma de trie (prefixos comuns compartilhados)
+
+    Em cada nó as continuações vêm antes do fim da frase, então a alternativa
+    mais longa é tentada primeiro e o backtracking cai para a mais curta.
+    """
+    trie = {}
+    for phrase in phrases:
+        node = trie
+        for char in phrase:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def build(node):
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        return '(?:' + body + ')?' if '' in node else body
+
+    return build(trie)
+
+
+_matchers = {}
+
+
+def compile_matcher(phrases: Iterable[str], flags: int = re.IGNORECASE) -> re.Pattern:
+    """
+    Compila as frases em uma regex de palavras inteiras, mais longa primeiro
+
+    Com re.IGNORECASE a trie é montada com as frases em minúsculas. A regex
+    compilada fica em memória pelo resto do processo, indexada pelas frases.
+    """
+    if flags & re.IGNORECASE:
+        phrases = {phrase.casefold(): None for phrase in phrases}
+    key = (tuple(sorted(set(phrases))), flags)
+    if key not in _matchers:
+        _matchers[key] = re.compile(r'\b(?:' + trie_pattern(key[0]) + r')\b', flags)
+    return _matchers[key]
+
+
+_glossaries = {}
+
+
+def load_all() -> Dict[str, Glossary]:
+    """Carrega todos os glossários do pacote (apenas na primeira chamada)"""
+    if not _glossaries:
+        for path in sorted(GLOSSARY_DIR.glob('*.json')):
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            _glossaries[path.stem] = Glossary(path.stem, data['categories'], data.get('description', ''))
+    return _glossaries
+
+
+def load(name: str) -> Glossary:
+    """Glossário pelo nome do arquivo (sem .json)"""
+    glossaries = load_all()
+    if name not in glossaries:
+        raise KeyError(f"Glossário não encontrado: {name} (disponíveis: {', '.join(glossaries)})")
+    return glossaries[name]
+
+
+def merge(names: Optional[List[str]] = None, strict: bool = False) -> Glossary:
+    """
+    Une glossários na ordem informada (padrão: todos)
+
+    Termos repetidos com traduções diferentes ficam em conflicts, com o
+    glossário posterior vencendo e a origem no formato 'glossário:categoria';
+    com strict=True geram GlossaryConflict.
+    """
+    names = names or list(load_all())
+    categories = {}
+    for name in names:
+        for category, terms in load(name).categories.items():
+            categories[f"{name}:{category}"] = terms
+
+    merged = Glossary('+'.join(names), categories)
+    if strict and merged.conflicts:
+        conflict = merged.conflicts[0]
+        raise GlossaryConflict(
+            f"'{conflict['term']}': '{conflict['previous']}' ({conflict['previous_source']}) "
+            f"x '{conflict['translation']}' ({conflict['source']}) "
+            f"e mais {len(merged.conflicts) - 1} conflito(s)"
+        )
+    return merged
+
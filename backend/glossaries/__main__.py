@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Resumo dos glossários e conflitos de tradução
+
+Uso:
+    python glossaries              # a partir de backend/
+    python glossaries --strict     # sai com código 1 se houver conflitos
+"""
+
+import sys
+import argparse
+from pathlib import Path
+
+# Executado como diretório: o pacote está um nível acima
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import glossaries
+
+
+def main(argv=None):
+    """Função principal - interface de linha de comando"""
+    parser = argparse.ArgumentParser(description="Glossários de tradução do Duralux CRM")
+    parser.add_argument('--strict', action='store_true',
+                        help='Falha se houver conflitos (no glossário ou entre glossários)')
+    args = parser.parse_args(argv)
+
+    print("📚 GLOSSÁRIOS DE TRADUÇÃO")
+    print("=" * 60)
+    for name, glossary in glossaries.load_all().items():
+        print(f"  {name}: {len(glossary)} termos em {len(glossary.categories)} categorias "
+              f"(hash {glossary.digest[:12]})")
+        for conflict in glossary.conflicts:
+            print(f"    ⚠️ '{conflict['term']}': '{conflict['previous']}' ({conflict['previous_source']}) "
+                  f"→ '{conflict['translation']}' ({conflict['source']})")
+
+    # A união inclui os conflitos de cada glossário e os entre glossários
+    merged = glossaries.merge()
+    print("-" * 60)
+    print(f"🔀 União: {len(merged)} termos, {len(merged.conflicts)} conflito(s)")
+    for conflict in merged.conflicts:
+        print(f"  ⚠️ '{conflict['term']}': '{conflict['previous']}' ({conflict['previous_source']}) "
+              f"→ '{conflict['translation']}' ({conflict['source']})")
+
+    if args.strict:
+        try:
+            glossaries.merge(strict=True)
+        except glossaries.GlossaryConflict as e:
+            print(f"❌ Conflito de tradução: {e}")
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
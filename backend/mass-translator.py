@@ -7,220 +7,237 @@ Traduz automaticamente textos em inglês para português em todas as páginas HT
 
 import os
 import re
+import sys
 import glob
 import json
 import shutil
-from collections import defaultdict, Counter
+import hashlib
+import importlib.util
+from pathlib import Path
+from collections import Counter
 from datetime import datetime
 
+
+def load_local_module(name, path):
+    """
+    Carrega um módulo ao lado deste script pelo caminho (run-translator.py
+    importa este arquivo a partir da raiz do projeto, fora do sys.path)
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.spec_from_file_location(name, Path(__file__).parent / path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+# Glossários e gravação/pool compartilhados com translate-and-notify.py
+glossaries = load_local_module("glossaries", Path("glossaries") / "__init__.py")
+translation_io = load_local_module("translation_io", "translation_io.py")
+
+# Tamanho máximo do contexto gravado no log de cada tradução
+CONTEXT_LENGTH = 100
+
+# Formato do manifesto da tradução incremental; mudanças no motor de tradução
+# (tokenizador, matcher) devem incrementá-lo para retraduzir todas as páginas
+MANIFEST_VERSION = 2
+
+# Atributos cujo valor é texto para o usuário (os demais nunca são traduzidos)
+TRANSLATABLE_ATTRIBUTES = {'title', 'alt', 'aria-label', 'placeholder'}
+
+# Tokens do HTML que não são texto: comentários, elementos de conteúdo bruto
+# (script, style, code, pre) inteiros, doctype/instruções e tags
+HTML_TOKEN_PATTERN = re.compile(r'''
+    <!--.*?(?:-->|\Z)
+  | <(script|style|code|pre)(?=[\s/>])[^>]*>.*?(?:</\1\s*>|\Z)
+  | <[!?][^>]*>?
+  | </?[a-zA-Z][^\s/>]*(?P<attributes>(?:"[^"]*"|'[^']*'|[^'">])*)>?
+''', re.IGNORECASE | re.DOTALL | re.VERBOSE)
+
+HTML_ATTRIBUTE_PATTERN = re.compile(r'''([^\s"'>/=]+)(?:\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'>]+)))?''')
+
+# Endereços dentro de textos ficam como estão
+URL_PATTERN = re.compile(r'''(?:https?://|www\.)[^\s<>"']+''', re.IGNORECASE)
+
+
+def html_text_spans(content):
+    """
+    Percorre o HTML uma única vez e gera os trechos traduzíveis (início, fim):
+    nós de texto e valores dos atributos de TRANSLATABLE_ATTRIBUTES
+    
+    Nomes de tags e de atributos, demais atributos, comentários, script,
+    style, code e pre nunca aparecem nos trechos.
+    """
+    position = 0
+    for token in HTML_TOKEN_PATTERN.finditer(content):
+        if token.start() > position:
+            yield from text_spans(content, position, token.start())
+        
+        if token.group('attributes'):
+            offset = token.start('attributes')
+            for attribute in HTML_ATTRIBUTE_PATTERN.finditer(token.group('attributes')):
+                if attribute.group(1).lower() not in TRANSLATABLE_ATTRIBUTES:
+                    continue
+                for group in (2, 3, 4):
+                    if attribute.group(group) is not None:
+                        yield offset + attribute.start(group), offset + attribute.end(group)
+                        break
+        
+        position = token.end()
+    
+    if position < len(content):
+        yield from text_spans(content, position, len(content))
+
+
+def text_spans(content, start, end):
+    """Trechos de um nó de texto, sem os endereços (URL_PATTERN)"""
+    for url in URL_PATTERN.finditer(content, start, end):
+        if url.start() > start:
+            yield start, url.start()
+        start = url.end()
+    if start < end:
+        yield start, end
+
+
+class TranslationManifest:
+    """
+    Manifesto da tradução incremental (translation_manifest.json)
+    
+    Por página guarda tamanho, mtime_ns e sha256 do conteúdo deixado pela
+    última execução, a versão do dicionário usada e o resumo do resultado.
+    Cada versão de dicionário ainda referenciada fica salva, para saber
+    quais termos mudaram desde a tradução de cada página.
+    """
+    
+    def __init__(self, manifest_file):
+        self.manifest_file = manifest_file
+        self.files = {}
+        self.dictionaries = {}
+        
+        try:
+            with open(manifest_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == MANIFEST_VERSION:
+                self.files = data['files']
+                self.dictionaries = data['dictionaries']
+        except (OSError, ValueError, KeyError):
+            pass  # Sem manifesto (ou de outra versão): todas as páginas são traduzidas
+    
+    def lookup(self, file_path):
+        """Registro da página se o conteúdo não mudou desde a última execução"""
+        record = self.files.get(os.path.basename(file_path))
+        if not record:
+            return None
+        
+        stat = os.stat(file_path)
+        if (stat.st_size, stat.st_mtime_ns) == (record['size'], record['mtime_ns']):
+            return record
+        
+        # Tocado mas talvez igual: confirma pelo conteúdo
+        if stat.st_size != record['size'] or file_sha256(file_path) != record['sha256']:
+            return None
+        record['mtime_ns'] = stat.st_mtime_ns
+        return record
+    
+    def changed_terms(self, dictionary_version, entries):
+        """
+        Termos novos ou com tradução diferente desde a versão informada
+        (None se a versão não estiver no manifesto)
+        """
+        previous = self.dictionaries.get(dictionary_version)
+        if previous is None:
+            return None
+        return [term for term, value in entries.items() if previous.get(term) != list(value)]
+    
+    def record(self, file_path, dictionary_version, entries, translations_count):
+        """Registra a página como traduzida com a versão atual do dicionário"""
+        stat = os.stat(file_path)
+        self.files[os.path.basename(file_path)] = {
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'sha256': file_sha256(file_path),
+            'dictionary_version': dictionary_version,
+            'translations_count': translations_count,
+            'translated_at': datetime.now().isoformat()
+        }
+        self.dictionaries.setdefault(dictionary_version, {term: list(value) for term, value in entries.items()})
+    
+    def save(self):
+        """Grava o manifesto, mantendo só os dicionários ainda referenciados"""
+        used = {record['dictionary_version'] for record in self.files.values()}
+        self.dictionaries = {version: terms for version, terms in self.dictionaries.items() if version in used}
+        translation_io.write_atomic(self.manifest_file, json.dumps({
+            'version': MANIFEST_VERSION,
+            'files': self.files,
+            'dictionaries': self.dictionaries
+        }, ensure_ascii=False, indent=2))
+
+
+def file_sha256(file_path):
+    """sha256 do conteúdo do arquivo"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
 class DuraluxTranslator:
     def __init__(self):
         self.html_dir = "duralux-admin"
         self.backup_dir = "backup_html"
         self.log_file = "translation_log.json"
+        self.manifest_file = "translation_manifest.json"
+        self.workers = os.cpu_count() or 1
         
-        # Dicionário de traduções por categoria
-        self.translations = {
-            # Interface/UI - Botões e Ações
-            "ui_actions": {
-                "Save": "Salvar",
-                "Cancel": "Cancelar", 
-                "Edit": "Editar",
-                "Delete": "Excluir",
-                "Create": "Criar",
-                "Add": "Adicionar",
-                "Remove": "Remover",
-                "Update": "Atualizar",
-                "Submit": "Enviar",
-                "Search": "Buscar",
-                "Filter": "Filtrar",
-                "Sort": "Ordenar",
-                "Select": "Selecionar",
-                "Choose": "Escolher",
-                "View": "Visualizar",
-                "Show": "Mostrar",
-                "Hide": "Ocultar",
-                "Download": "Baixar",
-                "Upload": "Carregar",
-                "Import": "Importar",
-                "Export": "Exportar",
-                "Print": "Imprimir",
-                "Share": "Compartilhar",
-                "Copy": "Copiar",
-                "Cut": "Recortar",
-                "Paste": "Colar"
-            },
-            
-            # Navegação e Interface
-            "navigation": {
-                "Home": "Início",
-                "Dashboard": "Painel",
-                "Overview": "Visão Geral",
-                "Analytics": "Analíticos",
-                "Reports": "Relatórios",
-                "Settings": "Configurações",
-                "Profile": "Perfil",
-                "Account": "Conta",
-                "Help": "Ajuda",
-                "Support": "Suporte",
-                "Contact": "Contato",
-                "About": "Sobre",
-                "Next": "Próximo",
-                "Previous": "Anterior",
-                "First": "Primeiro",
-                "Last": "Último",
-                "Page": "Página",
-                "All": "Todos",
-                "None": "Nenhum"
-            },
-            
-            # Status e Estados
-            "status": {
-                "Active": "Ativo",
-                "Inactive": "Inativo",
-                "Pending": "Pendente",
-                "Completed": "Concluído",
-                "In Progress": "Em Andamento",
-                "Draft": "Rascunho",
-                "Published": "Publicado",
-                "Archived": "Arquivado",
-                "New": "Novo",
-                "Updated": "Atualizado",
-                "Success": "Sucesso",
-                "Error": "Erro",
-                "Warning": "Aviso",
-                "Info": "Informação",
-                "Loading": "Carregando",
-                "Processing": "Processando"
-            },
-            
-            # Dados e Campos
-            "data_fields": {
-                "Name": "Nome",
-                "Description": "Descrição", 
-                "Title": "Título",
-                "Email": "E-mail",
-                "Phone": "Telefone",
-                "Address": "Endereço",
-                "Date": "Data",
-                "Time": "Hora",
-                "Status": "Status",
-                "Actions": "Ações",
-                "Details": "Detalhes",
-                "Total": "Total",
-                "Count": "Quantidade",
-                "Amount": "Valor",
-                "Price": "Preço",
-                "Category": "Categoria",
-                "Type": "Tipo",
-                "Priority": "Prioridade"
-            },
-            
-            # Módulos do Sistema
-            "modules": {
-                "Users": "Usuários",
-                "Customers": "Clientes", 
-                "Projects": "Projetos",
-                "Tasks": "Tarefas",
-                "Leads": "Leads",
-                "Sales": "Vendas",
-                "Marketing": "Marketing",
-                "Campaign": "Campanha",
-                "Revenue": "Receita",
-                "Finance": "Financeiro",
-                "Invoice": "Fatura",
-                "Proposal": "Proposta"
-            },
-            
-            # Tempo e Datas
-            "datetime": {
-                "Today": "Hoje",
-                "Yesterday": "Ontem", 
-                "Tomorrow": "Amanhã",
-                "Week": "Semana",
-                "Month": "Mês",
-                "Year": "Ano",
-                "Minutes": "minutos",
-                "Hours": "horas",
-                "Days": "dias",
-                "Weeks": "semanas",
-                "Months": "meses",
-                "Years": "anos"
-            },
-            
-            # Autenticação
-            "auth": {
-                "Login": "Entrar",
-                "Logout": "Sair",
-                "Register": "Cadastrar",
-                "Password": "Senha",
-                "Username": "Usuário",
-                "Remember Me": "Lembrar de mim",
-                "Forgot Password": "Esqueci a senha",
-                "Reset Password": "Redefinir senha"
-            },
-            
-            # Mensagens e Notificações
-            "messages": {
-                "Welcome": "Bem-vindo",
-                "Hello": "Olá",
-                "Good morning": "Bom dia",
-                "Good afternoon": "Boa tarde", 
-                "Good evening": "Boa noite",
-                "Thank you": "Obrigado",
-                "Please wait": "Aguarde",
-                "Try again": "Tente novamente",
-                "Learn more": "Saiba mais",
-                "Read more": "Leia mais",
-                "Contact us": "Entre em contato",
-                "Need help": "Precisa de ajuda"
-            }
-        }
+        # Dicionário de traduções por categoria (glossaries/mass-translator.json)
+        glossary = glossaries.load('mass-translator')
+        self.translations = glossary.categories
         
-        # Criar dicionário unificado para busca rápida
-        self.all_translations = {}
-        for category, translations in self.translations.items():
-            self.all_translations.update(translations)
-        
-        # Padrões especiais que precisam de cuidado
-        self.special_patterns = {
-            # Frases comuns
-            r'\bfrom last week\b': 'da semana passada',
-            r'\bfrom last month\b': 'do mês passado',
-            r'\bView all\b': 'Ver todos',
-            r'\bSelect all\b': 'Selecionar todos',
-            r'\bItems per page\b': 'Itens por página',
-            r'\bNo results found\b': 'Nenhum resultado encontrado',
-            r'\bSearch results\b': 'Resultados da busca',
-            r'\bLoad more\b': 'Carregar mais',
-            r'\bShow more\b': 'Mostrar mais',
-            r'\bLess\b': 'Menos',
-            r'\bMore\b': 'Mais',
-            
-            # Títulos e cabeçalhos comuns
-            r'\bStore Overview\b': 'Visão Geral da Loja',
-            r'\bSales Overview\b': 'Visão Geral de Vendas',
-            r'\bUser Management\b': 'Gerenciamento de Usuários',
-            r'\bCustomer Management\b': 'Gerenciamento de Clientes',
-            r'\bProject Management\b': 'Gerenciamento de Projetos',
-            r'\bTask Management\b': 'Gerenciamento de Tarefas',
-            
-            # Formulários
-            r'\bRequired field\b': 'Campo obrigatório',
-            r'\bOptional\b': 'Opcional',
-            r'\bPlease select\b': 'Por favor selecione',
-            r'\bChoose file\b': 'Escolher arquivo',
-            r'\bBrowse\b': 'Navegar',
-            
-            # Ações específicas
-            r'\bMark as read\b': 'Marcar como lido',
-            r'\bMark as unread\b': 'Marcar como não lido',
-            r'\bReply\b': 'Responder',
-            r'\bForward\b': 'Encaminhar',
-            r'\bArchive\b': 'Arquivar',
-            r'\bRestore\b': 'Restaurar'
-        }
+        # Dicionário unificado para busca rápida
+        self.all_translations = glossary.entries
+        
+        # Frases especiais: aplicadas como estão (sem ajuste de maiúsculas) e
+        # com prioridade sobre as palavras individuais
+        self.special_patterns = glossaries.load('mass-translator-phrases').entries
+        
+        # Matcher único para frases e palavras (ver build_matcher)
+        self.matcher, self.entries = self.build_matcher()
+        self.dictionary_version = glossaries.glossary_digest(self.entries)
+        
+        # Tradução incremental (ver needs_translation)
+        self.manifest = TranslationManifest(self.manifest_file)
         
+    def build_matcher(self):
+        """
+        Compila frases especiais e palavras em uma única regex (trie)
+        
+        Cada trecho de texto é varrido uma vez, com a ocorrência mais longa
+        primeiro em cada posição; o índice em minúsculas leva do texto
+        encontrado à tradução (frases especiais têm prioridade sobre as
+        palavras). A regex compilada fica em memória no pacote glossaries.
+        
+        Returns:
+            tuple: (regex compilada, {frase em minúsculas: (tradução, ajusta_maiúsculas)})
+        """
+        rules = [(english, portuguese, False) for english, portuguese in self.special_patterns.items()]
+        rules += [(english, portuguese, True) for english, portuguese in self.all_translations.items()]
+        
+        entries = {}
+        for english, portuguese, adjust_case in rules:
+            entries.setdefault(english.casefold(), (portuguese, adjust_case))
+        
+        return glossaries.compile_matcher(entries), entries
+    
+    def match_case(self, original, translation):
+        """Preserva a capitalização da palavra original"""
+        if original.isupper():
+            return translation.upper()
+        if original[0].isupper():
+            return translation.capitalize()
+        return translation
+    
     def create_backup(self):
         """Cria backup das páginas HTML antes da tradução"""
         if not os.path.exists(self.html_dir):
@@ -240,102 +257,63 @@ class DuraluxTranslator:
             print(f"❌ Erro ao criar backup: {e}")
             return False
     
-    def is_safe_to_translate(self, context_line, word):
-        """Verifica se é seguro traduzir uma palavra baseado no contexto"""
-        
-        # Não traduzir dentro de:
-        unsafe_contexts = [
-            'href=', 'src=', 'id=', 'class=', 'data-', 'onclick=', 'onchange=',
-            'console.', 'function(', 'var ', 'let ', 'const ', 'return ',
-            '<!--', '-->', '<script', '</script>', '<style', '</style>',
-            'javascript:', 'getElementById', 'querySelector', 'addEventListener',
-            '.css', '.js', '.json', '.php', '.html', 'http://', 'https://',
-            'placeholder=', 'value=', 'name=', 'type=', 'method=', 'action='
-        ]
-        
-        context_lower = context_line.lower()
-        
-        # Verificar se está em contexto inseguro
-        for unsafe in unsafe_contexts:
-            if unsafe in context_lower:
-                return False
-        
-        # Verificar se está dentro de tags de código
-        if '<code>' in context_lower or '<pre>' in context_lower:
-            return False
-            
-        # Verificar se está em URL ou caminho
-        if '/' in context_line and ('http' in context_lower or '.com' in context_lower):
-            return False
-            
-        return True
+    def translate_content(self, content):
+        """
+        Traduz o conteúdo HTML em uma única passada linear
+        
+        Só os trechos de html_text_spans são vistos pelo matcher, então tags,
+        atributos, scripts e estilos nunca são alterados.
+        
+        Returns:
+            tuple: (conteúdo traduzido, lista de traduções feitas)
+        """
+        pieces = []
+        translations_made = []
+        last = 0
+        
+        for span_start, span_end in html_text_spans(content):
+            context = None
+            for match in self.matcher.finditer(content, span_start, span_end):
+                original = match.group()
+                entry = self.entries.get(original.casefold())
+                if entry is None:
+                    # Casamento só pelo IGNORECASE do re (ex.: 'ı' casa com 'i'): não é o termo
+                    continue
+                translation, adjust_case = entry
+                if adjust_case:
+                    translation = self.match_case(original, translation)
+                
+                pieces.append(content[last:match.start()])
+                pieces.append(translation)
+                last = match.end()
+                
+                if context is None:
+                    context = self.span_context(content, span_start, span_end)
+                translations_made.append({
+                    'original': original,
+                    'translation': translation,
+                    'context': context
+                })
+        
+        pieces.append(content[last:])
+        return ''.join(pieces), translations_made
+    
+    def span_context(self, content, start, end):
+        """Texto do trecho (sem espaços nas pontas), limitado a CONTEXT_LENGTH"""
+        text = content[start:end].strip()
+        return text[:CONTEXT_LENGTH] + '...' if len(text) > CONTEXT_LENGTH else text
     
     def translate_file(self, file_path):
         """Traduz um arquivo HTML específico"""
         try:
             with open(file_path, 'r', encoding='utf-8') as f:
                 content = f.read()
-                
-            original_content = content
-            translations_made = []
             
-            # 1. Aplicar padrões especiais primeiro
-            for pattern, translation in self.special_patterns.items():
-                matches = list(re.finditer(pattern, content, re.IGNORECASE))
-                for match in matches:
-                    # Verificar contexto
-                    line_start = content.rfind('\n', 0, match.start()) + 1
-                    line_end = content.find('\n', match.end())
-                    if line_end == -1:
-                        line_end = len(content)
-                    
-                    context_line = content[line_start:line_end]
-                    
-                    if self.is_safe_to_translate(context_line, match.group()):
-                        content = content[:match.start()] + translation + content[match.end():]
-                        translations_made.append({
-                            'original': match.group(),
-                            'translation': translation,
-                            'context': context_line.strip()[:100] + '...' if len(context_line.strip()) > 100 else context_line.strip()
-                        })
-            
-            # 2. Aplicar traduções de palavras individuais
-            for english, portuguese in self.all_translations.items():
-                # Criar padrão para palavra completa
-                pattern = r'\b' + re.escape(english) + r'\b'
-                matches = list(re.finditer(pattern, content, re.IGNORECASE))
-                
-                for match in reversed(matches):  # Reverso para não afetar posições
-                    # Obter contexto da linha
-                    line_start = content.rfind('\n', 0, match.start()) + 1
-                    line_end = content.find('\n', match.end())
-                    if line_end == -1:
-                        line_end = len(content)
-                    
-                    context_line = content[line_start:line_end]
-                    
-                    if self.is_safe_to_translate(context_line, match.group()):
-                        # Preservar capitalização original
-                        original_word = match.group()
-                        translated_word = portuguese
-                        
-                        # Se original está em maiúscula, manter maiúscula
-                        if original_word.isupper():
-                            translated_word = translated_word.upper()
-                        elif original_word[0].isupper():
-                            translated_word = translated_word.capitalize()
-                            
-                        content = content[:match.start()] + translated_word + content[match.end():]
-                        translations_made.append({
-                            'original': original_word,
-                            'translation': translated_word,
-                            'context': context_line.strip()[:100] + '...' if len(context_line.strip()) > 100 else context_line.strip()
-                        })
+            translated, translations_made = self.translate_content(content)
             
             # Salvar apenas se houve mudanças
-            if content != original_content:
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    f.write(content)
+            if translated != content:
+                translation_io.write_atomic(file_path, translated)
                 
                 return {
                     'file': os.path.basename(file_path),
@@ -353,16 +331,61 @@ class DuraluxTranslator:
             print(f"❌ Erro ao traduzir {file_path}: {e}")
             return None
     
-    def translate_all_files(self, file_limit=None):
-        """Traduz todos os arquivos HTML"""
-        if not os.path.exists(self.html_dir):
-            print(f"❌ Diretório {self.html_dir} não encontrado!")
+    def needs_translation(self, file_path):
+        """
+        Verifica se a página precisa ser (re)traduzida
+        
+        Páginas sem alteração desde a última execução são puladas. Se só o
+        dicionário mudou, a página é retraduzida apenas quando algum termo novo
+        ou alterado aparece nos seus trechos traduzíveis.
+        """
+        record = self.manifest.lookup(file_path)
+        if record is None:
+            return True
+        if record['dictionary_version'] == self.dictionary_version:
+            return False
+        
+        changed = self.manifest.changed_terms(record['dictionary_version'], self.entries)
+        if changed is None:
+            return True
+        if changed:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                content = f.read()
+            matcher = glossaries.compile_matcher(changed)
+            if any(matcher.search(content, start, end) for start, end in html_text_spans(content)):
+                return True
+        
+        # Nenhum termo novo aparece na página: vale como traduzida com a versão atual
+        self.manifest.record(file_path, self.dictionary_version, self.entries, record['translations_count'])
+        return False
+    
+    def record_translation(self, file_path, result):
+        """Registra no manifesto a página traduzida"""
+        self.manifest.record(file_path, self.dictionary_version, self.entries, result['translations_count'])
+    
+    def translate_files(self, html_files, workers):
+        """Resultados de translate_file na ordem da lista, em série ou em um pool de processos"""
+        workers = min(workers, len(html_files))
+        if workers <= 1:
+            yield from map(self.translate_file, html_files)
             return
         
-        # Criar backup
-        backup_path = self.create_backup()
-        if not backup_path:
-            print("❌ Falha ao criar backup. Abortando tradução.")
+        print(f"⚙️ Tradução paralela: {workers} processos")
+        # Cada processo recebe este tradutor, com o matcher já compilado
+        yield from translation_io.pool_map('translate_file', html_files, workers, worker=self)
+    
+    def translate_all_files(self, file_limit=None, workers=None, force=False):
+        """
+        Traduz todos os arquivos HTML
+        
+        Páginas sem alteração de conteúdo nem de dicionário desde a última
+        execução são puladas (ver needs_translation); force=True traduz todas.
+        Com mais de um worker os arquivos são traduzidos em um pool de
+        processos; os resultados voltam na ordem da lista, então o log é o
+        mesmo de uma execução serial.
+        """
+        if not os.path.exists(self.html_dir):
+            print(f"❌ Diretório {self.html_dir} não encontrado!")
             return
         
         # Buscar arquivos HTML
@@ -371,17 +394,33 @@ class DuraluxTranslator:
         if file_limit:
             html_files = html_files[:file_limit]
         
-        print(f"🔄 Iniciando tradução de {len(html_files)} arquivos HTML...")
+        pending = [html_file for html_file in html_files if force or self.needs_translation(html_file)]
+        skipped = len(html_files) - len(pending)
+        if skipped:
+            print(f"⏭️ {skipped} arquivo(s) sem alterações desde a última tradução")
+        if not pending:
+            self.manifest.save()
+            print("✅ Nada a traduzir: páginas e dicionário inalterados")
+            return []
+        
+        # Criar backup
+        backup_path = self.create_backup()
+        if not backup_path:
+            print("❌ Falha ao criar backup. Abortando tradução.")
+            return
+        
+        print(f"🔄 Iniciando tradução de {len(pending)} arquivos HTML...")
         print("=" * 60)
         
         results = []
         total_translations = 0
         
-        for i, html_file in enumerate(html_files, 1):
-            print(f"📄 [{i:3d}/{len(html_files)}] Traduzindo: {os.path.basename(html_file)}")
+        file_results = self.translate_files(pending, workers or self.workers)
+        for i, (html_file, result) in enumerate(zip(pending, file_results), 1):
+            print(f"📄 [{i:3d}/{len(pending)}] Traduzindo: {os.path.basename(html_file)}")
             
-            result = self.translate_file(html_file)
             if result:
+                self.record_translation(html_file, result)
                 results.append(result)
                 total_translations += result['translations_count']
                 
@@ -390,11 +429,14 @@ class DuraluxTranslator:
                 else:
                     print(f"    ℹ️  Nenhuma tradução necessária")
         
+        self.manifest.save()
+        
         # Salvar log detalhado
         log_data = {
             'timestamp': datetime.now().isoformat(),
             'backup_path': backup_path,
             'total_files': len(html_files),
+            'skipped_files': skipped,
             'total_translations': total_translations,
             'results': results
         }
@@ -405,7 +447,7 @@ class DuraluxTranslator:
         # Resumo final
         print("=" * 60)
         print("🎉 TRADUÇÃO CONCLUÍDA!")
-        print(f"📊 Arquivos processados: {len(html_files)}")
+        print(f"📊 Arquivos processados: {len(pending)} (pulados: {skipped})")
         print(f"🔧 Total de traduções: {total_translations}")
         print(f"📁 Backup salvo em: {backup_path}")
         print(f"📋 Log detalhado: {self.log_file}")
@@ -431,52 +473,22 @@ class DuraluxTranslator:
             print("-" * 50)
             
             preview_count = 0
+            examples = Counter()
             
-            # Preview de padrões especiais
-            for pattern, translation in self.special_patterns.items():
-                matches = list(re.finditer(pattern, content, re.IGNORECASE))
-                for match in matches:
-                    if preview_count >= max_preview:
-                        break
-                        
-                    line_start = content.rfind('\n', 0, match.start()) + 1
-                    line_end = content.find('\n', match.end())
-                    if line_end == -1:
-                        line_end = len(content)
-                    
-                    context_line = content[line_start:line_end].strip()
-                    
-                    if self.is_safe_to_translate(context_line, match.group()):
-                        print(f"  '{match.group()}' → '{translation}'")
-                        print(f"    Contexto: {context_line[:80]}...")
-                        preview_count += 1
-                
-                if preview_count >= max_preview:
-                    break
-            
-            # Preview de palavras individuais
-            for english, portuguese in list(self.all_translations.items())[:20]:  # Limitar para não poluir
+            # Mesma passada da tradução, com no máximo 2 exemplos por termo
+            _, translations = self.translate_content(content)
+            for item in translations:
                 if preview_count >= max_preview:
                     break
-                    
-                pattern = r'\b' + re.escape(english) + r'\b'
-                matches = list(re.finditer(pattern, content, re.IGNORECASE))
                 
-                for match in matches[:2]:  # Max 2 exemplos por palavra
-                    if preview_count >= max_preview:
-                        break
-                        
-                    line_start = content.rfind('\n', 0, match.start()) + 1
-                    line_end = content.find('\n', match.end())
-                    if line_end == -1:
-                        line_end = len(content)
-                    
-                    context_line = content[line_start:line_end].strip()
-                    
-                    if self.is_safe_to_translate(context_line, match.group()):
-                        print(f"  '{match.group()}' → '{portuguese}'")
-                        print(f"    Contexto: {context_line[:80]}...")
-                        preview_count += 1
+                key = item['original'].casefold()
+                if examples[key] >= 2:
+                    continue
+                
+                print(f"  '{item['original']}' → '{item['translation']}'")
+                print(f"    Contexto: {item['context'][:80]}...")
+                examples[key] += 1
+                preview_count += 1
             
             if preview_count == 0:
                 print("  ✅ Nenhuma tradução necessária encontrada")
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+DURALUX CRM - Fixtures dos testes do backend
+Os scripts têm hífen no nome (não são importáveis), então são carregados
+pelo caminho, como em benchmark-backup.py
+
+Uso:
+    pip install -r requirements-dev.txt
+    python -m pytest -q tests
+"""
+
+import sys
+import json
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# O pacote glossaries fica ao lado dos scripts
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+
+def load_script(name: str, filename: str):
+    """Carrega um script do backend como módulo (uma vez por sessão)"""
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.spec_from_file_location(name, BACKEND_DIR / filename)
+    module = importlib.util.module_from_spec(spec)
+    # Registrado para que os workers dos pools encontrem as funções
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture(scope='session')
+def backup_module():
+    return load_script('duralux_backup_system', 'duralux-backup-system-v7.py')
+
+
+@pytest.fixture(scope='session')
+def translator_module():
+    return load_script('mass_translator', 'mass-translator.py')
+
+
+@pytest.fixture
+def project(tmp_path):
+    """Projeto mínimo com a árvore `site` a ser copiada"""
+    site = tmp_path / 'site'
+    (site / 'css').mkdir(parents=True)
+    (site / 'index.html').write_text('<h1>Duralux</h1>\n' * 50, encoding='utf-8')
+    (site / 'css' / 'app.css').write_text('body { margin: 0; }\n' * 50, encoding='utf-8')
+    (site / 'logo.bin').write_bytes(bytes(range(256)) * 16)
+    return tmp_path
+
+
+@pytest.fixture
+def make_system(backup_module, project):
+    """Cria um DuraluxBackupSystem isolado em project/backups"""
+    systems = []
+
+    def make(**overrides):
+        config = {
+            'backup_directory': str(project / 'backups'),
+            'include_directories': ['site'],
+            'exclude_patterns': [],
+            'store_patterns': [],
+            'sqlite_snapshots': {'databases': []},
+            'advanced_options': {
+                'verify_backups': False,
+                'create_checksums': True,
+                'parallel_compression': False,
+                'restore_workers': 1
+            }
+        }
+        config.update(overrides)
+        config_file = project / 'backup_config.json'
+        config_file.write_text(json.dumps(config), encoding='utf-8')
+
+        system = backup_module.DuraluxBackupSystem(str(config_file))
+        system.project_root = project
+        systems.append(system)
+        return system
+
+    yield make
+
+    for system in systems:
+        if system.chunk_store is not None:
+            system.chunk_store.close()
+        if system.history is not None:
+            system.history.close()
+
+
+def read_tree(root: Path) -> dict:
+    """Conteúdo de todos os arquivos sob root, por caminho relativo"""
+    return {path.relative_to(root).as_posix(): path.read_bytes()
+            for path in sorted(root.rglob('*')) if path.is_file()}
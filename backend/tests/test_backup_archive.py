@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Arquivo de backup: falha do dump do banco no meio da gravação"""
+
+
+def failing_dump(dest):
+    """mysqldump que cai depois de escrever parte do dump"""
+    dest.write(b"-- MySQL dump\nINSERT INTO clientes VALUES (1, 'Ana');\nINSERT INTO cli")
+    return False, "mysqldump terminou com código 2", 0, ''
+
+
+def split_options():
+    return {
+        'verify_backups': False,
+        'create_checksums': True,
+        'parallel_compression': False,
+        'split_large_backups': True,
+        'max_backup_size_mb': 0.001
+    }
+
+
+def test_failed_dump_discards_all_volumes(make_system, monkeypatch):
+    system = make_system(advanced_options=split_options())
+    monkeypatch.setattr(system, 'stream_database_dump', failing_dump)
+
+    result = system.perform_full_backup()
+
+    assert not result['success']
+    assert result['filename'] is None
+    assert 'mysqldump terminou com código 2' in result['error']
+    assert list(system.backup_dir.glob('duralux_backup_*.zip')) == []
+    assert list(system.manifest_dir.glob('duralux_backup_*.json')) == []
+    assert system.get_latest_manifest() is None
+
+
+def test_split_backup_keeps_all_volumes(make_system):
+    system = make_system(advanced_options=split_options())
+
+    result = system.perform_files_backup()
+
+    assert result['success']
+    assert result['stats']['volumes'] > 1
+    assert len(list(system.backup_dir.glob('duralux_backup_*.zip'))) == result['stats']['volumes']
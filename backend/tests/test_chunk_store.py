@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Chunk store: fatiamento por conteúdo e coleta de lixo"""
+
+import os
+import random
+import time
+
+import pytest
+
+from conftest import read_tree
+
+
+def sequential_lengths(module, data):
+    """Referência: cdc_cut_point chamado chunk a chunk"""
+    lengths, position = [], 0
+    while position < len(data):
+        cut = module.cdc_cut_point(data, position, len(data))
+        lengths.append(cut)
+        position += cut
+    return lengths
+
+
+@pytest.fixture
+def sample_data():
+    rng = random.Random(7)
+    return bytearray(rng.getrandbits(8 * 600_000).to_bytes(600_000, 'little')) + bytearray(b'x' * 150_000)
+
+
+@pytest.mark.parametrize('vectorized', [True, False])
+def test_chunk_lengths_match_rolling_hash(backup_module, sample_data, monkeypatch, vectorized):
+    if vectorized and backup_module.numpy is None:
+        pytest.skip('numpy não instalado')
+    if not vectorized:
+        monkeypatch.setattr(backup_module, 'numpy', None)
+
+    expected = sequential_lengths(backup_module, sample_data)
+    assert backup_module.cdc_chunk_lengths(sample_data, final=True) == expected
+
+    partial = backup_module.cdc_chunk_lengths(sample_data, final=False)
+    assert partial == expected[:len(partial)]
+    assert len(sample_data) - sum(partial) < backup_module.CDC_MAX_SIZE
+
+
+def test_writer_chunks_do_not_depend_on_write_size(backup_module, tmp_path, sample_data):
+    store = backup_module.ChunkStore(tmp_path / 'chunks')
+    try:
+        whole = store.writer()
+        whole.write(bytes(sample_data))
+        whole.close()
+
+        pieces = store.writer()
+        for offset in range(0, len(sample_data), 10_000):
+            pieces.write(bytes(sample_data[offset:offset + 10_000]))
+        pieces.close()
+
+        assert pieces.chunks == whole.chunks
+        assert b''.join(store.read_chunk(digest) for digest in whole.chunks) == bytes(sample_data)
+    finally:
+        store.close()
+
+
+def age(path, seconds):
+    old = time.time() - seconds
+    os.utime(path, (old, old))
+
+
+def test_garbage_collect_removes_deleted_snapshot_chunks(backup_module, tmp_path):
+    store = backup_module.ChunkStore(tmp_path / 'chunks')
+    try:
+        shared = store.put_chunk(b'compartilhado' * 100)
+        only_first = store.put_chunk(b'apenas no primeiro' * 100)
+        store.commit_snapshot('primeiro', 'files_only', '2026-01-01T00:00:00',
+                              [('a.txt', 1, 0, 'x', f"{shared} {only_first}")])
+        store.commit_snapshot('segundo', 'files_only', '2026-01-02T00:00:00',
+                              [('a.txt', 1, 0, 'x', shared)])
+
+        store.delete_snapshot('primeiro')
+        removed, _ = store.garbage_collect()
+
+        assert removed == 1
+        assert not store.object_path(only_first).exists()
+        assert store.read_chunk(shared) == b'compartilhado' * 100
+    finally:
+        store.close()
+
+
+def test_garbage_collect_sweeps_objects_of_failed_backups(backup_module, tmp_path):
+    store_dir = tmp_path / 'chunks'
+    store = backup_module.ChunkStore(store_dir)
+    recent = store.put_chunk(b'backup em andamento')
+    stale = store.put_chunk(b'backup que caiu antes do commit')
+    store.close()  # sem commit_snapshot: registros descartados, objetos ficam no disco
+
+    store = backup_module.ChunkStore(store_dir)
+    try:
+        assert store.conn.execute('SELECT COUNT(*) FROM chunks').fetchone()[0] == 0
+        age(store.object_path(stale), backup_module.CHUNK_ORPHAN_GRACE_SECONDS + 60)
+
+        removed, freed = store.garbage_collect()
+
+        assert removed == 1 and freed > 0
+        assert not store.object_path(stale).exists()
+        assert store.object_path(recent).exists()
+    finally:
+        store.close()
+
+
+def test_chunk_snapshot_backup_and_restore(make_system, project, tmp_path):
+    system = make_system(storage_backend='chunks')
+    first = system.perform_files_backup()
+    assert first['success']
+
+    (project / 'site' / 'novo.txt').write_text('conteúdo novo', encoding='utf-8')
+    second = system.perform_files_backup()
+    assert second['success']
+    assert second['stats']['reused_files'] == 3
+
+    restore_dir = tmp_path / 'restore'
+    assert system.restore_backup(second['filename'], str(restore_dir))
+    assert read_tree(restore_dir / 'site') == read_tree(project / 'site')
+
+
+def aggregate_report(store):
+    """Totais recalculados somando as tabelas (o que o ledger evita)"""
+    chunks, unique_bytes, stored_bytes = store.conn.execute(
+        'SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(stored_size), 0) FROM chunks').fetchone()
+    snapshots = store.conn.execute('SELECT COUNT(*) FROM snapshots').fetchone()[0]
+    logical_bytes = store.conn.execute('SELECT COALESCE(SUM(size), 0) FROM snapshot_files').fetchone()[0]
+    return {'snapshots': snapshots, 'chunks': chunks, 'logical_bytes': logical_bytes,
+            'unique_bytes': unique_bytes, 'stored_bytes': stored_bytes}
+
+
+def report_totals(store):
+    report = store.storage_report()
+    return {key: report[key] for key in ('snapshots', 'chunks', 'logical_bytes', 'unique_bytes', 'stored_bytes')}
+
+
+def test_storage_report_ledger_tracks_changes(backup_module, tmp_path):
+    store_dir = tmp_path / 'chunks'
+    store = backup_module.ChunkStore(store_dir)
+    try:
+        first = store.put_chunk(b'primeiro' * 500)
+        second = store.put_chunk(b'segundo' * 500)
+        store.commit_snapshot('a', 'files_only', '2026-01-01T00:00:00',
+                              [('x.txt', 4000, 0, 'x', first), ('y.txt', 3500, 0, 'y', second)])
+        store.commit_snapshot('b', 'files_only', '2026-01-02T00:00:00', [('x.txt', 4000, 0, 'x', first)])
+        assert report_totals(store) == aggregate_report(store)
+
+        store.delete_snapshot('a')
+        store.garbage_collect()
+        assert report_totals(store) == aggregate_report(store)
+        assert store.storage_report()['snapshots'] == 1
+
+        # Store criado antes do ledger: totais calculados uma vez ao abrir
+        with store.conn:
+            store.conn.execute('DROP TABLE store_totals')
+    finally:
+        store.close()
+
+    store = backup_module.ChunkStore(store_dir)
+    try:
+        assert report_totals(store) == aggregate_report(store)
+    finally:
+        store.close()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Criptografia AES-256-GCM em blocos: ida e volta, adulteração e backups cifrados"""
+
+import io
+import os
+import base64
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip('cryptography')
+
+from conftest import read_tree
+
+KEY = bytes(range(32))
+OTHER_KEY = bytes(range(1, 33))
+CHUNK = 16
+
+
+def encrypt(module, data: bytes, key: bytes = KEY) -> bytes:
+    out = io.BytesIO()
+    writer = module.EncryptingWriter(out, key, chunk_size=CHUNK)
+    # Escritas de tamanhos variados cruzando as fronteiras dos blocos
+    for offset in range(0, len(data), 7):
+        writer.write(data[offset:offset + 7])
+    writer.close()
+    return out.getvalue()
+
+
+@pytest.mark.parametrize('size', [0, 1, CHUNK - 1, CHUNK, CHUNK + 1, 3 * CHUNK, 5 * CHUNK + 3])
+def test_round_trip(backup_module, size):
+    data = os.urandom(size)
+    reader = backup_module.DecryptingReader(io.BytesIO(encrypt(backup_module, data)), KEY)
+    assert reader.read() == data
+    assert reader.size == size
+
+
+def test_random_access_reads(backup_module):
+    data = bytes(range(256)) * 3
+    reader = backup_module.DecryptingReader(io.BytesIO(encrypt(backup_module, data)), KEY)
+    for offset, length in [(0, 5), (15, 2), (100, 50), (len(data) - 3, 10), (len(data), 4)]:
+        reader.seek(offset)
+        assert reader.read(length) == data[offset:offset + length]
+    reader.seek(-4, io.SEEK_END)
+    assert reader.read() == data[-4:]
+
+
+def test_tampered_block_is_rejected(backup_module):
+    encrypted = bytearray(encrypt(backup_module, os.urandom(4 * CHUNK)))
+    encrypted[backup_module.ENCRYPTION_HEADER_SIZE + CHUNK + 20] ^= 0x01
+    reader = backup_module.DecryptingReader(io.BytesIO(bytes(encrypted)), KEY)
+    with pytest.raises(ValueError, match='não autenticado'):
+        reader.read()
+
+
+def test_truncated_file_is_rejected(backup_module):
+    encrypted = encrypt(backup_module, os.urandom(4 * CHUNK))
+    # Remove o último bloco inteiro: o penúltimo não tem a marca de final
+    truncated = encrypted[:-(CHUNK + backup_module.ENCRYPTION_TAG_SIZE)]
+    reader = backup_module.DecryptingReader(io.BytesIO(truncated), KEY)
+    with pytest.raises(ValueError):
+        reader.read()
+
+
+def test_wrong_key_is_rejected(backup_module):
+    encrypted = encrypt(backup_module, b'dados do cliente')
+    with pytest.raises(ValueError, match='Chave de criptografia diferente'):
+        backup_module.DecryptingReader(io.BytesIO(encrypted), OTHER_KEY)
+
+
+def test_decode_encryption_key_formats(backup_module):
+    assert backup_module.decode_encryption_key(KEY.hex()) == KEY
+    assert backup_module.decode_encryption_key(base64.urlsafe_b64encode(KEY).decode()) == KEY
+    with pytest.raises(ValueError):
+        backup_module.decode_encryption_key(base64.urlsafe_b64encode(b'curta').decode())
+
+
+def encrypted_options():
+    return {'enabled': True, 'env_file': 'sem-arquivo.env', 'key_variable': 'DURALUX_TEST_KEY'}
+
+
+def test_encrypted_backup_restores(backup_module, make_system, project, tmp_path, monkeypatch):
+    monkeypatch.setenv('DURALUX_TEST_KEY', KEY.hex())
+    system = make_system(encryption=encrypted_options())
+    result = system.perform_files_backup()
+    assert result['success']
+
+    archive = Path(result['filename'])
+    assert backup_module.is_encrypted_file(archive)
+    assert b'<h1>Duralux</h1>' not in archive.read_bytes()
+
+    restore_dir = tmp_path / 'restore'
+    assert system.restore_backup(result['filename'], str(restore_dir))
+    assert read_tree(restore_dir / 'site') == read_tree(project / 'site')
+
+
+def test_encrypted_backup_needs_the_same_key(make_system, tmp_path, monkeypatch):
+    monkeypatch.setenv('DURALUX_TEST_KEY', KEY.hex())
+    result = make_system(encryption=encrypted_options()).perform_files_backup()
+    assert result['success']
+
+    monkeypatch.setenv('DURALUX_TEST_KEY', OTHER_KEY.hex())
+    other = make_system(encryption=encrypted_options())
+    assert not other.restore_backup(result['filename'], str(tmp_path / 'restore'))
+
+
+def test_encryption_without_key_refuses_to_start(make_system, monkeypatch):
+    monkeypatch.delenv('DURALUX_TEST_KEY', raising=False)
+    with pytest.raises(RuntimeError, match='DURALUX_TEST_KEY'):
+        make_system(encryption=encrypted_options())
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Pacote glossaries: união dos glossários e conflitos entre scripts"""
+
+import pytest
+
+import glossaries
+
+
+@pytest.fixture
+def fake_glossaries(monkeypatch):
+    """Dois glossários de teste ao lado dos do pacote"""
+    loaded = glossaries.load_all()
+    monkeypatch.setitem(loaded, 'first', glossaries.Glossary('first', {
+        'ui': {'Save': 'Salvar', 'Upload': 'Carregar'}
+    }))
+    monkeypatch.setitem(loaded, 'second', glossaries.Glossary('second', {
+        'ui': {'Save': 'Salvar', 'Upload': 'Enviar', 'Delete': 'Excluir'}
+    }))
+
+
+def test_merge_reports_conflicts_between_glossaries(fake_glossaries):
+    merged = glossaries.merge(['first', 'second'])
+
+    assert merged.entries == {'Save': 'Salvar', 'Upload': 'Enviar', 'Delete': 'Excluir'}
+    assert merged.conflicts == [{
+        'term': 'Upload',
+        'previous': 'Carregar',
+        'previous_source': 'first:ui',
+        'translation': 'Enviar',
+        'source': 'second:ui'
+    }]
+
+
+def test_strict_merge_raises(fake_glossaries):
+    with pytest.raises(glossaries.GlossaryConflict, match="'Upload'"):
+        glossaries.merge(['first', 'second'], strict=True)
+    assert len(glossaries.merge(['first'], strict=True)) == 2
+
+
+def test_cli_strict_fails_on_conflicts_between_scripts(capsys):
+    from glossaries.__main__ import main
+
+    assert glossaries.merge(['mass-translator', 'translate-and-notify']).conflicts
+    assert main([]) == 0
+    assert main(['--strict']) == 1
+    assert 'Conflito de tradução' in capsys.readouterr().out
+
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tokenizador do HTML: quais trechos da página podem ser traduzidos"""
+
+import pytest
+
+
+@pytest.fixture
+def spans(translator_module):
+    def texts(content):
+        return [content[start:end] for start, end in translator_module.html_text_spans(content)]
+    return texts
+
+
+def test_text_nodes_between_tags(spans):
+    assert spans('<div class="card"><h1>Settings</h1> <p>Save</p></div>') == ['Settings', ' ', 'Save']
+
+
+@pytest.mark.parametrize('tag', ['script', 'style', 'code', 'pre', 'SCRIPT'])
+def test_raw_content_elements_are_skipped(spans, tag):
+    content = f'<{tag} type="text/plain">Save</{tag}><p>Cancel</p>'
+    assert spans(content) == ['Cancel']
+
+
+def test_unclosed_raw_element_runs_to_the_end(spans):
+    assert spans('<p>Save</p><script>var label = "Cancel";') == ['Save']
+
+
+def test_custom_elements_with_raw_element_prefix(spans):
+    content = '<pre-loader></pre-loader><h1>Settings</h1><code-block>Save</code-block>'
+    assert spans(content) == ['Settings', 'Save']
+
+
+def test_comments_and_doctype_are_skipped(spans):
+    assert spans('<!DOCTYPE html><!-- Save --><p>Cancel</p>') == ['Cancel']
+
+
+def test_only_translatable_attributes(spans):
+    content = ('<input type="text" name="Search" placeholder="Search" '
+               "title='Filter' data-label=Save aria-label=Close>")
+    assert spans(content) == ['Search', 'Filter', 'Close']
+
+
+def test_attribute_values_with_angle_brackets(spans):
+    assert spans('<a title="Next >" href="/next">Next</a>') == ['Next >', 'Next']
+
+
+def test_urls_in_text_are_excluded(spans):
+    content = '<p>See https://duralux.com/settings or www.duralux.com for Settings</p>'
+    assert spans(content) == ['See ', ' or ', ' for Settings']
+
+
+def test_tag_names_are_not_translated(translator_module, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    translator = translator_module.DuraluxTranslator()
+    content = '<pre-loader></pre-loader><h1 title="Settings">Settings</h1><button>Save</button>'
+    translated, made = translator.translate_content(content)
+    assert translated.startswith('<pre-loader></pre-loader><h1 title="')
+    assert '<button>' in translated and '</button>' in translated
+    assert 'Settings' not in translated and 'Save' not in translated
+    assert len(made) == 3
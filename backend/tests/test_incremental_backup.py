@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Backups incrementais: manifesto da cadeia e restauração a partir dele"""
+
+import os
+from pathlib import Path
+
+from conftest import read_tree
+
+
+def touch_later(path: Path, content: str):
+    """Reescreve o arquivo com mtime diferente (a comparação usa tamanho + mtime_ns)"""
+    stat = path.stat()
+    path.write_text(content, encoding='utf-8')
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 5_000_000_000))
+
+
+def test_incremental_stores_only_changed_files(make_system, project):
+    system = make_system()
+    base = system.perform_files_backup()
+    assert base['success']
+
+    touch_later(project / 'site' / 'index.html', '<h1>Duralux CRM</h1>\n')
+    (project / 'site' / 'novo.txt').write_text('arquivo novo', encoding='utf-8')
+
+    result = system.perform_incremental_backup()
+    assert result['success']
+    assert result['backup_type'] == 'incremental'
+    assert result['parent'] == Path(base['filename']).name
+    assert result['stats']['files_count'] == 2
+
+    manifest = system.read_archive_manifest(Path(result['filename']))
+    sources = {path: entry['source'] for path, entry in manifest['files'].items()}
+    assert sources['site/css/app.css'] == Path(base['filename']).name
+    assert sources['site/index.html'] == Path(result['filename']).name
+    assert sources['site/novo.txt'] == Path(result['filename']).name
+
+
+def test_restore_incremental_chain(make_system, project, tmp_path):
+    system = make_system()
+    assert system.perform_files_backup()['success']
+
+    touch_later(project / 'site' / 'index.html', '<h1>Primeira alteração</h1>\n')
+    first = system.perform_incremental_backup()
+    assert first['success']
+
+    touch_later(project / 'site' / 'css' / 'app.css', 'body { margin: 1px; }\n')
+    (project / 'site' / 'logo.bin').unlink()
+    second = system.perform_incremental_backup()
+    assert second['success']
+    assert second['parent'] == Path(first['filename']).name
+
+    restore_dir = tmp_path / 'restore'
+    assert system.restore_backup(second['filename'], str(restore_dir))
+    assert read_tree(restore_dir / 'site') == read_tree(project / 'site')
+
+
+def test_restore_fails_when_chain_is_broken(make_system, project, tmp_path):
+    system = make_system()
+    base = system.perform_files_backup()
+    touch_later(project / 'site' / 'index.html', '<h1>Alterado</h1>\n')
+    result = system.perform_incremental_backup()
+    assert result['success']
+
+    Path(base['filename']).unlink()
+    restore_dir = tmp_path / 'restore'
+    assert not system.restore_backup(result['filename'], str(restore_dir))
+    assert not (restore_dir / 'site').exists()
+
+
+def test_incremental_without_base_falls_back_to_files_backup(make_system):
+    system = make_system()
+    result = system.perform_incremental_backup()
+    assert result['success']
+    assert result['backup_type'] == 'files_only'
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""JobRunner: catch-up de execuções perdidas, timeout e limite por fila"""
+
+import sys
+import time
+import sqlite3
+import logging
+import datetime
+import threading
+
+import pytest
+
+# Job curto: dorme e registra início/fim em um arquivo (argumentos: log, nome, segundos)
+SLEEPER = ("import sys, time; started = time.time(); time.sleep(float(sys.argv[3])); "
+           "open(sys.argv[1], 'a').write(f'{sys.argv[2]} {started} {time.time()}\\n')")
+
+
+@pytest.fixture
+def make_runner(backup_module, tmp_path):
+    runners = []
+
+    def make(jobs, queues, catch_up=True):
+        runner = backup_module.JobRunner(tmp_path / 'backup_history.db', logging.getLogger('test-jobs'),
+                                         jobs, queues, catch_up)
+        runners.append(runner)
+        return runner
+
+    yield make
+
+    for runner in runners:
+        runner.stop()
+
+
+def job(backup_module, name, queue, log, seconds=0.2, timeout=None):
+    # Horário já passado hoje: a próxima execução agendada fica a ~22h
+    at = (datetime.datetime.now() - datetime.timedelta(hours=2)).strftime('%H:%M')
+    return {
+        'name': name,
+        'action': 'cleanup',
+        'days': list(backup_module.WEEKDAYS),
+        'at': at,
+        'queue': queue,
+        'timeout_seconds': timeout,
+        'command': [sys.executable, '-c', SLEEPER, str(log), name, str(seconds)]
+    }
+
+
+def persist_missed_runs(make_runner, jobs, queues, names):
+    """Estado de uma execução anterior do agendador que parou antes destes horários"""
+    previous = make_runner(jobs, queues)
+    previous.load_state()
+    missed = datetime.datetime.now() - datetime.timedelta(hours=1)
+    for name in names:
+        previous.save_next_run(name, missed)
+
+
+def run_until(runner, db_file, runs, timeout=20):
+    """run_forever em uma thread até `runs` linhas em job_runs"""
+    thread = threading.Thread(target=runner.run_forever, daemon=True)
+    thread.start()
+    deadline = time.monotonic() + timeout
+    try:
+        while time.monotonic() < deadline:
+            conn = sqlite3.connect(db_file)
+            count = conn.execute('SELECT COUNT(*) FROM job_runs').fetchone()[0]
+            conn.close()
+            if count >= runs:
+                break
+            time.sleep(0.05)
+        time.sleep(0.2)
+    finally:
+        runner.stop()
+        thread.join(timeout=5)
+
+
+def query(db_file, sql):
+    conn = sqlite3.connect(db_file)
+    try:
+        return conn.execute(sql).fetchall()
+    finally:
+        conn.close()
+
+
+def read_log(log):
+    runs = {}
+    for line in log.read_text().splitlines():
+        name, started, finished = line.split()
+        runs[name] = (float(started), float(finished))
+    return runs
+
+
+def test_missed_run_is_caught_up_once(backup_module, make_runner, tmp_path):
+    log = tmp_path / 'runs.log'
+    jobs = [job(backup_module, 'limpeza', 'maintenance', log), job(backup_module, 'backup', 'backup', log)]
+    queues = {'backup': 1, 'maintenance': 1}
+    persist_missed_runs(make_runner, jobs, queues, ['limpeza'])
+
+    db_file = tmp_path / 'backup_history.db'
+    run_until(make_runner(jobs, queues), db_file, runs=1)
+
+    # Só o job perdido roda; o outro não tinha execução pendente
+    assert query(db_file, 'SELECT job, status FROM job_runs') == [('limpeza', 'success')]
+    assert set(read_log(log)) == {'limpeza'}
+    next_runs = dict(query(db_file, 'SELECT name, next_run FROM scheduled_jobs'))
+    now = datetime.datetime.now()
+    assert all(datetime.datetime.fromisoformat(value) > now for value in next_runs.values())
+
+
+def test_catch_up_disabled_skips_missed_runs(backup_module, make_runner, tmp_path):
+    log = tmp_path / 'runs.log'
+    jobs = [job(backup_module, 'limpeza', 'maintenance', log)]
+    queues = {'maintenance': 1}
+    persist_missed_runs(make_runner, jobs, queues, ['limpeza'])
+
+    db_file = tmp_path / 'backup_history.db'
+    run_until(make_runner(jobs, queues, catch_up=False), db_file, runs=1, timeout=1)
+
+    assert query(db_file, 'SELECT COUNT(*) FROM job_runs') == [(0,)]
+
+
+def test_timeout_kills_the_job(backup_module, make_runner, tmp_path):
+    log = tmp_path / 'runs.log'
+    runner = make_runner([job(backup_module, 'backup', 'backup', log, seconds=30, timeout=0.5)], {'backup': 1})
+    runner.load_state()
+
+    started = time.monotonic()
+    runner.run_job('backup')
+
+    assert time.monotonic() - started < 10
+    assert not log.exists()
+    db_file = tmp_path / 'backup_history.db'
+    assert query(db_file, 'SELECT status, error FROM job_runs') == [('timeout', 'Excedeu 0.5s')]
+    assert query(db_file, 'SELECT last_status FROM scheduled_jobs') == [('timeout',)]
+
+
+def test_queue_concurrency_limits(backup_module, make_runner, tmp_path):
+    log = tmp_path / 'runs.log'
+    jobs = [job(backup_module, name, queue, log, seconds=0.6)
+            for name, queue in [('backup-1', 'backup'), ('backup-2', 'backup'),
+                                ('limpeza-1', 'maintenance'), ('limpeza-2', 'maintenance')]]
+    queues = {'backup': 1, 'maintenance': 2}
+    persist_missed_runs(make_runner, jobs, queues, [j['name'] for j in jobs])
+
+    db_file = tmp_path / 'backup_history.db'
+    run_until(make_runner(jobs, queues), db_file, runs=4)
+
+    runs = read_log(log)
+    assert len(runs) == 4
+
+    def overlap(a, b):
+        return runs[a][0] < runs[b][1] and runs[b][0] < runs[a][1]
+
+    # Fila backup com 1 worker: em série; maintenance com 2: ao mesmo tempo
+    assert not overlap('backup-1', 'backup-2')
+    assert overlap('limpeza-1', 'limpeza-2')
+    # A fila de manutenção não espera o backup
+    assert overlap('backup-1', 'limpeza-1') or overlap('backup-2', 'limpeza-1')
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Exportação nativa do banco: snapshot consistente entre os workers"""
+
+import json
+import sqlite3
+import threading
+
+import pytest
+
+
+def create_database(path, customers=95):
+    conn = sqlite3.connect(path)
+    with conn:
+        conn.execute('CREATE TABLE clientes (id INTEGER PRIMARY KEY, nome TEXT)')
+        conn.executemany('INSERT INTO clientes (id, nome) VALUES (?, ?)',
+                         [(i, f"Cliente {i}") for i in range(1, customers + 1)])
+        conn.execute('CREATE TABLE pontos (codigo POINT PRIMARY KEY, valor REAL)')
+        conn.executemany('INSERT INTO pontos VALUES (?, ?)', [('a1', 1.5), ('b2', 2.5)])
+    conn.close()
+
+
+@pytest.fixture
+def sqlite_system(make_system, project):
+    database = project / 'data' / 'crm.db'
+    database.parent.mkdir()
+    create_database(database)
+    return make_system(database={
+        'engine': 'sqlite',
+        'sqlite_path': 'data/crm.db',
+        'export_method': 'native',
+        'export_workers': 3,
+        'rows_per_range': 10,
+        'dump_format': 'gz'
+    })
+
+
+def read_manifest(export_dir):
+    with open(export_dir / 'export.json', 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+@pytest.mark.parametrize('column_type, expected', [
+    ('INTEGER', True), ('bigint', True), ('INT(11)', True), ('unsigned big int', True),
+    ('POINT', False), ('INTERVAL', False), ('TEXT', False), ('', False)
+])
+def test_sqlite_integer_primary_key_affinity(backup_module, column_type, expected):
+    conn = sqlite3.connect(':memory:')
+    conn.execute(f'CREATE TABLE t (chave {column_type} PRIMARY KEY, valor TEXT)')
+    found = backup_module.SQLiteDialect().integer_primary_key(conn, 't')
+    assert (found == 'chave') is expected
+
+
+def test_sqlite_export_and_import_round_trip(sqlite_system, project, tmp_path):
+    export_dir = tmp_path / 'export'
+    success, error = sqlite_system.export_database_native(export_dir)
+    assert success, error
+
+    manifest = read_manifest(export_dir)
+    assert manifest['tables']['clientes']['primary_key'] == 'id'
+    assert manifest['tables']['clientes']['ranges'] == 10
+    assert manifest['tables']['clientes']['rows'] == 95
+    assert manifest['tables']['pontos']['primary_key'] is None
+
+    restored = project / 'data' / 'restaurado.db'
+    sqlite_system.config['database']['sqlite_path'] = 'data/restaurado.db'
+    assert sqlite_system.import_database_native(export_dir)
+    conn = sqlite3.connect(restored)
+    assert conn.execute('SELECT COUNT(*), SUM(id) FROM clientes').fetchone() == (95, 95 * 96 // 2)
+    conn.close()
+
+
+@pytest.mark.parametrize('ids, expected_ranges', [
+    ([1, 10 ** 9], 1),
+    ([3, 7, 8, 2 ** 40, 2 ** 40 + 1, 2 ** 62, 2 ** 63 - 1], 3),
+])
+def test_ranges_follow_rows_for_sparse_keys(backup_module, ids, expected_ranges):
+    conn = sqlite3.connect(':memory:')
+    conn.execute('CREATE TABLE eventos (id INTEGER PRIMARY KEY, nome TEXT)')
+    conn.executemany('INSERT INTO eventos VALUES (?, ?)', [(i, 'x') for i in ids])
+    exporter = backup_module.DatabaseExporter(backup_module.SQLiteDialect(), pool=None,
+                                              logger=None, rows_per_range=3)
+
+    ranges = exporter.plan_ranges(conn, 'eventos', 'id')
+
+    assert len(ranges) == expected_ranges
+    assert ranges[0][0] == ids[0] and ranges[-1][1] is None
+    # Cada id cai em exatamente uma faixa, nenhuma com mais de rows_per_range linhas
+    counts = [sum(1 for i in ids if low <= i and (high is None or i < high)) for low, high in ranges]
+    assert sum(counts) == len(ids)
+    assert max(counts) <= 3
+
+
+def test_sqlite_export_reads_a_single_snapshot(backup_module, sqlite_system, project, tmp_path, monkeypatch):
+    original = backup_module.DatabaseExporter.export_range
+    written = []
+    lock = threading.Lock()
+
+    def export_range_with_concurrent_writes(self, table, *args):
+        # Outra aplicação grava no banco enquanto as faixas são exportadas
+        with lock:
+            if not written:
+                conn = sqlite3.connect(project / 'data' / 'crm.db')
+                with conn:
+                    conn.executemany('INSERT INTO clientes (id, nome) VALUES (?, ?)',
+                                     [(i, 'novo') for i in range(1000, 1050)])
+                    conn.execute('DELETE FROM clientes WHERE id <= 20')
+                conn.close()
+                written.append(True)
+        return original(self, table, *args)
+
+    monkeypatch.setattr(backup_module.DatabaseExporter, 'export_range', export_range_with_concurrent_writes)
+
+    export_dir = tmp_path / 'export'
+    success, error = sqlite_system.export_database_native(export_dir)
+    assert success, error
+    assert written
+    assert read_manifest(export_dir)['tables']['clientes']['rows'] == 95
+
+
+def test_sqlite_export_fails_without_snapshot(sqlite_system, project, tmp_path):
+    (project / 'data' / 'crm.db').unlink()
+    export_dir = tmp_path / 'export'
+    success, error = sqlite_system.export_database_native(export_dir)
+    assert not success
+    assert 'Erro na exportação nativa' in error
+    assert not export_dir.exists()
+
+
+class RecordingConnection:
+    """Conexão falsa que registra os comandos executados (sem servidor MySQL)"""
+
+    def __init__(self, log, name, fail_on=None):
+        self.log = log
+        self.name = name
+        self.fail_on = fail_on
+        self.closed = False
+
+    def cursor(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql):
+        if sql == self.fail_on:
+            raise RuntimeError('Access denied; you need the RELOAD privilege')
+        self.log.append((self.name, sql))
+
+    def close(self):
+        self.closed = True
+
+
+def test_mysql_workers_share_one_snapshot(backup_module):
+    log = []
+    coordinator = RecordingConnection(log, 'lock')
+    workers = [RecordingConnection(log, f"w{i}") for i in range(3)]
+
+    backup_module.MySQLDialect().begin_snapshot(lambda: coordinator, workers)
+
+    assert log[0] == ('lock', 'FLUSH TABLES WITH READ LOCK')
+    assert log[-1] == ('lock', 'UNLOCK TABLES')
+    started = [name for name, sql in log if sql == 'START TRANSACTION WITH CONSISTENT SNAPSHOT']
+    assert started == ['w0', 'w1', 'w2']
+    assert coordinator.closed
+
+
+def test_mysql_snapshot_fails_without_global_lock(backup_module):
+    log = []
+    coordinator = RecordingConnection(log, 'lock', fail_on='FLUSH TABLES WITH READ LOCK')
+    workers = [RecordingConnection(log, 'w0')]
+
+    with pytest.raises(RuntimeError):
+        backup_module.MySQLDialect().begin_snapshot(lambda: coordinator, workers)
+    assert log == []
+    assert coordinator.closed
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Outbox de notificações: digest de vários resultados e novas tentativas com espera"""
+
+import sqlite3
+import datetime
+
+import pytest
+
+
+class FakeSMTP:
+    """smtplib.SMTP falso: registra as mensagens; `failures` derruba as próximas conexões"""
+
+    sent = []
+    failures = 0
+    logins = []
+
+    def __init__(self, host, port, timeout=None):
+        if FakeSMTP.failures:
+            FakeSMTP.failures -= 1
+            raise ConnectionRefusedError('servidor SMTP fora do ar')
+        self.host = host
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def starttls(self, context=None):
+        pass
+
+    def login(self, username, password):
+        FakeSMTP.logins.append((username, password))
+
+    def send_message(self, message):
+        FakeSMTP.sent.append(message)
+
+
+@pytest.fixture
+def smtp(backup_module, monkeypatch):
+    monkeypatch.setattr(FakeSMTP, 'sent', [])
+    monkeypatch.setattr(FakeSMTP, 'failures', 0)
+    monkeypatch.setattr(FakeSMTP, 'logins', [])
+    monkeypatch.setattr(backup_module.smtplib, 'SMTP', FakeSMTP)
+    return FakeSMTP
+
+
+@pytest.fixture
+def outbox_system(make_system):
+    return make_system(email_recipients=['ops@duralux.local', 'ti@duralux.local'],
+                       notifications={'smtp_server': 'smtp.duralux.local', 'smtp_username': 'backup',
+                                      'smtp_password': 'segredo', 'digest_minutes': 5, 'max_attempts': 3})
+
+
+@pytest.fixture
+def outbox(outbox_system):
+    outbox = outbox_system.get_notification_outbox()
+    yield outbox
+    outbox.stop()
+
+
+def notify(system, backup_type, success=True):
+    system.send_notification({
+        'success': success,
+        'backup_type': backup_type,
+        'duration': 1.5,
+        'filename': f'{backup_type}.zip',
+        'stats': {'files_count': 3, 'total_size': 2048, 'compressed_size': 1024},
+        'error': None if success else 'disco cheio'
+    })
+
+
+def outbox_rows(system):
+    conn = sqlite3.connect(system.db_file)
+    conn.row_factory = sqlite3.Row
+    try:
+        return [dict(row) for row in conn.execute('SELECT * FROM notification_outbox ORDER BY id')]
+    finally:
+        conn.close()
+
+
+def shift(system, minutes):
+    """Simula a passagem do tempo: criação e próxima tentativa ficam `minutes` no passado"""
+    conn = sqlite3.connect(system.db_file)
+    with conn:
+        for row in outbox_rows(system):
+            conn.execute('UPDATE notification_outbox SET created = ?, next_attempt = ? WHERE id = ?', (
+                (datetime.datetime.fromisoformat(row['created']) - datetime.timedelta(minutes=minutes)).isoformat(),
+                (datetime.datetime.fromisoformat(row['next_attempt']) - datetime.timedelta(minutes=minutes)).isoformat(),
+                row['id']))
+    conn.close()
+
+
+def test_results_are_batched_into_one_digest(outbox_system, outbox, smtp):
+    notify(outbox_system, 'database')
+    notify(outbox_system, 'files', success=False)
+    notify(outbox_system, 'incremental')
+
+    # Dentro da janela do digest nada sai
+    assert outbox.drain() == 0
+    assert smtp.sent == []
+
+    shift(outbox_system, 6)
+    assert outbox.drain() == 3
+
+    [message] = smtp.sent
+    assert message['Subject'] == 'Duralux Backup - 3 resultados (1 falha(s))'
+    assert message['To'] == 'ops@duralux.local, ti@duralux.local'
+    assert message['From'] == 'backup'
+    body = message.get_content()
+    assert body.index('database') < body.index('files') < body.index('incremental')
+    assert 'disco cheio' in body
+    assert smtp.logins == [('backup', 'segredo')]
+    assert {row['status'] for row in outbox_rows(outbox_system)} == {'sent'}
+
+    # Nada pendente: a próxima passada não reenvia
+    assert outbox.drain() == 0 and len(smtp.sent) == 1
+
+
+def test_single_result_keeps_its_subject(outbox_system, outbox, smtp):
+    notify(outbox_system, 'database')
+    assert outbox.drain(force=True) == 1
+    assert smtp.sent[0]['Subject'] == 'Duralux Backup ✅ Sucesso - database'
+
+
+def test_failed_delivery_is_retried_with_backoff(backup_module, outbox_system, outbox, smtp):
+    notify(outbox_system, 'database')
+    notify(outbox_system, 'files')
+    shift(outbox_system, 6)
+
+    smtp.failures = 1
+    before = datetime.datetime.now()
+    assert outbox.drain() == 0
+    rows = outbox_rows(outbox_system)
+    assert [(row['status'], row['attempts']) for row in rows] == [('pending', 1)] * 2
+    assert rows[0]['last_error'] == 'servidor SMTP fora do ar'
+    delay = datetime.datetime.fromisoformat(rows[0]['next_attempt']) - before
+    assert delay >= datetime.timedelta(seconds=backup_module.OUTBOX_BACKOFF_SECONDS)
+
+    # Antes da espera vencer não há nova tentativa
+    assert outbox.drain() == 0 and smtp.sent == []
+
+    # Segunda falha: a espera dobra
+    shift(outbox_system, 2)
+    smtp.failures = 1
+    before = datetime.datetime.now()
+    assert outbox.drain() == 0
+    rows = outbox_rows(outbox_system)
+    assert rows[0]['attempts'] == 2
+    delay = datetime.datetime.fromisoformat(rows[0]['next_attempt']) - before
+    assert delay >= datetime.timedelta(seconds=2 * backup_module.OUTBOX_BACKOFF_SECONDS)
+
+    # Servidor de volta: o digest sai inteiro
+    shift(outbox_system, 3)
+    assert outbox.drain() == 2
+    assert len(smtp.sent) == 1
+    assert [(row['status'], row['attempts']) for row in outbox_rows(outbox_system)] == [('sent', 3)] * 2
+
+
+def test_gives_up_after_max_attempts(outbox_system, outbox, smtp):
+    notify(outbox_system, 'database')
+
+    smtp.failures = 10
+    for _ in range(3):
+        assert outbox.drain(force=True) == 0
+
+    [row] = outbox_rows(outbox_system)
+    assert (row['status'], row['attempts']) == ('failed', 3)
+    # 'failed' sai da fila: nem o envio forçado tenta de novo
+    smtp.failures = 0
+    assert outbox.drain(force=True) == 0 and smtp.sent == []
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Retenção GFS: candidatos, vagas por série e proteção das cadeias incrementais"""
+
+import json
+import datetime
+
+from conftest import BACKEND_DIR
+
+NO_TIERS = {'daily': 0, 'weekly': 0, 'monthly': 0}
+
+
+def add_row(system, name, days_ago, backup_type='files_only', status='success', parent=None):
+    timestamp = (datetime.datetime.now() - datetime.timedelta(days=days_ago)).isoformat()
+    with system.history.conn:
+        system.history.conn.execute(
+            'INSERT INTO backup_history (timestamp, backup_type, filename, file_size, status, '
+            'compressed_size, parent_backup) VALUES (?, ?, ?, ?, ?, ?, ?)',
+            (timestamp, backup_type, str(system.backup_dir / name), 1000, status, 100, parent)
+        )
+
+
+def planned(system):
+    plan = system.plan_retention()
+    keep = {row['filename'].rsplit('/', 1)[-1]: reasons for row, reasons in plan['keep']}
+    delete = {row['filename'].rsplit('/', 1)[-1] for row in plan['delete']}
+    return keep, delete
+
+
+def test_policy_defaults_have_a_single_source(backup_module, make_system):
+    system = make_system()
+    assert system.get_retention_policy() == {'within_days': backup_module.RETENTION_DAYS,
+                                             **backup_module.RETENTION_TIERS}
+
+    with open(BACKEND_DIR / 'backup_config.json', 'r', encoding='utf-8') as f:
+        shipped = json.load(f)
+    assert shipped['retention_days'] == backup_module.RETENTION_DAYS
+    assert shipped.get('retention', backup_module.RETENTION_TIERS) == backup_module.RETENTION_TIERS
+
+
+def test_partial_tiers_fall_back_to_defaults(backup_module, make_system):
+    system = make_system(retention={'daily': 3})
+    policy = system.get_retention_policy()
+    assert policy['daily'] == 3
+    assert policy['weekly'] == backup_module.RETENTION_TIERS['weekly']
+
+
+def test_gfs_keeps_latest_of_each_period(make_system):
+    system = make_system(retention_days=1, retention={'daily': 2, 'weekly': 0, 'monthly': 0})
+    add_row(system, 'hoje.zip', 0.1)
+    add_row(system, 'ontem_tarde.zip', 1.2)
+    add_row(system, 'ontem_manha.zip', 1.5)
+    add_row(system, 'antigo.zip', 10)
+
+    keep, delete = planned(system)
+
+    assert set(keep) == {'hoje.zip', 'ontem_tarde.zip'}
+    assert 'latest' in keep['hoje.zip']
+    assert delete == {'ontem_manha.zip', 'antigo.zip'}
+
+
+def test_failed_backup_with_archive_is_a_candidate(make_system):
+    system = make_system(retention_days=1, retention=NO_TIERS)
+    add_row(system, 'bom.zip', 20)
+    add_row(system, 'falhou_antigo.zip', 10, status='error')
+    add_row(system, 'falhou_recente.zip', 0.1, status='error')
+
+    keep, delete = planned(system)
+
+    # Backup com erro não ocupa a vaga de mais recente
+    assert keep['bom.zip'] == ['latest']
+    assert keep['falhou_recente.zip'] == ['within']
+    assert delete == {'falhou_antigo.zip'}
+
+
+def test_chain_parents_are_kept_whatever_their_status(make_system):
+    system = make_system(retention_days=1, retention=NO_TIERS)
+    add_row(system, 'base.zip', 30)
+    add_row(system, 'pai_com_erro.zip', 20, status='error', parent='base.zip')
+    add_row(system, 'inc.zip', 10, backup_type='incremental', parent='pai_com_erro.zip')
+    add_row(system, 'solto.zip', 25, status='error')
+
+    keep, delete = planned(system)
+
+    assert keep['inc.zip'] == ['latest']
+    assert keep['pai_com_erro.zip'] == ['chain']
+    assert 'chain' in keep['base.zip']
+    assert delete == {'solto.zip'}
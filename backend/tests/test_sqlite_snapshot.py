@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Snapshot online do SQLite: páginas incrementais e banco remontado na restauração"""
+
+import sqlite3
+
+import pytest
+
+from conftest import read_tree
+
+
+def sqlite_options():
+    return {
+        'databases': ['site/data/crm.db'],
+        'pages_per_step': 8,
+        'step_sleep_ms': 0,
+        'segment_pages': 4,
+        'integrity_check': 'full'
+    }
+
+
+@pytest.fixture
+def live_database(project):
+    """Banco em uso (WAL, conexão aberta): as últimas gravações ficam só no -wal"""
+    path = project / 'site' / 'data' / 'crm.db'
+    path.parent.mkdir()
+    conn = sqlite3.connect(path)
+    conn.execute('PRAGMA journal_mode = WAL')
+    conn.execute('PRAGMA wal_autocheckpoint = 0')
+    with conn:
+        conn.execute('CREATE TABLE clientes (id INTEGER PRIMARY KEY, nome TEXT, notas TEXT)')
+        conn.executemany('INSERT INTO clientes VALUES (?, ?, ?)',
+                         [(i, f"Cliente {i}", 'x' * 100) for i in range(1, 2001)])
+    yield conn
+    conn.close()
+
+
+@pytest.fixture
+def snapshot_summaries(backup_module, monkeypatch):
+    """Resumo de cada add_sqlite_snapshots (segmentos gravados e reaproveitados)"""
+    summaries = []
+    original = backup_module.DuraluxBackupSystem.add_sqlite_snapshots
+
+    def recording(self, *args):
+        summaries.append(original(self, *args))
+        return summaries[-1]
+
+    monkeypatch.setattr(backup_module.DuraluxBackupSystem, 'add_sqlite_snapshots', recording)
+    return summaries
+
+
+def rows(path):
+    conn = sqlite3.connect(path)
+    try:
+        assert conn.execute('PRAGMA integrity_check').fetchone() == ('ok',)
+        return conn.execute('SELECT * FROM clientes ORDER BY id').fetchall()
+    finally:
+        conn.close()
+
+
+def live_rows(conn):
+    return conn.execute('SELECT * FROM clientes ORDER BY id').fetchall()
+
+
+@pytest.mark.parametrize('storage_backend', ['zip', 'chunks'])
+def test_incremental_snapshot_restores_latest_database(make_system, project, tmp_path, live_database,
+                                                       snapshot_summaries, storage_backend):
+    system = make_system(sqlite_snapshots=sqlite_options(), storage_backend=storage_backend)
+    first = system.perform_files_backup()
+    assert first['success'], first['error']
+
+    # Escritas entre os dois snapshots
+    with live_database:
+        live_database.execute("UPDATE clientes SET nome = 'Alterado' WHERE id = 1000")
+        live_database.execute("INSERT INTO clientes VALUES (2001, 'Novo', 'y')")
+        live_database.execute('DELETE FROM clientes WHERE id = 7')
+
+    second = system.perform_incremental_backup()
+    assert second['success'], second['error']
+
+    full, incremental = snapshot_summaries
+    assert full['databases'] == incremental['databases'] == 1
+    assert full['reused_segments'] == 0
+    # Só os segmentos com páginas alteradas são gravados de novo
+    assert 0 < incremental['segments'] - incremental['reused_segments'] <= 4
+    assert incremental['reused_segments'] >= incremental['segments'] - 4
+
+    restore_dir = tmp_path / 'restore'
+    assert system.restore_backup(second['filename'], str(restore_dir))
+    restored = restore_dir / 'site' / 'data'
+    assert sorted(path.name for path in restored.iterdir()) == ['crm.db']
+    assert rows(restored / 'crm.db') == live_rows(live_database)
+
+    # Os demais arquivos do site continuam iguais
+    site = read_tree(restore_dir / 'site')
+    assert {name: data for name, data in site.items() if not name.startswith('data/')} == \
+        {name: data for name, data in read_tree(project / 'site').items() if not name.startswith('data/')}
+
+
+def test_failed_integrity_check_fails_the_backup(backup_module, make_system, live_database, monkeypatch):
+    monkeypatch.setattr(backup_module, 'check_sqlite_integrity', lambda path, mode: ['*** page 3: btree corrompida'])
+    system = make_system(sqlite_snapshots=sqlite_options())
+
+    result = system.perform_files_backup()
+
+    assert not result['success']
+    assert 'integrity_check falhou' in result['error']
+    assert 'btree corrompida' in result['error']
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""translation_io: escrita atômica e pool de processos dos tradutores"""
+
+import os
+import stat
+
+import pytest
+
+from translation_io import write_atomic, current_umask
+
+
+def test_write_atomic_keeps_file_mode(tmp_path):
+    page = tmp_path / 'index.html'
+    page.write_text('<p>Save</p>', encoding='utf-8')
+    page.chmod(0o640)
+
+    write_atomic(page, '<p>Salvar</p>')
+
+    assert page.read_text(encoding='utf-8') == '<p>Salvar</p>'
+    assert stat.S_IMODE(page.stat().st_mode) == 0o640
+    assert os.listdir(tmp_path) == ['index.html']
+
+
+def test_write_atomic_new_file_follows_umask(tmp_path):
+    page = tmp_path / 'new.html'
+    write_atomic(page, '<p>Salvar</p>')
+    assert stat.S_IMODE(page.stat().st_mode) == 0o666 & ~current_umask()
+
+
+def test_write_atomic_syncs_before_replace(tmp_path, monkeypatch):
+    page = tmp_path / 'index.html'
+    page.write_text('<p>Save</p>', encoding='utf-8')
+    calls = []
+    real_fsync, real_replace = os.fsync, os.replace
+
+    def fsync(fd):
+        calls.append(('fsync', os.fstat(fd).st_size))
+        real_fsync(fd)
+
+    def replace(source, target):
+        # Temporário único no mesmo diretório, nunca o nome fixo "<arquivo>.tmp"
+        calls.append(('replace', os.path.dirname(source) == str(tmp_path), source != f"{page}.tmp"))
+        real_replace(source, target)
+
+    monkeypatch.setattr(os, 'fsync', fsync)
+    monkeypatch.setattr(os, 'replace', replace)
+    write_atomic(page, '<p>Salvar</p>')
+
+    assert calls == [('fsync', len('<p>Salvar</p>')), ('replace', True, True)]
+
+
+def test_write_atomic_failure_keeps_original(tmp_path):
+    page = tmp_path / 'index.html'
+    page.write_text('<p>Save</p>', encoding='utf-8')
+
+    with pytest.raises(UnicodeEncodeError):
+        write_atomic(page, '<p>\udc80</p>')
+
+    assert page.read_text(encoding='utf-8') == '<p>Save</p>'
+    assert os.listdir(tmp_path) == ['index.html']
+
+
+def test_mass_translator_pool_matches_serial(translator_module, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    translator = translator_module.DuraluxTranslator()
+    pages = []
+    for i in range(4):
+        page = tmp_path / f'page{i}.html'
+        page.write_text('<h1>Settings</h1><button>Save</button>', encoding='utf-8')
+        pages.append(str(page))
+
+    serial = list(translator.translate_files(pages[:2], workers=1))
+    pooled = list(translator.translate_files(pages[2:], workers=2))
+
+    assert [r['translations_count'] for r in pooled] == [r['translations_count'] for r in serial]
+    assert {page.read_text(encoding='utf-8') for page in tmp_path.glob('*.html')} == \
+        {(tmp_path / 'page0.html').read_text(encoding='utf-8')}
+
+
+def test_translate_and_notify_pool_builds_its_own_translator(tmp_path):
+    from conftest import load_script
+    module = load_script('translate_and_notify', 'translate-and-notify.py')
+    (tmp_path / 'index.html').write_text('<html><body><h1>Dashboard</h1></body></html>', encoding='utf-8')
+    (tmp_path / 'broken.html').mkdir()
+
+    translator = module.DuraluxTranslator(tmp_path)
+    html_files = [tmp_path / 'broken.html', tmp_path / 'index.html']
+    results = list(translator.process_files(html_files, workers=2))
+
+    assert results[0][0] is False and results[0][1]
+    assert results[1] == (True, None)
+    assert translator.processed_files == [tmp_path / 'index.html']
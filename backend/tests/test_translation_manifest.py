@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tradução incremental: manifesto de páginas e versões do dicionário"""
+
+import os
+import json
+from itertools import count
+
+import pytest
+
+
+@pytest.fixture
+def run(translator_module, tmp_path, monkeypatch):
+    """Executa uma tradução completa com um tradutor novo (relê o manifesto)"""
+    monkeypatch.chdir(tmp_path)
+    runs = count()
+
+    def translate(extra_terms=None, **kwargs):
+        translator = translator_module.DuraluxTranslator()
+        # Um backup por execução (o nome tem só a precisão de segundos)
+        translator.backup_dir = f"backup_{next(runs)}"
+        if extra_terms:
+            translator.all_translations = {**translator.all_translations, **extra_terms}
+            translator.matcher, translator.entries = translator.build_matcher()
+            translator.dictionary_version = translator_module.glossaries.glossary_digest(translator.entries)
+        results = translator.translate_all_files(workers=1, **kwargs)
+        return sorted(result['file'] for result in results)
+
+    return translate
+
+
+@pytest.fixture
+def pages(tmp_path):
+    html_dir = tmp_path / 'duralux-admin'
+    html_dir.mkdir()
+    pages = {
+        'settings.html': '<h1>Settings</h1><p>Quokka</p>',
+        'tasks.html': '<h1>Tasks</h1><button>Save</button>',
+    }
+    for name, content in pages.items():
+        (html_dir / name).write_text(content, encoding='utf-8')
+    return html_dir
+
+
+def test_unchanged_pages_are_skipped(run, pages):
+    assert run() == ['settings.html', 'tasks.html']
+    translated = {page.name: page.read_text(encoding='utf-8') for page in pages.iterdir()}
+
+    assert run() == []
+    assert {page.name: page.read_text(encoding='utf-8') for page in pages.iterdir()} == translated
+
+
+def test_touched_page_with_same_content_is_skipped(run, pages):
+    run()
+    page = pages / 'tasks.html'
+    stat = page.stat()
+    os.utime(page, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+    assert run() == []
+
+
+def test_changed_page_is_translated_again(run, pages):
+    run()
+    page = pages / 'tasks.html'
+    page.write_text(page.read_text(encoding='utf-8') + '<p>Cancel</p>', encoding='utf-8')
+
+    assert run() == ['tasks.html']
+    assert page.read_text(encoding='utf-8').endswith('<p>Cancelar</p>')
+
+
+def test_dictionary_change_translates_only_pages_with_new_terms(run, pages, tmp_path):
+    run()
+
+    assert run(extra_terms={'Quokka': 'Quoca'}) == ['settings.html']
+    assert '<p>Quoca</p>' in (pages / 'settings.html').read_text(encoding='utf-8')
+
+    # A outra página passa a valer como traduzida com o dicionário novo
+    assert run(extra_terms={'Quokka': 'Quoca'}) == []
+    manifest = json.loads((tmp_path / 'translation_manifest.json').read_text(encoding='utf-8'))
+    assert len({record['dictionary_version'] for record in manifest['files'].values()}) == 1
+    assert len(manifest['dictionaries']) == 1
+
+
+def test_force_translates_every_page(run, pages):
+    run()
+    assert run(force=True) == ['settings.html', 'tasks.html']
+
+
+def test_manifest_of_another_version_is_ignored(run, pages, tmp_path, translator_module):
+    run()
+    manifest_file = tmp_path / 'translation_manifest.json'
+    manifest = json.loads(manifest_file.read_text(encoding='utf-8'))
+    manifest['version'] = translator_module.MANIFEST_VERSION - 1
+    manifest_file.write_text(json.dumps(manifest), encoding='utf-8')
+
+    assert run() == ['settings.html', 'tasks.html']
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Motor de tradução: matcher único (trie) e busca das traduções"""
+
+import pytest
+
+
+@pytest.fixture
+def translator(translator_module, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return translator_module.DuraluxTranslator()
+
+
+def test_translates_words_and_keeps_case(translator):
+    # Original em minúsculas mantém a grafia do glossário (match_case)
+    translated, made = translator.translate_content('<p>Save</p><p>SAVE</p><p>save</p>')
+    assert translated == '<p>Salvar</p><p>SALVAR</p><p>Salvar</p>'
+    assert [item['original'] for item in made] == ['Save', 'SAVE', 'save']
+
+
+def test_longest_phrase_wins(translator):
+    phrase = next(english for english in translator.special_patterns if ' ' in english)
+    translated, made = translator.translate_content(f"<p>{phrase}</p>")
+    assert translated == f"<p>{translator.special_patterns[phrase]}</p>"
+    assert len(made) == 1
+
+
+def test_only_whole_words_match(translator):
+    translated, made = translator.translate_content('<p>Saved Savings</p>')
+    assert translated == '<p>Saved Savings</p>'
+    assert made == []
+
+
+def test_ignorecase_only_match_is_skipped(translator):
+    # O IGNORECASE do re casa 'ı' (i sem ponto) com 'i', mas o casefold não
+    translated, made = translator.translate_content('<p>Settıngs</p><h1>Settings</h1>')
+    assert translated == '<p>Settıngs</p><h1>Configurações</h1>'
+    assert [item['original'] for item in made] == ['Settings']
+
+
+def test_translate_file_survives_unmatched_entries(translator, tmp_path):
+    page = tmp_path / 'pagina.html'
+    page.write_text('<p>Settıngs</p><p>Dashboard</p>', encoding='utf-8')
+    result = translator.translate_file(str(page))
+    assert result['translations_count'] == 1
+    assert page.read_text(encoding='utf-8') == '<p>Settıngs</p><p>Painel</p>'
+
+
+def test_compile_matcher_reuses_the_compiled_regex():
+    import glossaries
+
+    matcher = glossaries.compile_matcher(['Save', 'Save Task', 'Task'])
+    assert glossaries.compile_matcher(['task', 'save task', 'save']) is matcher
+    assert matcher.findall('Save Task and save') == ['Save Task', 'save']
@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Envio aos destinos: S3 multipart retomado pelo journal, SFTP, journal e limite de banda"""
+
+import os
+import sys
+import base64
+import hashlib
+import logging
+import types
+from pathlib import Path
+
+import pytest
+
+PART_SIZE = 1024
+
+
+class FakeS3:
+    """Cliente boto3 mínimo: o "servidor" (objetos e multipart) é compartilhado entre clientes"""
+
+    def __init__(self, server, fail_parts=(), corrupt_parts=(), max_parts=2):
+        self.server = server
+        self.fail_parts = set(fail_parts)
+        self.corrupt_parts = set(corrupt_parts)
+        self.max_parts = max_parts
+        self.sent_parts = []
+
+    def check_md5(self, body, content_md5):
+        if base64.b64encode(hashlib.md5(body).digest()).decode('ascii') != content_md5:
+            raise IOError('BadDigest')
+
+    def put_object(self, Bucket, Key, Body, ContentMD5):
+        self.check_md5(Body, ContentMD5)
+        self.server['objects'][(Bucket, Key)] = Body
+
+    def create_multipart_upload(self, Bucket, Key):
+        upload_id = f"upload-{len(self.server['uploads']) + 1}"
+        self.server['uploads'][upload_id] = {'key': (Bucket, Key), 'parts': {}}
+        return {'UploadId': upload_id}
+
+    def upload_part(self, Bucket, Key, UploadId, PartNumber, Body, ContentMD5):
+        if PartNumber in self.fail_parts:
+            # Conexão caiu no meio desta parte (uma vez)
+            self.fail_parts.discard(PartNumber)
+            raise ConnectionError('conexão perdida')
+        if PartNumber in self.corrupt_parts:
+            # Bit trocado no caminho: o servidor confere o Content-MD5
+            self.corrupt_parts.discard(PartNumber)
+            Body = bytes([Body[0] ^ 1]) + Body[1:]
+        self.check_md5(Body, ContentMD5)
+        etag = f'"{hashlib.md5(Body).hexdigest()}"'
+        self.server['uploads'][UploadId]['parts'][PartNumber] = (Body, etag)
+        self.sent_parts.append(PartNumber)
+        return {'ETag': etag}
+
+    def list_parts(self, Bucket, Key, UploadId, PartNumberMarker=0):
+        if UploadId not in self.server['uploads']:
+            raise KeyError('NoSuchUpload')
+        numbers = sorted(n for n in self.server['uploads'][UploadId]['parts'] if n > PartNumberMarker)
+        page = numbers[:self.max_parts]
+        parts = self.server['uploads'][UploadId]['parts']
+        return {
+            'Parts': [{'PartNumber': n, 'ETag': parts[n][1], 'Size': len(parts[n][0])} for n in page],
+            'IsTruncated': len(numbers) > len(page),
+            'NextPartNumberMarker': page[-1] if page else PartNumberMarker
+        }
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload):
+        upload = self.server['uploads'].pop(UploadId)
+        body = b''
+        for part in MultipartUpload['Parts']:
+            data, etag = upload['parts'][part['PartNumber']]
+            assert etag == part['ETag']
+            body += data
+        self.server['objects'][(Bucket, Key)] = body
+
+    def abort_multipart_upload(self, Bucket, Key, UploadId):
+        self.server['aborted'].append(UploadId)
+        self.server['uploads'].pop(UploadId, None)
+
+    def head_object(self, Bucket, Key):
+        return {'ContentLength': len(self.server['objects'][(Bucket, Key)])}
+
+
+@pytest.fixture
+def s3(backup_module, monkeypatch):
+    """boto3 falso: cada client() usa o próximo FakeS3 de `clients`"""
+    server = {'objects': {}, 'uploads': {}, 'aborted': []}
+    clients = []
+    fake_boto3 = types.SimpleNamespace(client=lambda *args, **kwargs: clients.pop(0))
+    monkeypatch.setattr(backup_module, 'boto3', fake_boto3)
+    monkeypatch.setattr(backup_module, 'UPLOAD_MIN_PART_SIZE', PART_SIZE)
+    # Sem espera entre as tentativas
+    monkeypatch.setattr(backup_module.time, 'sleep', lambda seconds: None)
+    return types.SimpleNamespace(server=server, clients=clients)
+
+
+def make_uploader(backup_module, destination, journal_dir, retries=0):
+    """Uploader de um "processo": journal relido do disco"""
+    return backup_module.BackupUploader([destination], backup_module.UploadJournal(journal_dir),
+                                        logging.getLogger('test-upload'), workers=1, retries=retries)
+
+
+def s3_destination(backup_module, s3, client):
+    s3.clients.append(client)
+    return backup_module.S3Destination('s3', {'bucket': 'backups', 'prefix': 'duralux'},
+                                       backup_module.Throttle(), {}, part_size=PART_SIZE, part_workers=1)
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / 'backups' / 'files_backup.zip'
+    path.parent.mkdir()
+    path.write_bytes(os.urandom(PART_SIZE * 4 + 100))
+    return path
+
+
+def test_s3_multipart_resumes_from_journal(backup_module, s3, source, tmp_path):
+    journal_dir = tmp_path / 'backups' / 'uploads'
+
+    # Primeiro processo: a parte 3 falha e o envio fica pendente no journal
+    first = FakeS3(s3.server, fail_parts={3})
+    uploader = make_uploader(backup_module, s3_destination(backup_module, s3, first), journal_dir)
+    uploader.submit(source, 'files_backup.zip')
+    [result] = uploader.wait()
+    uploader.close()
+
+    assert not result['ok'] and 'conexão perdida' in result['error']
+    [pending] = backup_module.UploadJournal(journal_dir).pending()
+    assert pending['upload_id'] in s3.server['uploads']
+    assert pending['part_size'] == PART_SIZE
+    assert sorted(first.sent_parts) == [1, 2, 4, 5]
+
+    # Próximo processo: list_parts (paginado) diz o que o servidor tem; só a parte 3 sai de novo
+    second = FakeS3(s3.server)
+    uploader = make_uploader(backup_module, s3_destination(backup_module, s3, second), journal_dir)
+    assert uploader.resume_pending() == 1
+    [result] = uploader.wait()
+    uploader.close()
+
+    assert result['ok'] and result['bytes'] == PART_SIZE
+    assert second.sent_parts == [3]
+    assert s3.server['objects'][('backups', 'duralux/files_backup.zip')] == source.read_bytes()
+    assert s3.server['uploads'] == {}
+    assert backup_module.UploadJournal(journal_dir).pending() == []
+
+
+def test_s3_changed_source_aborts_previous_multipart(backup_module, s3, source, tmp_path):
+    journal_dir = tmp_path / 'backups' / 'uploads'
+    first = FakeS3(s3.server, fail_parts={2})
+    uploader = make_uploader(backup_module, s3_destination(backup_module, s3, first), journal_dir)
+    uploader.submit(source, 'files_backup.zip')
+    uploader.wait()
+    uploader.close()
+    [pending] = backup_module.UploadJournal(journal_dir).pending()
+
+    # Arquivo regravado com outro tamanho: as partes antigas não servem
+    source.write_bytes(os.urandom(PART_SIZE * 3))
+    second = FakeS3(s3.server)
+    uploader = make_uploader(backup_module, s3_destination(backup_module, s3, second), journal_dir)
+    uploader.resume_pending()
+    [result] = uploader.wait()
+    uploader.close()
+
+    assert result['ok']
+    assert s3.server['aborted'] == [pending['upload_id']]
+    assert sorted(second.sent_parts) == [1, 2, 3]
+    assert s3.server['objects'][('backups', 'duralux/files_backup.zip')] == source.read_bytes()
+
+
+def test_s3_content_md5_rejects_corrupted_part(backup_module, s3, source, tmp_path):
+    client = FakeS3(s3.server, corrupt_parts={2})
+    uploader = make_uploader(backup_module, s3_destination(backup_module, s3, client),
+                             tmp_path / 'backups' / 'uploads', retries=1)
+    uploader.submit(source, 'files_backup.zip')
+    [result] = uploader.wait()
+    uploader.close()
+
+    # A parte corrompida é recusada e reenviada na tentativa seguinte
+    assert result['ok']
+    assert client.sent_parts.count(2) == 1 and sorted(client.sent_parts) == [1, 2, 3, 4, 5]
+    assert s3.server['objects'][('backups', 'duralux/files_backup.zip')] == source.read_bytes()
+
+
+def test_s3_small_file_uses_single_put(backup_module, s3, tmp_path):
+    small = tmp_path / 'small.zip'
+    small.write_bytes(b'duralux' * 10)
+    client = FakeS3(s3.server)
+    destination = s3_destination(backup_module, s3, client)
+    state = {'destination': 's3', 'key': 'small.zip', 'size': small.stat().st_size}
+
+    assert destination.upload(small, state, lambda state: None) == state['size']
+    assert client.sent_parts == [] and s3.server['uploads'] == {}
+    assert s3.server['objects'][('backups', 'duralux/small.zip')] == small.read_bytes()
+
+
+class FakeSFTP:
+    """SFTP sobre um diretório local (caminhos remotos relativos a `root`)"""
+
+    def __init__(self, root: Path):
+        self.root = root
+        self.opened = []
+
+    def local(self, path: str) -> Path:
+        return self.root / path
+
+    def stat(self, path):
+        return os.stat(self.local(path))
+
+    def mkdir(self, path):
+        self.local(path).mkdir()
+
+    def open(self, path, mode):
+        self.opened.append((path, mode))
+        handle = open(self.local(path), mode)
+        handle.set_pipelined = lambda pipelined: None
+        return handle
+
+    def posix_rename(self, source, target):
+        os.replace(self.local(source), self.local(target))
+
+    def remove(self, path):
+        os.remove(self.local(path))
+
+
+@pytest.fixture
+def sftp(backup_module, monkeypatch, tmp_path):
+    server = FakeSFTP(tmp_path / 'server')
+    server.root.mkdir()
+    connections = []
+
+    class SSHClient:
+        def load_system_host_keys(self):
+            self.known_hosts = True
+
+        def set_missing_host_key_policy(self, policy):
+            self.policy = policy
+
+        def connect(self, host, **kwargs):
+            connections.append((self, host, kwargs))
+
+        def open_sftp(self):
+            return server
+
+        def close(self):
+            self.closed = True
+
+    class RejectPolicy:
+        pass
+
+    monkeypatch.setattr(backup_module, 'paramiko',
+                        types.SimpleNamespace(SSHClient=SSHClient, RejectPolicy=RejectPolicy))
+    server.connections = connections
+    return server
+
+
+def test_sftp_resumes_partial_upload(backup_module, sftp, source, tmp_path):
+    destination = backup_module.SFTPDestination('nas', {'host': 'nas.local', 'username': 'backup',
+                                                        'path': 'duralux'}, backup_module.Throttle())
+    # Envio anterior interrompido: o .part remoto tem o começo do arquivo
+    remote_dir = sftp.root / 'duralux' / 'daily'
+    remote_dir.mkdir(parents=True)
+    (remote_dir / 'files_backup.zip.part').write_bytes(source.read_bytes()[:1500])
+
+    journal = backup_module.UploadJournal(tmp_path / 'backups' / 'uploads')
+    state, stale = journal.open('nas', 'daily/files_backup.zip', source)
+    sent = destination.upload(source, state, journal.save)
+
+    assert sent == source.stat().st_size - 1500
+    assert sftp.opened == [('duralux/daily/files_backup.zip.part', 'ab')]
+    assert (remote_dir / 'files_backup.zip').read_bytes() == source.read_bytes()
+    assert not (remote_dir / 'files_backup.zip.part').exists()
+
+    # Só servidores conhecidos
+    [(client, host, options)] = sftp.connections
+    assert host == 'nas.local' and options['username'] == 'backup'
+    assert client.known_hosts and isinstance(client.policy, backup_module.paramiko.RejectPolicy)
+    assert client.closed
+
+
+def test_sftp_new_upload_creates_directories(backup_module, sftp, source, tmp_path):
+    destination = backup_module.SFTPDestination('nas', {'host': 'nas.local', 'path': 'duralux'},
+                                                backup_module.Throttle())
+    state = {'destination': 'nas', 'key': 'daily/files_backup.zip', 'size': source.stat().st_size}
+
+    assert destination.upload(source, state, lambda state: None) == state['size']
+    assert sftp.opened == [('duralux/daily/files_backup.zip.part', 'wb')]
+    assert (sftp.root / 'duralux' / 'daily' / 'files_backup.zip').read_bytes() == source.read_bytes()
+
+    # discard() de um envio sem .part não falha
+    destination.discard(state)
+
+
+def test_upload_journal_reuses_entry_until_source_changes(backup_module, source, tmp_path):
+    journal = backup_module.UploadJournal(tmp_path / 'backups' / 'uploads')
+    state, stale = journal.open('s3', 'files_backup.zip', source)
+    assert stale is None
+    state['upload_id'] = 'upload-1'
+    journal.save(state)
+
+    # Outro processo: mesma origem, mesma entrada (com o UploadId)
+    reopened, stale = backup_module.UploadJournal(journal.journal_dir).open('s3', 'files_backup.zip', source)
+    assert reopened['upload_id'] == 'upload-1' and stale is None
+
+    # Origem alterada: entrada nova, a anterior volta para ser descartada
+    source.write_bytes(b'outro backup')
+    fresh, stale = journal.open('s3', 'files_backup.zip', source)
+    assert 'upload_id' not in fresh and fresh['size'] == len(b'outro backup')
+    assert stale['upload_id'] == 'upload-1'
+
+    # Mesma chave em outro destino é outra entrada; JSON inválido é ignorado
+    journal.open('nas', 'files_backup.zip', source)
+    (journal.journal_dir / 'broken.json').write_text('{', encoding='utf-8')
+    assert sorted(entry['destination'] for entry in journal.pending()) == ['nas', 's3']
+
+    journal.remove(fresh)
+    assert [entry['destination'] for entry in journal.pending()] == ['nas']
+
+
+def test_throttle_spreads_bytes_over_time(backup_module, monkeypatch):
+    clock = [100.0]
+    sleeps = []
+
+    def sleep(seconds):
+        sleeps.append(round(seconds, 6))
+        clock[0] += seconds
+
+    monkeypatch.setattr(backup_module, 'time', types.SimpleNamespace(monotonic=lambda: clock[0], sleep=sleep))
+
+    unlimited = backup_module.Throttle()
+    unlimited.consume(10 ** 9)
+    assert sleeps == []
+
+    throttle = backup_module.Throttle(1000)
+    throttle.consume(1000)      # saldo inicial cobre o primeiro segundo
+    throttle.consume(500)       # saldo negativo: dorme até pagar
+    clock[0] += 0.25
+    throttle.consume(1000)      # blocos grandes respeitam a média
+    assert sleeps == [0.5, 0.75]
+    assert clock[0] - 100.0 == pytest.approx(1.5)
+
+
+def test_copy_throttled_copies_in_blocks(backup_module, source, tmp_path):
+    consumed = []
+    throttle = types.SimpleNamespace(consume=consumed.append)
+    target = tmp_path / 'copy.bin'
+    with open(source, 'rb') as src, open(target, 'wb') as dest:
+        assert backup_module.copy_throttled(src, dest, throttle, block_size=PART_SIZE) == source.stat().st_size
+
+    assert target.read_bytes() == source.read_bytes()
+    assert consumed == [PART_SIZE] * 4 + [100]
+
+
+def test_upload_action_resumes_pending_uploads(backup_module, make_system, project, monkeypatch):
+    target_dir = project / 'nas'
+    system = make_system(destinations=[{'type': 'local', 'name': 'nas', 'path': str(target_dir)}])
+    archive = system.backup_dir / 'files_backup.zip'
+    archive.write_bytes(os.urandom(5000))
+
+    # Envio interrompido por um processo anterior: entrada no journal e .part parcial
+    journal = backup_module.UploadJournal(system.upload_journal_dir)
+    journal.open('nas', 'files_backup.zip', archive)
+    target_dir.mkdir()
+    (target_dir / 'files_backup.zip.part').write_bytes(archive.read_bytes()[:2000])
+
+    # Criar o uploader não envia nada por conta própria
+    assert system.get_uploader().wait() == []
+
+    monkeypatch.setattr(sys, 'argv', ['duralux-backup-system-v7.py', '--config',
+                                      str(project / 'backup_config.json'), '--action', 'upload'])
+    backup_module.main()
+
+    assert (target_dir / 'files_backup.zip').read_bytes() == archive.read_bytes()
+    assert not (target_dir / 'files_backup.zip.part').exists()
+    assert journal.pending() == []
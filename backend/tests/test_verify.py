@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Verificação dos backups: membro corrompido em um volume e registro no histórico"""
+
+import sys
+import sqlite3
+import zipfile
+
+import pytest
+
+
+def verify_options():
+    return {
+        'verify_backups': True,
+        'create_checksums': True,
+        'parallel_compression': False,
+        'restore_workers': 1
+    }
+
+
+def corrupt_member(volume, member):
+    """Inverte um byte no meio dos dados comprimidos do membro"""
+    with zipfile.ZipFile(volume) as zipf:
+        info = zipf.getinfo(member)
+    with open(volume, 'r+b') as f:
+        f.seek(info.header_offset + 26)
+        name_length, extra_length = int.from_bytes(f.read(2), 'little'), int.from_bytes(f.read(2), 'little')
+        position = info.header_offset + 30 + name_length + extra_length + info.compress_size // 2
+        f.seek(position)
+        byte = f.read(1)
+        f.seek(position)
+        f.write(bytes([byte[0] ^ 0xFF]))
+
+
+def verification_row(system, filename):
+    conn = sqlite3.connect(system.db_file)
+    try:
+        return conn.execute('SELECT verify_status, verify_error FROM backup_history WHERE filename = ?',
+                            (filename,)).fetchone()
+    finally:
+        conn.close()
+
+
+def test_new_backup_is_verified_and_recorded(make_system):
+    system = make_system(advanced_options=verify_options())
+
+    result = system.perform_files_backup()
+
+    assert result['success']
+    assert result['verified'] is True
+    assert verification_row(system, result['filename']) == ('ok', None)
+
+
+def test_verify_action_reports_corrupted_member(backup_module, make_system, project, monkeypatch, caplog):
+    system = make_system(advanced_options=verify_options())
+    result = system.perform_files_backup()
+    assert result['verified'] is True
+    corrupt_member(result['filename'], 'site/css/app.css')
+
+    monkeypatch.setattr(sys, 'argv', ['duralux-backup-system-v7.py', '--config',
+                                      str(project / 'backup_config.json'), '--action', 'verify'])
+    with pytest.raises(SystemExit) as exit_info:
+        backup_module.main()
+
+    assert exit_info.value.code == 1
+    assert 'Backup corrompido' in caplog.text
+    status, error = verification_row(system, result['filename'])
+    assert status == 'failed'
+    assert 'site/css/app.css' in error
+    assert 'checksum do arquivo não confere' in error
+    assert 'site/index.html' not in error
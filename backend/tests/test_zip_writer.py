@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""ZipStreamWriter: volumes gravados no formato do zip, lidos pelo zipfile"""
+
+import io
+import os
+import zlib
+import zipfile
+
+import pytest
+
+DATA = b'Duralux CRM ' * 4000
+DATE = (2024, 5, 17, 13, 45, 10)
+
+
+class StreamOnly:
+    """Destino sem tell/seek, como o HashingFile"""
+
+    def __init__(self):
+        self.buffer = io.BytesIO()
+
+    def write(self, data):
+        return self.buffer.write(data)
+
+
+def write_archive(backup_module, members=1):
+    target = StreamOnly()
+    writer = backup_module.ZipStreamWriter(target, compression_level=6)
+    for index in range(members):
+        for method in (zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED, zipfile.ZIP_LZMA):
+            with writer.open(f"stream/{index}/{method}.txt", DATE, 0o100640, method,
+                             file_size=len(DATA)) as dest:
+                dest.write(DATA[:1000])
+                dest.write(memoryview(DATA)[1000:])
+
+            compressor = backup_module.zip_member_compressor(method, 6)
+            payload = DATA if compressor is None else compressor.compress(DATA) + compressor.flush()
+            writer.write_compressed(f"worker/{index}/{method}.txt", DATE, 0o100644, method,
+                                    payload, len(DATA), zlib.crc32(DATA))
+    writer.writestr('relatórios/ação.json', '{"ok": true}')
+    writer.close()
+    return target.buffer.getvalue()
+
+
+def check_archive(content, expected_members):
+    with zipfile.ZipFile(io.BytesIO(content)) as zipf:
+        assert zipf.testzip() is None
+        infos = zipf.infolist()
+        assert len(infos) == expected_members
+        for info in infos[:-1]:
+            assert zipf.read(info) == DATA
+            assert info.date_time == DATE
+        assert zipf.read('relatórios/ação.json') == b'{"ok": true}'
+        return infos
+
+
+def test_members_round_trip_through_zipfile(backup_module):
+    infos = check_archive(write_archive(backup_module), 7)
+    modes = {info.filename: info.external_attr >> 16 for info in infos}
+    assert modes['stream/0/0.txt'] == 0o100640
+    assert modes['worker/0/14.txt'] == 0o100644
+    assert [info.compress_type for info in infos[:6]] == [0, 0, 8, 8, 14, 14]
+
+
+def test_zip64_records(backup_module, monkeypatch):
+    # Limites reduzidos: tamanhos, offsets e quantidade de membros em ZIP64
+    monkeypatch.setattr(backup_module, 'ZIP64_LIMIT', 1000)
+    monkeypatch.setattr(backup_module, 'ZIP_FILECOUNT_LIMIT', 5)
+    content = write_archive(backup_module, members=2)
+    assert b'PK\x06\x06' in content and b'PK\x06\x07' in content
+    check_archive(content, 13)
+
+
+def test_stream_over_limit_without_zip64_fails(backup_module, monkeypatch):
+    monkeypatch.setattr(backup_module, 'ZIP64_LIMIT', 1000)
+    writer = backup_module.ZipStreamWriter(StreamOnly())
+    dest = writer.open('grande.bin', DATE, 0o644, zipfile.ZIP_STORED, file_size=10)
+    dest.write(os.urandom(2000))
+    with pytest.raises(RuntimeError):
+        dest.close()
+
+
+def test_one_member_open_at_a_time(backup_module):
+    writer = backup_module.ZipStreamWriter(StreamOnly())
+    with writer.open('a.txt', DATE, 0o644, zipfile.ZIP_DEFLATED):
+        with pytest.raises(ValueError):
+            writer.writestr('b.txt', b'x')
+    writer.writestr('b.txt', b'x')
+    writer.close()
+    assert writer.namelist() == ['a.txt', 'b.txt']
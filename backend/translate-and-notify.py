@@ -9,264 +9,29 @@ import re
 import json
 from pathlib import Path
 
+import glossaries
+from translation_io import write_atomic, pool_map
+
+
 class DuraluxTranslator:
     def __init__(self, base_path):
         self.base_path = Path(base_path)
         self.translations = self.load_translations()
+        self.html_patterns = self.build_html_patterns()
         self.processed_files = []
+        self.workers = os.cpu_count() or 1
         
     def load_translations(self):
-        """Carrega dicionário de traduções"""
-        return {
-            # Navigation & Menu
-            'Navigation': 'Navegação',
-            'Dashboards': 'Painéis',
-            'CRM': 'CRM',
-            'Analytics': 'Analíticos',
-            'Reports': 'Relatórios',
-            'Applications': 'Aplicações',
-            'Proposal': 'Propostas',
-            'Payment': 'Pagamento',
-            'Customers': 'Clientes',
-            'Leads': 'Leads',
-            'Projects': 'Projetos',
-            'Widgets': 'Widgets',
-            'Settings': 'Configurações',
-            'Authentication': 'Autenticação',
-            'Help Center': 'Central de Ajuda',
-            
-            # Specific Pages
-            'Sales Report': 'Relatório de Vendas',
-            'Leads Report': 'Relatório de Leads',
-            'Project Report': 'Relatório de Projetos',
-            'Timesheets Report': 'Relatório de Folha de Ponto',
-            'Chat': 'Chat',
-            'Email': 'Email',
-            'Tasks': 'Tarefas',
-            'Notes': 'Anotações',
-            'Storage': 'Armazenamento',
-            'Calendar': 'Calendário',
-            'Proposal View': 'Visualizar Proposta',
-            'Proposal Edit': 'Editar Proposta',
-            'Proposal Create': 'Criar Proposta',
-            'Invoice View': 'Visualizar Fatura',
-            'Invoice Create': 'Criar Fatura',
-            'Customers View': 'Visualizar Cliente',
-            'Customers Create': 'Criar Cliente',
-            'Leads View': 'Visualizar Lead',
-            'Leads Create': 'Criar Lead',
-            'Projects View': 'Visualizar Projeto',
-            'Projects Create': 'Criar Projeto',
-            
-            # Widgets
-            'Lists': 'Listas',
-            'Tables': 'Tabelas',
-            'Charts': 'Gráficos',
-            'Statistics': 'Estatísticas',
-            'Miscellaneous': 'Diversos',
-            
-            # Settings
-            'General': 'Geral',
-            'SEO': 'SEO',
-            'Tags': 'Tags',
-            'Email': 'Email',
-            'Tasks': 'Tarefas',
-            'Leads': 'Leads',
-            'Support': 'Suporte',
-            'Finance': 'Financeiro',
-            'Gateways': 'Gateways',
-            'Customers': 'Clientes',
-            'Localization': 'Localização',
-            'reCAPTCHA': 'reCAPTCHA',
-            
-            # Authentication
-            'Login': 'Entrar',
-            'Register': 'Registrar',
-            'Error-404': 'Erro-404',
-            'Reset Pass': 'Redefinir Senha',
-            'Verify OTP': 'Verificar OTP',
-            'Maintenance': 'Manutenção',
-            'Cover': 'Capa',
-            'Minimal': 'Mínimo',
-            'Creative': 'Criativo',
-            
-            # Common Elements
-            'Search': 'Buscar',
-            'Search....': 'Buscar...',
-            'Notifications': 'Notificações',
-            'Profile': 'Perfil',
-            'Logout': 'Sair',
-            'Home': 'Início',
-            'Dashboard': 'Painel',
-            'Add New': 'Adicionar Novo',
-            'View All': 'Ver Todos',
-            'Edit': 'Editar',
-            'Delete': 'Excluir',
-            'Save': 'Salvar',
-            'Cancel': 'Cancelar',
-            'Submit': 'Enviar',
-            'Close': 'Fechar',
-            'Back': 'Voltar',
-            'Next': 'Próximo',
-            'Previous': 'Anterior',
-            'Loading': 'Carregando',
-            'No data': 'Sem dados',
-            'Actions': 'Ações',
-            'Status': 'Status',
-            'Active': 'Ativo',
-            'Inactive': 'Inativo',
-            'Date': 'Data',
-            'Time': 'Hora',
-            'Name': 'Nome',
-            'Description': 'Descrição',
-            'Total': 'Total',
-            'Amount': 'Valor',
-            'Price': 'Preço',
-            
-            # Page Titles
-            'Proposal Edit': 'Editar Proposta',
-            'Create Proposal': 'Criar Proposta',
-            'View Proposal': 'Visualizar Proposta',
-            'Lead Management': 'Gerenciamento de Leads',
-            'Customer Management': 'Gerenciamento de Clientes',
-            'Project Management': 'Gerenciamento de Projetos',
-            
-            # Form Elements
-            'Title': 'Título',
-            'Subject': 'Assunto',
-            'Message': 'Mensagem',
-            'Content': 'Conteúdo',
-            'Category': 'Categoria',
-            'Priority': 'Prioridade',
-            'Assigned to': 'Atribuído a',
-            'Due Date': 'Data de Vencimento',
-            'Start Date': 'Data de Início',
-            'End Date': 'Data de Fim',
-            'Progress': 'Progresso',
-            'Completed': 'Concluído',
-            'Pending': 'Pendente',
-            'In Progress': 'Em Andamento',
-            
-            # Notifications
-            'New Lead': 'Novo Lead',
-            'New Message': 'Nova Mensagem',
-            'Task Completed': 'Tarefa Concluída',
-            'Payment Received': 'Pagamento Recebido',
-            'Project Updated': 'Projeto Atualizado',
-            
-            # Common Phrases
-            'Welcome to': 'Bem-vindo ao',
-            'Getting started': 'Primeiros passos',
-            'Learn more': 'Saiba mais',
-            'Read more': 'Leia mais',
-            'Show more': 'Mostrar mais',
-            'Load more': 'Carregar mais',
-            'View details': 'Ver detalhes',
-            'Quick actions': 'Ações rápidas',
-            'Recent activity': 'Atividade recente',
-            'Popular items': 'Itens populares',
-            'Recommended': 'Recomendado',
-            
-            # Months
-            'January': 'Janeiro',
-            'February': 'Fevereiro',
-            'March': 'Março',
-            'April': 'Abril',
-            'May': 'Maio',
-            'June': 'Junho',
-            'July': 'Julho',
-            'August': 'Agosto',
-            'September': 'Setembro',
-            'October': 'Outubro',
-            'November': 'Novembro',
-            'December': 'Dezembro',
-            
-            # Days
-            'Monday': 'Segunda-feira',
-            'Tuesday': 'Terça-feira',
-            'Wednesday': 'Quarta-feira',
-            'Thursday': 'Quinta-feira',
-            'Friday': 'Sexta-feira',
-            'Saturday': 'Sábado',
-            'Sunday': 'Domingo',
-            
-            # Notification Center v6.0 - Specific Terms
-            'Notification Center': 'Central de Notificações',
-            'Push Notifications': 'Notificações Push',
-            'Email Notifications': 'Notificações por Email',
-            'SMS Notifications': 'Notificações por SMS',
-            'Webhook Notifications': 'Notificações Webhook',
-            'Notification Templates': 'Modelos de Notificação',
-            'Notification History': 'Histórico de Notificações',
-            'Notification Settings': 'Configurações de Notificação',
-            'Mark as Read': 'Marcar como Lida',
-            'Mark all as Read': 'Marcar Todas como Lidas',
-            'Unread Notifications': 'Notificações Não Lidas',
-            'Read Notifications': 'Notificações Lidas',
-            'Notification Analytics': 'Análises de Notificação',
-            'Delivery Rate': 'Taxa de Entrega',
-            'Read Rate': 'Taxa de Leitura',
-            'Click Rate': 'Taxa de Clique',
-            'Notification Preferences': 'Preferências de Notificação',
-            'Quiet Hours': 'Horário Silencioso',
-            'Do Not Disturb': 'Não Perturbe',
-            'Send Test Notification': 'Enviar Notificação de Teste',
-            'Notification Queue': 'Fila de Notificações',
-            'Processing Queue': 'Processando Fila',
-            'Failed Notifications': 'Notificações Falharam',
-            'Retry Failed': 'Tentar Novamente',
-            'Schedule Notification': 'Agendar Notificação',
-            'Immediate Delivery': 'Entrega Imediata',
-            'Delayed Delivery': 'Entrega Programada',
-            'Bulk Notifications': 'Notificações em Lote',
-            'Personalized Messages': 'Mensagens Personalizadas',
-            
-            # Additional System Terms
-            'System Integration': 'Integração do Sistema',
-            'Performance Dashboard': 'Painel de Performance',
-            'Test Dashboard': 'Painel de Teste',
-            'Downloading Center': 'Centro de Downloads',
-            'Download Now': 'Baixar Agora',
-            'KnowledgeBase': 'Base de Conhecimento',
-            'Documentations': 'Documentações',
-            'Add New Items': 'Adicionar Novos Itens',
-            'Mega Menu': 'Menu Mega',
-            
-            # Breadcrumbs and Navigation
-            'You are here': 'Você está aqui',
-            'Current page': 'Página atual',
-            'Go to': 'Ir para',
-            'Return to': 'Retornar para',
-            
-            # Additional CRM Terms
-            'Lead Score': 'Pontuação do Lead',
-            'Conversion Rate': 'Taxa de Conversão',
-            'Sales Pipeline': 'Funil de Vendas',
-            'Deal Value': 'Valor do Negócio',
-            'Win Rate': 'Taxa de Vitória',
-            'Customer Lifetime Value': 'Valor Vitalício do Cliente',
-            'Monthly Recurring Revenue': 'Receita Recorrente Mensal',
-            'Annual Contract Value': 'Valor Anual do Contrato',
-            'Churn Rate': 'Taxa de Cancelamento',
-            'Customer Acquisition Cost': 'Custo de Aquisição de Cliente'
-        }
+        """Carrega dicionário de traduções (glossaries/translate-and-notify.json)"""
+        self.glossary = glossaries.load('translate-and-notify')
+        return self.glossary.entries
     
     def translate_text(self, text):
-        """Traduz um texto usando o dicionário"""
-        # Tradução exata
-        if text in self.translations:
-            return self.translations[text]
-        
-        # Tradução case insensitive
-        for en, pt in self.translations.items():
-            if text.lower() == en.lower():
-                return pt
-        
-        return text  # Retorna original se não encontrar tradução
+        """Traduz um texto usando o dicionário (exato ou sem diferenciar maiúsculas, O(1))"""
+        return self.glossary.lookup(text, text)  # Retorna original se não encontrar tradução
     
-    def process_html_content(self, content):
-        """Processa conteúdo HTML e traduz textos relevantes"""
-        # Padrões para traduzir
+    def build_html_patterns(self):
+        """Padrões de tradução do HTML, compilados uma única vez"""
         patterns = [
             # Títulos e textos entre tags
             (r'<title[^>]*>([^<]+)</title>', lambda m: f'<title>{self.translate_text(m.group(1).strip())}</title>'),
@@ -294,10 +59,13 @@ class DuraluxTranslator:
             (r'alt="([^"]+)"', lambda m: f'alt="{self.translate_text(m.group(1))}"'),
             (r"alt='([^']+)'", lambda m: f"alt='{self.translate_text(m.group(1))}'"),
         ]
-        
+        return [(re.compile(pattern, re.IGNORECASE | re.DOTALL), replacement) for pattern, replacement in patterns]
+    
+    def process_html_content(self, content):
+        """Processa conteúdo HTML e traduz textos relevantes"""
         # Aplicar traduções
-        for pattern, replacement in patterns:
-            content = re.sub(pattern, replacement, content, flags=re.IGNORECASE | re.DOTALL)
+        for pattern, replacement in self.html_patterns:
+            content = pattern.sub(replacement, content)
         
         # Traduzir lang attribute
         content = re.sub(r'<html lang="[^"]*"', '<html lang="pt-BR"', content)
@@ -849,28 +617,53 @@ class DuraluxTranslator:
         content = self.add_notification_center(content)
         
         # Salvar arquivo processado
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(content)
+        write_atomic(file_path, content)
         
         self.processed_files.append(file_path)
         return True
     
-    def process_all_html_files(self):
-        """Processa todos os arquivos HTML do diretório"""
+    def try_process_file(self, file_path):
+        """(sucesso, erro) de process_file; erros voltam como texto (também do pool)"""
+        try:
+            return self.process_file(file_path), None
+        except Exception as e:
+            return False, str(e)
+    
+    def process_files(self, html_files, workers):
+        """(sucesso, erro) de cada arquivo na ordem da lista, em série ou em um pool de processos"""
+        workers = min(workers, len(html_files))
+        if workers <= 1:
+            yield from map(self.try_process_file, html_files)
+            return
+        
+        # Os padrões usam lambdas (não serializáveis), então cada processo
+        # monta o seu tradutor a partir do glossário
+        results = pool_map('try_process_file', html_files, workers,
+                           factory=DuraluxTranslator, args=(self.base_path,))
+        for file_path, (success, error) in zip(html_files, results):
+            if success:
+                self.processed_files.append(file_path)
+            yield success, error
+    
+    def process_all_html_files(self, workers=None):
+        """Processa todos os arquivos HTML do diretório (em paralelo com mais de um worker)"""
         html_files = list(self.base_path.glob('**/*.html'))
+        workers = min(workers or self.workers, len(html_files))
         
         print(f"🌐 Iniciando tradução PT-BR e implementação do Notification Center v6.0")
         print(f"📁 Diretório: {self.base_path}")
         print(f"📄 Encontrados {len(html_files)} arquivos HTML")
+        if workers > 1:
+            print(f"⚙️ Processamento paralelo: {workers} processos")
         print("=" * 60)
         
-        for i, file_path in enumerate(html_files, 1):
-            try:
-                print(f"[{i:3d}/{len(html_files)}] Processando: {file_path.name}")
-                self.process_file(file_path)
+        file_results = self.process_files(html_files, workers)
+        for i, (file_path, (success, error)) in enumerate(zip(html_files, file_results), 1):
+            print(f"[{i:3d}/{len(html_files)}] Processando: {file_path.name}")
+            if success:
                 print(f"            ✅ Traduzido e atualizado com sucesso")
-            except Exception as e:
-                print(f"            ❌ Erro: {e}")
+            else:
+                print(f"            ❌ Erro: {error}")
         
         print("=" * 60)
         print(f"✅ Processamento concluído!")
@@ -9,57 +9,22 @@ import re
 import json
 from pathlib import Path
 
+import glossaries
+
+# $1,234.56 -> R$ 1.234,56
+CURRENCY_FORMAT_PATTERN = re.compile(r'\$(\d{1,3}(?:,\d{3})*(?:\.\d{2})?)')
+
+# Valores em dólar restantes após a conversão de formato (ex: $1234 -> R$ 1234)
+CURRENCY_PATTERNS = [
+    (re.compile(r'\$(\d+(?:,\d{3})*(?:\.\d{2})?)'), r'R$ \1'),
+    (re.compile(r'\$(\d+(?:\.\d{3})*(?:,\d{2})?)'), r'R$ \1'),
+]
+
 class DuraluxTranslator:
     def __init__(self, project_root):
         self.project_root = Path(project_root)
-        self.translations = {
-            # Termos financeiros
-            'USD': '',
-            r'\$(\d+(?:,\d{3})*(?:\.\d{2})?)': r'R$ \1',
-            r'\$(\d+(?:\.\d{3})*(?:,\d{2})?)': r'R$ \1',
-            
-            # Status
-            'Active Deals': 'Negócios Ativos',
-            'Revenue Deals': 'Receita de Vendas', 
-            'Deals Created': 'Negócios Criados',
-            'Deals Closing': 'Negócios Fechados',
-            'Sales Pipeline': 'Funil de Vendas',
-            
-            # Textos gerais
-            'Generate Report': 'Gerar Relatório',
-            'Sales': 'Vendas',
-            'Revenue': 'Receita',
-            'Awaiting': 'Aguardando',
-            'Completed': 'Concluído',
-            'Rejected': 'Rejeitado',
-            'vs last month': 'vs mês anterior',
-            'Monthly': 'Mensal',
-            'Weekly': 'Semanal',
-            'Daily': 'Diário',
-            'Total': 'Total',
-            'Dashboard': 'Painel de Controle',
-            
-            # Interface
-            'Search': 'Buscar',
-            'Filter': 'Filtrar',
-            'Export': 'Exportar',
-            'Import': 'Importar',
-            'Settings': 'Configurações',
-            'Profile': 'Perfil',
-            'Logout': 'Sair',
-            'Login': 'Entrar',
-            'Register': 'Registrar',
-            'Reset Password': 'Redefinir Senha',
-            'Forgot Password': 'Esqueci a Senha',
-            
-            # Status de negócio
-            'New': 'Novo',
-            'In Progress': 'Em Andamento',
-            'Pending': 'Pendente',
-            'Approved': 'Aprovado',
-            'Cancelled': 'Cancelado',
-            'Finished': 'Finalizado',
-        }
+        # Termos do glossário compartilhado (glossaries/translate-project.json)
+        self.translations = glossaries.load('translate-project').entries
         
         # Arquivos a serem processados
         self.file_extensions = ['.html', '.js', '.php', '.css']
@@ -79,9 +44,6 @@ class DuraluxTranslator:
     
     def convert_currency_format(self, text):
         """Converte formato monetário americano para brasileiro"""
-        # $1,234.56 -> R$ 1.234,56
-        pattern = r'\$(\d{1,3}(?:,\d{3})*(?:\.\d{2})?)'
-        
         def replace_currency(match):
             amount = match.group(1)
             # Trocar ponto por vírgula para decimal
@@ -95,7 +57,7 @@ class DuraluxTranslator:
                 # É um valor inteiro com separadores de milhares
                 return f'R$ {amount.replace(",", ".")}'
         
-        return re.sub(pattern, replace_currency, text)
+        return CURRENCY_FORMAT_PATTERN.sub(replace_currency, text)
     
     def translate_text(self, text):
         """Aplica traduções ao texto"""
@@ -104,13 +66,12 @@ class DuraluxTranslator:
         # Primeiro converter moedas
         result = self.convert_currency_format(result)
         
-        # Depois aplicar traduções de termos
+        # Depois aplicar traduções de termos e os valores em dólar restantes
         for english, portuguese in self.translations.items():
-            if english.startswith(r'\$'):  # Regex patterns
-                result = re.sub(english, portuguese, result)
-            else:  # Text replacements
-                result = result.replace(english, portuguese)
-                
+            result = result.replace(english, portuguese)
+        for pattern, replacement in CURRENCY_PATTERNS:
+            result = pattern.sub(replacement, result)
+            
         return result
     
     def process_file(self, file_path):
@@ -165,7 +126,7 @@ class DuraluxTranslator:
                 'files_modified': results['changed_files'],
                 'success_rate': f"{(results['changed_files'] / results['total_files'] * 100):.1f}%" if results['total_files'] > 0 else "0%"
             },
-            'translations_applied': len(self.translations),
+            'translations_applied': len(self.translations) + len(CURRENCY_PATTERNS),
             'modified_files': results['changed_file_list']
         }
         
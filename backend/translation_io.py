@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+DURALUX CRM - Gravação das páginas e pool de processos dos tradutores
+Compartilhado por mass-translator.py e translate-and-notify.py
+
+Uso:
+    from translation_io import write_atomic, pool_map
+    write_atomic(path, html)               # nunca deixa página pela metade
+    pool_map('translate_file', files, 4, worker=translator)
+"""
+
+import os
+import shutil
+import tempfile
+from itertools import repeat
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List
+
+
+def write_atomic(file_path, content):
+    """
+    Grava em um arquivo temporário e renomeia: nunca deixa página pela metade
+
+    O temporário (nome único, no mesmo diretório) vai para o disco com fsync
+    antes do os.replace, então uma queda de energia deixa a página antiga ou
+    a nova. Ele recebe as permissões do arquivo que substitui; um arquivo
+    novo fica com as permissões padrão (umask).
+    """
+    directory, name = os.path.split(os.path.abspath(file_path))
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=f".{name}.", suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        if os.path.exists(file_path):
+            shutil.copymode(file_path, temp_path)
+        else:
+            os.chmod(temp_path, 0o666 & ~current_umask())
+        os.replace(temp_path, file_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def current_umask():
+    """umask do processo (só é possível lê-la trocando e restaurando)"""
+    umask = os.umask(0o022)
+    os.umask(umask)
+    return umask
+
+
+# Objeto de trabalho de cada processo do pool (ver pool_map)
+_pool_worker = None
+
+
+def _init_pool_worker(worker, factory, args):
+    global _pool_worker
+    _pool_worker = worker if factory is None else factory(*args)
+
+
+def _call_pool_worker(method, item):
+    return getattr(_pool_worker, method)(item)
+
+
+def pool_map(method: str, items: List, workers: int, worker=None, factory=None, args=()) -> Iterator:
+    """
+    worker.method(item) de cada item, na ordem da lista, em um pool de processos
+
+    O worker é enviado a cada processo (no fork é herdado sem cópia); quando
+    não é serializável (ex.: padrões com lambdas), passe factory e args para
+    que cada processo monte o seu.
+    """
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_pool_worker,
+                             initargs=(worker, factory, tuple(args))) as executor:
+        yield from executor.map(_call_pool_worker, repeat(method), items)
@@ -2,6 +2,7 @@
 # -*- coding: utf-8 -*-
 """
 Execução direta do tradutor automático - Páginas específicas mais problemáticas
+Páginas inalteradas desde a última execução são puladas; use --force para retraduzir todas
 """
 
 import sys
@@ -34,6 +35,7 @@ def main():
     ]
     
     translator = DuraluxTranslator()
+    force = '--force' in sys.argv
     
     # Criar backup
     backup_path = translator.create_backup()
@@ -50,11 +52,14 @@ def main():
     for i, filename in enumerate(target_files, 1):
         file_path = os.path.join(translator.html_dir, filename)
         
-        if os.path.exists(file_path):
+        if os.path.exists(file_path) and not force and not translator.needs_translation(file_path):
+            print(f"📄 [{i:2d}/{len(target_files)}] ⏭️  {filename} - Sem alterações desde a última tradução")
+        elif os.path.exists(file_path):
             print(f"📄 [{i:2d}/{len(target_files)}] Traduzindo: {filename}")
             
             result = translator.translate_file(file_path)
             if result:
+                translator.record_translation(file_path, result)
                 results.append(result)
                 total_translations += result['translations_count']
                 
@@ -65,6 +70,8 @@ def main():
         else:
             print(f"📄 [{i:2d}/{len(target_files)}] ⚠️  {filename} - Arquivo não encontrado")
     
+    translator.manifest.save()
+    
     # Salvar log
     import json
     from datetime import datetime
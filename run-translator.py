@@ -2,6 +2,7 @@
 # -*- coding: utf-8 -*-
 """
 Execução direta do tradutor automático - Top 10 páginas
+Páginas inalteradas desde a última execução são puladas; use --force para retraduzir todas
 """
 
 import sys
@@ -11,6 +12,8 @@ import importlib.util
 # Carregar o módulo diretamente
 spec = importlib.util.spec_from_file_location("mass_translator", "backend/mass-translator.py")
 mass_translator = importlib.util.module_from_spec(spec)
+# Registrado para que os processos do pool de tradução encontrem as funções
+sys.modules[spec.name] = mass_translator
 spec.loader.exec_module(mass_translator)
 
 DuraluxTranslator = mass_translator.DuraluxTranslator
@@ -22,9 +25,11 @@ def main():
     translator = DuraluxTranslator()
     
     # Executar tradução limitada (top 10)
-    results = translator.translate_all_files(file_limit=10)
+    results = translator.translate_all_files(file_limit=10, force='--force' in sys.argv)
     
-    if results:
+    if results == []:
+        print("\n✅ Nenhuma página precisou ser traduzida")
+    elif results:
         print("\n✅ TRADUÇÃO CONCLUÍDA COM SUCESSO!")
         print(f"📊 Total de traduções realizadas: {sum(r['translations_count'] for r in results)}")
     else: